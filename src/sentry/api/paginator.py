@@ -121,10 +121,11 @@ class BasePaginator:
         # max_hits can be limited to speed up the query
         if max_hits is None:
             max_hits = MAX_HITS_LIMIT
-        if count_hits:
+        if known_hits is not None:
+            # e.g. counted (and cached) for a previous page
+            hits = min(known_hits, max_hits) if count_hits else known_hits
+        elif count_hits:
             hits = self.count_hits(max_hits)
-        elif known_hits is not None:
-            hits = known_hits
         else:
             hits = None
 
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import msgpack
+from django.apps import apps
+from django.db import models
+from django.utils import timezone
+
+from sentry.utils.codecs import Codec
+
+# Values encoded by ``BufferValueCodec`` start with this byte, followed by
+# the format version. Legacy values are either JSON (which starts with ``{``
+# or ``[``) or pickle (which starts with ``\x80`` for any protocol version
+# >= 2, or a printable opcode for protocol 0), so this prefix is never
+# ambiguous.
+MAGIC = b"\x00"
+VERSION = 1
+
+EXT_DATETIME = 1
+EXT_MODEL = 2
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def is_versioned(value: bytes) -> bool:
+    return value[:1] == MAGIC
+
+
+class BufferValueCodec(Codec[Any, bytes]):
+    """
+    Encodes filter and extra values written to the buffer using msgpack.
+
+    In addition to the types natively supported by msgpack, this supports
+    ``datetime`` objects (preserving microseconds and whether or not the
+    value is timezone aware) and model instances. Model instances are stored
+    as a reference to their primary key and decoded as an unsaved instance
+    that only has its primary key set, which is sufficient for using them in
+    query filters and when assigning foreign keys.
+    """
+
+    def __default(self, value: Any) -> Any:
+        if isinstance(value, datetime):
+            aware = timezone.is_aware(value)
+            if aware:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            delta = value - EPOCH
+            return msgpack.ExtType(
+                EXT_DATETIME,
+                msgpack.packb([delta.days * 86400 + delta.seconds, delta.microseconds, aware]),
+            )
+        elif isinstance(value, models.Model):
+            return msgpack.ExtType(EXT_MODEL, msgpack.packb([value._meta.label, value.pk]))
+        raise TypeError(f"cannot encode {type(value)!r}")
+
+    def __ext_hook(self, code: int, data: bytes) -> Any:
+        if code == EXT_DATETIME:
+            seconds, microseconds, aware = msgpack.unpackb(data)
+            value = EPOCH + timedelta(seconds=seconds, microseconds=microseconds)
+            return value.replace(tzinfo=timezone.utc) if aware else value
+        elif code == EXT_MODEL:
+            label, pk = msgpack.unpackb(data)
+            return apps.get_model(label)(pk=pk)
+        return msgpack.ExtType(code, data)
+
+    def encode(self, value: Any) -> bytes:
+        return MAGIC + bytes([VERSION]) + msgpack.packb(value, default=self.__default)
+
+    def decode(self, value: bytes) -> Any:
+        if not is_versioned(value):
+            raise ValueError("value was not encoded by this codec")
+
+        version = value[1]
+        if version != VERSION:
+            raise ValueError(f"unsupported buffer value version: {version}")
+
+        return msgpack.unpackb(value[2:], ext_hook=self.__ext_hook)
@@ -1,5 +1,6 @@
 import pickle
 import threading
+from collections import defaultdict
 from datetime import datetime
 from time import time
 
@@ -8,17 +9,20 @@ from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 
 from sentry.buffer import Buffer
+from sentry.buffer.codecs import BufferValueCodec, is_versioned
 from sentry.exceptions import InvalidConfiguration
 from sentry.tasks.process_buffer import process_incr, process_pending
 from sentry.utils import json, metrics
 from sentry.utils.compat import crc32
 from sentry.utils.hashlib import md5_text
 from sentry.utils.imports import import_string
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
 
 _local_buffers = None
 _local_buffers_lock = threading.Lock()
 
+flush_keys = load_script("buffer/flush.lua")
+
 
 class PendingBuffer:
     def __init__(self, size):
@@ -51,12 +55,35 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(
+        self,
+        pending_partitions=1,
+        incr_batch_size=2,
+        value_encoding="pickle",
+        batched_flush=False,
+        **options,
+    ):
+        """
+        ``value_encoding`` controls how filters and extra values are written
+        to Redis, and may be either ``pickle`` (legacy) or ``msgpack``. Both
+        encodings (as well as the legacy JSON encoding) are always readable,
+        so deploy all buffer processing workers before switching writers to
+        ``msgpack``.
+
+        If ``batched_flush`` is enabled, every batch of keys queued by
+        ``process_pending`` is read and removed with one script invocation
+        per Redis host, rather than taking a lock and issuing a round trip for
+        every key. This is most effective with a larger ``incr_batch_size``.
+        """
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        self.value_encoding = value_encoding
+        self.batched_flush = batched_flush
+        self.codec = BufferValueCodec()
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
+        assert self.value_encoding in ("pickle", "msgpack")
 
     def validate(self):
         try:
@@ -126,6 +153,29 @@ class RedisBuffer(Buffer):
             raise TypeError(type(value))
         return (type_, str(value))
 
+    def _encode(self, value):
+        if self.value_encoding == "msgpack":
+            return self.codec.encode(value)
+        return pickle.dumps(value)
+
+    def _decode_filters(self, payload):
+        if is_versioned(payload):
+            return self.codec.decode(payload)
+        elif payload.startswith(b"{"):
+            return self._load_values(json.loads(payload.decode("utf-8")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            return pickle.loads(payload)
+
+    def _decode_extra(self, payload):
+        if is_versioned(payload):
+            return self.codec.decode(payload)
+        elif payload.startswith(b"["):
+            return self._load_value(json.loads(payload.decode("utf-8")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            return pickle.loads(payload)
+
     def _load_values(self, payload):
         result = {}
         for k, (t, v) in payload.items():
@@ -184,7 +234,7 @@ class RedisBuffer(Buffer):
         pipe.hsetnx(key, "m", f"{model.__module__}.{model.__name__}")
         # TODO(dcramer): once this goes live in production, we can kill the pickle path
         # (this is to ensure a zero downtime deploy where we can transition event processing)
-        pipe.hsetnx(key, "f", pickle.dumps(filters))
+        pipe.hsetnx(key, "f", self._encode(filters))
         # pipe.hsetnx(key, 'f', json.dumps(self._dump_values(filters)))
         for column, amount in columns.items():
             pipe.hincrby(key, "i+" + column, amount)
@@ -196,7 +246,7 @@ class RedisBuffer(Buffer):
             for column, value in extra.items():
                 # TODO(dcramer): once this goes live in production, we can kill the pickle path
                 # (this is to ensure a zero downtime deploy where we can transition event processing)
-                pipe.hset(key, "e+" + column, pickle.dumps(value))
+                pipe.hset(key, "e+" + column, self._encode(value))
                 # pipe.hset(key, 'e+' + column, json.dumps(self._dump_value(value)))
 
         if signal_only is True:
@@ -262,9 +312,67 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if self.batched_flush:
+            self._process_batch_incr(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
+    def _process_batch_incr(self, keys):
+        router = self.cluster.get_router()
+        keys_by_host = defaultdict(list)
+        for key in keys:
+            keys_by_host[router.get_host_for_key(key)].append(key)
+
+        for host, host_keys in keys_by_host.items():
+            script_keys = []
+            for key in host_keys:
+                script_keys.extend([key, self._make_pending_key_from_key(key)])
+
+            with metrics.timer("buffer.flush-batch"):
+                results = flush_keys(self.cluster.get_local_client(host), script_keys, [])
+            metrics.timing("buffer.flush-batch.size", len(host_keys))
+
+            for key, values in zip(host_keys, results):
+                # The values have already been removed from Redis, so make
+                # sure a failure to process one key doesn't drop the others.
+                try:
+                    self._process_values(key, dict(zip(values[::2], values[1::2])))
+                except Exception:
+                    self.logger.exception("buffer.flush-batch.failed", extra={"redis_key": key})
+
+    def _process_values(self, key, values):
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_text(k): v for k, v in values.items()}
+
+        if not values:
+            metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+            self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            return
+
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))
+
+        filters = self._decode_filters(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                extra_values[k[2:]] = self._decode_extra(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        super().process(model, incr_values, filters, extra_values, signal_only)
+
     def _process_single_incr(self, key):
         client = self.cluster.get_routing_client()
         lock_key = self._make_lock_key(key)
@@ -284,43 +392,6 @@ class RedisBuffer(Buffer):
             pipe.zrem(pending_key, key)
             pipe.delete(key)
             values = pipe.execute()[0]
-
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_text(k): v for k, v in values.items()}
-
-            if not values:
-                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
-                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
-                return
-
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))
-
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super().process(model, incr_values, filters, extra_values, signal_only)
+            self._process_values(key, values)
         finally:
             client.delete(lock_key)
@@ -1382,6 +1382,9 @@ CACHE_VERSION = 1
 
 # Digests backend
 SENTRY_DIGESTS = "sentry.digests.backends.dummy.DummyBackend"
+# Set ``codec`` to ``{"path": "sentry.digests.codecs.NotificationCodec"}`` to
+# store records as references to their events instead of pickling them (records
+# written by the default codec can still be read after switching.)
 SENTRY_DIGESTS_OPTIONS = {}
 
 # Quota backend
@@ -1390,6 +1393,9 @@ SENTRY_QUOTA_OPTIONS = {}
 
 # Cache for Relay project configs
 SENTRY_RELAY_PROJECTCONFIG_CACHE = "sentry.relay.projectconfig_cache.redis.RedisProjectConfigCache"
+# Set ``zstd_dictionaries`` to a list of paths to dictionaries trained with
+# ``sentry relay train-dictionary`` to compress project configs with the first
+# one (the others are only used to read configs written before a rotation.)
 SENTRY_RELAY_PROJECTCONFIG_CACHE_OPTIONS = {}
 
 # Which cache to use for debouncing cache updates to the projectconfig cache
@@ -1398,6 +1404,17 @@ SENTRY_RELAY_PROJECTCONFIG_DEBOUNCE_CACHE = (
 )
 SENTRY_RELAY_PROJECTCONFIG_DEBOUNCE_CACHE_OPTIONS = {}
 
+# Queue that coalesces invalidations of relay project configs. The base
+# implementation disables coalescing, use
+# "sentry.relay.projectconfig_invalidation_queue.redis.RedisProjectConfigInvalidationQueue"
+# to enable it.
+SENTRY_RELAY_PROJECTCONFIG_INVALIDATION_QUEUE = (
+    "sentry.relay.projectconfig_invalidation_queue.base.ProjectConfigInvalidationQueue"
+)
+SENTRY_RELAY_PROJECTCONFIG_INVALIDATION_QUEUE_OPTIONS = {}
+# The maximum number of queued invalidations handled by one task.
+SENTRY_RELAY_PROJECTCONFIG_INVALIDATION_BATCH_SIZE = 1000
+
 # Rate limiting backend
 SENTRY_RATELIMITER = "sentry.ratelimits.base.RateLimiter"
 SENTRY_RATELIMITER_ENABLED = False
@@ -1421,6 +1438,31 @@ SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS = {}
+# The maximum total size (in bytes of encoded payloads) of the process-local
+# cache of nodes, which is consulted before the ``nodedata`` cache and the
+# nodestore backend itself. 0 disables the local cache.
+SENTRY_NODESTORE_LOCAL_CACHE_SIZE = 0
+# The number of seconds nodes are kept in the process-local cache.
+SENTRY_NODESTORE_LOCAL_CACHE_TTL = 30
+# The format new nodes are written in (see ``sentry.nodestore.encoding``.)
+# Nodes in any format can be read regardless of this setting, so every
+# process reading from nodestore must be deployed before it is changed.
+SENTRY_NODESTORE_FORMAT_VERSION = 1
+# The zstd compression level used for version 2 nodes (0 disables compression.)
+SENTRY_NODESTORE_ZSTD_LEVEL = 3
+# Paths to zstd dictionaries (see ``sentry nodestore train-dictionary``) used
+# for version 2 nodes. The first dictionary is used to compress new nodes, the
+# others are kept to read nodes written with previous dictionaries.
+SENTRY_NODESTORE_ZSTD_DICTIONARIES = ()
+
+# The number of threads the deletion tasks use to delete child relations (see
+# ``sentry.deletions.engine``.) 0 deletes child relations one at a time.
+SENTRY_DELETIONS_CONCURRENCY = 0
+# The number of shards (by id) the rows of each child relation are split into
+# when deleting them concurrently.
+SENTRY_DELETIONS_NUM_SHARDS = 4
+# The number of rows deleted per statement by keyset-paginated deletes.
+SENTRY_DELETIONS_BATCH_SIZE = 10000
 
 # Tag storage backend
 SENTRY_TAGSTORE = os.environ.get("SENTRY_TAGSTORE", "sentry.tagstore.snuba.SnubaTagStorage")
@@ -1465,6 +1507,10 @@ SENTRY_METRICS_SKIP_INTERNAL_PREFIXES = []  # Order this by most frequent prefix
 SENTRY_METRICS_INDEXER = "sentry.sentry_metrics.indexer.postgres_v2.StaticStringsIndexerDecorator"
 SENTRY_METRICS_INDEXER_OPTIONS = {}
 SENTRY_METRICS_INDEXER_CACHE_TTL = 3600 * 2
+# The number of most recently seen strings (and the maximum per organization)
+# the indexer consumer preloads into its local cache when it starts.
+SENTRY_METRICS_INDEXER_WARM_UP_LIMIT = 10000
+SENTRY_METRICS_INDEXER_WARM_UP_ORG_LIMIT = 1000
 
 # Rate limits during string indexing for our metrics product.
 # Which cluster to use. Example: {"cluster": "default"}
@@ -1538,6 +1584,34 @@ SENTRY_SOURCE_FETCH_MAX_SIZE = 40 * 1024 * 1024
 # e.g. memcached defaults to 1MB  = 1024 * 1024
 SENTRY_CACHE_MAX_VALUE_SIZE = None
 
+# Maximum total size (in bytes of the raw files) of the parsed JavaScript
+# sources and sourcemaps each worker process keeps in memory, so that they are
+# not parsed again for every event of a release. Set to 0 to disable.
+SENTRY_JS_VIEW_CACHE_SIZE = 0
+
+# Time (in seconds) parsed JavaScript sources and sourcemaps are kept in memory
+SENTRY_JS_VIEW_CACHE_TTL = 600
+
+# Directory for a local on-disk cache of decompressed release files and
+# sources, shared by all workers on a host. Defaults to None which disables it.
+SENTRY_JS_DISK_CACHE_PATH = None
+
+# Maximum size (in bytes) of the on-disk cache of decompressed release files
+SENTRY_JS_DISK_CACHE_SIZE = 1024 * 1024 * 1024
+
+# The codec ``sentry.utils.json`` serializes with, unless a call site picks one
+# explicitly. Either "simplejson" or "rapidjson", which produces semantically
+# equal (but not byte-identical) output and is considerably faster for events.
+SENTRY_JSON_CODEC = "simplejson"
+
+# Maximum total number of ownership rules (including CODEOWNERS) each process
+# keeps compiled in memory, so that they are not compiled again for every event
+# of a project. Set to 0 to disable.
+SENTRY_OWNERSHIP_INDEX_CACHE_SIZE = 100000
+
+# Time (in seconds) compiled ownership rules are kept in memory
+SENTRY_OWNERSHIP_INDEX_CACHE_TTL = 600
+
 # Fields which managed users cannot change via Sentry UI. Username and password
 # cannot be changed by managed users. Optionally include 'email' and
 # 'name' in SENTRY_MANAGED_USER_FIELDS.
@@ -1770,6 +1844,12 @@ SENTRY_TEAM_ROLES = (
 SENTRY_OPTIONS = {}
 SENTRY_DEFAULT_OPTIONS = {}
 
+# When set, every process loads all stored options with a single query, and
+# keeps them until a change of any option is published through the cache. The
+# published version is checked at most once per this many seconds. Otherwise,
+# options are fetched one by one and expire after their TTL.
+SENTRY_OPTIONS_VERSION_CHECK_INTERVAL = 0
+
 # You should not change this setting after your database has been created
 # unless you have altered all schemas first
 SENTRY_USE_BIG_INTS = False
@@ -2736,6 +2816,10 @@ ORGANIZATION_VITALS_OVERVIEW_PROJECT_LIMIT = 300
 SENTRY_STRING_INDEXER_CACHE_OPTIONS = {
     "version": 1,
     "cache_name": "default",
+    # Size (in bytes) of the process-local cache in front of the shared
+    # cache, disabled if 0.
+    "local_cache_size": 0,
+    "local_cache_ttl": 600,
 }
 
 SERVER_COMPONENT_MODE = os.environ.get("SENTRY_SERVER_COMPONENT_MODE", None)
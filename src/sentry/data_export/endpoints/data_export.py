@@ -14,12 +14,13 @@ from sentry.exceptions import InvalidSearchQuery
 from sentry.models import Environment
 from sentry.search.events.builder import QueryBuilder
 from sentry.utils import metrics
+from sentry.utils.options import sample_modulo
 from sentry.utils.snuba import MAX_FIELDS, Dataset
 
 from ..base import ExportQueryType
 from ..models import ExportedData
 from ..processors.discover import DiscoverProcessor
-from ..tasks import assemble_download
+from ..tasks import assemble_download, stream_download
 
 
 class DataExportQuerySerializer(serializers.Serializer):
@@ -157,7 +158,11 @@ class DataExportEndpoint(OrganizationEndpoint, EnvironmentMixin):
                 metrics.incr(
                     "dataexport.enqueue", tags={"query_type": data["query_type"]}, sample_rate=1.0
                 )
-                assemble_download.delay(
+                if sample_modulo("data-export.streaming-rollout-rate", organization.id):
+                    task = stream_download
+                else:
+                    task = assemble_download
+                task.delay(
                     data_export_id=data_export.id, export_limit=limit, environment_id=environment_id
                 )
                 status = 201
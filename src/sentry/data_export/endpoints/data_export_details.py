@@ -50,5 +50,8 @@ class DataExportDetailsEndpoint(OrganizationEndpoint):
             iter(lambda: raw_file.read(4096), b""), content_type="text/csv"
         )
         response["Content-Length"] = file.size
+        # Streamed exports are stored gzip-compressed
+        if file.headers.get("Content-Encoding"):
+            response["Content-Encoding"] = file.headers["Content-Encoding"]
         response["Content-Disposition"] = f'attachment; filename="{file.name}"'
         return response
@@ -90,23 +90,35 @@ class IssuesByTagProcessor:
             result["ip_address"] = euser.ip_address if euser else ""
         return result
 
-    def get_raw_data(self, limit=1000, offset=0):
+    def get_raw_data(self, limit=1000, offset=0, callbacks=None):
         """
         Returns list of GroupTagValues
+
+        The processor's callbacks (which may query the database) are run on
+        the results unless other ``callbacks`` are given.
         """
         return tagstore.get_group_tag_value_iter(
             project_id=self.group.project_id,
             group_id=self.group.id,
             environment_ids=[self.environment_id],
             key=self.lookup_key,
-            callbacks=self.callbacks,
+            callbacks=self.callbacks if callbacks is None else callbacks,
             limit=limit,
             offset=offset,
         )
 
+    def serialize_raw_data(self, raw_data):
+        """
+        Runs the processor's callbacks on GroupTagValues that were fetched
+        without them, and returns the list of serialized dictionaries
+        """
+        for callback in self.callbacks:
+            callback(raw_data)
+        return [self.serialize_row(item, self.key) for item in raw_data]
+
     def get_serialized_data(self, limit=1000, offset=0):
         """
         Returns list of serialized GroupTagValue dictionaries
         """
-        raw_data = self.get_raw_data(limit=limit, offset=offset)
-        return [self.serialize_row(item, self.key) for item in raw_data]
+        raw_data = self.get_raw_data(limit=limit, offset=offset, callbacks=())
+        return self.serialize_raw_data(raw_data)
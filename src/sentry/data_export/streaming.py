@@ -0,0 +1,118 @@
+import csv
+import io
+import logging
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from itertools import islice
+
+from django.core.files.base import ContentFile
+from django.db import connections
+
+from sentry.models import DEFAULT_BLOB_SIZE, FileBlob, FileBlobIndex
+
+logger = logging.getLogger(__name__)
+
+
+def iter_pages(get_page, export_limit, batch_size, concurrency=1):
+    """
+    Yield the pages of an export in order, where ``get_page(limit, offset)``
+    returns the rows of a single page.
+
+    Up to ``concurrency`` pages are fetched ahead concurrently while the
+    previous pages are being written. Iteration stops at the first page that
+    is not full, or once ``export_limit`` rows have been fetched.
+    """
+    offsets = iter(range(0, export_limit, batch_size))
+
+    def fetch(offset):
+        try:
+            return get_page(limit=min(batch_size, export_limit - offset), offset=offset)
+        finally:
+            if concurrency > 1:
+                # Every worker thread has its own database connections.
+                connections.close_all()
+
+    if concurrency <= 1:
+        for offset in offsets:
+            page = fetch(offset)
+            yield page
+            if len(page) < batch_size:
+                return
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque(executor.submit(fetch, offset) for offset in islice(offsets, concurrency))
+        try:
+            while pending:
+                page = pending.popleft().result()
+                yield page
+                if len(page) < batch_size:
+                    return
+                for offset in islice(offsets, 1):
+                    pending.append(executor.submit(fetch, offset))
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class ExportFileWriter:
+    """
+    Writes the rows of an export as gzip-compressed CSV directly into the
+    blobs of ``file``, so exports neither need to be buffered in temporary
+    files nor merged once all of their rows have been written.
+
+    ``close`` must be called once all rows have been written to store the
+    remaining data and the size and checksum of the file.
+    """
+
+    def __init__(self, file, header_fields, blob_size=DEFAULT_BLOB_SIZE, compresslevel=6):
+        self.file = file
+        self.blob_size = blob_size
+        self.rows = 0
+        # the number of (compressed) bytes that have been stored in blobs
+        self.size = 0
+        self.__buffer = io.StringIO()
+        self.__writer = csv.DictWriter(self.__buffer, header_fields, extrasaction="ignore")
+        self.__compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self.__pending = bytearray()
+        self.__checksum = sha1(b"")
+
+    def writeheader(self):
+        self.__writer.writeheader()
+        self.__compress()
+
+    def writerows(self, rows):
+        self.__writer.writerows(rows)
+        self.rows += len(rows)
+        self.__compress()
+
+    def __compress(self):
+        data = self.__buffer.getvalue().encode("utf-8")
+        self.__buffer.seek(0)
+        self.__buffer.truncate()
+
+        self.__pending += self.__compressor.compress(data)
+        self.__flush()
+
+    def __flush(self, final=False):
+        while len(self.__pending) >= self.blob_size or (final and self.__pending):
+            self.__store(bytes(self.__pending[: self.blob_size]))
+            del self.__pending[: self.blob_size]
+
+    def __store(self, contents):
+        # adapted from `putfile` in  `src/sentry/models/file.py`
+        blob = FileBlob.from_file(ContentFile(contents), logger=logger)
+        FileBlobIndex.objects.create(file=self.file, blob=blob, offset=self.size)
+        self.size += blob.size
+        self.__checksum.update(contents)
+
+    def close(self):
+        self.__pending += self.__compressor.flush()
+        self.__flush(final=True)
+
+        self.file.size = self.size
+        self.file.checksum = self.__checksum.hexdigest()
+        self.file.save()
+        return self.file
@@ -2,6 +2,7 @@ import codecs
 import csv
 import logging
 import tempfile
+from functools import partial
 from hashlib import sha1
 
 import celery
@@ -18,6 +19,7 @@ from django.core.files.base import ContentFile
 from django.db import IntegrityError, router
 from django.utils import timezone
 
+from sentry import options
 from sentry.models import (
     DEFAULT_BLOB_SIZE,
     MAX_FILE_SIZE,
@@ -42,6 +44,7 @@ from .base import (
 from .models import ExportedData, ExportedDataBlob
 from .processors.discover import DiscoverProcessor
 from .processors.issues_by_tag import IssuesByTagProcessor
+from .streaming import ExportFileWriter, iter_pages
 from .utils import handle_snuba_errors
 
 logger = logging.getLogger(__name__)
@@ -83,19 +86,7 @@ def assemble_download(
             logger.exception(error)
             return
 
-        with sentry_sdk.configure_scope() as scope:
-            if data_export.user:
-                user = {}
-                if data_export.user.id:
-                    user["id"] = data_export.user.id
-                if data_export.user.username:
-                    user["username"] = data_export.user.username
-                if data_export.user.email:
-                    user["email"] = data_export.user.email
-                scope.user = user
-            scope.set_tag("organization.slug", data_export.organization.slug)
-            scope.set_tag("export.type", ExportQueryType.as_str(data_export.query_type))
-            scope.set_extra("export.query", data_export.query_info)
+        configure_scope(data_export)
 
         base_bytes_written = bytes_written
 
@@ -213,6 +204,150 @@ def assemble_download(
                 merge_export_blobs.delay(data_export_id)
 
 
+def configure_scope(data_export):
+    with sentry_sdk.configure_scope() as scope:
+        if data_export.user:
+            user = {}
+            if data_export.user.id:
+                user["id"] = data_export.user.id
+            if data_export.user.username:
+                user["username"] = data_export.user.username
+            if data_export.user.email:
+                user["email"] = data_export.user.email
+            scope.user = user
+        scope.set_tag("organization.slug", data_export.organization.slug)
+        scope.set_tag("export.type", ExportQueryType.as_str(data_export.query_type))
+        scope.set_extra("export.query", data_export.query_info)
+
+
+@instrumented_task(
+    name="sentry.data_export.tasks.stream_download",
+    queue="data_export",
+    default_retry_delay=60,
+    max_retries=3,
+    acks_late=True,
+)
+def stream_download(
+    data_export_id,
+    export_limit=EXPORTED_ROWS_LIMIT,
+    batch_size=SNUBA_MAX_RESULTS,
+    environment_id=None,
+    concurrency=None,
+    export_retries=3,
+    countdown=60,
+    **kwargs,
+):
+    """
+    Export all rows in a single task, as opposed to `assemble_download`.
+
+    Up to `concurrency` pages are fetched from snuba concurrently, and rows
+    are written as gzip-compressed CSV directly into the blobs of the export
+    file, so no merge pass is needed once all rows have been fetched.
+    """
+    with sentry_sdk.start_span(op="stream"):
+        try:
+            logger.info("dataexport.start", extra={"data_export_id": data_export_id})
+            data_export = ExportedData.objects.get(id=data_export_id)
+            metrics.incr(
+                "dataexport.start", tags={"success": True, "streaming": True}, sample_rate=1.0
+            )
+        except ExportedData.DoesNotExist as error:
+            metrics.incr(
+                "dataexport.start", tags={"success": False, "streaming": True}, sample_rate=1.0
+            )
+            logger.exception(error)
+            return
+
+        configure_scope(data_export)
+
+        if concurrency is None:
+            concurrency = options.get("data-export.streaming-concurrency")
+
+        file = None
+        try:
+            # ensure that the export limit is set and capped at EXPORTED_ROWS_LIMIT
+            if export_limit is None:
+                export_limit = EXPORTED_ROWS_LIMIT
+            else:
+                export_limit = min(export_limit, EXPORTED_ROWS_LIMIT)
+
+            processor = get_processor(data_export, environment_id)
+
+            file = File.objects.create(
+                name=data_export.file_name,
+                type="export.csv",
+                headers={"Content-Type": "text/csv", "Content-Encoding": "gzip"},
+            )
+            writer = ExportFileWriter(file, processor.header_fields)
+            writer.writeheader()
+
+            pages = iter_pages(
+                partial(fetch_rows, processor, data_export),
+                export_limit=export_limit,
+                batch_size=batch_size,
+                concurrency=concurrency,
+            )
+            try:
+                for page in pages:
+                    writer.writerows(serialize_rows(processor, data_export, page))
+
+                    # NOTE: there seems to be issues with downloading files larger than 1 GB on
+                    # slower networks, limit the export to 1 GB for now to improve reliability
+                    if writer.size >= min(MAX_FILE_SIZE, 2**30):
+                        break
+            finally:
+                pages.close()
+
+            writer.close()
+        except ExportError as error:
+            if file is not None:
+                file.delete()
+            if error.recoverable and export_retries > 0:
+                stream_download.apply_async(
+                    args=[data_export_id],
+                    kwargs={
+                        "export_limit": export_limit,
+                        "batch_size": batch_size // 2,
+                        "environment_id": environment_id,
+                        "concurrency": concurrency,
+                        "export_retries": export_retries - 1,
+                    },
+                    countdown=countdown,
+                )
+            else:
+                return data_export.email_failure(message=str(error))
+        except Exception as error:
+            if file is not None:
+                file.delete()
+            metrics.incr("dataexport.error", tags={"error": str(error)}, sample_rate=1.0)
+            logger.error(
+                "dataexport.error: %s",
+                str(error),
+                extra={"query": data_export.payload, "org": data_export.organization_id},
+            )
+            capture_exception(error)
+
+            try:
+                current_task.retry()
+            except MaxRetriesExceededError:
+                metrics.incr(
+                    "dataexport.end",
+                    tags={"success": False, "error": str(error)},
+                    sample_rate=1.0,
+                )
+                return data_export.email_failure(message="Internal processing failure")
+        else:
+            with atomic_transaction(using=router.db_for_write(ExportedData)):
+                data_export.finalize_upload(file=file)
+
+            metrics.timing("dataexport.row_count", writer.rows, sample_rate=1.0)
+            metrics.timing("dataexport.file_size", writer.size, sample_rate=1.0)
+            time_elapsed = (timezone.now() - data_export.date_added).total_seconds()
+            metrics.timing("dataexport.duration", time_elapsed, sample_rate=1.0)
+            logger.info("dataexport.end", extra={"data_export_id": data_export_id})
+            metrics.incr("dataexport.end", tags={"success": True}, sample_rate=1.0)
+
+
 def get_processor(data_export, environment_id):
     try:
         if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
@@ -256,6 +391,44 @@ def process_rows(processor, data_export, batch_size, offset):
         raise
 
 
+def fetch_rows(processor, data_export, limit, offset):
+    """
+    Fetch the raw rows of a page, which may run in a separate thread. The
+    rows need to be passed through `serialize_rows` before they're written.
+    """
+    try:
+        if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
+            rows = fetch_issues_by_tag(processor, limit, offset)
+        elif data_export.query_type == ExportQueryType.DISCOVER:
+            rows = fetch_discover(processor, limit, offset)
+        else:
+            raise ExportError(f"No processor found for this query type: {data_export.query_type}")
+        return rows
+    except ExportError as error:
+        error_str = str(error)
+        metrics.incr("dataexport.error", tags={"error": error_str}, sample_rate=1.0)
+        logger.info(f"dataexport.error: {error_str}")
+        capture_exception(error)
+        raise
+
+
+def serialize_rows(processor, data_export, rows):
+    if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
+        return processor.serialize_raw_data(rows)
+    return processor.handle_fields(rows)
+
+
+@handle_snuba_errors(logger)
+def fetch_issues_by_tag(processor, limit, offset):
+    # callbacks query the database and are run by `serialize_rows`
+    return processor.get_raw_data(limit=limit, offset=offset, callbacks=())
+
+
+@handle_snuba_errors(logger)
+def fetch_discover(processor, limit, offset):
+    return processor.data_fn(limit=limit, offset=offset)["data"]
+
+
 @handle_snuba_errors(logger)
 def process_issues_by_tag(processor, limit, offset):
     return processor.get_serialized_data(limit=limit, offset=offset)
@@ -312,19 +485,7 @@ def merge_export_blobs(data_export_id, **kwargs):
             logger.exception(error)
             return
 
-        with sentry_sdk.configure_scope() as scope:
-            if data_export.user:
-                user = {}
-                if data_export.user.id:
-                    user["id"] = data_export.user.id
-                if data_export.user.username:
-                    user["username"] = data_export.user.username
-                if data_export.user.email:
-                    user["email"] = data_export.user.email
-                scope.user = user
-            scope.set_tag("organization.slug", data_export.organization.slug)
-            scope.set_tag("export.type", ExportQueryType.as_str(data_export.query_type))
-            scope.set_extra("export.query", data_export.query_info)
+        configure_scope(data_export)
 
         # adapted from `putfile` in  `src/sentry/models/file.py`
         try:
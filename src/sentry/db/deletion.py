@@ -1,12 +1,19 @@
 import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from typing import NamedTuple
 from uuid import uuid4
 
+from django.core.cache import cache
 from django.db import connections, router
 from django.utils import timezone
 
 
 class BulkDeleteQuery:
+    ID_RANGE_WINDOW = timedelta(days=1)
+
     def __init__(self, model, project_id=None, dtfield=None, days=None, order_by=None):
         self.model = model
         self.project_id = int(project_id) if project_id else None
@@ -14,6 +21,7 @@ class BulkDeleteQuery:
         self.days = int(days) if days is not None else None
         self.order_by = order_by
         self.using = router.db_for_write(model)
+        self.cutoff = timezone.now() - timedelta(days=self.days) if self.days is not None else None
 
     def execute(self, chunk_size=10000):
         quote_name = connections[self.using].ops.quote_name
@@ -144,3 +152,259 @@ class BulkDeleteQuery:
 
             if chunk:
                 yield tuple(chunk)
+
+    def __get_conditions(self):
+        quote_name = connections[self.using].ops.quote_name
+
+        conditions = []
+        parameters = []
+        if self.dtfield and self.cutoff is not None:
+            conditions.append(f"{quote_name(self.dtfield)} < %s")
+            parameters.append(self.cutoff)
+        if self.project_id:
+            conditions.append("project_id = %s")
+            parameters.append(self.project_id)
+        return conditions, parameters
+
+    def get_id_range(self):
+        """
+        Return a 2-tuple of the smallest id of the table and an upper bound
+        for the ids of the matching rows (or ``None`` for both if there are no
+        rows.)
+
+        Finding the exact largest id of the matching rows would scan the id
+        index through every retained row, so the upper bound is the largest
+        id of the rows that expired within ``ID_RANGE_WINDOW`` before the
+        cutoff, found through the index of ``dtfield``. As ids and dates of
+        rows are roughly correlated, expired rows with larger ids are rare and
+        fall within the range of a later run.
+        """
+        quote_name = connections[self.using].ops.quote_name
+        table = self.model._meta.db_table
+        conditions, parameters = self.__get_conditions()
+
+        cursor = connections[self.using].cursor()
+        cursor.execute(f"select min(id) from {table}")
+        (lower,) = cursor.fetchone()
+        if lower is None:
+            return None, None
+
+        where = " where {}".format(" and ".join(conditions)) if conditions else ""
+        if self.dtfield and self.cutoff is not None:
+            cursor.execute(
+                f"select max(id) from {table}{where} and {quote_name(self.dtfield)} >= %s",
+                parameters + [self.cutoff - self.ID_RANGE_WINDOW],
+            )
+            (upper,) = cursor.fetchone()
+            if upper is None:
+                # Nothing expired within the window, fall back to the most
+                # recently expired row.
+                cursor.execute(
+                    f"select id from {table}{where} order by {quote_name(self.dtfield)} desc limit 1",
+                    parameters,
+                )
+                row = cursor.fetchone()
+                upper = row[0] if row is not None else None
+        else:
+            cursor.execute(f"select max(id) from {table}{where}", parameters)
+            (upper,) = cursor.fetchone()
+
+        if upper is None:
+            return None, None
+        return lower, upper
+
+    def select_range(self, lower, upper, chunk_size=100):
+        """
+        Return the ids of up to ``chunk_size`` matching rows with ids in
+        ``(lower, upper]``, in id order.
+        """
+        conditions, parameters = self.__get_conditions()
+        conditions.extend(["id > %s", "id <= %s"])
+        parameters.extend([lower, upper])
+
+        cursor = connections[self.using].cursor()
+        cursor.execute(
+            """
+                select id
+                from {table}
+                where {conditions}
+                order by id
+                limit {chunk_size:d}
+            """.format(
+                table=self.model._meta.db_table,
+                conditions=" and ".join(conditions),
+                chunk_size=chunk_size,
+            ),
+            parameters,
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def delete_range(self, lower, upper, chunk_size=10000):
+        """
+        Delete up to ``chunk_size`` matching rows with ids in ``(lower,
+        upper]``, in id order. Returns a 2-tuple of the number of deleted rows
+        and the largest deleted id.
+        """
+        conditions, parameters = self.__get_conditions()
+        conditions.extend(["id > %s", "id <= %s"])
+        parameters.extend([lower, upper])
+
+        cursor = connections[self.using].cursor()
+        cursor.execute(
+            """
+                with deleted as (
+                    delete from {table}
+                    where id = any(array(
+                        select id
+                        from {table}
+                        where {conditions}
+                        order by id
+                        limit {chunk_size:d}
+                    ))
+                    returning id
+                )
+                select count(*), max(id) from deleted
+            """.format(
+                table=self.model._meta.db_table,
+                conditions=" and ".join(conditions),
+                chunk_size=chunk_size,
+            ),
+            parameters,
+        )
+        return cursor.fetchone()
+
+
+class RowBudget:
+    """
+    Limits the total number of rows deleted per second by all threads that
+    share the budget. Threads report the rows they have deleted with
+    ``consume``, which blocks until the budget allows them to continue.
+    """
+
+    def __init__(self, rows_per_second, clock=time.monotonic, sleep=time.sleep):
+        assert rows_per_second > 0
+        self.rows_per_second = rows_per_second
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__lock = threading.Lock()
+        self.__available_at = clock()
+
+    def consume(self, rows):
+        with self.__lock:
+            now = self.__clock()
+            start = max(self.__available_at, now)
+            self.__available_at = start + rows / self.rows_per_second
+        if start > now:
+            self.__sleep(start - now)
+
+
+class DeletionThroughput(NamedTuple):
+    rows: int
+    duration: float
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.duration if self.duration > 0 else 0.0
+
+
+class PartitionedDeletion:
+    """
+    Deletes the rows of a ``BulkDeleteQuery`` by splitting the id range of
+    the matching rows into ``partitions`` ranges that are processed by
+    ``concurrency`` threads.
+
+    ``delete_batch(lower, upper)`` is called for every batch and deletes some
+    of the matching rows with ids in ``(lower, upper]``. Like
+    ``BulkDeleteQuery.delete_range``, it returns a 2-tuple of the number of
+    deleted rows and the largest id it has processed, which is ``None`` once
+    there are no matching rows left in the range.
+
+    The position of every partition is stored in the cache under
+    ``checkpoint_key``, so an interrupted run resumes where it stopped when
+    it is started again. The checkpoint is removed once all partitions have
+    been processed.
+    """
+
+    CHECKPOINT_TTL = 60 * 60 * 24 * 7
+
+    def __init__(
+        self,
+        query,
+        delete_batch,
+        partitions=1,
+        concurrency=1,
+        budget=None,
+        checkpoint_key=None,
+    ):
+        assert partitions > 0
+        self.query = query
+        self.delete_batch = delete_batch
+        self.partitions = partitions
+        self.concurrency = concurrency
+        self.budget = budget
+        self.checkpoint_key = checkpoint_key
+        self.__lock = threading.Lock()
+        self.__positions = None
+
+    def get_positions(self):
+        """
+        Return the current ``[position, upper]`` range of every partition,
+        restoring them from the checkpoint if there is one.
+        """
+        if self.checkpoint_key is not None:
+            positions = cache.get(self.checkpoint_key)
+            if positions is not None:
+                return positions
+
+        lower, upper = self.query.get_id_range()
+        if lower is None:
+            return []
+
+        lower -= 1
+        size = max((upper - lower) // self.partitions, 1)
+        bounds = list(range(lower, upper, size))[: self.partitions] + [upper]
+        return [[start, end] for start, end in zip(bounds, bounds[1:])]
+
+    def __save(self):
+        if self.checkpoint_key is not None:
+            cache.set(self.checkpoint_key, self.__positions, self.CHECKPOINT_TTL)
+
+    def __run_partition(self, index):
+        rows = 0
+        try:
+            while True:
+                with self.__lock:
+                    position, upper = self.__positions[index]
+                if position >= upper:
+                    return rows
+
+                deleted, last_id = self.delete_batch(position, upper)
+                with self.__lock:
+                    self.__positions[index][0] = upper if last_id is None else last_id
+                    self.__save()
+
+                rows += deleted
+                if last_id is None:
+                    return rows
+
+                if self.budget is not None and deleted:
+                    self.budget.consume(deleted)
+        finally:
+            if self.concurrency > 1:
+                connections.close_all()
+
+    def run(self):
+        started = time.monotonic()
+        self.__positions = self.get_positions()
+        self.__save()
+
+        if self.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                rows = sum(executor.map(self.__run_partition, range(len(self.__positions))))
+        else:
+            rows = sum(map(self.__run_partition, range(len(self.__positions))))
+
+        if self.checkpoint_key is not None:
+            cache.delete(self.checkpoint_key)
+
+        return DeletionThroughput(rows, time.monotonic() - started)
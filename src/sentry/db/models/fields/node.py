@@ -8,8 +8,14 @@ from django.db.models.signals import post_delete
 
 from sentry import nodestore
 from sentry.db.models.utils import Creator
+from sentry.nodestore.encoding import LazyNodePayload
 from sentry.utils.cache import memoize
-from sentry.utils.canonical import CANONICAL_TYPES, CanonicalKeyDict
+from sentry.utils.canonical import (
+    CANONICAL_TYPES,
+    LEGACY_KEY_MAPPING,
+    CanonicalKeyDict,
+    get_canonical_name,
+)
 from sentry.utils.strings import compress, decompress
 
 from .gzippeddict import GzippedDictField
@@ -31,6 +37,11 @@ class NodeData(MutableMapping):
     Initializing with:
     data=None means, this is a node that needs to be fetched from nodestore.
     data={...} means, this is an object that should be saved to nodestore.
+
+    Until the data is needed in full (to iterate over, modify or save it),
+    reading a key of a node that is stored in version 2 of the nodestore
+    format only decodes that key (see ``NodeStorage.get_lazy``.) Such values
+    were written from wrapped data, so they are returned without wrapping.
     """
 
     def __init__(self, id, data=None, wrapper=None, ref_version=None, ref_func=None):
@@ -45,6 +56,7 @@ class NodeData(MutableMapping):
         if data is not None and self.wrapper is not None:
             data = self.wrapper(data)
         self._node_data = data
+        self._lazy_data = None
 
     def __getstate__(self):
         data = dict(self.__dict__)
@@ -53,6 +65,8 @@ class NodeData(MutableMapping):
         # collection types.  For instance we have events where this is a
         # CanonicalKeyDict
         data.pop("data", None)
+        if data.pop("_lazy_data", None) is not None:
+            data["_node_data"] = self.data
         data["_node_data_CANONICAL"] = isinstance(data["_node_data"], CANONICAL_TYPES)
         data["_node_data"] = dict(data["_node_data"].items())
         return data
@@ -63,10 +77,24 @@ class NodeData(MutableMapping):
         state.pop("data", None)
         if state.pop("_node_data_CANONICAL", False):
             state["_node_data"] = CanonicalKeyDict(state["_node_data"])
+        state["_lazy_data"] = None
         self.__dict__ = state
 
     def __getitem__(self, key):
-        return self.data[key]
+        lazy_data = self._get_lazy_data()
+        if lazy_data is None:
+            return self.data[key]
+
+        lazy_key = self._get_lazy_key(lazy_data, key)
+        if lazy_key is None:
+            raise KeyError(key)
+        return lazy_data[lazy_key]
+
+    def __contains__(self, key):
+        lazy_data = self._get_lazy_data()
+        if lazy_data is None:
+            return key in self.data
+        return self._get_lazy_key(lazy_data, key) is not None
 
     def __setitem__(self, key, value):
         self.data[key] = value
@@ -86,6 +114,41 @@ class NodeData(MutableMapping):
             return f"<{cls_name}: id={self.id} data={self._node_data!r}>"
         return f"<{cls_name}: id={self.id}>"
 
+    def _get_lazy_data(self):
+        """
+        Return the ``LazyNodePayload`` of the node if its data has not been
+        loaded yet and is stored in a format that can be decoded lazily,
+        otherwise ``None``.
+        """
+        if self._node_data is not None or not self.id:
+            return None
+
+        if self._lazy_data is None:
+            data = nodestore.get_lazy(self.id)
+            if not isinstance(data, LazyNodePayload):
+                self.bind_data(data or {})
+                return None
+            self._lazy_data = data
+        return self._lazy_data
+
+    def _get_lazy_key(self, lazy_data, key):
+        # References are removed from the data when it is bound.
+        if key in ("_ref", "_ref_version"):
+            return None
+
+        # Data of canonical wrappers is stored with normalized keys, which can
+        # be read through their canonical or legacy names.
+        if isinstance(self.wrapper, type) and issubclass(self.wrapper, CanonicalKeyDict):
+            canonical = get_canonical_name(key)
+            candidates = (canonical,) + LEGACY_KEY_MAPPING.get(canonical, ())
+        else:
+            candidates = (key,)
+
+        for candidate in candidates:
+            if candidate in lazy_data:
+                return candidate
+        return None
+
     def get_ref(self, instance):
         if not self.ref_func:
             return
@@ -103,6 +166,10 @@ class NodeData(MutableMapping):
         if self._node_data is not None:
             return self._node_data
 
+        elif self._lazy_data is not None:
+            self.bind_data(self._lazy_data.materialize())
+            return self._node_data
+
         elif self.id:
             self.bind_data(nodestore.get(self.id) or {})
             return self._node_data
@@ -122,6 +189,7 @@ class NodeData(MutableMapping):
         if self.wrapper is not None:
             data = self.wrapper(data)
         self._node_data = data
+        self._lazy_data = None
 
     def bind_ref(self, instance):
         ref = self.get_ref(instance)
@@ -57,6 +57,15 @@ deletion task needs to implement the `should_proceed` hook.
 The above would only proceed with the deletion if the record's status was correct.  When a deletion
 is cancelled by this hook, the `ScheduledDeletion` row will be removed.
 
+Concurrent Deletions
+--------------------
+
+When ``SENTRY_DELETIONS_CONCURRENCY`` is set, the deletion tasks use a ``DeletionEngine`` to delete
+child relations. The engine deletes relations that do not depend on each other concurrently,
+shards large relations by id and deletes rows that don't need signals with keyset-paginated raw
+deletes, checkpointing its progress so retried deletions resume where they left off. See
+``sentry.deletions.engine`` for details.
+
 Using Deletions Manager Directly
 --------------------------------
 
@@ -80,6 +89,7 @@ descendants, such as Event, so it can more efficiently bulk delete rows.
 
 
 from .base import BulkModelDeletionTask, ModelDeletionTask, ModelRelation  # NOQA
+from .engine import DeletionEngine, get_engine  # NOQA
 from .manager import DeletionTaskManager
 
 default_manager = DeletionTaskManager(default_task=ModelDeletionTask)
@@ -34,13 +34,20 @@ class BaseDeletionTask:
     DEFAULT_CHUNK_SIZE = 100
 
     def __init__(
-        self, manager, skip_models=None, transaction_id=None, actor_id=None, chunk_size=None
+        self,
+        manager,
+        skip_models=None,
+        transaction_id=None,
+        actor_id=None,
+        chunk_size=None,
+        engine=None,
     ):
         self.manager = manager
         self.skip_models = set(skip_models) if skip_models else None
         self.transaction_id = transaction_id
         self.actor_id = actor_id
         self.chunk_size = chunk_size if chunk_size is not None else self.DEFAULT_CHUNK_SIZE
+        self.engine = engine
 
     def __repr__(self):
         return "<{}: skip_models={} transaction_id={} actor_id={}>".format(
@@ -126,6 +133,9 @@ class BaseDeletionTask:
             self.delete_instance(instance)
 
     def delete_children(self, relations):
+        if self.engine is not None:
+            return self.engine.delete_relations(relations)
+
         # Ideally this runs through the deletion manager
         for relation in relations:
             task = self.manager.get(
@@ -159,6 +169,7 @@ class ModelDeletionTask(BaseDeletionTask):
         self.query = query
         self.query_limit = query_limit or self.DEFAULT_QUERY_LIMIT or self.chunk_size
         self.order_by = order_by
+        self.deleted = 0
 
     def __repr__(self):
         return "<{}: model={} query={} order_by={} transaction_id={} actor_id={}>".format(
@@ -206,6 +217,7 @@ class ModelDeletionTask(BaseDeletionTask):
                 return False
 
             self.delete_bulk(queryset)
+            self.deleted += len(queryset)
             remaining = remaining - query_limit
         # We have more work to do as we didn't run out of rows to delete.
         return True
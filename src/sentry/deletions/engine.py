@@ -0,0 +1,347 @@
+"""
+The deletion engine deletes the child relations of a deletion task
+concurrently.
+
+Relations are split into waves: a relation is deleted after every relation
+that precedes it and whose model it (transitively) references through a
+foreign key, or is referenced by, since deleting rows of one of those models
+may cascade to the other. Relations within a wave are deleted concurrently,
+and the rows of each relation are split across ``num_shards`` shards (by id)
+that are deleted concurrently as well.
+
+Relations that do not need to run Django's deletion machinery (there are no
+signal receivers, no reverse relations and no custom deletion logic) are
+deleted with raw, keyset-paginated ``DELETE`` statements. The position of
+each shard is checkpointed, so deletions that are retried resume where they
+left off instead of scanning the index entries of rows that were already
+deleted.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from hashlib import md5
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models
+from django.db.models.signals import post_delete, pre_delete
+
+from sentry.utils import metrics
+from sentry.utils.query import bulk_delete_objects_keyset
+
+from .base import BulkModelDeletionTask, ModelDeletionTask
+
+logger = logging.getLogger("sentry.deletions.engine")
+
+CHECKPOINT_TTL = 60 * 60 * 24
+
+
+class DeletionStats(NamedTuple):
+    rows: int
+    started: float
+    finished: float
+
+    @property
+    def rows_per_second(self):
+        duration = self.finished - self.started
+        return self.rows / duration if duration > 0 else 0.0
+
+
+@lru_cache(maxsize=None)
+def get_dependent_models(model):
+    """
+    Return ``model`` and the models that (transitively) reference it, all of
+    which may be modified when rows of ``model`` are deleted.
+    """
+    dependents = {model}
+    pending = [model]
+    while pending:
+        for related in pending.pop()._meta.related_objects:
+            if related.related_model not in dependents:
+                dependents.add(related.related_model)
+                pending.append(related.related_model)
+    return frozenset(dependents)
+
+
+def plan_waves(relations):
+    """
+    Split ``relations`` into a list of waves of relations that can be
+    deleted concurrently, preserving the order of relations that depend on
+    each other. Relations without a model (custom tasks) are barriers.
+    """
+    waves = []
+    planned = []
+    for relation in relations:
+        model = relation.params.get("model")
+        wave = 0
+        for other_model, other_wave in planned:
+            if (
+                model is None
+                or other_model is None
+                or other_model in get_dependent_models(model)
+                or model in get_dependent_models(other_model)
+            ):
+                wave = max(wave, other_wave + 1)
+
+        planned.append((model, wave))
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(relation)
+    return waves
+
+
+def get_bulk_filters(task):
+    """
+    Return the query of ``task`` as a mapping of column names to values if
+    its rows can be deleted with raw ``DELETE`` statements, or ``None``.
+    """
+    model = task.model
+    if type(task) is ModelDeletionTask:
+        if (
+            model.delete is not models.Model.delete
+            or pre_delete.has_listeners(model)
+            or post_delete.has_listeners(model)
+            or model._meta.related_objects
+            or model._meta.many_to_many
+            or task.manager.dependencies.get(model)
+            or task.manager.bulk_dependencies.get(model)
+        ):
+            return None
+    elif type(task) is not BulkModelDeletionTask:
+        return None
+
+    filters = {}
+    for name, value in task.query.items():
+        if "__" in name:
+            return None
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.many_to_many:
+            return None
+        filters[field.column] = value.pk if isinstance(value, models.Model) else value
+    return filters
+
+
+class DeletionEngine:
+    def __init__(
+        self,
+        manager,
+        transaction_id=None,
+        actor_id=None,
+        concurrency=4,
+        num_shards=4,
+        batch_size=10000,
+    ):
+        self.manager = manager
+        self.transaction_id = transaction_id
+        self.actor_id = actor_id
+        self.concurrency = concurrency
+        self.num_shards = num_shards
+        self.batch_size = batch_size
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__stats = {}
+
+    def __repr__(self):
+        return "<{}: concurrency={} num_shards={} transaction_id={}>".format(
+            type(self).__name__, self.concurrency, self.num_shards, self.transaction_id
+        )
+
+    def get_stats(self):
+        with self.__lock:
+            return dict(self.__stats)
+
+    def delete_relations(self, relations):
+        """
+        Delete the rows of ``relations``, including their own relations. Like
+        ``BaseDeletionTask.delete_children``, this returns ``False`` once all
+        rows have been deleted.
+
+        Relations of tasks that are run by the engine (such as the events of
+        a group that is deleted by a project deletion) are deleted inline,
+        without sharding.
+        """
+        if getattr(self.__local, "nested", False):
+            for relation in relations:
+                for unit in self.__get_units(relation, 1):
+                    unit()
+            return False
+
+        started = time.monotonic()
+
+        if self.concurrency <= 1:
+            for relation in relations:
+                for unit in self.__get_units(relation, 1):
+                    self.__run_unit(unit, close_connections=False)
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for wave in plan_waves(relations):
+                    futures = [
+                        executor.submit(self.__run_unit, unit)
+                        for relation in wave
+                        for unit in self.__get_units(relation, self.num_shards)
+                    ]
+                    for future in futures:
+                        future.result()
+
+        self.__report(started)
+        return False
+
+    def __run_unit(self, unit, close_connections=True):
+        self.__local.nested = True
+        try:
+            unit()
+        finally:
+            self.__local.nested = False
+            if close_connections:
+                # Every worker thread has its own database connections.
+                connections.close_all()
+
+    def __get_task(self, relation):
+        return self.manager.get(
+            transaction_id=self.transaction_id,
+            actor_id=self.actor_id,
+            task=relation.task,
+            engine=self,
+            **relation.params,
+        )
+
+    def __get_units(self, relation, num_shards):
+        task = self.__get_task(relation)
+        shards = [(num_shards, shard_id) for shard_id in range(num_shards)]
+        if num_shards <= 1:
+            shards = [(None, None)]
+
+        filters = get_bulk_filters(task) if isinstance(task, ModelDeletionTask) else None
+        if filters is not None:
+            return [partial(self.__bulk_delete, task, filters, *shard) for shard in shards]
+
+        if type(task) is BulkModelDeletionTask or not isinstance(task, ModelDeletionTask):
+            return [partial(self.__chunk, task)]
+
+        # Every shard needs its own task, as tasks count the rows they delete.
+        units = []
+        for index, shard in enumerate(shards):
+            shard_task = task if index == 0 else self.__get_task(relation)
+            units.append(partial(self.__chunk, shard_task, *shard))
+        return units
+
+    def get_checkpoint_key(self, task, filters, num_shards=None, shard_id=None):
+        if self.transaction_id is None:
+            return None
+        unit = repr(
+            (
+                task.model._meta.db_table,
+                sorted(filters.items()),
+                sorted((getattr(task, "partition_key", None) or {}).items()),
+                num_shards,
+                shard_id,
+            )
+        )
+        return "deletions:checkpoint:{}:{}".format(
+            self.transaction_id, md5(unit.encode("utf-8")).hexdigest()
+        )
+
+    def __bulk_delete(self, task, filters, num_shards, shard_id):
+        started = time.monotonic()
+        checkpoint_key = self.get_checkpoint_key(task, filters, num_shards, shard_id)
+        after_id = (cache.get(checkpoint_key) if checkpoint_key else None) or 0
+
+        rows = 0
+        swept = False
+        while True:
+            deleted, last_id = bulk_delete_objects_keyset(
+                task.model,
+                limit=self.batch_size,
+                after_id=after_id,
+                num_shards=num_shards,
+                shard_id=shard_id,
+                partition_key=getattr(task, "partition_key", None),
+                **filters,
+            )
+            if deleted:
+                rows += deleted
+                after_id = last_id
+                if checkpoint_key:
+                    cache.set(checkpoint_key, after_id, CHECKPOINT_TTL)
+                continue
+
+            if after_id == 0 or swept:
+                break
+
+            # Sweep once more from the start, for rows whose transactions
+            # committed after the cursor had already moved past their ids.
+            after_id = 0
+            swept = True
+
+        if checkpoint_key:
+            cache.delete(checkpoint_key)
+
+        self.__record(task.model.__name__, rows, started)
+
+    def __chunk(self, task, num_shards=None, shard_id=None):
+        started = time.monotonic()
+        kwargs = {"num_shards": num_shards, "shard_id": shard_id} if num_shards else {}
+        while task.chunk(**kwargs):
+            pass
+
+        if isinstance(task, ModelDeletionTask) and type(task) is not BulkModelDeletionTask:
+            self.__record(task.model.__name__, task.deleted, started)
+
+    def __record(self, name, rows, started):
+        finished = time.monotonic()
+        with self.__lock:
+            stats = self.__stats.get(name)
+            if stats is None:
+                self.__stats[name] = DeletionStats(rows, started, finished)
+            else:
+                self.__stats[name] = DeletionStats(
+                    stats.rows + rows, min(stats.started, started), max(stats.finished, finished)
+                )
+
+    def __report(self, since):
+        for name, stats in self.get_stats().items():
+            if stats.finished < since:
+                continue
+
+            metrics.incr("deletions.engine.rows", amount=stats.rows, tags={"model": name})
+            metrics.timing(
+                "deletions.engine.rows_per_second", stats.rows_per_second, tags={"model": name}
+            )
+            logger.info(
+                "object.delete.engine.completed",
+                extra={
+                    "model": name,
+                    "rows": stats.rows,
+                    "duration": stats.finished - stats.started,
+                    "rows_per_second": stats.rows_per_second,
+                    "transaction_id": self.transaction_id,
+                },
+            )
+
+
+def get_engine(transaction_id=None, actor_id=None):
+    """
+    Return the deletion engine for a root deletion task, or ``None`` if
+    deletions should delete child relations sequentially.
+    """
+    from sentry.deletions import default_manager
+
+    if not settings.SENTRY_DELETIONS_CONCURRENCY:
+        return None
+
+    return DeletionEngine(
+        default_manager,
+        transaction_id=transaction_id,
+        actor_id=actor_id,
+        concurrency=settings.SENTRY_DELETIONS_CONCURRENCY,
+        num_shards=settings.SENTRY_DELETIONS_NUM_SHARDS,
+        batch_size=settings.SENTRY_DELETIONS_BATCH_SIZE,
+    )
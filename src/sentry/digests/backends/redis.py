@@ -217,13 +217,18 @@ class RedisBackend(Backend):
                 else:
                     raise
 
+            # The response contains the columns of the digest: the record keys,
+            # their encoded values and their timestamps. Values are decoded
+            # together, so that codecs can load any related data in bulk.
+            keys, values, timestamps = response
+            decoded = iter(self.codec.decode_many([value for value in values if value is not None]))
             records = [
                 Record(
                     key.decode(),
-                    self.codec.decode(value) if value is not None else None,
+                    next(decoded) if value is not None else None,
                     float(timestamp),
                 )
-                for key, value, timestamp in response
+                for key, value, timestamp in zip(keys, values, timestamps)
             ]
 
             # If the record value is `None`, this means the record data was
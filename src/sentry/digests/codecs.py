@@ -1,6 +1,8 @@
 import pickle
 import zlib
-from typing import Any
+from typing import Any, List, Sequence
+
+from sentry.utils import json
 
 
 class Codec:
@@ -10,6 +12,9 @@ class Codec:
     def decode(self, value: bytes) -> Any:
         raise NotImplementedError
 
+    def decode_many(self, values: Sequence[bytes]) -> Sequence[Any]:
+        return [self.decode(value) for value in values]
+
 
 class CompressedPickleCodec(Codec):
     def encode(self, value: Any) -> bytes:
@@ -17,3 +22,61 @@ class CompressedPickleCodec(Codec):
 
     def decode(self, value: bytes) -> Any:
         return pickle.loads(zlib.decompress(value))
+
+
+class NotificationCodec(Codec):
+    """
+    Encodes notifications as a reference to their event and the IDs of their
+    rules, instead of pickling the event with its data. Event data is loaded
+    from nodestore on decoding, for all values passed to ``decode_many`` at once.
+
+    Other values are encoded with ``CompressedPickleCodec``, which is also used
+    to decode values that were written before switching to this codec.
+    """
+
+    prefix = b"n1:"
+
+    def __init__(self) -> None:
+        self.fallback = CompressedPickleCodec()
+
+    def encode(self, value: Any) -> bytes:
+        from sentry.digests.notifications import Notification
+        from sentry.eventstore.models import Event
+
+        if not isinstance(value, Notification) or type(value.event) is not Event:
+            return self.fallback.encode(value)
+
+        event = value.event
+        reference = [event.project_id, event.event_id, event.group_id, list(value.rules)]
+        return self.prefix + json.dumps(reference).encode("utf-8")
+
+    def __decode(self, value: bytes) -> Any:
+        from sentry.digests.notifications import Notification
+        from sentry.eventstore.models import Event
+
+        if not value.startswith(self.prefix):
+            return self.fallback.decode(value)
+
+        project_id, event_id, group_id, rules = json.loads(
+            value[len(self.prefix) :].decode("utf-8"), skip_trace=True
+        )
+        return Notification(Event(project_id, event_id, group_id=group_id), rules)
+
+    def decode(self, value: bytes) -> Any:
+        # The data of the event is fetched lazily when it is first accessed.
+        return self.__decode(value)
+
+    def decode_many(self, values: Sequence[bytes]) -> Sequence[Any]:
+        from sentry import eventstore
+
+        results: List[Any] = []
+        unbound: List[Any] = []
+        for value in values:
+            result = self.__decode(value)
+            if value.startswith(self.prefix):
+                unbound.append(result.event)
+            results.append(result)
+
+        if unbound:
+            eventstore.bind_nodes(unbound, "data")
+        return results
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import functools
-import itertools
 import logging
 from collections import defaultdict, namedtuple
 from typing import Any, Mapping, MutableMapping, MutableSequence, Sequence
@@ -11,6 +10,7 @@ from sentry.digests import Digest, Record
 from sentry.eventstore.models import Event
 from sentry.models import Group, GroupStatus, Project, Rule
 from sentry.notifications.types import ActionTargetType
+from sentry.tsdb.base import TotalsQuery
 from sentry.utils.dates import to_timestamp
 from sentry.utils.pipeline import Pipeline
 
@@ -60,17 +60,33 @@ def fetch_state(project: Project, records: Sequence[Record]) -> Mapping[str, Any
     start = records[-1].datetime
     end = records[0].datetime
 
-    groups = Group.objects.in_bulk(record.value.event.group_id for record in records)
+    # Large digests contain many records of the same groups and rules, so
+    # they're deduplicated before loading them.
+    group_ids: set[int] = set()
+    rule_ids: set[int] = set()
+    for record in records:
+        group_ids.add(record.value.event.group_id)
+        rule_ids.update(record.value.rules)
+
+    groups = Group.objects.in_bulk(group_ids)
+    event_counts, user_counts = tsdb.get_totals_multi(
+        [
+            TotalsQuery(tsdb.models.group, list(groups.keys()), start, end),
+            TotalsQuery(
+                tsdb.models.users_affected_by_group,
+                list(groups.keys()),
+                start,
+                end,
+                distinct=True,
+            ),
+        ]
+    )
     return {
         "project": project,
         "groups": groups,
-        "rules": Rule.objects.in_bulk(
-            itertools.chain.from_iterable(record.value.rules for record in records)
-        ),
-        "event_counts": tsdb.get_sums(tsdb.models.group, list(groups.keys()), start, end),
-        "user_counts": tsdb.get_distinct_counts_totals(
-            tsdb.models.users_affected_by_group, list(groups.keys()), start, end
-        ),
+        "rules": Rule.objects.in_bulk(rule_ids),
+        "event_counts": event_counts,
+        "user_counts": user_counts,
     }
 
 
@@ -163,9 +179,16 @@ def sort_rule_groups(rules: Mapping[str, Rule]) -> Mapping[str, Rule]:
     )
 
 
-def check_group_state(record: Record) -> bool:
+def check_group_state(record: Record, statuses: MutableMapping[int, int] | None = None) -> bool:
+    # The status of a group is the same for all of its records, and can be
+    # remembered in ``statuses`` (which requires a query for ignored groups.)
+    group = record.value.event.group
+    if statuses is None:
+        statuses = {}
+    if group.id not in statuses:
+        statuses[group.id] = group.get_status()
     # Explicitly typing to satisfy mypy.
-    is_unresolved: bool = record.value.event.group.get_status() == GroupStatus.UNRESOLVED
+    is_unresolved: bool = statuses[group.id] == GroupStatus.UNRESOLVED
     return is_unresolved
 
 
@@ -184,7 +207,7 @@ def build_digest(
         Pipeline()
         .map(functools.partial(rewrite_record, **attach_state(**state)))
         .filter(bool)
-        .filter(check_group_state)
+        .filter(functools.partial(check_group_state, statuses={}))
         .reduce(group_records, lambda sequence: defaultdict(lambda: defaultdict(list)))
         .apply(sort_group_contents)
         .apply(sort_rule_groups)
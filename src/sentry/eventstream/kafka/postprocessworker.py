@@ -11,7 +11,7 @@ from sentry.eventstream.kafka.protocol import (
     get_task_kwargs_for_message,
     get_task_kwargs_for_message_from_headers,
 )
-from sentry.tasks.post_process import post_process_group
+from sentry.tasks.post_process import post_process_group, post_process_group_batch
 from sentry.utils import metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
@@ -23,6 +23,7 @@ _DURATION_METRIC = "eventstream.duration"
 _CONCURRENCY_METRIC = "eventstream.concurrency"
 _MESSAGES_METRIC = "eventstream.messages"
 _CONCURRENCY_OPTION = "post-process-forwarder:concurrency"
+_BATCH_SIZE_OPTION = "post-process-forwarder:batch-size"
 _TRANSACTION_FORWARDER_HEADER = "transaction_forwarder"
 
 
@@ -91,6 +92,34 @@ def dispatch_post_process_group_task(
         )
 
 
+def dispatch_post_process_group_batch(events: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Dispatches a single task to post process multiple events, see `post_process_group_batch`.
+    :param events: The task kwargs of the events, as returned by `_get_task_kwargs`
+    """
+    batch = []
+    for task_kwargs in events:
+        if task_kwargs.get("skip_consume", False):
+            logger.info("post_process.skip.raw_event", extra={"event_id": task_kwargs["event_id"]})
+            continue
+
+        batch.append(
+            {
+                "is_new": task_kwargs["is_new"],
+                "is_regression": task_kwargs["is_regression"],
+                "is_new_group_environment": task_kwargs["is_new_group_environment"],
+                "primary_hash": task_kwargs["primary_hash"],
+                "cache_key": cache_key_for_event(
+                    {"project": task_kwargs["project_id"], "event_id": task_kwargs["event_id"]}
+                ),
+                "group_id": task_kwargs["group_id"],
+            }
+        )
+
+    if batch:
+        post_process_group_batch.delay(events=batch)
+
+
 def _get_task_kwargs_and_dispatch(message: Message):
     task_kwargs = _get_task_kwargs(message)
     if not task_kwargs:
@@ -100,6 +129,15 @@ def _get_task_kwargs_and_dispatch(message: Message):
     dispatch_post_process_group_task(**task_kwargs)
 
 
+def _get_task_kwargs_and_record(message: Message) -> Optional[Mapping[str, Any]]:
+    task_kwargs = _get_task_kwargs(message)
+    if not task_kwargs:
+        return None
+
+    _record_metrics(message.partition(), task_kwargs)
+    return task_kwargs
+
+
 class PostProcessForwarderWorker(AbstractBatchWorker):
     """
     Implementation of the AbstractBatchWorker which would be used for post process forwarder.
@@ -120,7 +158,12 @@ class PostProcessForwarderWorker(AbstractBatchWorker):
         Process the message received by the consumer and return the Future associated with the message. The future
         is stored in the batch of batching_kafka_consumer and provided as an argument to flush_batch. If None is
         returned, the batching_kafka_consumer will not add the return value to the batch.
+
+        If batching is enabled, the task kwargs of the message are the result of the future, and the
+        task is dispatched in flush_batch along with the other messages of the batch.
         """
+        if options.get(_BATCH_SIZE_OPTION) > 0:
+            return self.__executor.submit(_get_task_kwargs_and_record, message)
         return self.__executor.submit(_get_task_kwargs_and_dispatch, message)
 
     def flush_batch(self, batch: Optional[Sequence[Future]]) -> None:
@@ -135,6 +178,12 @@ class PostProcessForwarderWorker(AbstractBatchWorker):
                 if exc is not None:
                     raise exc
 
+            # Messages which have been dispatched already have no result
+            events = [future.result() for future in batch if future.result()]
+            batch_size = max(options.get(_BATCH_SIZE_OPTION), 1)
+            for i in range(0, len(events), batch_size):
+                dispatch_post_process_group_batch(events[i : i + batch_size])
+
         # Check if the concurrency settings have changed. If yes, then shutdown the existing executor
         # and create a new one with the new settings
         new_concurrency = options.get(_CONCURRENCY_OPTION)
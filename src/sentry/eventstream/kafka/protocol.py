@@ -82,7 +82,7 @@ def get_task_kwargs_for_message(value):
     """
 
     metrics.timing("eventstream.events.size.data", len(value))
-    payload = json.loads(value, use_rapid_json=True)
+    payload = json.loads(value, use_rapid_json=True, skip_trace=True)
 
     try:
         version = payload[0]
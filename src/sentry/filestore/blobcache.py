@@ -0,0 +1,165 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from sentry.utils import metrics
+
+
+class BlobCache:
+    """
+    A local, on-disk cache of the contents of file blobs, keyed by their
+    checksums (which makes entries immutable.)
+
+    The least recently used entries are removed once the total size of the
+    cache exceeds ``max_size``. The cache directory may be shared by several
+    processes, each of which only tracks the entries it has seen, so the
+    size limit is approximate. Entries are written atomically, so partially
+    written entries are never read.
+
+    Hits, misses and evictions are recorded under the ``metric`` prefix.
+    """
+
+    def __init__(self, path, max_size, metric="filestore.blob-cache"):
+        assert max_size > 0
+        self.path = path
+        self.max_size = max_size
+        self.metric = metric
+        self.__lock = threading.Lock()
+        # checksum -> size, in order of access
+        self.__entries = None
+        self.__size = 0
+
+    def __get_path(self, checksum):
+        return os.path.join(self.path, checksum[:2], checksum[2:])
+
+    def __load(self):
+        """
+        Scan the cache directory for entries written by other (or previous)
+        processes, ordered by their last access.
+        """
+        entries = []
+        try:
+            folders = os.listdir(self.path)
+        except OSError:
+            folders = []
+
+        for folder in folders:
+            try:
+                names = os.listdir(os.path.join(self.path, folder))
+            except OSError:
+                continue
+            for name in names:
+                if name.startswith("."):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.path, folder, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, folder + name, stat.st_size))
+
+        self.__entries = OrderedDict()
+        self.__size = 0
+        for _, checksum, size in sorted(entries):
+            self.__entries[checksum] = size
+            self.__size += size
+
+    def get(self, checksum):
+        path = self.__get_path(checksum)
+        try:
+            with open(path, "rb") as f:
+                contents = f.read()
+        except OSError:
+            metrics.incr(self.metric, tags={"result": "miss"})
+            return None
+
+        metrics.incr(self.metric, tags={"result": "hit"})
+        try:
+            # The modification time of an entry is its last access time.
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self.__lock:
+            if self.__entries is not None and checksum in self.__entries:
+                self.__entries.move_to_end(checksum)
+        return contents
+
+    def set(self, checksum, contents):
+        if len(contents) > self.max_size:
+            return
+
+        path = self.__get_path(checksum)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".", dir=folder)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(contents)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        evicted = []
+        with self.__lock:
+            if self.__entries is None:
+                self.__load()
+            else:
+                self.__size += len(contents) - self.__entries.pop(checksum, 0)
+                self.__entries[checksum] = len(contents)
+
+            while self.__size > self.max_size and len(self.__entries) > 1:
+                evicted_checksum, evicted_size = self.__entries.popitem(last=False)
+                self.__size -= evicted_size
+                evicted.append(evicted_checksum)
+
+        for evicted_checksum in evicted:
+            try:
+                os.remove(self.__get_path(evicted_checksum))
+            except OSError:
+                pass
+
+        if evicted:
+            metrics.incr(f"{self.metric}.evictions", amount=len(evicted))
+
+    def clear(self):
+        with self.__lock:
+            if self.__entries is None:
+                self.__load()
+            checksums = list(self.__entries)
+            self.__entries.clear()
+            self.__size = 0
+
+        for checksum in checksums:
+            try:
+                os.remove(self.__get_path(checksum))
+            except OSError:
+                pass
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_blob_cache():
+    """
+    Return the blob cache configured by the ``filestore.blob-cache-path`` and
+    ``filestore.blob-cache-size`` options, or ``None`` if it is disabled.
+    """
+    from sentry import options
+
+    path = options.get("filestore.blob-cache-path")
+    if not path:
+        return None
+
+    max_size = options.get("filestore.blob-cache-size")
+    with _caches_lock:
+        cache = _caches.get((path, max_size))
+        if cache is None:
+            cache = _caches[(path, max_size)] = BlobCache(path, max_size)
+        return cache
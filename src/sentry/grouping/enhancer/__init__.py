@@ -1,6 +1,7 @@
 import base64
 import os
 import zlib
+from functools import lru_cache
 
 import msgpack
 from parsimonious.exceptions import ParseError
@@ -15,10 +16,13 @@ from .exceptions import InvalidEnhancerConfig
 from .matchers import (
     CalleeMatch,
     CallerMatch,
+    CategoryMatch,
     ExceptionFieldMatch,
     FrameMatch,
+    InAppMatch,
     Match,
     create_match_frame,
+    match_cache,
 )
 
 # Grammar is defined in EBNF syntax.
@@ -70,6 +74,10 @@ _        = space*
 VERSIONS = [1, 2]
 LATEST_VERSION = VERSIONS[-1]
 
+# The number of distinct (serialized) enhancement configs whose parsed form is
+# kept in memory, see ``Enhancements.loads``.
+LOADED_ENHANCEMENTS_CACHE_SIZE = 1000
+
 
 class StacktraceState:
     def __init__(self):
@@ -96,6 +104,94 @@ class StacktraceState:
         return f"{hint} by stack trace rule ({description})"
 
 
+class CompiledRules:
+    """
+    A precompiled form of a list of rules that evaluates every distinct frame
+    matcher at most once per frame of a stacktrace, no matter how many rules
+    share it (rules of the bundled configs share matchers such as
+    ``family:native`` extensively.) Matchers are interned by
+    ``FrameMatch.from_key``, so identical matchers are the same object.
+
+    Results of matchers on fields that actions modify (``app`` and
+    ``category``) are discarded after the actions of a modifier rule have
+    been yielded, as the caller may have applied them to the frames.
+    """
+
+    def __init__(self, rules):
+        matchers = {}
+        self._rules = []
+        for rule in rules:
+            frame_matchers = []
+            for matcher in rule._other_matchers:
+                if isinstance(matcher, CallerMatch):
+                    offset, matcher = -1, matcher.caller
+                elif isinstance(matcher, CalleeMatch):
+                    offset, matcher = 1, matcher.caller
+                else:
+                    offset = 0
+                frame_matchers.append((offset, matchers.setdefault(matcher, len(matchers))))
+            self._rules.append((rule, frame_matchers))
+        self._matchers = list(matchers)
+        self._mutable_matchers = [
+            idx
+            for matcher, idx in matchers.items()
+            if isinstance(matcher, (InAppMatch, CategoryMatch))
+        ]
+
+    def iter_matching_frame_actions(self, frames, platform, exception_data, cache):
+        """
+        Yields ``(rule, idx, action)`` for every action of every rule that
+        matches a frame, in the same order as ``Rule.get_matching_frame_actions``
+        would when called for every rule.
+        """
+        num_frames = len(frames)
+        results = [None] * len(self._matchers)
+
+        for rule, frame_matchers in self._rules:
+            if not rule.matchers:
+                continue
+
+            if not all(
+                m.matches_frame(frames, -1, platform, exception_data, cache)
+                for m in rule._exception_matchers
+            ):
+                continue
+
+            # Like ``Rule.get_matching_frame_actions``, all frames are matched
+            # before any action of the rule is yielded.
+            matching_frames = []
+            for idx in range(num_frames):
+                for offset, matcher_idx in frame_matchers:
+                    frame_idx = idx + offset
+                    if frame_idx < 0 or frame_idx >= num_frames:
+                        break
+
+                    matcher_results = results[matcher_idx]
+                    if matcher_results is None:
+                        matcher_results = results[matcher_idx] = [None] * num_frames
+
+                    rv = matcher_results[frame_idx]
+                    if rv is None:
+                        rv = matcher_results[frame_idx] = self._matchers[matcher_idx].matches_frame(
+                            frames, frame_idx, platform, exception_data, cache
+                        )
+                    if not rv:
+                        break
+                else:
+                    matching_frames.append(idx)
+
+            if not matching_frames:
+                continue
+
+            for idx in matching_frames:
+                for action in rule.actions:
+                    yield rule, idx, action
+
+            if rule.is_modifier:
+                for matcher_idx in self._mutable_matchers:
+                    results[matcher_idx] = None
+
+
 class Enhancements:
 
     # NOTE: You must add a version to ``VERSIONS`` any time attributes are added
@@ -115,37 +211,32 @@ class Enhancements:
 
         self._modifier_rules = [rule for rule in self.iter_rules() if rule.is_modifier]
         self._updater_rules = [rule for rule in self.iter_rules() if rule.is_updater]
+        self._compiled_modifier_rules = CompiledRules(self._modifier_rules)
+        self._compiled_updater_rules = CompiledRules(self._updater_rules)
 
     def apply_modifications_to_frame(self, frames, platform, exception_data):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
         """
 
-        cache = {}
-
         match_frames = [create_match_frame(frame, platform) for frame in frames]
 
-        for rule in self._modifier_rules:
-            for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
-            ):
-                action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
+        for rule, idx, action in self._compiled_modifier_rules.iter_matching_frame_actions(
+            match_frames, platform, exception_data, match_cache
+        ):
+            action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
 
     def update_frame_components_contributions(self, components, frames, platform, exception_data):
 
-        cache = {}
-
         match_frames = [create_match_frame(frame, platform) for frame in frames]
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
-
-            for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
-            ):
-                action.update_frame_components_contributions(components, frames, idx, rule=rule)
-                action.modify_stacktrace_state(stacktrace_state, rule)
+        for rule, idx, action in self._compiled_updater_rules.iter_matching_frame_actions(
+            match_frames, platform, exception_data, match_cache
+        ):
+            action.update_frame_components_contributions(components, frames, idx, rule=rule)
+            action.modify_stacktrace_state(stacktrace_state, rule)
 
         # Use the stack state to update frame contributions again to trim
         # down to max-frames.  min-frames is handled on the other hand for
@@ -249,8 +340,19 @@ class Enhancements:
 
     @classmethod
     def loads(cls, data):
+        """
+        Load enhancements serialized with ``dumps``.
+
+        The same serialized config is loaded for every event of a project, so
+        parsed (and compiled) configs are cached and shared. The returned
+        instance must not be modified.
+        """
         if isinstance(data, str):
             data = data.encode("ascii", "ignore")
+        return _load_enhancements(cls, data)
+
+    @classmethod
+    def _loads(cls, data):
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
             return cls._from_config_structure(
@@ -273,6 +375,11 @@ class Enhancements:
         return EnhancmentsVisitor(bases, id).visit(tree)
 
 
+@lru_cache(maxsize=LOADED_ENHANCEMENTS_CACHE_SIZE)
+def _load_enhancements(cls, data):
+    return cls._loads(data)
+
+
 class Rule:
     def __init__(self, matchers, actions):
         self.matchers = matchers
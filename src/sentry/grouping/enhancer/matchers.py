@@ -1,3 +1,5 @@
+import itertools
+import threading
 from typing import Optional
 
 from sentry.grouping.utils import get_rule_bool
@@ -25,6 +27,13 @@ SHORT_MATCH_KEYS = {v: k for k, v in MATCH_KEYS.items()}
 
 assert len(SHORT_MATCH_KEYS) == len(MATCH_KEYS)  # assert short key names are not reused
 
+# Characters that have a special meaning in glob patterns. Patterns that
+# contain none of them can only match values that are equal to the pattern.
+GLOB_CHARACTERS = frozenset("*?[]{}\\")
+
+# The maximum number of match results retained by ``match_cache``.
+MATCH_CACHE_SIZE = 100000
+
 FAMILIES = {"native": "N", "javascript": "J", "all": "a"}
 REVERSE_FAMILIES = {v: k for k, v in FAMILIES.items()}
 
@@ -50,6 +59,33 @@ MATCHERS = {
 }
 
 
+class MatchCache(dict):
+    """
+    A process-wide cache of matcher results, keyed by the matcher function
+    and the frame value it was called with (see ``cached``.)
+
+    Frames of the same release repeat across many events, so sharing results
+    between events avoids re-evaluating the same glob patterns against the
+    same values over and over. Once full, the oldest tenth of the entries is
+    discarded.
+    """
+
+    def __init__(self, max_size):
+        super().__init__()
+        self.max_size = max_size
+        self.__lock = threading.Lock()
+
+    def __setitem__(self, key, value):
+        with self.__lock:
+            if len(self) >= self.max_size:
+                for old_key in list(itertools.islice(iter(self), self.max_size // 10 or 1)):
+                    self.pop(old_key, None)
+            super().__setitem__(key, value)
+
+
+match_cache = MatchCache(MATCH_CACHE_SIZE)
+
+
 def _get_function_name(frame_data: dict, platform: Optional[str]):
 
     function_name = get_function_name_for_frame(frame_data, platform)
@@ -154,6 +190,7 @@ class FrameMatch(Match):
             raise InvalidEnhancerConfig("Unknown matcher '%s'" % key)
         self.pattern = pattern
         self._encoded_pattern = pattern.encode("utf-8")
+        self._is_literal = not GLOB_CHARACTERS.intersection(pattern)
         self.negated = negated
 
     @property
@@ -242,6 +279,8 @@ class InAppMatch(FrameMatch):
 
 class FunctionMatch(FrameMatch):
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
+        if self._is_literal:
+            return match_frame["function"] == self._encoded_pattern
 
         return cached(cache, glob_match, match_frame["function"], self._encoded_pattern)
 
@@ -252,6 +291,9 @@ class FrameFieldMatch(FrameMatch):
         if field is None:
             return False
 
+        if self._is_literal:
+            return field == self._encoded_pattern
+
         return cached(cache, glob_match, field, self._encoded_pattern)
 
 
@@ -85,6 +85,52 @@ class IncidentManager(BaseManager):
 
         return incident
 
+    def get_active_incidents(self, alert_rules_and_project_ids):
+        """
+        Fetches the active incidents of multiple alert rules, like `get_active_incident`.
+        :param alert_rules_and_project_ids: A list of `(alert_rule, project_id)` tuples
+        :return: A dict of `(alert_rule_id, project_id)` to the active incident or None
+        """
+        cache_keys = {
+            self._build_active_incident_cache_key(alert_rule.id, project_id): (
+                alert_rule.id,
+                project_id,
+            )
+            for alert_rule, project_id in alert_rules_and_project_ids
+        }
+        incidents = {
+            cache_keys[cache_key]: incident
+            for cache_key, incident in cache.get_many(list(cache_keys)).items()
+            if incident is not None
+        }
+
+        missing = [key for key in cache_keys.values() if key not in incidents]
+        if missing:
+            fetched = {}
+            for incident_project in (
+                IncidentProject.objects.filter(
+                    incident__type=IncidentType.ALERT_TRIGGERED.value,
+                    incident__alert_rule_id__in={alert_rule_id for alert_rule_id, _ in missing},
+                    project_id__in={project_id for _, project_id in missing},
+                )
+                .exclude(incident__status=IncidentStatus.CLOSED.value)
+                .select_related("incident")
+                .order_by("incident__date_added")
+            ):
+                # the most recent incident wins
+                incident = incident_project.incident
+                fetched[(incident.alert_rule_id, incident_project.project_id)] = incident
+
+            to_cache = {}
+            for cache_key, key in cache_keys.items():
+                if key in incidents:
+                    continue
+                # Store False so that we can have a negative cache as well.
+                incidents[key] = to_cache[cache_key] = fetched.get(key, False)
+            cache.set_many(to_cache)
+
+        return {key: incident or None for key, incident in incidents.items()}
+
     @classmethod
     def clear_active_incident_cache(cls, instance, **kwargs):
         for project in instance.projects.all():
@@ -316,6 +362,46 @@ class AlertRuleManager(BaseManager):
 
         return alert_rule
 
+    def get_for_subscriptions(self, subscriptions):
+        """
+        Fetches the AlertRules associated with multiple Subscriptions, like
+        `get_for_subscription`.
+        :return: A dict of subscription ids to AlertRules, without the subscriptions that
+        have no AlertRule
+        """
+        cache_keys = {
+            self.__build_subscription_cache_key(subscription.id): subscription.id
+            for subscription in subscriptions
+        }
+        alert_rules = {
+            cache_keys[cache_key]: alert_rule
+            for cache_key, alert_rule in cache.get_many(list(cache_keys)).items()
+            if alert_rule is not None
+        }
+
+        missing = [
+            subscription.id for subscription in subscriptions if subscription.id not in alert_rules
+        ]
+        if missing:
+            snuba_query_ids = dict(
+                QuerySubscription.objects.filter(id__in=missing).values_list("id", "snuba_query_id")
+            )
+            alert_rules_by_query = {
+                alert_rule.snuba_query_id: alert_rule
+                for alert_rule in AlertRule.objects.filter(
+                    snuba_query_id__in=set(snuba_query_ids.values())
+                )
+            }
+            to_cache = {}
+            for subscription_id, snuba_query_id in snuba_query_ids.items():
+                alert_rule = alert_rules_by_query.get(snuba_query_id)
+                if alert_rule is not None:
+                    alert_rules[subscription_id] = alert_rule
+                    to_cache[self.__build_subscription_cache_key(subscription_id)] = alert_rule
+            cache.set_many(to_cache, 3600)
+
+        return alert_rules
+
     @classmethod
     def clear_subscription_cache(cls, instance, **kwargs):
         cache.delete(cls.__build_subscription_cache_key(instance.id))
@@ -464,6 +550,39 @@ class AlertRuleTriggerManager(BaseManager):
             cache.set(cache_key, triggers, 3600)
         return triggers
 
+    def get_for_alert_rules(self, alert_rules):
+        """
+        Fetches the AlertRuleTriggers associated with multiple AlertRules, like
+        `get_for_alert_rule`.
+        :return: A dict of alert rule ids to lists of AlertRuleTriggers
+        """
+        cache_keys = {
+            self._build_trigger_cache_key(alert_rule.id): alert_rule.id
+            for alert_rule in alert_rules
+        }
+        triggers = {
+            cache_keys[cache_key]: alert_rule_triggers
+            for cache_key, alert_rule_triggers in cache.get_many(list(cache_keys)).items()
+            if alert_rule_triggers is not None
+        }
+
+        missing = [
+            alert_rule_id for alert_rule_id in cache_keys.values() if alert_rule_id not in triggers
+        ]
+        if missing:
+            for alert_rule_id in missing:
+                triggers[alert_rule_id] = []
+            for trigger in AlertRuleTrigger.objects.filter(alert_rule_id__in=missing):
+                triggers[trigger.alert_rule_id].append(trigger)
+            cache.set_many(
+                {
+                    self._build_trigger_cache_key(alert_rule_id): triggers[alert_rule_id]
+                    for alert_rule_id in missing
+                },
+                3600,
+            )
+        return triggers
+
     @classmethod
     def clear_trigger_cache(cls, instance, **kwargs):
         cache.delete(cls._build_trigger_cache_key(instance.alert_rule_id))
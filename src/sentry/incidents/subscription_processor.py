@@ -1,11 +1,12 @@
 import logging
 import operator
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from datetime import timedelta
 from typing import Optional
 
 from django.conf import settings
-from django.db import transaction
+from django.db import connections, transaction
 from snuba_sdk import Column, Condition, Limit, Op
 
 from sentry import features
@@ -29,7 +30,7 @@ from sentry.incidents.models import (
     TriggerStatus,
 )
 from sentry.incidents.tasks import handle_trigger_action
-from sentry.models import Project
+from sentry.models import Organization, Project
 from sentry.snuba.dataset import Dataset
 from sentry.snuba.entity_subscription import (
     ENTITY_TIME_COLUMNS,
@@ -37,6 +38,7 @@ from sentry.snuba.entity_subscription import (
     get_entity_key_from_query_builder,
     get_entity_subscription_from_snuba_query,
 )
+from sentry.snuba.models import SnubaQuery
 from sentry.snuba.tasks import build_query_builder
 from sentry.utils import metrics, redis
 from sentry.utils.dates import to_datetime, to_timestamp
@@ -54,6 +56,8 @@ ALERT_RULE_TRIGGER_STAT_KEYS = ("alert_triggered", "resolve_triggered")
 # ToDo(ahmed): This is still experimental. If we decide that it makes sense to keep this
 #  functionality, then maybe we should move this to constants
 CRASH_RATE_ALERT_MINIMUM_THRESHOLD: Optional[int] = None
+# Maximum number of comparison queries that are run concurrently for a batch of updates
+COMPARISON_QUERY_WORKERS = 8
 
 
 class SubscriptionProcessor:
@@ -70,24 +74,122 @@ class SubscriptionProcessor:
         AlertRuleThresholdType.BELOW: (operator.lt, operator.gt),
     }
 
-    def __init__(self, subscription):
+    def __init__(self, subscription, alert_rule=None, triggers=None, alert_rule_stats=None):
         self.subscription = subscription
-        try:
-            self.alert_rule = AlertRule.objects.get_for_subscription(subscription)
-        except AlertRule.DoesNotExist:
-            return
+        # Set to a redis pipeline to defer writing the alert rule stats
+        self.stats_pipeline = None
+        # Comparison query results fetched in advance, by the timestamp of the update
+        self.comparison_aggregates = {}
+
+        if alert_rule is None:
+            try:
+                alert_rule = AlertRule.objects.get_for_subscription(subscription)
+            except AlertRule.DoesNotExist:
+                return
+        self.alert_rule = alert_rule
 
-        self.triggers = AlertRuleTrigger.objects.get_for_alert_rule(self.alert_rule)
-        self.triggers.sort(key=lambda trigger: trigger.alert_threshold)
+        if triggers is None:
+            triggers = AlertRuleTrigger.objects.get_for_alert_rule(self.alert_rule)
+        self.triggers = sorted(triggers, key=lambda trigger: trigger.alert_threshold)
 
+        if alert_rule_stats is None:
+            alert_rule_stats = get_alert_rule_stats(
+                self.alert_rule, self.subscription, self.triggers
+            )
         (
             self.last_update,
             self.trigger_alert_counts,
             self.trigger_resolve_counts,
-        ) = get_alert_rule_stats(self.alert_rule, self.subscription, self.triggers)
+        ) = alert_rule_stats
         self.orig_trigger_alert_counts = deepcopy(self.trigger_alert_counts)
         self.orig_trigger_resolve_counts = deepcopy(self.trigger_resolve_counts)
 
+    @classmethod
+    def for_subscriptions(cls, subscriptions):
+        """
+        Creates processors for multiple subscriptions, like creating them one by one, but
+        fetches the alert rules, triggers and stats, as well as the active incidents and
+        their triggers in bulk.
+        :return: A dict of subscription ids to processors
+        """
+        projects = {
+            project.id: project
+            for project in Project.objects.get_many_from_cache(
+                {subscription.project_id for subscription in subscriptions}
+            )
+        }
+        organizations = {
+            organization.id: organization
+            for organization in Organization.objects.get_many_from_cache(
+                {project.organization_id for project in projects.values()}
+            )
+        }
+        snuba_queries = SnubaQuery.objects.in_bulk(
+            {subscription.snuba_query_id for subscription in subscriptions}
+        )
+        for subscription in subscriptions:
+            project = projects.get(subscription.project_id)
+            if project is not None:
+                if project.organization_id in organizations:
+                    project.organization = organizations[project.organization_id]
+                subscription.project = project
+            if subscription.snuba_query_id in snuba_queries:
+                subscription.snuba_query = snuba_queries[subscription.snuba_query_id]
+
+        alert_rules = AlertRule.objects.get_for_subscriptions(subscriptions)
+        triggers = AlertRuleTrigger.objects.get_for_alert_rules(alert_rules.values())
+
+        processors = {}
+        subscriptions = [s for s in subscriptions if s.id in alert_rules]
+        stats = get_alert_rule_stats_many(
+            [
+                (
+                    alert_rules[subscription.id],
+                    subscription,
+                    triggers[alert_rules[subscription.id].id],
+                )
+                for subscription in subscriptions
+            ]
+        )
+        for subscription, alert_rule_stats in zip(subscriptions, stats):
+            alert_rule = alert_rules[subscription.id]
+            if alert_rule.snuba_query_id == subscription.snuba_query_id:
+                alert_rule.snuba_query = subscription.snuba_query
+            processors[subscription.id] = cls(
+                subscription,
+                alert_rule=alert_rule,
+                triggers=triggers[alert_rule.id],
+                alert_rule_stats=alert_rule_stats,
+            )
+
+        active_incidents = Incident.objects.get_active_incidents(
+            [
+                (processor.alert_rule, processor.subscription.project_id)
+                for processor in processors.values()
+            ]
+        )
+        incident_triggers = {}
+        for incident_trigger in IncidentTrigger.objects.filter(
+            incident__in=[
+                incident for incident in active_incidents.values() if incident is not None
+            ]
+        ).select_related("alert_rule_trigger"):
+            incident_triggers.setdefault(incident_trigger.incident_id, {})[
+                incident_trigger.alert_rule_trigger_id
+            ] = incident_trigger
+
+        for processor in processors.values():
+            incident = active_incidents[
+                (processor.alert_rule.id, processor.subscription.project_id)
+            ]
+            processor.active_incident = incident
+            if incident is not None:
+                processor._incident_triggers = incident_triggers.get(incident.id, {})
+            else:
+                processor._incident_triggers = {}
+
+        return processors
+
     @property
     def active_incident(self):
         if not hasattr(self, "_active_incident"):
@@ -165,9 +267,15 @@ class SubscriptionProcessor:
 
         return trigger.alert_threshold + resolve_add
 
-    def get_comparison_aggregation_value(self, subscription_update, aggregation_value):
-        # For comparison alerts run a query over the comparison period and use it to calculate the
-        # % change.
+    def needs_comparison_query(self, subscription_update):
+        return bool(
+            self.alert_rule.comparison_delta
+            and self.subscription.snuba_query.dataset
+            not in (Dataset.Sessions.value, Dataset.Metrics.value)
+            and subscription_update["timestamp"] > self.last_update
+        )
+
+    def build_comparison_query(self, subscription_update):
         delta = timedelta(seconds=self.alert_rule.comparison_delta)
         end = subscription_update["timestamp"] - delta
         snuba_query = self.subscription.snuba_query
@@ -177,31 +285,40 @@ class SubscriptionProcessor:
             snuba_query,
             self.subscription.project.organization_id,
         )
-        try:
-            project_ids = [self.subscription.project_id]
-            query_builder = build_query_builder(
-                entity_subscription,
-                snuba_query.query,
-                project_ids,
-                snuba_query.environment,
-                params={
-                    "organization_id": self.subscription.project.organization.id,
-                    "project_id": project_ids,
-                    "start": start,
-                    "end": end,
-                },
-            )
-            time_col = ENTITY_TIME_COLUMNS[get_entity_key_from_query_builder(query_builder)]
-            query_builder.add_conditions(
-                [
-                    Condition(Column(time_col), Op.GTE, start),
-                    Condition(Column(time_col), Op.LT, end),
-                ]
-            )
-            query_builder.limit = Limit(1)
-            results = query_builder.run_query(referrer="subscription_processor.comparison_query")
-            comparison_aggregate = list(results["data"][0].values())[0]
+        project_ids = [self.subscription.project_id]
+        query_builder = build_query_builder(
+            entity_subscription,
+            snuba_query.query,
+            project_ids,
+            snuba_query.environment,
+            params={
+                "organization_id": self.subscription.project.organization.id,
+                "project_id": project_ids,
+                "start": start,
+                "end": end,
+            },
+        )
+        time_col = ENTITY_TIME_COLUMNS[get_entity_key_from_query_builder(query_builder)]
+        query_builder.add_conditions(
+            [
+                Condition(Column(time_col), Op.GTE, start),
+                Condition(Column(time_col), Op.LT, end),
+            ]
+        )
+        query_builder.limit = Limit(1)
+        return query_builder
 
+    def get_comparison_aggregation_value(self, subscription_update, aggregation_value):
+        # For comparison alerts run a query over the comparison period and use it to calculate the
+        # % change.
+        try:
+            future = self.comparison_aggregates.pop(subscription_update["timestamp"], None)
+            if future is not None:
+                comparison_aggregate = future.result()
+            else:
+                comparison_aggregate = run_comparison_query(
+                    self.build_comparison_query(subscription_update)
+                )
         except Exception:
             logger.exception("Failed to run comparison query")
             return
@@ -665,7 +782,74 @@ class SubscriptionProcessor:
             self.last_update,
             updated_trigger_alert_counts,
             updated_trigger_resolve_counts,
+            pipeline=self.stats_pipeline,
         )
+        # Further updates of the same processor only need to write what they change
+        self.orig_trigger_alert_counts = deepcopy(self.trigger_alert_counts)
+        self.orig_trigger_resolve_counts = deepcopy(self.trigger_resolve_counts)
+
+
+def run_comparison_query(query_builder):
+    results = query_builder.run_query(referrer="subscription_processor.comparison_query")
+    return list(results["data"][0].values())[0]
+
+
+def _run_comparison_query_in_thread(query_builder):
+    try:
+        return run_comparison_query(query_builder)
+    finally:
+        # Every thread opens database connections of its own
+        connections.close_all()
+
+
+def process_updates(updates):
+    """
+    Processes a batch of subscription updates, like processing them one by one with
+    `SubscriptionProcessor.process_update`, in order. The state of all subscriptions is
+    fetched in bulk, the stats of all alert rules are written in a single redis pipeline
+    once all updates have been processed, and the queries of comparison alerts are run
+    concurrently.
+    :param updates: A list of `(subscription_update, subscription)` tuples
+    """
+    subscriptions = {}
+    for _, subscription in updates:
+        subscriptions.setdefault(subscription.id, subscription)
+
+    processors = SubscriptionProcessor.for_subscriptions(list(subscriptions.values()))
+    pipeline = get_redis_client().pipeline()
+    for processor in processors.values():
+        processor.stats_pipeline = pipeline
+
+    with ThreadPoolExecutor(max_workers=COMPARISON_QUERY_WORKERS) as executor:
+        for subscription_update, subscription in updates:
+            processor = processors.get(subscription.id)
+            if processor is None or not processor.needs_comparison_query(subscription_update):
+                continue
+            try:
+                # Queries are built here, since building them may access the database
+                query_builder = processor.build_comparison_query(subscription_update)
+            except Exception:
+                # Fails again (and is logged) when the update is processed
+                continue
+            processor.comparison_aggregates[subscription_update["timestamp"]] = executor.submit(
+                _run_comparison_query_in_thread, query_builder
+            )
+
+        try:
+            for subscription_update, subscription in updates:
+                processor = processors.get(subscription.id)
+                if processor is None:
+                    # e.g. the alert rule has been removed
+                    processor = SubscriptionProcessor(subscription)
+                try:
+                    processor.process_update(subscription_update)
+                except Exception:
+                    logger.exception(
+                        "Failed to process subscription update",
+                        extra={"subscription_id": subscription.id},
+                    )
+        finally:
+            pipeline.execute()
 
 
 def build_alert_rule_stat_keys(alert_rule, subscription):
@@ -736,11 +920,45 @@ def get_alert_rule_stats(alert_rule, subscription, triggers):
     return last_update, trigger_alert_counts, trigger_resolve_counts
 
 
-def update_alert_rule_stats(alert_rule, subscription, last_update, alert_counts, resolve_counts):
+def get_alert_rule_stats_many(items):
     """
-    Updates stats about the alert rule, subscription and triggers if they've changed.
+    Fetches the stats of multiple alert rules like `get_alert_rule_stats`, with a single
+    redis pipeline.
+    :param items: A list of `(alert_rule, subscription, triggers)` tuples
+    :return: A list with a tuple of stats for each of the items
     """
     pipeline = get_redis_client().pipeline()
+    for alert_rule, subscription, triggers in items:
+        # All keys of an alert rule and subscription share a hash slot
+        pipeline.mget(
+            build_alert_rule_stat_keys(alert_rule, subscription)
+            + build_trigger_stat_keys(alert_rule, subscription, triggers)
+        )
+
+    stats = []
+    for (alert_rule, subscription, triggers), results in zip(items, pipeline.execute()):
+        results = tuple(0 if result is None else int(result) for result in results)
+        trigger_alert_counts = {}
+        trigger_resolve_counts = {}
+        for trigger, trigger_result in zip(
+            triggers, partition(results[1:], len(ALERT_RULE_TRIGGER_STAT_KEYS))
+        ):
+            trigger_alert_counts[trigger.id] = trigger_result[0]
+            trigger_resolve_counts[trigger.id] = trigger_result[1]
+        stats.append((to_datetime(results[0]), trigger_alert_counts, trigger_resolve_counts))
+    return stats
+
+
+def update_alert_rule_stats(
+    alert_rule, subscription, last_update, alert_counts, resolve_counts, pipeline=None
+):
+    """
+    Updates stats about the alert rule, subscription and triggers if they've changed.
+    If a `pipeline` is passed, the updates are only added to it.
+    """
+    execute = pipeline is None
+    if pipeline is None:
+        pipeline = get_redis_client().pipeline()
 
     counts_with_stat_keys = zip(ALERT_RULE_TRIGGER_STAT_KEYS, (alert_counts, resolve_counts))
     for stat_key, trigger_counts in counts_with_stat_keys:
@@ -755,7 +973,8 @@ def update_alert_rule_stats(alert_rule, subscription, last_update, alert_counts,
 
     last_update_key = build_alert_rule_stat_keys(alert_rule, subscription)[0]
     pipeline.set(last_update_key, int(to_timestamp(last_update)), ex=REDIS_TTL)
-    pipeline.execute()
+    if execute:
+        pipeline.execute()
 
 
 def get_redis_client():
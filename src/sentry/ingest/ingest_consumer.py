@@ -1,6 +1,7 @@
 import functools
 import logging
 import random
+import threading
 import time
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import (
@@ -26,12 +27,14 @@ from sentry import eventstore, features
 from sentry.attachments import CachedAttachment, attachment_cache
 from sentry.event_manager import save_attachment
 from sentry.eventstore.processing import event_processing_store
+from sentry.ingest.pipeline import Pipeline, PipelineBatch, Stage
 from sentry.ingest.types import ConsumerType
 from sentry.ingest.userreport import Conflict, save_userreport
 from sentry.killswitches import killswitch_matches_context
 from sentry.models import Project
 from sentry.signals import event_accepted
 from sentry.tasks.store import preprocess_event, save_event_transaction
+from sentry.tasks.symbolication import batch_symbolication
 from sentry.utils import json, metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
@@ -72,7 +75,7 @@ class IngestConsumerWorker(AbstractBatchWorker):
 
     def flush_batch(self, batch):
         mark_scope_as_unsafe()
-        with metrics.timer("ingest_consumer.flush_batch"):
+        with metrics.timer("ingest_consumer.flush_batch"), batch_symbolication():
             return self._flush_batch(batch)
 
     def _flush_batch(self, batch: Sequence[Message]):
@@ -153,6 +156,165 @@ class IngestConsumerWorker(AbstractBatchWorker):
             self.__process_event_executor.shutdown()
 
 
+class PipelinedMessage(NamedTuple):
+    message: Message
+    project: Optional[Project]
+    # Set by the store stage for event messages: the storage key of the
+    # event in the processing store, and the function to call with it to
+    # dispatch the processing tasks.
+    cache_key: Optional[str] = None
+    dispatch: Optional[Callable[[str], None]] = None
+
+
+class PipelinedIngestConsumerWorker(AbstractBatchWorker):
+    """
+    A variant of ``IngestConsumerWorker`` that overlaps the processing of
+    messages within a batch, rather than running each processing step for the
+    entire batch before moving on to the next.
+
+    Messages move through the following stages, each of which runs on its own
+    bounded thread pool:
+
+    1. ``decode``: deserialize the msgpack-encoded Kafka payload,
+    2. ``project``: look up the project the message belongs to,
+    3. ``store``: parse and filter events and write them to the processing
+       store (attachment chunks are written to the attachment cache here),
+    4. ``dispatch``: spawn the processing tasks for events, and save
+       individual attachments and user reports.
+
+    Each stage only accepts a limited number of pending messages, so a slow
+    stage blocks earlier stages (and eventually the consumer) rather than
+    buffering the entire batch in memory.
+
+    ``flush_batch`` only returns after every message in the batch has been
+    completely processed, so offsets are still committed in order and only for
+    messages that have been handled.
+    """
+
+    def __init__(
+        self,
+        decode_concurrency: int = 1,
+        project_concurrency: int = 1,
+        store_concurrency: int = 4,
+        dispatch_concurrency: int = 4,
+        max_pending: int = 100,
+    ) -> None:
+        self.__prepare = Pipeline(
+            "ingest_consumer",
+            [
+                Stage("decode", self._decode, decode_concurrency, max_pending),
+                Stage("project", self._fetch_project, project_concurrency, max_pending),
+                Stage("store", self._store, store_concurrency, max_pending),
+            ],
+        )
+        self.__dispatch = Pipeline(
+            "ingest_consumer",
+            [Stage("dispatch", self._dispatch, dispatch_concurrency, max_pending)],
+        )
+
+    def process_message(self, message) -> bytes:
+        # Decoding is deferred to the pipeline so that it can be overlapped
+        # with the I/O of other messages in the batch.
+        return message.value()
+
+    def flush_batch(self, batch: Sequence[bytes]):
+        mark_scope_as_unsafe()
+        with metrics.timer("ingest_consumer.flush_batch"), batch_symbolication():
+            return self._flush_batch(batch)
+
+    def _flush_batch(self, batch: Sequence[bytes]) -> None:
+        state = PipelineBatch()
+
+        # attachment_chunk messages need to be stored before the attachment and
+        # event messages that reference them are dispatched. As we don't know
+        # which messages depend on chunks that are part of this batch, all
+        # messages that have attachments are held back until every other
+        # message has cleared the store stage.
+        held: MutableSequence[PipelinedMessage] = []
+        held_lock = threading.Lock()
+
+        def on_prepared(item: PipelinedMessage) -> None:
+            if _requires_attachment_chunks(item.message):
+                with held_lock:
+                    held.append(item)
+            else:
+                self.__dispatch.submit(state, item)
+
+        for value in batch:
+            self.__prepare.submit(state, value, on_result=on_prepared)
+
+        state.wait()
+
+        for item in held:
+            self.__dispatch.submit(state, item)
+
+        state.wait()
+
+    def _decode(self, value: bytes) -> Message:
+        message = msgpack.unpackb(value, use_list=False)
+        metrics.incr("ingest_consumer.flush.messages_seen", tags={"message_type": message["type"]})
+        return message
+
+    def _fetch_project(self, message: Message) -> PipelinedMessage:
+        message_type = message["type"]
+        if message_type == "attachment_chunk":
+            # Chunks are written to the attachment cache without a project.
+            return PipelinedMessage(message, None)
+        elif message_type not in ("event", "attachment", "user_report"):
+            raise ValueError(f"Unknown message type: {message_type}")
+
+        try:
+            project = Project.objects.get_from_cache(id=int(message["project_id"]))
+        except Project.DoesNotExist:
+            project = None
+        return PipelinedMessage(message, project)
+
+    def _store(self, item: PipelinedMessage) -> Optional[PipelinedMessage]:
+        message = item.message
+        projects = {item.project.id: item.project} if item.project is not None else {}
+        message_type = message["type"]
+
+        if message_type == "attachment_chunk":
+            process_attachment_chunk(message, projects=projects)
+            return None
+        elif message_type != "event":
+            return item
+
+        with metrics.timer("ingest_consumer.process_event"):
+            result = _load_event(message, projects)
+            if result is None:
+                return None
+
+            data, dispatch = result
+            return item._replace(cache_key=_store_event(data), dispatch=dispatch)
+
+    def _dispatch(self, item: PipelinedMessage) -> None:
+        message = item.message
+        projects = {item.project.id: item.project} if item.project is not None else {}
+        message_type = message["type"]
+
+        if message_type == "event":
+            assert item.dispatch is not None and item.cache_key is not None
+            item.dispatch(item.cache_key)
+        elif message_type == "attachment":
+            process_individual_attachment(message, projects)
+        elif message_type == "user_report":
+            process_userreport(message, projects)
+
+    def get_stats(self) -> Mapping[str, Any]:
+        return {**self.__prepare.get_stats(), **self.__dispatch.get_stats()}
+
+    def shutdown(self):
+        self.__prepare.shutdown()
+        self.__dispatch.shutdown()
+
+
+def _requires_attachment_chunks(message: Message) -> bool:
+    if message["type"] == "attachment":
+        return True
+    return message["type"] == "event" and bool(message.get("attachments"))
+
+
 def trace_func(**span_kwargs):
     def wrapper(f):
         @functools.wraps(f)
@@ -423,14 +585,29 @@ def process_userreport(message, projects) -> None:
 
 
 def get_ingest_consumer(
-    consumer_types, once=False, executor: Optional[ThreadPoolExecutor] = None, **options
+    consumer_types,
+    once=False,
+    executor: Optional[ThreadPoolExecutor] = None,
+    pipelined: bool = False,
+    pipeline_concurrency: int = 4,
+    **options,
 ):
     """
     Handles events coming via a kafka queue.
 
     The events should have already been processed (normalized... ) upstream (by Relay).
+
+    If ``pipelined`` is set, messages are processed by a
+    ``PipelinedIngestConsumerWorker`` whose I/O bound stages use
+    ``pipeline_concurrency`` threads each.
     """
     topic_names = {ConsumerType.get_topic_name(consumer_type) for consumer_type in consumer_types}
-    return create_batching_kafka_consumer(
-        topic_names=topic_names, worker=IngestConsumerWorker(executor), **options
-    )
+    worker: AbstractBatchWorker
+    if pipelined:
+        worker = PipelinedIngestConsumerWorker(
+            store_concurrency=pipeline_concurrency,
+            dispatch_concurrency=pipeline_concurrency,
+        )
+    else:
+        worker = IngestConsumerWorker(executor)
+    return create_batching_kafka_consumer(topic_names=topic_names, worker=worker, **options)
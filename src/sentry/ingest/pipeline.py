@@ -0,0 +1,177 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Mapping, MutableMapping, NamedTuple, Optional, Sequence
+
+from sentry.utils import metrics
+
+
+class Stage(NamedTuple):
+    """
+    A single step of a ``Pipeline``.
+
+    ``function`` is called with the output of the previous stage (or the
+    submitted item for the first stage.) Returning ``None`` drops the item from
+    the pipeline, which is how stages filter out items that need no further
+    processing.
+    """
+
+    name: str
+    function: Callable[[Any], Any]
+    concurrency: int = 1
+    # The maximum number of items that may be queued for or executing in this
+    # stage at once. Submitting to a stage that is at capacity blocks the
+    # submitting thread, which propagates backpressure to earlier stages.
+    max_pending: int = 100
+
+
+class StageStats(NamedTuple):
+    items: int
+    busy_time: float
+
+
+class PipelineBatch:
+    """
+    Tracks the completion of a set of items submitted to one or more pipelines.
+
+    ``wait`` blocks until every item submitted as part of this batch has
+    either completed its final stage, been dropped, or failed. The first error
+    raised by any stage is re-raised from ``wait`` so that callers can avoid
+    committing work that has not been completed.
+    """
+
+    def __init__(self) -> None:
+        self.__condition = threading.Condition()
+        self.__pending = 0
+        self.__errors: List[Exception] = []
+
+    def _begin(self) -> None:
+        with self.__condition:
+            self.__pending += 1
+
+    def _finish(self, error: Optional[Exception] = None) -> None:
+        with self.__condition:
+            if error is not None:
+                self.__errors.append(error)
+            self.__pending -= 1
+            if self.__pending == 0:
+                self.__condition.notify_all()
+
+    def wait(self) -> None:
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__pending == 0)
+            if self.__errors:
+                raise self.__errors[0]
+
+
+class Pipeline:
+    """
+    Runs items through a sequence of stages, where every stage has its own
+    bounded thread pool.
+
+    Items move to the next stage as soon as they complete the current one, so
+    work for different items is overlapped across stages (e.g. one item is
+    being decoded while another is waiting on a network round-trip.) Items are
+    not guaranteed to complete in the order they were submitted; callers that
+    need ordering guarantees should wait for the whole ``PipelineBatch`` to
+    complete before acting on its results.
+    """
+
+    def __init__(self, name: str, stages: Sequence[Stage]) -> None:
+        assert stages, "pipeline requires at least one stage"
+        self.__name = name
+        self.__stages = stages
+        self.__executors = [
+            ThreadPoolExecutor(stage.concurrency, thread_name_prefix=f"{name}.{stage.name}")
+            for stage in stages
+        ]
+        self.__capacity = [threading.BoundedSemaphore(stage.max_pending) for stage in stages]
+        self.__stats_lock = threading.Lock()
+        self.__stats: MutableMapping[str, StageStats] = {
+            stage.name: StageStats(0, 0.0) for stage in stages
+        }
+
+    def submit(
+        self,
+        batch: PipelineBatch,
+        item: Any,
+        on_result: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        """
+        Submit an item to the first stage of the pipeline, blocking if that
+        stage is at capacity. ``on_result`` is called (from a worker thread)
+        with the output of the final stage.
+        """
+        batch._begin()
+        self.__submit(0, batch, item, on_result)
+
+    def __submit(
+        self,
+        index: int,
+        batch: PipelineBatch,
+        item: Any,
+        on_result: Optional[Callable[[Any], None]],
+    ) -> None:
+        self.__capacity[index].acquire()
+        try:
+            future = self.__executors[index].submit(self.__run_stage, index, item)
+        except Exception as error:
+            self.__capacity[index].release()
+            batch._finish(error)
+            return
+
+        future.add_done_callback(lambda future: self.__advance(index, batch, future, on_result))
+
+    def __run_stage(self, index: int, item: Any) -> Any:
+        stage = self.__stages[index]
+        start = time.monotonic()
+        try:
+            return stage.function(item)
+        finally:
+            duration = time.monotonic() - start
+            metrics.timing(f"{self.__name}.pipeline.stage", duration, tags={"stage": stage.name})
+            with self.__stats_lock:
+                stats = self.__stats[stage.name]
+                self.__stats[stage.name] = StageStats(stats.items + 1, stats.busy_time + duration)
+
+    def __advance(
+        self,
+        index: int,
+        batch: PipelineBatch,
+        future: "Future[Any]",
+        on_result: Optional[Callable[[Any], None]],
+    ) -> None:
+        # Release the capacity for this stage before (potentially) blocking on
+        # the next stage to avoid holding slots in two stages at once.
+        self.__capacity[index].release()
+
+        try:
+            result = future.result()
+        except Exception as error:
+            batch._finish(error)
+            return
+
+        if result is None:
+            batch._finish()
+        elif index + 1 < len(self.__stages):
+            self.__submit(index + 1, batch, result, on_result)
+        else:
+            error = None
+            if on_result is not None:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    error = e
+            batch._finish(error)
+
+    def get_stats(self) -> Mapping[str, StageStats]:
+        """
+        Return the number of items processed and the cumulative time spent
+        executing each stage since the pipeline was created.
+        """
+        with self.__stats_lock:
+            return dict(self.__stats)
+
+    def shutdown(self) -> None:
+        for executor in self.__executors:
+            executor.shutdown()
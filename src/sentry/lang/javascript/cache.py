@@ -1,8 +1,20 @@
+from hashlib import sha1
+from threading import Lock
+
+from django.conf import settings
 from symbolic import SourceView
 
+from sentry.filestore.blobcache import BlobCache
+from sentry.utils import metrics
+from sentry.utils.lru import SizedLRUCache
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "get_cached_view", "get_disk_cache"]
+
+# Process-wide caches, shared between all events processed by a worker.
+_view_caches = {}
+_disk_caches = {}
+_caches_lock = Lock()
 
 
 def is_utf8(codec):
@@ -10,6 +22,94 @@ def is_utf8(codec):
     return name in ("utf-8", "ascii")
 
 
+def make_source_view(source, encoding=None):
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    # If an encoding is provided and it's not utf-8 compatible
+    # we try to re-encoding the source and create a source view
+    # from it.
+    elif encoding is not None and not is_utf8(encoding):
+        try:
+            source = source.decode(encoding).encode("utf-8")
+        except UnicodeError:
+            pass
+    return SourceView.from_bytes(source)
+
+
+def get_view_cache():
+    """
+    Return the process-wide cache of parsed source and sourcemap views, or
+    ``None`` if it is disabled.
+
+    The cache is bounded by the total size of the raw files the views were
+    parsed from (parsed views take up a multiple of that.)
+    """
+    max_size = settings.SENTRY_JS_VIEW_CACHE_SIZE
+    if not max_size:
+        return None
+
+    ttl = settings.SENTRY_JS_VIEW_CACHE_TTL
+    key = (max_size, ttl)
+    try:
+        return _view_caches[key]
+    except KeyError:
+        pass
+
+    with _caches_lock:
+        if key not in _view_caches:
+            _view_caches[key] = SizedLRUCache(
+                max_size,
+                ttl,
+                on_evict=lambda key: metrics.incr(
+                    "sourcemaps.view_cache.evicted", tags={"kind": key[0]}, skip_internal=True
+                ),
+            )
+        return _view_caches[key]
+
+
+def get_cached_view(kind, url, body, parse, release=None, dist=None):
+    """
+    Return ``parse(body)``, reusing the view this process has parsed before
+    for the same ``url`` of ``release`` and ``dist`` if the body is identical.
+    """
+    cache = get_view_cache()
+    if cache is None:
+        return parse(body)
+
+    key = (kind, release and release.id, dist and dist.id, url, sha1(body).hexdigest())
+    view = cache.get(key)
+    if view is not None:
+        metrics.incr("sourcemaps.view_cache", tags={"kind": kind, "result": "hit"})
+        return view
+
+    metrics.incr("sourcemaps.view_cache", tags={"kind": kind, "result": "miss"})
+    view = parse(body)
+    cache.set(key, view, size=len(body))
+    return view
+
+
+def get_disk_cache():
+    """
+    Return the on-disk cache of decompressed release files and sources, which
+    is shared by all workers on a host, or ``None`` if it is disabled.
+    """
+    path = settings.SENTRY_JS_DISK_CACHE_PATH
+    if not path:
+        return None
+
+    max_size = settings.SENTRY_JS_DISK_CACHE_SIZE
+    key = (path, max_size)
+    try:
+        return _disk_caches[key]
+    except KeyError:
+        pass
+
+    with _caches_lock:
+        if key not in _disk_caches:
+            _disk_caches[key] = BlobCache(path, max_size, metric="sourcemaps.disk_cache")
+        return _disk_caches[key]
+
+
 class SourceCache:
     def __init__(self):
         self._cache = {}
@@ -40,17 +140,7 @@ class SourceCache:
         url = self._get_canonical_url(url)
 
         if not isinstance(source, SourceView):
-            if isinstance(source, str):
-                source = source.encode("utf-8")
-            # If an encoding is provided and it's not utf-8 compatible
-            # we try to re-encoding the source and create a source view
-            # from it.
-            elif encoding is not None and not is_utf8(encoding):
-                try:
-                    source = source.decode(encoding).encode("utf-8")
-                except UnicodeError:
-                    pass
-            source = SourceView.from_bytes(source)
+            source = make_source_view(source, encoding)
         self._cache[url] = source
 
     def add_error(self, url, error):
@@ -6,6 +6,7 @@ import sys
 import time
 import zlib
 from datetime import datetime
+from hashlib import sha1
 from io import BytesIO
 from os.path import splitext
 from typing import IO, Optional, Tuple
@@ -36,7 +37,7 @@ from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import get_path
 from sentry.utils.urls import non_standard_url_join
 
-from .cache import SourceCache, SourceMapCache
+from .cache import SourceCache, SourceMapCache, get_cached_view, get_disk_cache, make_source_view
 
 __all__ = ["JavaScriptStacktraceProcessor"]
 
@@ -296,6 +297,28 @@ def get_cache_keys(filename, release, dist):
     return cache_key, cache_key_meta
 
 
+# Compressed bodies smaller than this are cheaper to decompress than to read
+# from the disk cache.
+DISK_CACHE_MIN_SIZE = 64 * 1024
+
+
+def decompress_body(z_body):
+    """
+    Decompress a cached body, reusing the result from the local disk cache
+    (if enabled) for large bodies, e.g. sourcemaps of big bundles.
+    """
+    disk_cache = get_disk_cache() if len(z_body) >= DISK_CACHE_MIN_SIZE else None
+    if disk_cache is None:
+        return zlib.decompress(z_body)
+
+    checksum = sha1(z_body).hexdigest()
+    body = disk_cache.get(checksum)
+    if body is None:
+        body = zlib.decompress(z_body)
+        disk_cache.set(checksum, body)
+    return body
+
+
 def result_from_cache(filename, result):
     # Previous caches would be a 3-tuple instead of a 4-tuple,
     # so this is being maintained for backwards compatibility
@@ -304,7 +327,7 @@ def result_from_cache(filename, result):
     except IndexError:
         encoding = None
 
-    return http.UrlResult(filename, result[0], zlib.decompress(result[1]), result[2], encoding)
+    return http.UrlResult(filename, result[0], decompress_body(result[1]), result[2], encoding)
 
 
 @metrics.wraps("sourcemaps.release_file")
@@ -642,7 +665,7 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
             # We got a cache hit, but the body is compressed, so we
             # need to decompress it before handing it off
             result = http.UrlResult(
-                result[0], result[1], zlib.decompress(result[2]), result[3], encoding
+                result[0], result[1], decompress_body(result[2]), result[3], encoding
             )
 
     if result is None:
@@ -748,6 +771,8 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
             )
         except TypeError as e:
             raise UnparseableSourcemap({"url": "<base64>", "reason": str(e)})
+        # the body is part of the url already
+        cache_url = None
     else:
         # look in the database and, if not found, optionally try to scrape the web
         with sentry_sdk.start_span(
@@ -762,11 +787,19 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
                 allow_scraping=allow_scraping,
             )
         body = result.body
+        cache_url = result.url
     try:
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.fetch_sourcemap.SourceMapView.from_json_bytes"
         ):
-            return SourceMapView.from_json_bytes(body)
+            return get_cached_view(
+                "sourcemap",
+                cache_url,
+                body,
+                SourceMapView.from_json_bytes,
+                release=release,
+                dist=dist,
+            )
     except Exception as exc:
         # This is in debug because the product shows an error already.
         logger.debug(str(exc), exc_info=True)
@@ -1180,7 +1213,15 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             # either way, there's no more for us to do here, since we don't have
             # a valid file to cache
             return
-        cache.add(filename, result.body, result.encoding)
+        source_view = get_cached_view(
+            "source",
+            result.url,
+            result.body,
+            lambda body: make_source_view(body, result.encoding),
+            release=self.release,
+            dist=self.dist,
+        )
+        cache.add(filename, source_view)
         cache.alias(result.url, filename)
 
         sourcemap_url = discover_sourcemap(result)
@@ -0,0 +1,310 @@
+"""
+Batched symbolication of native events.
+
+Crash storms send many events with near identical stacktraces. Instead of
+creating one symbolicator task per event, the events of a project are
+symbolicated with a single request, in which every module and every
+(module, instruction address) pair is sent only once. The combined response
+is then split up again and merged into every event like a response for just
+that event.
+"""
+
+from collections import defaultdict, namedtuple
+from hashlib import md5
+
+from sentry.lang.native.processing import _get_payload_request, _merge_payload_response
+from sentry.lang.native.symbolicator import Symbolicator
+from sentry.lang.native.utils import signal_from_data
+from sentry.models import Project
+from sentry.utils import json, metrics
+
+# Module fields that differ between processes loading the same image.
+MODULE_ADDRESS_FIELDS = frozenset(("image_addr",))
+
+BatchedEvent = namedtuple(
+    "BatchedEvent",
+    [
+        "data",
+        "stacktrace_infos",
+        "modules",
+        "stacktraces",
+        # indexes of the event's modules and frames in the combined request
+        "module_indexes",
+        "frame_indexes",
+        # indexes of the event's modules referenced by its frames
+        "used_modules",
+    ],
+)
+
+
+def _parse_addr(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            return int(value, 16 if value[:2].lower() == "0x" else 10)
+        except ValueError:
+            return None
+    return value
+
+
+class PayloadBatch:
+    """
+    Combines the symbolication requests of several events into one.
+
+    All events of a batch must belong to the same project and have the same
+    signal, since both apply to the whole request. Modules are deduplicated
+    by their identity regardless of their load address, and all frames are
+    converted to addresses relative to their module, so that the frames of
+    events with different load addresses can be deduplicated as well.
+    """
+
+    def __init__(self):
+        self.modules = []
+        self.frames = []
+        self.events = []
+        self.__module_indexes = {}
+        self.__frame_indexes = {}
+
+    def __add_module(self, module):
+        key = json.dumps(
+            {k: v for k, v in module.items() if k not in MODULE_ADDRESS_FIELDS}, sort_keys=True
+        )
+        idx = self.__module_indexes.get(key)
+        if idx is None:
+            idx = self.__module_indexes[key] = len(self.modules)
+            self.modules.append({**module, "image_addr": "0x0"})
+        return idx
+
+    def __add_frame(self, frame, leading, registers):
+        # The first frame of a stacktrace is the crashing frame, the
+        # instruction addresses of all other frames are adjusted by
+        # symbolicator to point to the call instruction.
+        key = (frame["addr_mode"], frame["instruction_addr"], frame.get("function_id"))
+        key += (bool(registers),) if leading else (None,)
+        idx = self.__frame_indexes.get(key)
+        if idx is None:
+            idx = self.__frame_indexes[key] = len(self.frames)
+            self.frames.append((frame, leading, registers))
+        return idx
+
+    def add(self, data):
+        """
+        Adds the event to the batch. Returns ``False`` if the event cannot be
+        batched, because some of its frames cannot be attributed to a module.
+        """
+        stacktrace_infos, modules, stacktraces = _get_payload_request(data)
+
+        # Resolve all frames before changing the batch, so that events which
+        # cannot be batched leave no unused modules behind.
+        relative_stacktraces = []
+        for stacktrace in stacktraces:
+            relative_frames = []
+            for frame in stacktrace["frames"]:
+                relative_frame = _get_relative_frame(frame, modules)
+                if relative_frame is None:
+                    return False
+                relative_frames.append(relative_frame)
+            relative_stacktraces.append(relative_frames)
+
+        if not any(relative_stacktraces):
+            # nothing to symbolicate
+            return True
+
+        module_indexes = [self.__add_module(module) for module in modules]
+        used_modules = set()
+        frame_indexes = []
+        for stacktrace, relative_frames in zip(stacktraces, relative_stacktraces):
+            indexes = []
+            for i, (module_idx, addr, function_id) in enumerate(relative_frames):
+                used_modules.add(module_idx)
+                frame = {
+                    "instruction_addr": "0x%x" % addr,
+                    "addr_mode": "rel:%d" % module_indexes[module_idx],
+                }
+                if function_id is not None:
+                    frame["function_id"] = function_id
+                indexes.append(self.__add_frame(frame, i == 0, stacktrace["registers"]))
+            frame_indexes.append(indexes)
+
+        self.events.append(
+            BatchedEvent(
+                data,
+                stacktrace_infos,
+                modules,
+                stacktraces,
+                module_indexes,
+                frame_indexes,
+                used_modules,
+            )
+        )
+        return True
+
+    def get_request(self):
+        """
+        Returns the stacktraces of the combined request.
+
+        Every leading frame is sent as a stacktrace of its own. All other
+        frames are sent in a single stacktrace after a copy of its first
+        frame, so that none of them is treated as a crashing frame.
+        """
+        stacktraces = []
+        frame_indexes = []
+
+        trailing = []
+        for idx, (frame, leading, registers) in enumerate(self.frames):
+            if leading:
+                stacktraces.append({"registers": registers, "frames": [frame]})
+                frame_indexes.append([idx])
+            else:
+                trailing.append(idx)
+
+        if trailing:
+            frames = [self.frames[idx][0] for idx in trailing]
+            stacktraces.append({"registers": {}, "frames": frames[:1] + frames})
+            frame_indexes.append([None] + trailing)
+
+        return stacktraces, frame_indexes
+
+    def split_response(self, response, frame_indexes):
+        """
+        Yields every event of the batch along with the part of the combined
+        ``response`` that applies to it.
+        """
+        complete_frames = [[] for _ in self.frames]
+        for indexes, complete_stacktrace in zip(frame_indexes, response.get("stacktraces") or ()):
+            for complete_frame in complete_stacktrace.get("frames") or ():
+                idx = indexes[complete_frame["original_index"]]
+                if idx is not None:
+                    complete_frames[idx].append(complete_frame)
+
+        for event in self.events:
+            if response.get("status") != "completed":
+                yield event, response
+                continue
+
+            event_modules = []
+            for i, (module, idx) in enumerate(zip(event.modules, event.module_indexes)):
+                complete_module = dict(response["modules"][idx])
+                complete_module["image_addr"] = module.get("image_addr")
+                if i not in event.used_modules:
+                    complete_module["debug_status"] = "unused"
+                event_modules.append(complete_module)
+
+            event_stacktraces = []
+            for stacktrace, indexes in zip(event.stacktraces, event.frame_indexes):
+                frames = []
+                for original_index, (raw_frame, idx) in enumerate(
+                    zip(stacktrace["frames"], indexes)
+                ):
+                    for complete_frame in complete_frames[idx]:
+                        frame = dict(complete_frame, original_index=original_index)
+                        frame["instruction_addr"] = raw_frame["instruction_addr"]
+                        frame["addr_mode"] = raw_frame.get("addr_mode")
+                        frames.append(frame)
+                event_stacktraces.append({"frames": frames})
+
+            event_response = dict(response, modules=event_modules, stacktraces=event_stacktraces)
+            yield event, event_response
+
+
+def _get_relative_frame(frame, modules):
+    """
+    Returns the index of the module containing the frame, the instruction
+    address relative to that module and the function id of the frame.
+    """
+    addr = _parse_addr(frame.get("instruction_addr"))
+    if addr is None:
+        return None
+
+    addr_mode = frame.get("addr_mode")
+    if addr_mode is not None:
+        # already relative to a module of the event
+        module_idx = int(addr_mode[4:])
+        if module_idx >= len(modules):
+            return None
+        return module_idx, addr, frame.get("function_id")
+
+    for module_idx, module in enumerate(modules):
+        image_addr = _parse_addr(module.get("image_addr"))
+        image_size = _parse_addr(module.get("image_size"))
+        if image_addr is not None and image_size and image_addr <= addr < image_addr + image_size:
+            return module_idx, addr - image_addr, frame.get("function_id")
+
+    return None
+
+
+def get_batch_id(events):
+    return md5("".join(sorted(data["event_id"] for data in events)).encode("utf-8")).hexdigest()
+
+
+def process_payloads(events):
+    """
+    Symbolicates the native stacktraces of multiple events, with one request
+    per project and signal. The symbol sources are configured per project.
+
+    Events that cannot be batched are symbolicated with a request of their
+    own. Returns the list of events that were symbolicated.
+
+    Like ``process_payload``, this raises ``RetrySymbolication`` while
+    symbolicator is still processing a request. Requests are identified by
+    the events they contain, and no event is changed until all requests have
+    completed, so calling this again with the same events resumes polling
+    the pending requests.
+    """
+    groups = defaultdict(list)
+    for data in events:
+        groups[(data["project"], json.dumps(signal_from_data(data)))].append(data)
+
+    responses = []
+    unbatched = []
+    for (project_id, _), group in groups.items():
+        batch = PayloadBatch()
+        for data in group:
+            if not batch.add(data):
+                unbatched.append(data)
+
+        if not batch.events:
+            continue
+
+        batch_events = [event.data for event in batch.events]
+        project = Project.objects.get_from_cache(id=project_id)
+        symbolicator = Symbolicator(project=project, event_id=get_batch_id(batch_events))
+        stacktraces, frame_indexes = batch.get_request()
+
+        metrics.timing("symbolicator.batch.events", len(batch_events))
+        metrics.timing(
+            "symbolicator.batch.frames",
+            sum(len(s["frames"]) for event in batch.events for s in event.stacktraces),
+            tags={"deduplicated": "false"},
+        )
+        metrics.timing(
+            "symbolicator.batch.frames", len(batch.frames), tags={"deduplicated": "true"}
+        )
+
+        response = symbolicator.process_payload(
+            stacktraces=stacktraces,
+            modules=batch.modules,
+            signal=signal_from_data(batch_events[0]),
+        )
+        responses.extend(batch.split_response(response, frame_indexes))
+
+    if unbatched:
+        metrics.incr("symbolicator.batch.unbatched_events", amount=len(unbatched))
+
+    for data in unbatched:
+        stacktrace_infos, modules, stacktraces = _get_payload_request(data)
+        project = Project.objects.get_from_cache(id=data["project"])
+        symbolicator = Symbolicator(project=project, event_id=data["event_id"])
+        response = symbolicator.process_payload(
+            stacktraces=stacktraces, modules=modules, signal=signal_from_data(data)
+        )
+        event = BatchedEvent(data, stacktrace_infos, modules, stacktraces, None, None, None)
+        responses.append((event, response))
+
+    for event, response in responses:
+        _merge_payload_response(
+            event.data, event.stacktrace_infos, event.modules, event.stacktraces, response
+        )
+
+    return [event.data for event, _ in responses]
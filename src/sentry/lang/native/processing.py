@@ -343,11 +343,11 @@ def get_frames_for_symbolication(frames, data, modules):
     return rv
 
 
-def process_payload(data):
-    project = Project.objects.get_from_cache(id=data["project"])
-
-    symbolicator = Symbolicator(project=project, event_id=data["event_id"])
-
+def _get_payload_request(data):
+    """
+    Returns the stacktrace infos of all native stacktraces in the event, along
+    with the modules and stacktraces to send to symbolicator for them.
+    """
     stacktrace_infos = [
         stacktrace
         for stacktrace in find_stacktraces_in_data(data)
@@ -366,13 +366,10 @@ def process_payload(data):
         for sinfo in stacktrace_infos
     ]
 
-    if not any(stacktrace["frames"] for stacktrace in stacktraces):
-        return
+    return stacktrace_infos, modules, stacktraces
 
-    signal = signal_from_data(data)
-
-    response = symbolicator.process_payload(stacktraces=stacktraces, modules=modules, signal=signal)
 
+def _merge_payload_response(data, stacktrace_infos, modules, stacktraces, response):
     if not _handle_response_status(data, response):
         return data
 
@@ -422,6 +419,23 @@ def process_payload(data):
     return data
 
 
+def process_payload(data):
+    project = Project.objects.get_from_cache(id=data["project"])
+
+    symbolicator = Symbolicator(project=project, event_id=data["event_id"])
+
+    stacktrace_infos, modules, stacktraces = _get_payload_request(data)
+
+    if not any(stacktrace["frames"] for stacktrace in stacktraces):
+        return
+
+    signal = signal_from_data(data)
+
+    response = symbolicator.process_payload(stacktraces=stacktraces, modules=modules, signal=signal)
+
+    return _merge_payload_response(data, stacktrace_infos, modules, stacktraces, response)
+
+
 def get_symbolication_function(data):
     if is_minidump_event(data):
         return process_minidump
@@ -3,10 +3,10 @@ import mmap
 import os
 import tempfile
 import time
-from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from hashlib import sha1
-from threading import Semaphore
 from uuid import uuid4
 
 from django.conf import settings
@@ -24,6 +24,7 @@ from sentry.db.models import (
     JSONField,
     Model,
 )
+from sentry.filestore.blobcache import get_blob_cache
 from sentry.tasks.files import delete_file as delete_file_task
 from sentry.tasks.files import delete_unreferenced_blobs
 from sentry.utils import metrics
@@ -38,6 +39,7 @@ UPLOAD_RETRY_TIME = getattr(settings, "SENTRY_UPLOAD_RETRY_TIME", 60)  # 1min
 DEFAULT_BLOB_SIZE = 1024 * 1024  # one mb
 CHUNK_STATE_HEADER = "__state"
 MULTI_BLOB_UPLOAD_CONCURRENCY = 8
+MULTI_BLOB_READ_CONCURRENCY = 4
 MAX_FILE_SIZE = 2**31  # 2GB is the maximum offset supported by fileblob
 
 
@@ -127,6 +129,8 @@ class FileBlob(Model):
         If both are provided then a checksum check is performed.
 
         If the checksums mismatch an `IOError` is raised.
+
+        Returns the blobs in the order of `files`.
         """
         logger.debug("FileBlob.from_files.start")
 
@@ -137,11 +141,12 @@ class FileBlob(Model):
             else:
                 files_with_checksums.append((fileobj, None))
 
+        checksums = []
         checksums_seen = set()
-        blobs_created = []
+        blobs_by_checksum = {}
         blobs_to_save = []
         locks = set()
-        semaphore = Semaphore(value=MULTI_BLOB_UPLOAD_CONCURRENCY)
+        uploads = set()
 
         def _upload_and_pend_chunk(fileobj, size, checksum, lock):
             logger.debug(
@@ -182,9 +187,18 @@ class FileBlob(Model):
                     break
 
                 _save_blob(blob)
+                blobs_by_checksum[blob.checksum] = blob
                 lock.__exit__(None, None, None)
                 locks.discard(lock)
-                semaphore.release()
+
+        def _wait_for_uploads(return_when):
+            done, not_done = wait(uploads, return_when=return_when)
+            uploads.clear()
+            uploads.update(not_done)
+            for future in done:
+                # Raises the exception of failed uploads
+                future.result()
+            _flush_blobs()
 
         try:
             with ThreadPoolExecutor(max_workers=MULTI_BLOB_UPLOAD_CONCURRENCY) as exe:
@@ -202,6 +216,7 @@ class FileBlob(Model):
                     size, checksum = _get_size_and_checksum(fileobj)
                     if reference_checksum is not None and checksum != reference_checksum:
                         raise OSError("Checksum mismatch")
+                    checksums.append(checksum)
                     if checksum in checksums_seen:
                         continue
                     checksums_seen.add(checksum)
@@ -212,7 +227,7 @@ class FileBlob(Model):
                     existing = lock.__enter__()
                     if existing is not None:
                         lock.__exit__(None, None, None)
-                        blobs_created.append(existing)
+                        blobs_by_checksum[checksum] = existing
                         _ensure_blob_owned(existing)
                         continue
 
@@ -221,16 +236,15 @@ class FileBlob(Model):
                     locks.add(lock)
 
                     # Otherwise we leave the blob locked and submit the task.
-                    # We use the semaphore to ensure we never schedule too
-                    # many.  The upload will be done with a certain amount
-                    # of concurrency controlled by the semaphore and the
-                    # `_flush_blobs` call will take all those uploaded
-                    # blobs and associate them with the database.
-                    semaphore.acquire()
-                    exe.submit(_upload_and_pend_chunk(fileobj, size, checksum, lock))
+                    # We wait for running uploads to ensure we never schedule
+                    # too many.  The `_flush_blobs` call will take all those
+                    # uploaded blobs and associate them with the database.
+                    if len(uploads) >= MULTI_BLOB_UPLOAD_CONCURRENCY:
+                        _wait_for_uploads(FIRST_COMPLETED)
+                    uploads.add(exe.submit(_upload_and_pend_chunk, fileobj, size, checksum, lock))
                     logger.debug("FileBlob.from_files.end", extra={"checksum": reference_checksum})
 
-            _flush_blobs()
+                _wait_for_uploads(ALL_COMPLETED)
         finally:
             for lock in locks:
                 try:
@@ -239,6 +253,8 @@ class FileBlob(Model):
                     pass
             logger.debug("FileBlob.from_files.end")
 
+        return [blobs_by_checksum[checksum] for checksum in checksums]
+
     @classmethod
     def from_file(cls, fileobj, logger=nooplogger):
         """
@@ -337,13 +353,24 @@ class File(Model):
         app_label = "sentry"
         db_table = "sentry_file"
 
-    def _get_chunked_blob(self, mode=None, prefetch=False, prefetch_to=None, delete=True):
+    def _get_chunked_blob(
+        self, mode=None, prefetch=False, prefetch_to=None, delete=True, read_ahead=None, cache=None
+    ):
+        from sentry import options
+
+        if read_ahead is None:
+            read_ahead = options.get("filestore.read-ahead")
+        if cache is None:
+            cache = get_blob_cache()
+
         return ChunkedFileBlobIndexWrapper(
             FileBlobIndex.objects.filter(file=self).select_related("blob").order_by("offset"),
             mode=mode,
             prefetch=prefetch,
             prefetch_to=prefetch_to,
             delete=delete,
+            read_ahead=read_ahead,
+            cache=cache,
         )
 
     def getfile(self, mode=None, prefetch=False):
@@ -394,7 +421,8 @@ class File(Model):
 
     def putfile(self, fileobj, blob_size=DEFAULT_BLOB_SIZE, commit=True, logger=nooplogger):
         """
-        Save a fileobj into a number of chunks.
+        Save a fileobj into a number of chunks, which are uploaded
+        concurrently.
 
         Returns a list of `FileBlobIndex` items.
 
@@ -405,15 +433,20 @@ class File(Model):
         checksum = sha1(b"")
 
         while True:
-            contents = fileobj.read(blob_size)
-            if not contents:
+            chunks = []
+            while len(chunks) < MULTI_BLOB_UPLOAD_CONCURRENCY:
+                contents = fileobj.read(blob_size)
+                if not contents:
+                    break
+                checksum.update(contents)
+                chunks.append(ContentFile(contents))
+
+            if not chunks:
                 break
-            checksum.update(contents)
 
-            blob_fileobj = ContentFile(contents)
-            blob = FileBlob.from_file(blob_fileobj, logger=logger)
-            results.append(FileBlobIndex.objects.create(file=self, blob=blob, offset=offset))
-            offset += blob.size
+            for blob in FileBlob.from_files(chunks, logger=logger):
+                results.append(FileBlobIndex.objects.create(file=self, blob=blob, offset=offset))
+                offset += blob.size
         self.size = offset
         self.checksum = checksum.hexdigest()
         metrics.timing("filestore.file-size", offset)
@@ -490,11 +523,37 @@ class FileBlobIndex(Model):
 
 
 class ChunkedFileBlobIndexWrapper:
-    def __init__(self, indexes, mode=None, prefetch=False, prefetch_to=None, delete=True):
+    """
+    A file-like object over the blobs of a file.
+
+    Unless the file is prefetched into a tempfile, reads only fetch the blobs
+    that cover the requested byte range, concurrently if a read spans several
+    blobs. In addition, up to `read_ahead` blobs following each read are
+    fetched in the background. Blobs are stored in `cache` (a `BlobCache`) if
+    one is given.
+    """
+
+    def __init__(
+        self,
+        indexes,
+        mode=None,
+        prefetch=False,
+        prefetch_to=None,
+        delete=True,
+        read_ahead=0,
+        cache=None,
+    ):
         # eager load from database incase its a queryset
         self._indexes = list(indexes)
+        self._offsets = [idx.offset for idx in self._indexes]
+        self._size = sum(i.blob.size for i in self._indexes)
         self._curfile = None
-        self._curidx = None
+        self._pos = 0
+        # index in `_indexes` -> future of the blob's contents
+        self._blobs = {}
+        self._executor = None
+        self.read_ahead = read_ahead
+        self.cache = cache
         if prefetch:
             self.prefetched = True
             self._prefetch(prefetch_to, delete)
@@ -518,23 +577,36 @@ class ChunkedFileBlobIndexWrapper:
         rv.seek(0)
         return rv
 
-    def _nextidx(self):
-        assert not self.prefetched, "this makes no sense"
-        old_file = self._curfile
-        try:
-            try:
-                self._curidx = next(self._idxiter)
-                self._curfile = self._curidx.blob.getfile()
-            except StopIteration:
-                self._curidx = None
-                self._curfile = None
-        finally:
-            if old_file is not None:
-                old_file.close()
+    def _fetch_blob(self, blob):
+        if self.cache is not None:
+            contents = self.cache.get(blob.checksum)
+            if contents is not None:
+                return contents
+
+        with blob.getfile() as f:
+            contents = f.read()
+
+        if self.cache is not None:
+            self.cache.set(blob.checksum, contents)
+        return contents
+
+    def _get_blob(self, n, concurrent):
+        future = self._blobs.get(n)
+        if future is None:
+            blob = self._indexes[n].blob
+            if concurrent:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=MULTI_BLOB_READ_CONCURRENCY)
+                future = self._executor.submit(self._fetch_blob, blob)
+            else:
+                future = Future()
+                future.set_result(self._fetch_blob(blob))
+            self._blobs[n] = future
+        return future
 
     @property
     def size(self):
-        return sum(i.blob.size for i in self._indexes)
+        return self._size
 
     def open(self):
         self.closed = False
@@ -563,7 +635,7 @@ class ChunkedFileBlobIndexWrapper:
                     mem[offset : offset + len(chunk)] = chunk
                     offset += len(chunk)
 
-        with ThreadPoolExecutor(max_workers=4) as exe:
+        with ThreadPoolExecutor(max_workers=MULTI_BLOB_READ_CONCURRENCY) as exe:
             for idx in self._indexes:
                 exe.submit(fetch_file, idx.offset, idx.blob.getfile)
 
@@ -574,7 +646,12 @@ class ChunkedFileBlobIndexWrapper:
         if self._curfile:
             self._curfile.close()
         self._curfile = None
-        self._curidx = None
+        for future in self._blobs.values():
+            future.cancel()
+        self._blobs = {}
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         self.closed = True
 
     def _seek(self, pos):
@@ -586,19 +663,9 @@ class ChunkedFileBlobIndexWrapper:
 
         if pos < 0:
             raise OSError("Invalid argument")
-        if pos == 0 and not self._indexes:
-            # Empty file, there's no seeking to be done.
-            return
-
-        for n, idx in enumerate(self._indexes[::-1]):
-            if idx.offset <= pos:
-                if idx != self._curidx:
-                    self._idxiter = iter(self._indexes[-(n + 1) :])
-                    self._nextidx()
-                break
-        else:
+        if not self._indexes and pos != 0:
             raise ValueError("Cannot seek to pos")
-        self._curfile.seek(pos - self._curidx.offset)
+        self._pos = pos
 
     def seek(self, pos, whence=io.SEEK_SET):
         if whence == io.SEEK_SET:
@@ -615,40 +682,59 @@ class ChunkedFileBlobIndexWrapper:
             raise ValueError("I/O operation on closed file")
         if self.prefetched:
             return self._curfile.tell()
-        if self._curfile is None:
-            return self.size
-        return self._curidx.offset + self._curfile.tell()
+        return self._pos
 
-    def read(self, n=-1):
+    def read_range(self, offset, length=-1):
+        """
+        Read up to `length` bytes (or until the end of the file if `length`
+        is negative) starting at `offset`, without changing the position of
+        the file.
+        """
         if self.closed:
             raise ValueError("I/O operation on closed file")
 
         if self.prefetched:
-            return self._curfile.read(n)
+            self._curfile.flush()
+            if length < 0:
+                length = max(self.size - offset, 0)
+            return os.pread(self._curfile.fileno(), length, offset)
 
-        result = bytearray()
+        end = self.size if length < 0 else min(offset + length, self.size)
+        if offset >= end:
+            return b""
 
-        # Read to the end of the file
-        if n < 0:
-            while self._curfile is not None:
-                blob_result = self._curfile.read(32768)
-                if not blob_result:
-                    self._nextidx()
-                else:
-                    result.extend(blob_result)
+        first = bisect_right(self._offsets, offset) - 1
+        last = bisect_right(self._offsets, end - 1) - 1
+        ahead = min(last + 1 + self.read_ahead, len(self._indexes))
+        concurrent = ahead - first > 1
 
-        # Read until a certain number of bytes are read
-        else:
-            while n > 0 and self._curfile is not None:
-                blob_result = self._curfile.read(min(n, 32768))
-                if not blob_result:
-                    self._nextidx()
-                else:
-                    n -= len(blob_result)
-                    result.extend(blob_result)
+        # Only keep the blobs of this read and the blobs that are read ahead.
+        for n in list(self._blobs):
+            if not first <= n < ahead:
+                self._blobs.pop(n).cancel()
 
+        futures = [self._get_blob(n, concurrent) for n in range(first, last + 1)]
+        for n in range(last + 1, ahead):
+            self._get_blob(n, concurrent)
+
+        result = bytearray()
+        for n, future in zip(range(first, last + 1), futures):
+            blob_offset = self._offsets[n]
+            contents = future.result()
+            result.extend(contents[max(offset - blob_offset, 0) : end - blob_offset])
         return bytes(result)
 
+    def read(self, n=-1):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+
+        if self.prefetched:
+            return self._curfile.read(n)
+
+        result = self.read_range(self._pos, n)
+        self._pos += len(result)
+        return result
+
 
 class FileBlobOwner(Model):
     __include_in_export__ = False
@@ -71,6 +71,31 @@ class ProjectOptionManager(OptionManager["Project"]):
         values: Mapping[str, Value] = self._option_cache.get(cache_key, {})
         return values
 
+    def preload_all_values(self, project_ids: Sequence[int]) -> None:
+        """
+        Loads the options of many projects into the local option cache at once,
+        so that following calls to ``get_value`` for them do not query the
+        cache or database.
+        """
+        cache_keys = {self._make_key(project_id): project_id for project_id in project_ids}
+        missing = [key for key in cache_keys if key not in self._option_cache]
+        if not missing:
+            return
+
+        cached = cache.get_many(missing)
+        self._option_cache.update(cached)
+
+        uncached = {cache_keys[key]: {} for key in missing if key not in cached}
+        if not uncached:
+            return
+
+        for option in self.filter(project__in=uncached.keys()):
+            uncached[option.project_id][option.key] = option.value
+
+        results = {self._make_key(project_id): values for project_id, values in uncached.items()}
+        cache.set_many(results)
+        self._option_cache.update(results)
+
     def reload_cache(self, project_id: int, update_reason: str) -> Mapping[str, Value]:
         if update_reason != "projectoption.get_all_values":
             # this hook may be called from model hooks during an
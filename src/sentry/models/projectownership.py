@@ -7,7 +7,8 @@ from django.utils import timezone
 from sentry.db.models import Model, sane_repr
 from sentry.db.models.fields import FlexibleForeignKey, JSONField
 from sentry.models import ActorTuple
-from sentry.ownership.grammar import Rule, load_schema, resolve_actors
+from sentry.ownership.grammar import Rule, resolve_actors
+from sentry.ownership.index import get_ownership_index
 from sentry.utils import metrics
 from sentry.utils.cache import cache
 
@@ -197,9 +198,7 @@ class ProjectOwnership(Model):
     ) -> Sequence["Rule"]:
         rules = []
         if ownership.schema is not None:
-            for rule in load_schema(ownership.schema):
-                if rule.test(data):
-                    rules.append(rule)
+            rules = get_ownership_index(project_id, ownership.schema).get_matching_rules(data)
 
         return rules
 
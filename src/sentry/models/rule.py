@@ -60,6 +60,30 @@ class Rule(Model):
             cache.set(cache_key, rules_list, 60)
         return rules_list
 
+    @classmethod
+    def get_for_projects(cls, project_ids):
+        """
+        Fetches the rules of multiple projects, like `get_for_project`.
+        :return: A dict of project ids to lists of rules
+        """
+        cache_keys = {f"project:{project_id}:rules": project_id for project_id in project_ids}
+        rules = {
+            cache_keys[cache_key]: rules_list
+            for cache_key, rules_list in cache.get_many(list(cache_keys)).items()
+            if rules_list is not None
+        }
+
+        missing = [project_id for project_id in cache_keys.values() if project_id not in rules]
+        if missing:
+            for project_id in missing:
+                rules[project_id] = []
+            for rule in cls.objects.filter(project__in=missing, status=RuleStatus.ACTIVE):
+                rules[rule.project_id].append(rule)
+            cache.set_many(
+                {f"project:{project_id}:rules": rules[project_id] for project_id in missing}, 60
+            )
+        return rules
+
     @property
     def created_by(self):
         try:
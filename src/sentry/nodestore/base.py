@@ -1,26 +1,59 @@
-from threading import local
+from threading import Lock, local
 
 import sentry_sdk
+from django.conf import settings
 from django.core.cache import InvalidCacheBackendError, caches
 
-from sentry.utils import json
+from sentry.nodestore import encoding
+from sentry.nodestore.encoding import json_dumps, json_loads
+from sentry.utils import metrics
 from sentry.utils.cache import memoize
+from sentry.utils.lru import SizedLRUCache
 from sentry.utils.services import Service
 
-# Cache an instance of the encoder we want to use
-json_dumps = json.JSONEncoder(
-    separators=(",", ":"),
-    sort_keys=True,
-    skipkeys=False,
-    ensure_ascii=True,
-    check_circular=True,
-    allow_nan=True,
-    indent=None,
-    encoding="utf-8",
-    default=None,
-).encode
+# Process-wide local cache instances, shared between all threads (instances of
+# ``NodeStorage`` are thread-local.)
+_local_caches = {}
+_local_caches_lock = Lock()
 
-json_loads = json._default_decoder.decode
+
+def _local_cache_entry_size(entry):
+    return sum(len(value) for value in entry.values())
+
+
+def _record_local_cache_eviction(id):
+    metrics.incr("nodestore.local_cache.evicted", skip_internal=True)
+
+
+def get_local_cache(backend_cls):
+    """
+    Return the process-local cache for the given backend class, or ``None``
+    if the local cache is disabled.
+
+    Entries are keyed by node id and contain the JSON-encoded payload of every
+    subkey of that node that has been read or written by this process. The
+    cache is bounded by the total length of those payloads.
+    """
+    max_size = settings.SENTRY_NODESTORE_LOCAL_CACHE_SIZE
+    if not max_size:
+        return None
+
+    ttl = settings.SENTRY_NODESTORE_LOCAL_CACHE_TTL
+    key = (backend_cls, max_size, ttl)
+    try:
+        return _local_caches[key]
+    except KeyError:
+        pass
+
+    with _local_caches_lock:
+        if key not in _local_caches:
+            _local_caches[key] = SizedLRUCache(
+                max_size,
+                ttl,
+                sizeof=_local_cache_entry_size,
+                on_evict=_record_local_cache_eviction,
+            )
+        return _local_caches[key]
 
 
 class NodeStorage(local, Service):
@@ -56,12 +89,19 @@ class NodeStorage(local, Service):
 
     This is used in reprocessing to store a snapshot of the event from multiple
     stages of the pipeline.
+
+    Values are written in the format given by
+    ``SENTRY_NODESTORE_FORMAT_VERSION``. Version 2 (see
+    ``sentry.nodestore.encoding``) is compressed and allows decoding
+    individual top-level keys through ``get_lazy``. Both versions can always
+    be read.
     """
 
     __all__ = (
         "delete",
         "delete_multi",
         "get",
+        "get_lazy",
         "get_multi",
         "set",
         "set_subkeys",
@@ -88,10 +128,13 @@ class NodeStorage(local, Service):
         for id in id_list:
             self.delete(id)
 
-    def _decode(self, value, subkey):
+    def _decode(self, value, subkey, lazy=False):
         if value is None:
             return None
 
+        if encoding.is_versioned(value):
+            return encoding.decode(value, subkey=subkey, lazy=lazy)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -126,11 +169,18 @@ class NodeStorage(local, Service):
         """
         with sentry_sdk.start_span(op="nodestore.get") as span:
             span.set_tag("node_id", id)
+            item_from_local_cache = self._get_local_cache_item(id, subkey)
+            if item_from_local_cache is not None:
+                span.set_tag("origin", "from_local_cache")
+                span.set_tag("found", bool(item_from_local_cache))
+                return item_from_local_cache
+
             if subkey is None:
                 item_from_cache = self._get_cache_item(id)
                 if item_from_cache:
                     span.set_tag("origin", "from_cache")
                     span.set_tag("found", bool(item_from_cache))
+                    self._set_local_cache_item(id, subkey, item_from_cache)
                     return item_from_cache
 
             span.set_tag("subkey", str(subkey))
@@ -139,6 +189,45 @@ class NodeStorage(local, Service):
             if subkey is None:
                 # set cache item only after we know decoding did not fail
                 self._set_cache_item(id, rv)
+            self._set_local_cache_item(id, subkey, rv)
+
+            span.set_tag("result", "from_service")
+            if bytes_data:
+                span.set_tag("bytes.size", len(bytes_data))
+            span.set_tag("found", bool(rv))
+
+            return rv
+
+    def get_lazy(self, id):
+        """
+        Like ``get``, but returns a value stored in version 2 of the format as
+        a ``LazyNodePayload`` that only decodes the top-level keys that are
+        accessed. Such values are not written to the caches, which would
+        require decoding them in full.
+
+        >>> payload = nodestore.get_lazy('key1')
+        >>> payload['message']
+        "hello world"
+        """
+        with sentry_sdk.start_span(op="nodestore.get_lazy") as span:
+            span.set_tag("node_id", id)
+            item_from_local_cache = self._get_local_cache_item(id, None)
+            if item_from_local_cache is not None:
+                span.set_tag("origin", "from_local_cache")
+                return item_from_local_cache
+
+            item_from_cache = self._get_cache_item(id)
+            if item_from_cache:
+                span.set_tag("origin", "from_cache")
+                return item_from_cache
+
+            bytes_data = self._get_bytes(id)
+            rv = self._decode(bytes_data, subkey=None, lazy=True)
+            if not isinstance(rv, encoding.LazyNodePayload):
+                # Version 1 values (and non-object values) are decoded in full
+                # anyway, so they are cached like in ``get``.
+                self._set_cache_item(id, rv)
+                self._set_local_cache_item(id, None, rv)
 
             span.set_tag("result", "from_service")
             if bytes_data:
@@ -169,10 +258,19 @@ class NodeStorage(local, Service):
             span.set_tag("subkey", str(subkey))
             span.set_tag("num_ids", len(id_list))
 
+            local_cache_items = self._get_local_cache_items(id_list, subkey)
+            if len(local_cache_items) == len(id_list):
+                span.set_tag("result", "from_local_cache")
+                return local_cache_items
+            id_list = [id for id in id_list if id not in local_cache_items]
+
             if subkey is None:
                 cache_items = self._get_cache_items(id_list)
+                for id, value in cache_items.items():
+                    self._set_local_cache_item(id, subkey, value)
                 if len(cache_items) == len(id_list):
                     span.set_tag("result", "from_cache")
+                    cache_items.update(local_cache_items)
                     return cache_items
 
                 uncached_ids = [id for id in id_list if id not in cache_items]
@@ -186,6 +284,9 @@ class NodeStorage(local, Service):
             if subkey is None:
                 self._set_cache_items(items)
                 items.update(cache_items)
+            for id in uncached_ids:
+                self._set_local_cache_item(id, subkey, items.get(id))
+            items.update(local_cache_items)
 
             span.set_tag("result", "from_service")
             span.set_tag("found", len(items))
@@ -201,6 +302,9 @@ class NodeStorage(local, Service):
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
         """
+        if settings.SENTRY_NODESTORE_FORMAT_VERSION == encoding.VERSION:
+            return encoding.encode(data, compress=settings.SENTRY_NODESTORE_ZSTD_LEVEL > 0)
+
         lines = [json_dumps(data.pop(None)).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
@@ -241,10 +345,14 @@ class NodeStorage(local, Service):
             span.set_tag("node_id", id)
             span.set_data("subkeys_count", len(data))
             cache_item = data.get(None)
+            local_cache_entry = self._make_local_cache_entry(data)
             bytes_data = self._encode(data)
             self._set_bytes(id, bytes_data, ttl=ttl)
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
+            if local_cache_entry is not None:
+                # All existing subkeys have been replaced by this write.
+                self.local_cache.set(id, local_cache_entry)
 
     def cleanup(self, cutoff_timestamp):
         raise NotImplementedError
@@ -252,6 +360,56 @@ class NodeStorage(local, Service):
     def bootstrap(self):
         raise NotImplementedError
 
+    @property
+    def local_cache(self):
+        return get_local_cache(type(self))
+
+    def _make_local_cache_entry(self, data):
+        if self.local_cache is None:
+            return None
+        return {
+            subkey: json_dumps(value).encode("utf8")
+            for subkey, value in data.items()
+            if value is not None
+        }
+
+    def _get_local_cache_item(self, id, subkey):
+        local_cache = self.local_cache
+        if local_cache is None:
+            return None
+
+        entry = local_cache.get(id)
+        if entry is None or subkey not in entry:
+            metrics.incr(
+                "nodestore.local_cache.miss", tags={"subkey": str(subkey)}, skip_internal=True
+            )
+            return None
+
+        metrics.incr("nodestore.local_cache.hit", tags={"subkey": str(subkey)}, skip_internal=True)
+        # Values are stored encoded so that callers that mutate the returned
+        # payload can't affect other readers of the same node.
+        return json_loads(entry[subkey])
+
+    def _get_local_cache_items(self, id_list, subkey):
+        if self.local_cache is None:
+            return {}
+
+        items = {}
+        for id in id_list:
+            value = self._get_local_cache_item(id, subkey)
+            if value is not None:
+                items[id] = value
+        return items
+
+    def _set_local_cache_item(self, id, subkey, value):
+        local_cache = self.local_cache
+        if local_cache is None or not value:
+            return
+
+        entry = dict(local_cache.get(id) or ())
+        entry[subkey] = json_dumps(value).encode("utf8")
+        local_cache.set(id, entry)
+
     def _get_cache_item(self, id):
         if self.cache:
             return self.cache.get(id)
@@ -272,10 +430,14 @@ class NodeStorage(local, Service):
     def _delete_cache_item(self, id):
         if self.cache:
             self.cache.delete(id)
+        if self.local_cache is not None:
+            self.local_cache.delete(id)
 
     def _delete_cache_items(self, id_list):
         if self.cache:
             self.cache.delete_many([id for id in id_list])
+        if self.local_cache is not None:
+            self.local_cache.delete_many(id_list)
 
     @memoize
     def cache(self):
@@ -5,6 +5,7 @@ import pickle
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
+from sentry.nodestore import encoding
 from sentry.nodestore.base import NodeStorage
 from sentry.utils.strings import compress, decompress
 
@@ -18,13 +19,13 @@ class DjangoNodeStorage(NodeStorage):
         Node.objects.filter(id=id).delete()
         self._delete_cache_item(id)
 
-    def _decode(self, value, subkey):
+    def _decode(self, value, subkey, lazy=False):
         if value is None:
             return None
 
         try:
-            if value.startswith(b"{"):
-                return NodeStorage._decode(self, value, subkey=subkey)
+            if value.startswith(b"{") or encoding.is_versioned(value):
+                return NodeStorage._decode(self, value, subkey=subkey, lazy=lazy)
 
             if subkey is None:
                 return pickle.loads(value)
@@ -60,6 +61,8 @@ class DjangoNodeStorage(NodeStorage):
         BulkDeleteQuery(model=Node, dtfield="timestamp", days=days).execute()
         if self.cache:
             self.cache.clear()
+        if self.local_cache is not None:
+            self.local_cache.clear()
 
     def bootstrap(self):
         # Nothing for Django backend to do during bootstrap
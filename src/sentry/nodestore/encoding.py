@@ -0,0 +1,214 @@
+"""
+Version 2 of the on-disk format of nodestore values.
+
+Version 1 values are the newline-separated JSON payloads produced by
+``NodeStorage._encode``, which have to be parsed in full to read any part of
+the node. Version 2 values are laid out as follows::
+
+    +-------+---------+-------+---------------------------+
+    | \\x00 | version | flags | body (optionally zstd'd)  |
+    |  (1)  |   (1)   |  (1)  |                           |
+    +-------+---------+-------+---------------------------+
+
+The body starts with the length of the index (a 4 byte unsigned integer),
+followed by the JSON-encoded index and the concatenated JSON fragments the
+index refers to. The index contains one entry per subkey::
+
+    [subkey, offset, length, keys]
+
+If the subkey's value is an object, ``keys`` is a list of ``[key, offset,
+length]`` entries, one for each of its top-level keys, which allows decoding
+individual keys (such as ``exception`` or ``breadcrumbs``) without parsing
+the rest of the payload. Otherwise ``keys`` is ``null`` and the whole value
+is stored as one fragment at ``offset``/``length``. If the body is compressed
+with a dictionary, the id of the dictionary is stored in the header of the
+zstd frame.
+
+Version 1 values never start with a null byte, so both formats can be read
+from the same backend.
+"""
+
+import struct
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+from typing import Mapping as MappingType
+from typing import Optional, Sequence, Tuple
+
+import zstandard
+from django.conf import settings
+
+from sentry.utils import json
+from sentry.utils.codecs import ZstdDictionaryCodec, load_zstd_dictionaries
+
+MAGIC = b"\x00"
+VERSION = 2
+
+FLAG_ZSTD = 1
+
+HEADER = struct.Struct(">cBB")
+INDEX_LENGTH = struct.Struct(">I")
+
+# Cache an instance of the encoder we want to use
+json_dumps = json.JSONEncoder(
+    separators=(",", ":"),
+    sort_keys=True,
+    skipkeys=False,
+    ensure_ascii=True,
+    check_circular=True,
+    allow_nan=True,
+    indent=None,
+    encoding="utf-8",
+    default=None,
+).encode
+
+json_loads = json._default_decoder.decode
+
+
+def is_versioned(value: bytes) -> bool:
+    return value[:1] == MAGIC
+
+
+def get_dictionaries() -> Tuple[MappingType[int, zstandard.ZstdCompressionDict], int]:
+    """
+    Return a mapping of dictionary id to zstd dictionary for every dictionary
+    in ``SENTRY_NODESTORE_ZSTD_DICTIONARIES``, along with the id of the
+    dictionary that is used to compress new values (the first one, or ``0``
+    if no dictionaries are configured.)
+    """
+    return load_zstd_dictionaries(tuple(settings.SENTRY_NODESTORE_ZSTD_DICTIONARIES))
+
+
+def train_dictionary(samples: Sequence[bytes], size: int = 112640) -> bytes:
+    """
+    Train a zstd dictionary from a sample of (version 1 or 2) node values.
+    """
+    payloads = []
+    for sample in samples:
+        if is_versioned(sample):
+            sample = json_dumps(decode(sample)).encode("utf8")
+        payloads.append(sample)
+    return zstandard.train_dictionary(size, payloads).as_bytes()
+
+
+class LazyNodePayload(Mapping):
+    """
+    A read-only mapping over a node's top-level keys that only decodes the
+    JSON of each key when it is first accessed.
+
+    Use ``dict(payload)`` (or ``materialize``) to get a mutable copy.
+    """
+
+    def __init__(self, data: bytes, keys: Sequence[Sequence[Any]]) -> None:
+        self.__data = data
+        self.__keys = {key: (offset, length) for key, offset, length in keys}
+        self.__decoded: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self.__decoded[key]
+        except KeyError:
+            pass
+
+        offset, length = self.__keys[key]
+        value = self.__decoded[key] = json_loads(self.__data[offset : offset + length])
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__keys)
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def __repr__(self) -> str:
+        return f"<LazyNodePayload: keys={list(self.__keys)!r}>"
+
+    def materialize(self) -> MappingType[str, Any]:
+        return {key: self[key] for key in self}
+
+
+def get_codec() -> ZstdDictionaryCodec:
+    dictionaries, dictionary_id = get_dictionaries()
+    return ZstdDictionaryCodec(
+        dictionaries, dictionary_id, level=settings.SENTRY_NODESTORE_ZSTD_LEVEL
+    )
+
+
+def encode(data: MappingType[Optional[str], Any], compress: bool = True) -> bytes:
+    """
+    Encode a node and its subkeys (where the ``None`` subkey is the main
+    value of the node.)
+    """
+    fragments = []
+    position = 0
+
+    def append(value: Any) -> Sequence[int]:
+        nonlocal position
+        fragment = json_dumps(value).encode("utf8")
+        fragments.append(fragment)
+        offset = position
+        position += len(fragment)
+        return offset, len(fragment)
+
+    index = []
+    for subkey, value in data.items():
+        start = position
+        if isinstance(value, Mapping):
+            keys = [[key, *append(item)] for key, item in value.items()]
+        else:
+            append(value)
+            keys = None
+        index.append([subkey, start, position - start, keys])
+
+    encoded_index = json_dumps(index).encode("utf8")
+    body = b"".join([INDEX_LENGTH.pack(len(encoded_index)), encoded_index, *fragments])
+
+    flags = 0
+    if compress:
+        flags |= FLAG_ZSTD
+        body = get_codec().encode(body)
+
+    return HEADER.pack(MAGIC, VERSION, flags) + body
+
+
+def decode(value: bytes, subkey: Optional[str] = None, lazy: bool = False) -> Any:
+    """
+    Decode the value of a subkey (the main value of the node if ``subkey``
+    is ``None``.) Returns ``None`` if the subkey does not exist.
+
+    If ``lazy`` is set and the value is an object, a ``LazyNodePayload`` is
+    returned instead of a ``dict``, which only parses the keys that are
+    accessed.
+
+    Raises ``UnknownZstdDictionary`` if the value was compressed with a
+    dictionary that is not configured.
+    """
+    _, version, flags = HEADER.unpack_from(value)
+    if version != VERSION:
+        raise ValueError(f"unsupported nodestore value version: {version}")
+
+    body = value[HEADER.size :]
+    if flags & FLAG_ZSTD:
+        body = get_codec().decode(body)
+
+    (index_length,) = INDEX_LENGTH.unpack_from(body)
+    index_end = INDEX_LENGTH.size + index_length
+    index = json_loads(body[INDEX_LENGTH.size : index_end])
+    data = memoryview(body)[index_end:]
+
+    for entry_subkey, offset, length, keys in index:
+        if entry_subkey != subkey:
+            continue
+
+        if keys is None:
+            return json_loads(bytes(data[offset : offset + length]))
+
+        payload = LazyNodePayload(
+            bytes(data[offset : offset + length]),
+            [[key, key_offset - offset, key_length] for key, key_offset, key_length in keys],
+        )
+        return payload if lazy else payload.materialize()
+
+    return None
@@ -139,6 +139,13 @@ register("beacon.anonymous", type=Bool, flags=FLAG_REQUIRED)
 # Filestore
 register("filestore.backend", default="filesystem", flags=FLAG_NOSTORE)
 register("filestore.options", default={"location": "/tmp/sentry-files"}, flags=FLAG_NOSTORE)
+# Local cache of the blobs that are read by `File.getfile` (disabled if no path
+# is set), and the number of blobs that are fetched ahead of reads.
+register("filestore.blob-cache-path", default="", flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
+register(
+    "filestore.blob-cache-size", type=Int, default=1024 * 1024 * 1024, flags=FLAG_PRIORITIZE_DISK
+)
+register("filestore.read-ahead", type=Int, default=2, flags=FLAG_PRIORITIZE_DISK)
 
 # Symbol server
 register("symbolserver.enabled", default=False, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
@@ -256,6 +263,12 @@ register("snuba.search.chunk-growth-rate", default=1.5)
 register("snuba.search.max-chunk-size", default=2000)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0)
 register("snuba.search.hits-sample-size", default=100)
+# How long (in seconds) hit counts of issue searches are cached. 0 disables it.
+register("snuba.search.hits-cache-ttl", default=0)
+# Number of pages after the first one that issue searches fetch ahead and
+# cache for the following page requests. 0 disables it.
+register("snuba.search.prefetch-pages", default=0)
+register("snuba.search.prefetch-cache-ttl", default=60)
 register("snuba.track-outcomes-sample-rate", default=0.0)
 
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
@@ -421,9 +434,14 @@ register("eventstream:kafka-headers", default=True)
 register("post-process-forwarder:kafka-headers", default=True)
 # Number of threads to use for post processing
 register("post-process-forwarder:concurrency", default=1)
+# Maximum number of events post processed by a single task. Every event is post processed
+# by its own task with 0.
+register("post-process-forwarder:batch-size", default=0)
 
 # Subscription queries sampling rate
 register("subscriptions-query.sample-rate", default=0.01)
+# Number of updates passed to batch subscribers at once. Batching is disabled with 1.
+register("subscriptions-query.batch-size", default=1)
 
 # The ratio of symbolication requests for which metrics will be submitted to redis.
 #
@@ -431,6 +449,10 @@ register("subscriptions-query.sample-rate", default=0.01)
 # removed once it is fully rolled out.
 register("symbolicate-event.low-priority.metrics.submission-rate", default=0.0)
 
+# The maximum number of native events of a project that are symbolicated with a single
+# symbolicator request when they are ingested together. Set to 0 to disable batching.
+register("symbolicate-event.batch-size", default=0)
+
 # This is to enable the ingestion of suspect spans by project ids.
 register("performance.suspect-spans-ingestion-projects", default={})
 # This is to enable the ingestion of suspect spans by project groups.
@@ -497,3 +519,12 @@ register("sentry-metrics.writes-limiter.limits.releasehealth.global", default=[]
 
 # A rate to apply during ingest to turn on performance detection (just detection, no storage of events or issues)
 register("store.use-ingest-performance-detection-only", default=0.0)
+
+# Fraction of data exports that are assembled by the streaming export task,
+# and the number of pages it fetches from snuba concurrently.
+register("data-export.streaming-rollout-rate", default=0.0)
+register("data-export.streaming-concurrency", default=4)
+
+# Number of seconds the counts queried by the event frequency conditions of issue alerts are
+# reused for other events of the same issue. Set to 0 to query them for every event.
+register("rules.event-frequency.memoize-ttl", default=5)
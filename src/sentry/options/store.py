@@ -14,6 +14,9 @@ Key = namedtuple("Key", ("name", "default", "type", "flags", "ttl", "grace", "ca
 CACHE_FETCH_ERR = "Unable to fetch option cache for %s"
 CACHE_UPDATE_ERR = "Unable to update option cache for %s"
 
+# The cache key of the version of all stored options, see ``get_version``.
+VERSION_CACHE_KEY = "o:version"
+
 logger = logging.getLogger("sentry")
 
 
@@ -21,6 +24,13 @@ def _make_cache_key(key):
     return "o:%s" % md5_text(key).hexdigest()
 
 
+def _make_version(options):
+    checksum = md5_text()
+    for name, last_updated in sorted(options):
+        checksum.update(f"{name}:{last_updated.isoformat()}\n".encode("utf-8"))
+    return checksum.hexdigest()
+
+
 def _make_cache_value(key, value):
     now = int(time())
     return (value, now + key.ttl, now + key.ttl + key.grace)
@@ -38,9 +48,13 @@ class OptionsStore:
     OptionsManager instead, unless you need raw access to something.
     """
 
-    def __init__(self, cache=None, ttl=None):
+    def __init__(self, cache=None, ttl=None, version_check_interval=None):
         self.cache = cache
         self.ttl = ttl
+        # If set, all stored options are loaded at once and kept until a new
+        # version of the options is published, which is checked at most once
+        # per interval (in seconds.) See ``get_snapshot``.
+        self.version_check_interval = version_check_interval
         self.flush_local_cache()
 
     @cached_property
@@ -56,6 +70,13 @@ class OptionsStore:
         """
         Fetches a value from the options store.
         """
+        if self.version_check_interval:
+            snapshot = self.get_snapshot(silent=silent)
+            if snapshot is not None:
+                # The snapshot contains all stored options, so missing
+                # options are not set.
+                return snapshot.get(key.name)
+
         result = self.get_cache(key, silent=silent)
         if result is not None:
             return result
@@ -93,6 +114,90 @@ class OptionsStore:
 
         return value
 
+    def get_snapshot(self, silent=False):
+        """
+        Returns the values of all stored options by name, or ``None`` if they
+        are not available and options should be fetched one by one instead.
+
+        The snapshot is reloaded with a single query when the published version
+        of the options changes. Between checks of the version, the snapshot is
+        used as is.
+        """
+        snapshot = self._snapshot
+        checked_at = self._version_checked_at
+        now = time()
+        if checked_at is not None and now < checked_at + self.version_check_interval:
+            return snapshot[1] if snapshot is not None else None
+        self._version_checked_at = now
+
+        version = self.get_version(silent=silent)
+        if version is None:
+            return None
+        if snapshot is not None and snapshot[0] == version:
+            return snapshot[1]
+
+        try:
+            options = list(self.model.objects.all())
+        except (ProgrammingError, OperationalError):
+            return None
+        except Exception:
+            if not silent:
+                logger.exception("option.failed-snapshot")
+            return None
+
+        # The version of the snapshot is derived from the loaded options, and
+        # not taken from the cache. If the options were changed but the new
+        # version isn't published yet, or the change wasn't committed when the
+        # version was published, the versions differ and the snapshot is
+        # reloaded on the next check.
+        values = {option.key: option.value for option in options}
+        self._snapshot = (
+            _make_version((option.key, option.last_updated) for option in options),
+            values,
+        )
+        return values
+
+    def get_version(self, silent=False):
+        """
+        Returns the published version of the stored options, or ``None`` if
+        it's not available.
+        """
+        if self.cache is None:
+            return None
+
+        try:
+            return self.cache.get(VERSION_CACHE_KEY)
+        except Exception:
+            if not silent:
+                logger.warning(
+                    CACHE_FETCH_ERR,
+                    VERSION_CACHE_KEY,
+                    extra={"key": VERSION_CACHE_KEY},
+                    exc_info=True,
+                )
+            return None
+
+    def publish_version(self):
+        """
+        Publishes the version of the stored options, which is derived from
+        the time every option was last updated. This is done after every change,
+        and periodically by ``sync_options`` in case publishing failed.
+
+        Returns a boolean to indicate if the version was published.
+        """
+        if self.cache is None or not self.version_check_interval:
+            return False
+
+        version = _make_version(self.model.objects.values_list("key", "last_updated"))
+        try:
+            self.cache.set(VERSION_CACHE_KEY, version, None)
+            return True
+        except Exception:
+            logger.warning(
+                CACHE_UPDATE_ERR, VERSION_CACHE_KEY, extra={"key": VERSION_CACHE_KEY}, exc_info=True
+            )
+            return False
+
     def get_local_cache(self, key, force_grace=False):
         """
         Attempt to fetch a key out of the local cache.
@@ -182,6 +287,8 @@ class OptionsStore:
         assert self.cache is not None, "cache must be configured before mutating options"
 
         self.set_store(key, value)
+        self.flush_snapshot()
+        self.publish_version()
         return self.set_cache(key, value)
 
     def set_store(self, key, value):
@@ -217,6 +324,8 @@ class OptionsStore:
         assert self.cache is not None, "cache must be configured before mutating options"
 
         self.delete_store(key)
+        self.flush_snapshot()
+        self.publish_version()
         return self.delete_cache(key)
 
     def delete_store(self, key):
@@ -269,6 +378,14 @@ class OptionsStore:
         Empty store's local in-process cache.
         """
         self._local_cache = {}
+        self.flush_snapshot()
+
+    def flush_snapshot(self):
+        """
+        Drop the snapshot of all options, so that it's reloaded on next use.
+        """
+        self._snapshot = None
+        self._version_checked_at = None
 
     def maybe_clean_local_cache(self, **kwargs):
         # Periodically force an expire on the local cache.
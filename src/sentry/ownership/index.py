@@ -0,0 +1,231 @@
+"""
+Compiled ownership rules.
+
+Evaluating every rule of an ownership schema against an event is slow for
+projects with large CODEOWNERS files, since every path rule extracts the frame
+values of the event again and matches its pattern against every one of them.
+
+An ``OwnershipIndex`` compiles the rules of a schema once. Frame values are
+extracted once per event, and path, module and CODEOWNERS rules are indexed by a
+literal path segment of their pattern. Patterns are anchored at both ends and
+the segment is delimited by slashes, so a rule can only match a value that
+contains the segment as a path segment of its own. Likewise, a rule ending in a
+segment like ``*.py`` can only match a value with a segment of that extension.
+Only the rules that share a segment with the event (and rules that cannot be
+indexed) are tested.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import defaultdict
+from hashlib import md5
+from typing import Any, Dict, List, Mapping, Optional, Pattern, Sequence, Set, Tuple
+
+from django.conf import settings
+
+from sentry.ownership.grammar import (
+    CODEOWNERS,
+    MODULE,
+    PATH,
+    Matcher,
+    Rule,
+    _path_to_regex,
+    load_schema,
+)
+from sentry.utils import json, metrics
+from sentry.utils.event_frames import find_stack_frames
+from sentry.utils.glob import glob_match
+from sentry.utils.lru import SizedLRUCache
+from sentry.utils.safe import PathSearchable
+
+__all__ = ("OwnershipIndex", "get_ownership_index")
+
+FRAME_MATCHER_TYPES = (PATH, MODULE, CODEOWNERS)
+
+# Characters that may have a special meaning in glob patterns. Segments
+# containing any of them are not used as index keys.
+GLOB_CHARS = frozenset("*?[]{}!\\")
+
+SEGMENT_SEPARATOR_RE = re.compile(r"[/\\]")
+
+
+def _get_extension_key(segment: str) -> str:
+    return "*" + segment[segment.rfind(".") :]
+
+
+def _get_index_segment(pattern: str) -> Optional[str]:
+    """
+    Returns the last path segment of the pattern that has no wildcards, in lower
+    case. Segments with non-ASCII characters are skipped, since they can be
+    matched case insensitively by characters of a different length.
+
+    Patterns without such a segment, but with a last segment like ``*.py`` are
+    indexed by the extension of the segment instead.
+    """
+    segments = [segment for segment in pattern.split("/") if segment and segment.isascii()]
+    for segment in reversed(segments):
+        if not GLOB_CHARS.intersection(segment):
+            return segment.lower()
+
+    if segments:
+        segment = segments[-1]
+        if segment.startswith("*") and "." in segment and not GLOB_CHARS.intersection(segment[1:]):
+            return _get_extension_key(segment.lower())
+    return None
+
+
+def _get_frame_values(frames: Sequence[Mapping[str, Any]], keys: Sequence[str]) -> Sequence[str]:
+    """
+    Returns the distinct values of the given keys of all frames, in order.
+    """
+    values: Dict[str, None] = {}
+    for frame in frames:
+        if not isinstance(frame, Mapping):
+            continue
+        for key in keys:
+            value = frame.get(key)
+            if value and isinstance(value, str):
+                values[value] = None
+    return list(values)
+
+
+class OwnershipIndex:
+    """
+    The compiled rules of an ownership schema, see the module docstring.
+
+    ``get_matching_rules`` returns the same rules as testing every rule of the
+    schema with ``Rule.test``, in the same order.
+    """
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = rules
+        # matcher type -> index segment -> indexes of the rules
+        self.__segments: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        # matcher type -> indexes of rules that have no index segment
+        self.__unindexed: Dict[str, List[int]] = defaultdict(list)
+        # indexes of rules that don't match frames, and are always tested
+        self.__other: List[int] = []
+        self.__regexes: Dict[int, Pattern[str]] = {}
+        self.__frame_matcher_types: Set[str] = set()
+
+        for idx, rule in enumerate(rules):
+            matcher_type, pattern = rule.matcher
+            if matcher_type not in FRAME_MATCHER_TYPES:
+                self.__other.append(idx)
+                continue
+
+            self.__frame_matcher_types.add(matcher_type)
+            if matcher_type == CODEOWNERS:
+                self.__regexes[idx] = _path_to_regex(pattern)
+
+            segment = _get_index_segment(pattern)
+            if segment is None:
+                self.__unindexed[matcher_type].append(idx)
+            else:
+                self.__segments[matcher_type][segment].append(idx)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __get_candidates(self, matcher_type: str, values: Sequence[str]) -> Set[int]:
+        segments = self.__segments.get(matcher_type, {})
+        candidates = set(self.__unindexed.get(matcher_type, ()))
+        value_segments: Set[str] = set()
+        for value in values:
+            if not value.isascii():
+                # see `_get_index_segment`
+                for idxs in segments.values():
+                    candidates.update(idxs)
+                return candidates
+            for segment in SEGMENT_SEPARATOR_RE.split(value.lower()):
+                value_segments.add(segment)
+                if "." in segment:
+                    value_segments.add(_get_extension_key(segment))
+
+        for segment in value_segments:
+            candidates.update(segments.get(segment, ()))
+        return candidates
+
+    def __test_values(self, idx: int, values: Sequence[str]) -> bool:
+        regex = self.__regexes.get(idx)
+        if regex is not None:
+            return any(regex.search(value) for value in values)
+        pattern = self.rules[idx].matcher.pattern
+        return any(
+            glob_match(value, pattern, ignorecase=True, path_normalize=True) for value in values
+        )
+
+    def get_matching_rules(self, data: PathSearchable) -> Sequence[Rule]:
+        values_by_type: Dict[str, Sequence[str]] = {}
+        if self.__frame_matcher_types & {PATH, CODEOWNERS}:
+            path_values = _get_frame_values(*Matcher.munge_if_needed(data))
+            values_by_type[PATH] = values_by_type[CODEOWNERS] = path_values
+        if MODULE in self.__frame_matcher_types:
+            values_by_type[MODULE] = _get_frame_values(find_stack_frames(data), ["module"])
+
+        candidates = set(self.__other)
+        for matcher_type, values in values_by_type.items():
+            if values:
+                candidates.update(self.__get_candidates(matcher_type, values))
+
+        matching: List[Rule] = []
+        for idx in sorted(candidates):
+            rule = self.rules[idx]
+            values = values_by_type.get(rule.matcher.type)
+            if values is None:
+                matched = rule.test(data)
+            else:
+                matched = self.__test_values(idx, values)
+            if matched:
+                matching.append(rule)
+        return matching
+
+
+_index_caches: Dict[Tuple[int, int], SizedLRUCache[Tuple[int, str], OwnershipIndex]] = {}
+_index_caches_lock = threading.Lock()
+
+
+def get_index_cache() -> Optional[SizedLRUCache[Tuple[int, str], OwnershipIndex]]:
+    """
+    Return the process-wide cache of compiled ownership indexes, or ``None``
+    if it is disabled. The cache is bounded by the total number of rules.
+    """
+    max_size = settings.SENTRY_OWNERSHIP_INDEX_CACHE_SIZE
+    if not max_size:
+        return None
+
+    key = (max_size, settings.SENTRY_OWNERSHIP_INDEX_CACHE_TTL)
+    try:
+        return _index_caches[key]
+    except KeyError:
+        pass
+
+    with _index_caches_lock:
+        if key not in _index_caches:
+            _index_caches[key] = SizedLRUCache(max_size, key[1], sizeof=len)
+        return _index_caches[key]
+
+
+def get_ownership_index(project_id: int, schema: Mapping[str, Any]) -> OwnershipIndex:
+    """
+    Returns the compiled index of the rules of an ownership schema of the
+    project. Indexes are reused by the process for as long as the schema,
+    including its ``$version``, stays the same.
+    """
+    cache = get_index_cache()
+    if cache is None:
+        return OwnershipIndex(load_schema(schema))
+
+    key = (project_id, md5(json.dumps(schema).encode("utf-8")).hexdigest())
+    index = cache.get(key)
+    if index is not None:
+        metrics.incr("ownership.index_cache", tags={"result": "hit"}, skip_internal=True)
+        return index
+
+    metrics.incr("ownership.index_cache", tags={"result": "miss"}, skip_internal=True)
+    with metrics.timer("ownership.build_index"):
+        index = OwnershipIndex(load_schema(schema))
+    cache.set(key, index, size=max(len(index), 1))
+    return index
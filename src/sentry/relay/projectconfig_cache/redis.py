@@ -4,6 +4,7 @@ import zstandard
 
 from sentry.relay.projectconfig_cache.base import ProjectConfigCache
 from sentry.utils import json, metrics, redis
+from sentry.utils.codecs import UnknownZstdDictionary, ZstdDictionaryCodec, load_zstd_dictionaries
 from sentry.utils.redis import validate_dynamic_cluster
 
 REDIS_CACHE_TIMEOUT = 3600  # 1 hr
@@ -13,10 +14,24 @@ logger = logging.getLogger(__name__)
 
 
 class RedisProjectConfigCache(ProjectConfigCache):
+    """
+    Stores zstd-compressed project configs in Redis.
+
+    If ``zstd_dictionaries`` (a list of paths to dictionaries trained with
+    ``sentry relay train-dictionary``) is set, new configs are compressed with
+    the first dictionary. Configs compressed with any of the dictionaries,
+    without a dictionary, or not compressed at all can be read.
+    """
+
     def __init__(self, **options):
         cluster_key = options.get("cluster", "default")
         self.cluster = redis.redis_clusters.get(cluster_key)
 
+        dictionaries, dictionary_id = load_zstd_dictionaries(
+            tuple(options.get("zstd_dictionaries", ()))
+        )
+        self.codec = ZstdDictionaryCodec(dictionaries, dictionary_id, level=COMPRESSION_LEVEL)
+
         super().__init__(**options)
 
     def validate(self):
@@ -32,9 +47,13 @@ class RedisProjectConfigCache(ProjectConfigCache):
         p = self.cluster.pipeline()
         for public_key, config in configs.items():
             serialized = json.dumps(config).encode()
-            compressed = zstandard.compress(serialized, level=COMPRESSION_LEVEL)
+            compressed = self.codec.encode(serialized)
             metrics.timing("relay.projectconfig_cache.uncompressed_size", len(serialized))
-            metrics.timing("relay.projectconfig_cache.size", len(compressed))
+            metrics.timing(
+                "relay.projectconfig_cache.size",
+                len(compressed),
+                tags={"dictionary": bool(self.codec.dictionary_id)},
+            )
 
             p.setex(self.__get_redis_key(public_key), REDIS_CACHE_TIMEOUT, compressed)
 
@@ -51,13 +70,63 @@ class RedisProjectConfigCache(ProjectConfigCache):
             "relay.projectconfig_cache.write", amount=sum(return_values), tags={"action": "delete"}
         )
 
+    def exists_many(self, public_keys):
+        public_keys = list(public_keys)
+        # Note: Those are multiple pipelines, one per cluster node
+        with self.cluster.pipeline() as p:
+            for public_key in public_keys:
+                p.exists(self.__get_redis_key(public_key))
+            return_values = p.execute()
+
+        return {public_key for public_key, exists in zip(public_keys, return_values) if exists}
+
+    def __decode(self, value):
+        try:
+            return self.codec.decode(value)
+        except (TypeError, zstandard.ZstdError):
+            # assume raw json
+            return value
+
     def get(self, public_key):
         rv = self.cluster.get(self.__get_redis_key(public_key))
         if rv is not None:
             try:
-                rv = zstandard.decompress(rv).decode()
-            except (TypeError, zstandard.ZstdError):
-                # assume raw json
-                pass
-            return json.loads(rv)
+                rv = self.__decode(rv)
+            except UnknownZstdDictionary as e:
+                # The dictionary has been removed from the options before the
+                # config expired, treat it as a cache miss.
+                logger.warning(
+                    "relay.projectconfig_cache.unknown_dictionary",
+                    extra={"dictionary_id": e.args[0]},
+                )
+                return None
+            return json.loads(rv, skip_trace=True)
         return None
+
+    def get_samples(self, count):
+        """
+        Return the serialized JSON of up to ``count`` cached project configs,
+        used to train compression dictionaries.
+        """
+        keys = []
+        for key in self.cluster.scan_iter(match=self.__get_redis_key("*"), count=1000):
+            keys.append(key)
+            if len(keys) >= count:
+                break
+
+        # Note: Those are multiple pipelines, one per cluster node
+        with self.cluster.pipeline() as p:
+            for key in keys:
+                p.get(key)
+            values = p.execute()
+
+        samples = []
+        for value in values:
+            if value is None:
+                continue
+            try:
+                value = self.__decode(value)
+            except UnknownZstdDictionary:
+                continue
+            samples.append(value.encode() if isinstance(value, str) else value)
+        return samples
@@ -0,0 +1,13 @@
+from django.conf import settings
+
+from sentry.utils.services import LazyServiceWrapper
+
+from .base import ProjectConfigInvalidationQueue
+
+backend = LazyServiceWrapper(
+    ProjectConfigInvalidationQueue,
+    settings.SENTRY_RELAY_PROJECTCONFIG_INVALIDATION_QUEUE,
+    settings.SENTRY_RELAY_PROJECTCONFIG_INVALIDATION_QUEUE_OPTIONS,
+)
+
+backend.expose(locals())
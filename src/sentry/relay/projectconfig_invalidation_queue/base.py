@@ -0,0 +1,67 @@
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+from sentry.utils.services import Service
+
+
+class EnqueueResult(NamedTuple):
+    #: Whether the scope was already queued, in which case this invalidation
+    #: was coalesced with the queued one.
+    coalesced: bool
+    #: Whether the caller has to schedule a task to drain the queue.
+    schedule_drain: bool
+
+
+class PoppedScopes(NamedTuple):
+    #: The popped scopes along with the time they were first queued.
+    scopes: Sequence[Tuple[str, float]]
+    #: The number of scopes that are still queued.
+    remaining: int
+
+
+def make_scope(organization_id=None, project_id=None, public_key=None) -> str:
+    if organization_id:
+        return f"o:{organization_id}"
+    elif project_id:
+        return f"p:{project_id}"
+    elif public_key:
+        return f"k:{public_key}"
+    else:
+        raise ValueError()
+
+
+def parse_scope(scope: str) -> Tuple[str, str]:
+    kind, value = scope.split(":", 1)
+    return kind, value
+
+
+class ProjectConfigInvalidationQueue(Service):
+    """A queue that coalesces invalidations of relay project configs.
+
+    Instead of scheduling one task per invalidated organization, project or public key,
+    invalidations are added to this queue and drained by a single task that runs after a
+    short delay.  Repeated invalidations of the same scope while it is queued are only
+    computed once.
+
+    The base implementation does not queue anything, in which case every invalidation
+    schedules its own task.
+    """
+
+    __all__ = ("enqueue", "pop_many", "mark_drain_done")
+
+    def __init__(self, **options):
+        pass
+
+    def enqueue(self, *, organization_id, project_id, public_key) -> Optional[EnqueueResult]:
+        """Adds the highest-scoped argument to the queue.
+
+        Returns ``None`` if the invalidation was not queued.
+        """
+        return None
+
+    def pop_many(self, limit: int) -> PoppedScopes:
+        """Removes and returns up to ``limit`` of the oldest queued scopes."""
+        return PoppedScopes([], 0)
+
+    def mark_drain_done(self) -> None:
+        """Marks the task draining the queue as started, so that following invalidations
+        schedule a new one."""
@@ -0,0 +1,64 @@
+import time
+
+from sentry.relay.projectconfig_invalidation_queue.base import (
+    EnqueueResult,
+    PoppedScopes,
+    ProjectConfigInvalidationQueue,
+    make_scope,
+)
+from sentry.utils.redis import (
+    get_dynamic_cluster_from_options,
+    load_script,
+    validate_dynamic_cluster,
+)
+
+pop_invalidations = load_script("relay/pop_invalidations.lua")
+
+# The drain flag expires in case the task draining the queue gets lost.
+DRAIN_TTL = 60
+
+
+class RedisProjectConfigInvalidationQueue(ProjectConfigInvalidationQueue):
+    def __init__(self, **options):
+        key_prefix = options.pop("key_prefix", "relayconfig-invalidation")
+        # Both keys use the same hash tag so that they end up on the same node.
+        self._queue_key = f"{{{key_prefix}}}:queue"
+        self._drain_key = f"{{{key_prefix}}}:drain"
+        self._drain_ttl = options.pop("drain_ttl", DRAIN_TTL)
+        self.is_redis_cluster, self.cluster, options = get_dynamic_cluster_from_options(
+            "SENTRY_RELAY_PROJECTCONFIG_INVALIDATION_QUEUE_OPTIONS", options
+        )
+
+        super().__init__(**options)
+
+    def validate(self):
+        validate_dynamic_cluster(self.is_redis_cluster, self.cluster)
+
+    def _get_redis_client(self):
+        if self.is_redis_cluster:
+            return self.cluster
+        else:
+            return self.cluster.get_local_client_for_key(self._queue_key)
+
+    def enqueue(self, *, organization_id, project_id, public_key):
+        scope = make_scope(organization_id, project_id, public_key)
+        with self._get_redis_client().pipeline(transaction=False) as p:
+            p.zadd(self._queue_key, {scope: time.time()}, nx=True)
+            p.set(self._drain_key, 1, nx=True, ex=self._drain_ttl)
+            added, schedule_drain = p.execute()
+
+        return EnqueueResult(coalesced=not added, schedule_drain=bool(schedule_drain))
+
+    def pop_many(self, limit):
+        items, remaining = pop_invalidations(self._get_redis_client(), [self._queue_key], [limit])
+        scopes = []
+        for i in range(0, len(items), 2):
+            scope = items[i]
+            if isinstance(scope, bytes):
+                # Redis Cluster clients decode responses, RB clients do not.
+                scope = scope.decode("utf-8")
+            scopes.append((scope, float(items[i + 1])))
+        return PoppedScopes(scopes, remaining)
+
+    def mark_drain_done(self):
+        self._get_redis_client().delete(self._drain_key)
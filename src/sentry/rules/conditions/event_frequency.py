@@ -4,18 +4,20 @@ import abc
 import contextlib
 import logging
 import re
+import time
 from datetime import datetime, timedelta
-from typing import Any, Mapping
+from typing import Any, Mapping, NamedTuple
 
 from django import forms
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import release_health, tsdb
+from sentry import options, release_health, tsdb
 from sentry.eventstore.models import Event
 from sentry.receivers.rules import DEFAULT_RULE_LABEL
 from sentry.rules import EventState
 from sentry.rules.conditions.base import EventCondition
+from sentry.tsdb.base import TotalsQuery, TSDBModel
 from sentry.utils import metrics
 from sentry.utils.snuba import options_override
 
@@ -82,13 +84,136 @@ class EventFrequencyForm(forms.Form):  # type: ignore
         return cleaned_data
 
 
+class FrequencyWindow(NamedTuple):
+    """
+    A range of an issue's counts that a frequency condition compares against, ending
+    `offset` before the evaluation of the rules.
+    """
+
+    model: TSDBModel
+    distinct: bool
+    duration: timedelta
+    offset: timedelta
+    environment_id: int | None
+
+
+class EventFrequencyQueryPlanner:
+    """
+    Answers the TSDB queries of the frequency conditions of all the rules that are evaluated
+    for an event at once.
+
+    Conditions add their windows up front with `add_condition`. The first time a condition
+    needs a count, every window added so far is fetched with a single `get_totals_multi`
+    call, so that windows shared by several rules are only queried once. If no condition ends
+    up needing a count (e.g. because cheaper conditions already decided the rules) nothing is
+    queried at all.
+
+    Counts are memoized per group for `rules.event-frequency.memoize-ttl` seconds, so that
+    bursts of events of an issue don't query the same windows again.
+    """
+
+    def __init__(self, event: Event, tsdb: Any = tsdb) -> None:
+        self.event = event
+        self.tsdb = tsdb
+        self.end = timezone.now()
+        self.__pending: set[FrequencyWindow] = set()
+        self.__results: dict[FrequencyWindow, int] = {}
+        self.__memo: dict[FrequencyWindow, tuple[int, float]] | None = None
+
+    def add_condition(self, condition: BaseEventFrequencyCondition) -> None:
+        for window in condition.get_windows():
+            if window not in self.__results:
+                self.__pending.add(window)
+
+    def get_total(self, window: FrequencyWindow) -> int:
+        if window not in self.__results:
+            self.__pending.add(window)
+            self.__fetch()
+        return self.__results[window]
+
+    def __get_memo_key(self) -> str:
+        return f"r.c.ef:{self.event.group_id}"
+
+    def __fetch(self) -> None:
+        windows, self.__pending = self.__pending, set()
+
+        memoize_ttl = options.get("rules.event-frequency.memoize-ttl")
+        now = time.time()
+        if memoize_ttl and self.__memo is None:
+            self.__memo = cache.get(self.__get_memo_key()) or {}
+        memo = self.__memo if memoize_ttl else None
+
+        missing = []
+        for window in windows:
+            memoized = memo.get(window) if memo else None
+            if memoized is not None and now - memoized[1] < memoize_ttl:
+                self.__results[window] = memoized[0]
+            else:
+                missing.append(window)
+
+        metrics.incr(
+            "rules.conditions.event_frequency.windows",
+            amount=len(windows) - len(missing),
+            tags={"memoized": True},
+            skip_internal=True,
+        )
+        metrics.incr(
+            "rules.conditions.event_frequency.windows",
+            amount=len(missing),
+            tags={"memoized": False},
+            skip_internal=True,
+        )
+        if not missing:
+            return
+
+        # For windows >= 1 hour we don't need to worry about read your writes consistency. These
+        # are queried without it, so that we can scale to more nodes.
+        for consistent in (True, False):
+            batch = [
+                window for window in missing if (window.duration < timedelta(hours=1)) == consistent
+            ]
+            if not batch:
+                continue
+
+            option_override_cm = contextlib.nullcontext()
+            if not consistent:
+                option_override_cm = options_override({"consistent": False})
+            with option_override_cm:
+                results = self.tsdb.get_totals_multi(
+                    [
+                        TotalsQuery(
+                            model=window.model,
+                            keys=[self.event.group_id],
+                            start=self.end - window.offset - window.duration,
+                            end=self.end - window.offset,
+                            environment_id=window.environment_id,
+                            distinct=window.distinct,
+                            jitter_value=self.event.group_id,
+                        )
+                        for window in batch
+                    ],
+                    use_cache=True,
+                )
+            for window, totals in zip(batch, results):
+                self.__results[window] = totals[self.event.group_id]
+
+        if memo is not None:
+            for window in missing:
+                memo[window] = (self.__results[window], now)
+            cache.set(self.__get_memo_key(), memo, memoize_ttl)
+
+
 class BaseEventFrequencyCondition(EventCondition, abc.ABC):
     intervals = standard_intervals
     form_cls = EventFrequencyForm
     label: str
+    # The TSDB model counted by the condition, and whether distinct items are counted
+    tsdb_model: TSDBModel = TSDBModel.group
+    distinct = False
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.tsdb = kwargs.pop("tsdb", tsdb)
+        self.planner: EventFrequencyQueryPlanner | None = kwargs.pop("planner", None)
         self.form_fields = {
             "value": {"type": "number", "placeholder": 100},
             "interval": {
@@ -132,12 +257,61 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         return query_result
 
     def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
-        """ """
-        raise NotImplementedError  # subclass must implement
+        return self.get_total(event, start, end, environment_id)
+
+    def get_total(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
+        """
+        Returns the count of `tsdb_model` for the issue of the event between start and end.
+        """
+        if self.planner is not None:
+            return self.planner.get_total(
+                FrequencyWindow(
+                    self.tsdb_model,
+                    self.distinct,
+                    end - start,
+                    self.planner.end - end,
+                    environment_id,  # type: ignore
+                )
+            )
+
+        get_totals = self.tsdb.get_distinct_counts_totals if self.distinct else self.tsdb.get_sums
+        totals: Mapping[int, int] = get_totals(
+            model=self.tsdb_model,
+            keys=[event.group_id],
+            start=start,
+            end=end,
+            environment_id=environment_id,
+            use_cache=True,
+            jitter_value=event.group_id,
+        )
+        return totals[event.group_id]
+
+    def get_windows(self) -> list[FrequencyWindow]:
+        """
+        Returns the windows `get_rate` queries when the condition is evaluated, for
+        `EventFrequencyQueryPlanner.add_condition`.
+        """
+        interval = self.get_option("interval")
+        if not isinstance(interval, str) or interval not in self.intervals:
+            return []
+
+        _, duration = self.intervals[interval]
+        # TODO(mgaeta): Bug: Rule is optional.
+        environment_id = self.rule.environment_id  # type: ignore
+        offsets = [timedelta()]
+        if self.get_option("comparisonType", COMPARISON_TYPE_COUNT) == COMPARISON_TYPE_PERCENT:
+            comparison_interval = self.get_option("comparisonInterval")
+            if isinstance(comparison_interval, str) and comparison_interval in comparison_intervals:
+                offsets.append(comparison_intervals[comparison_interval][1])
+
+        return [
+            FrequencyWindow(self.tsdb_model, self.distinct, duration, offset, environment_id)
+            for offset in offsets
+        ]
 
     def get_rate(self, event: Event, interval: str, environment_id: str) -> int:
         _, duration = self.intervals[interval]
-        end = timezone.now()
+        end = self.planner.end if self.planner is not None else timezone.now()
 
         # For conditions with interval >= 1 hour we don't need to worry about read your writes
         # consistency. Disable it so that we can scale to more nodes.
@@ -185,34 +359,12 @@ class EventFrequencyCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventFrequencyCondition"
     label = "The issue is seen more than {value} times in {interval}"
 
-    def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
-        sums: Mapping[int, int] = self.tsdb.get_sums(
-            model=self.tsdb.models.group,
-            keys=[event.group_id],
-            start=start,
-            end=end,
-            environment_id=environment_id,
-            use_cache=True,
-            jitter_value=event.group_id,
-        )
-        return sums[event.group_id]
-
 
 class EventUniqueUserFrequencyCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventUniqueUserFrequencyCondition"
     label = "The issue is seen by more than {value} users in {interval}"
-
-    def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
-        totals: Mapping[int, int] = self.tsdb.get_distinct_counts_totals(
-            model=self.tsdb.models.users_affected_by_group,
-            keys=[event.group_id],
-            start=start,
-            end=end,
-            environment_id=environment_id,
-            use_cache=True,
-            jitter_value=event.group_id,
-        )
-        return totals[event.group_id]
+    tsdb_model = TSDBModel.users_affected_by_group
+    distinct = True
 
 
 percent_intervals = {
@@ -304,15 +456,7 @@ class EventFrequencyPercentCondition(BaseEventFrequencyCondition):
                 percent_intervals[self.get_option("interval")][1].total_seconds() // 60
             )
             avg_sessions_in_interval = session_count_last_hour / (60 / interval_in_minutes)
-            issue_count = self.tsdb.get_sums(
-                model=self.tsdb.models.group,
-                keys=[event.group_id],
-                start=start,
-                end=end,
-                environment_id=environment_id,
-                use_cache=True,
-                jitter_value=event.group_id,
-            )[event.group_id]
+            issue_count = self.get_total(event, start, end, environment_id)
             if issue_count > avg_sessions_in_interval:
                 # We want to better understand when and why this is happening, so we're logging it for now
                 self.logger.info(
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 from random import randrange
 from typing import Any, Callable, Iterable, List, Mapping, MutableMapping, Sequence, Set, Tuple
 
@@ -11,13 +11,17 @@ from django.utils import timezone
 from sentry import analytics, features
 from sentry.eventstore.models import Event
 from sentry.mail.actions import NotifyActiveReleaseEmailAction
-from sentry.models import GroupRuleStatus, Rule
+from sentry.models import Group, GroupRuleStatus, Rule
 from sentry.notifications.types import ActionTargetType
 from sentry.rules import EventState, history, rules
 from sentry.rules.actions import EventAction
 from sentry.rules.base import CallbackFuture
 from sentry.rules.conditions.active_release import ActiveReleaseEventCondition
 from sentry.rules.conditions.base import EventCondition
+from sentry.rules.conditions.event_frequency import (
+    BaseEventFrequencyCondition,
+    EventFrequencyQueryPlanner,
+)
 from sentry.rules.filters.base import EventFilter
 from sentry.types.rules import RuleFuture
 from sentry.utils.hashlib import hash_values
@@ -36,10 +40,15 @@ class RuleProcessor:
         is_regression: bool,
         is_new_group_environment: bool,
         has_reappeared: bool,
+        rules: Sequence[Rule] | None = None,
+        rule_statuses: Mapping[int, GroupRuleStatus] | None = None,
     ) -> None:
         self.event = event
         self.group = event.group
         self.project = event.project
+        # Rules and their statuses for the group, if they have been fetched in bulk already
+        self.rules = rules
+        self.rule_statuses = rule_statuses
 
         self.is_new = is_new
         self.is_regression = is_regression
@@ -49,69 +58,108 @@ class RuleProcessor:
         self.grouped_futures: MutableMapping[
             str, Tuple[Callable[[Event, Sequence[RuleFuture]], None], List[RuleFuture]]
         ] = {}
+        # Batches the queries of the frequency conditions of the rules applied to the event
+        self.frequency_planner: EventFrequencyQueryPlanner | None = None
 
     def get_rules(self) -> Sequence[Rule]:
         """Get all of the rules for this project from the DB (or cache)."""
+        if self.rules is not None:
+            return self.rules
         rules_: Sequence[Rule] = Rule.get_for_project(self.project.id)
         return rules_
 
+    @staticmethod
+    def _build_group_rule_status_cache_key(group_id: int, rule_id: int) -> str:
+        return "grouprulestatus:1:%s" % hash_values([group_id, rule_id])
+
     def _build_rule_status_cache_key(self, rule_id: int) -> str:
-        return "grouprulestatus:1:%s" % hash_values([self.group.id, rule_id])
+        return self._build_group_rule_status_cache_key(self.group.id, rule_id)
 
     def bulk_get_rule_status(self, rules: Sequence[Rule]) -> Mapping[int, GroupRuleStatus]:
-        keys = [self._build_rule_status_cache_key(rule.id) for rule in rules]
-        cache_results: Mapping[str, GroupRuleStatus] = cache.get_many(keys)
-        missing_rule_ids: Set[int] = set()
-        rule_statuses: MutableMapping[int, GroupRuleStatus] = {}
-        for key, rule in zip(keys, rules):
+        return self.bulk_get_rule_statuses([(self.group, rules)])[self.group.id]
+
+    @classmethod
+    def bulk_get_rule_statuses(
+        cls, groups_and_rules: Sequence[Tuple[Group, Sequence[Rule]]]
+    ) -> Mapping[int, Mapping[int, GroupRuleStatus]]:
+        """
+        Fetches (or creates) the statuses of the rules of multiple groups at once.
+        :return: A dict of group ids to dicts of rule ids to statuses
+        """
+        groups: MutableMapping[int, Group] = {}
+        keys: MutableMapping[str, Tuple[int, int]] = {}
+        for group, group_rules in groups_and_rules:
+            groups[group.id] = group
+            for rule in group_rules:
+                keys[cls._build_group_rule_status_cache_key(group.id, rule.id)] = (
+                    group.id,
+                    rule.id,
+                )
+
+        cache_results: Mapping[str, GroupRuleStatus] = cache.get_many(list(keys))
+        missing: Set[Tuple[int, int]] = set()
+        rule_statuses: MutableMapping[int, MutableMapping[int, GroupRuleStatus]] = {
+            group_id: {} for group_id in groups
+        }
+        for key, (group_id, rule_id) in keys.items():
             rule_status = cache_results.get(key)
             if not rule_status:
-                missing_rule_ids.add(rule.id)
+                missing.add((group_id, rule_id))
             else:
-                rule_statuses[rule.id] = rule_status
+                rule_statuses[group_id][rule_id] = rule_status
 
-        if missing_rule_ids:
-            # If not cached, attempt to fetch status from the database
-            statuses = GroupRuleStatus.objects.filter(
-                group=self.group, rule_id__in=missing_rule_ids
-            )
+        if missing:
             to_cache: List[GroupRuleStatus] = list()
-            for status in statuses:
-                rule_statuses[status.rule_id] = status
-                missing_rule_ids.remove(status.rule_id)
-                to_cache.append(status)
+
+            def fetch_missing() -> None:
+                statuses = GroupRuleStatus.objects.filter(
+                    group__in={group_id for group_id, _ in missing},
+                    rule_id__in={rule_id for _, rule_id in missing},
+                )
+                for status in statuses:
+                    if (status.group_id, status.rule_id) in missing:
+                        rule_statuses[status.group_id][status.rule_id] = status
+                        missing.remove((status.group_id, status.rule_id))
+                        to_cache.append(status)
+
+            # If not cached, attempt to fetch status from the database
+            fetch_missing()
 
             # We might need to create some statuses if they don't already exist
-            if missing_rule_ids:
+            if missing:
                 # We use `ignore_conflicts=True` here to avoid race conditions where the statuses
                 # might be created between when we queried above and attempt to create the rows now.
                 GroupRuleStatus.objects.bulk_create(
                     [
-                        GroupRuleStatus(rule_id=rule_id, group=self.group, project=self.project)
-                        for rule_id in missing_rule_ids
+                        GroupRuleStatus(
+                            rule_id=rule_id,
+                            group=groups[group_id],
+                            project_id=groups[group_id].project_id,
+                        )
+                        for group_id, rule_id in missing
                     ],
                     ignore_conflicts=True,
                 )
                 # Using `ignore_conflicts=True` prevents the pk from being set on the model
                 # instances. Re-query the database to fetch the rows, they should all exist at this
                 # point.
-                statuses = GroupRuleStatus.objects.filter(
-                    group=self.group, rule_id__in=missing_rule_ids
-                )
-                for status in statuses:
-                    rule_statuses[status.rule_id] = status
-                    missing_rule_ids.remove(status.rule_id)
-                    to_cache.append(status)
+                fetch_missing()
 
-                if missing_rule_ids:
+                if missing:
                     # Shouldn't happen, but log just in case
-                    self.logger.error(
+                    cls.logger.error(
                         "Failed to fetch some GroupRuleStatuses in RuleProcessor",
-                        extra={"missing_rule_ids": missing_rule_ids, "group_id": self.group.id},
+                        extra={
+                            "missing_rule_ids": {rule_id for _, rule_id in missing},
+                            "group_ids": {group_id for group_id, _ in missing},
+                        },
                     )
             if to_cache:
                 cache.set_many(
-                    {self._build_rule_status_cache_key(item.rule_id): item for item in to_cache}
+                    {
+                        cls._build_group_rule_status_cache_key(item.group_id, item.rule_id): item
+                        for item in to_cache
+                    }
                 )
 
         return rule_statuses
@@ -124,7 +172,12 @@ class RuleProcessor:
             self.logger.warning("Unregistered condition %r", condition["id"])
             return None
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
+        kwargs: dict[str, Any] = {}
+        if self.frequency_planner is not None and issubclass(
+            condition_cls, BaseEventFrequencyCondition
+        ):
+            kwargs["planner"] = self.frequency_planner
+        condition_inst = condition_cls(self.project, data=condition, rule=rule, **kwargs)
         passes: bool = safe_execute(
             condition_inst.passes, self.event, state, _with_transaction=False
         )
@@ -156,6 +209,33 @@ class RuleProcessor:
             return lambda bool_iter: not any(bool_iter)
         return None
 
+    def should_apply_rule(self, rule: Rule, status: GroupRuleStatus, now: datetime) -> bool:
+        """
+        Whether the rule is evaluated for the event at all: it has to be for the environment of
+        the event, and must not have fired within its action interval.
+        """
+        if (
+            rule.environment_id is not None
+            and self.event.get_environment().id != rule.environment_id
+        ):
+            return False
+
+        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+        freq_offset = now - timedelta(minutes=frequency)
+        return not (status.last_active and status.last_active > freq_offset)
+
+    def plan_frequency_conditions(self, rule: Rule) -> None:
+        """
+        Adds the windows of the frequency conditions of the rule to `frequency_planner`.
+        """
+        assert self.frequency_planner is not None
+        for condition in rule.data.get("conditions", ()):
+            condition_cls = rules.get(condition.get("id"))
+            if condition_cls is not None and issubclass(condition_cls, BaseEventFrequencyCondition):
+                self.frequency_planner.add_condition(
+                    condition_cls(self.project, data=condition, rule=rule)
+                )
+
     def apply_rule(self, rule: Rule, status: GroupRuleStatus) -> None:
         """
         If all conditions and filters pass, execute every action.
@@ -168,16 +248,11 @@ class RuleProcessor:
         rule_condition_list = rule.data.get("conditions", ())
         frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
 
-        if (
-            rule.environment_id is not None
-            and self.event.get_environment().id != rule.environment_id
-        ):
+        now = timezone.now()
+        if not self.should_apply_rule(rule, status, now):
             return
 
-        now = timezone.now()
         freq_offset = now - timedelta(minutes=frequency)
-        if status.last_active and status.last_active > freq_offset:
-            return
 
         state = self.get_state()
 
@@ -325,7 +400,16 @@ class RuleProcessor:
 
         self.grouped_futures.clear()
         rules = self.get_rules()
-        rule_statuses = self.bulk_get_rule_status(rules)
+        rule_statuses = self.rule_statuses
+        if rule_statuses is None or any(rule.id not in rule_statuses for rule in rules):
+            rule_statuses = self.bulk_get_rule_status(rules)
+
+        self.frequency_planner = EventFrequencyQueryPlanner(self.event)
+        now = timezone.now()
+        for rule in rules:
+            if self.should_apply_rule(rule, rule_statuses[rule.id], now):
+                self.plan_frequency_conditions(rule)
+
         for rule in rules:
             self.apply_rule(rule, rule_statuses[rule.id])
 
@@ -1,6 +1,7 @@
 import os
 import time
 from datetime import timedelta
+from functools import partial
 from uuid import uuid4
 
 import click
@@ -35,6 +36,21 @@ _STOP_WORKER = "91650ec271ae4b3e8a67cdc909d80f8c"
 API_TOKEN_TTL_IN_DAYS = 30
 
 
+def get_skip_models():
+    from sentry import models, similarity
+
+    return [
+        # Handled by other parts of cleanup
+        models.EventAttachment,
+        models.UserReport,
+        models.Group,
+        models.GroupEmailThread,
+        models.GroupRuleStatus,
+        # Handled by TTL
+        similarity,
+    ] + [b[0] for b in EXTRA_BULK_QUERY_DELETES]
+
+
 def multiprocess_worker(task_queue):
     # Configure within each Process
     import logging
@@ -60,18 +76,9 @@ def multiprocess_worker(task_queue):
             configure()
             configured = True
 
-            from sentry import deletions, models, similarity
+            from sentry import deletions
 
-            skip_models = [
-                # Handled by other parts of cleanup
-                models.EventAttachment,
-                models.UserReport,
-                models.Group,
-                models.GroupEmailThread,
-                models.GroupRuleStatus,
-                # Handled by TTL
-                similarity,
-            ] + [b[0] for b in EXTRA_BULK_QUERY_DELETES]
+            skip_models = get_skip_models()
 
         model, chunk = j
         model = import_string(model)
@@ -93,6 +100,51 @@ def multiprocess_worker(task_queue):
             task_queue.task_done()
 
 
+def delete_chunk(query, skip_models, lower, upper):
+    """
+    Delete a chunk of the rows of ``query`` with ids in ``(lower, upper]``
+    using the ``deletions`` code path, for partitioned cleanups.
+    """
+    from sentry import deletions
+
+    chunk = query.select_range(lower, upper, chunk_size=100)
+    if not chunk:
+        return 0, None
+
+    task = deletions.get(
+        model=query.model,
+        query={"id__in": chunk},
+        skip_models=skip_models,
+        transaction_id=uuid4().hex,
+    )
+    while task.chunk():
+        pass
+    return len(chunk), chunk[-1]
+
+
+def delete_unused_blobs(query, lower, upper):
+    """
+    Delete the blobs of ``query`` with ids in ``(lower, upper]`` that are not
+    referenced by any file, for partitioned cleanups.
+    """
+    from sentry.models import File, FileBlob, FileBlobIndex
+
+    chunk = query.select_range(lower, upper, chunk_size=100)
+    if not chunk:
+        return 0, None
+
+    referenced = set(
+        FileBlobIndex.objects.filter(blob_id__in=chunk).values_list("blob_id", flat=True)
+    )
+    referenced.update(File.objects.filter(blob_id__in=chunk).values_list("blob_id", flat=True))
+
+    deleted = 0
+    for blob in FileBlob.objects.filter(id__in=chunk).exclude(id__in=referenced):
+        blob.delete()
+        deleted += 1
+    return deleted, chunk[-1]
+
+
 @click.command()
 @click.option("--days", default=30, show_default=True, help="Numbers of days to truncate on.")
 @click.option("--project", help="Limit truncation to only entries from project.")
@@ -106,6 +158,21 @@ def multiprocess_worker(task_queue):
 @click.option(
     "--silent", "-q", default=False, is_flag=True, help="Run quietly. No output on success."
 )
+@click.option(
+    "--partitions",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Split the id range of each model into this many partitions that are deleted "
+    "concurrently by `--concurrency` threads. Interrupted runs resume where they stopped.",
+)
+@click.option(
+    "--rows-per-second",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Limit the number of rows deleted per second across all partitions (0 for no limit).",
+)
 @click.option("--model", "-m", multiple=True)
 @click.option("--router", "-r", default=None, help="Database router")
 @click.option(
@@ -116,7 +183,7 @@ def multiprocess_worker(task_queue):
     help="Send the duration of this command to internal metrics.",
 )
 @log_options()
-def cleanup(days, project, concurrency, silent, model, router, timed):
+def cleanup(days, project, concurrency, partitions, rows_per_second, silent, model, router, timed):
     """Delete a portion of trailing data based on creation date.
 
     All data that is older than `--days` will be deleted.  The default for
@@ -124,11 +191,20 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
     but if you have a specific project you want to limit this to this can be
     done with the `--project` flag which accepts a project ID or a string
     with the form `org/project` where both are slugs.
+
+    With `--partitions`, the id range of each model is split into partitions
+    that are deleted concurrently (optionally limited to `--rows-per-second`
+    rows per second in total.) The progress of every partition is stored, so
+    a cleanup that is interrupted resumes where it stopped.
     """
     if concurrency < 1:
         click.echo("Error: Minimum concurrency is 1", err=True)
         raise click.Abort()
 
+    if partitions < 0 or rows_per_second < 0:
+        click.echo("Error: --partitions and --rows-per-second must not be negative", err=True)
+        raise click.Abort()
+
     os.environ["_SENTRY_CLEANUP"] = "1"
 
     # Make sure we fork off multiprocessing pool
@@ -155,7 +231,7 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
         from sentry.app import nodestore
         from sentry.constants import ObjectStatus
         from sentry.data_export.models import ExportedData
-        from sentry.db.deletion import BulkDeleteQuery
+        from sentry.db.deletion import BulkDeleteQuery, PartitionedDeletion, RowBudget
         from sentry.replays import models as replay_models
         from sentry.utils import metrics
         from sentry.utils.query import RangeQuerySetWrapper
@@ -174,6 +250,26 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
                 return False
             return model.__name__.lower() not in model_list
 
+        budget = RowBudget(rows_per_second) if rows_per_second else None
+        throughput = {}
+
+        def delete_partitioned(query, delete_batch):
+            deletion = PartitionedDeletion(
+                query,
+                delete_batch,
+                partitions=partitions,
+                concurrency=concurrency,
+                budget=budget,
+                # Positions are only valid for the cutoff they were computed
+                # with, so runs with a later cutoff don't resume from them.
+                checkpoint_key="cleanup:partitions:{}:{}:{}".format(
+                    query.model._meta.db_table,
+                    query.project_id or "*",
+                    query.cutoff.date().isoformat(),
+                ),
+            )
+            throughput[query.model.__name__] = deletion.run()
+
         # Deletions that use `BulkDeleteQuery` (and don't need to worry about child relations)
         # (model, datetime_field, order_by)
         BULK_QUERY_DELETES = [
@@ -285,13 +381,18 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
                 if not silent:
                     click.echo(">> Skipping %s" % model.__name__)
             else:
-                BulkDeleteQuery(
+                q = BulkDeleteQuery(
                     model=model,
                     dtfield=dtfield,
                     days=days,
                     project_id=project_id,
                     order_by=order_by,
-                ).execute(chunk_size=chunk_size)
+                )
+
+                if partitions:
+                    delete_partitioned(q, partial(q.delete_range, chunk_size=chunk_size))
+                else:
+                    q.execute(chunk_size=chunk_size)
 
         for model, dtfield, order_by in DELETES:
             if not silent:
@@ -315,6 +416,10 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
                     order_by=order_by,
                 )
 
+                if partitions:
+                    delete_partitioned(q, partial(delete_chunk, q, get_skip_models()))
+                    continue
+
                 for chunk in q.iterator(chunk_size=100):
                     task_queue.put((imp, chunk))
 
@@ -367,9 +472,24 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
         if is_filtered(models.FileBlob):
             if not silent:
                 click.echo(">> Skipping FileBlob")
+        elif partitions:
+            q = BulkDeleteQuery(model=models.FileBlob, dtfield="timestamp", days=1)
+            delete_partitioned(q, partial(delete_unused_blobs, q))
         else:
             cleanup_unused_files(silent)
 
+        if throughput and not silent:
+            click.echo("Throughput:")
+            for name, stats in throughput.items():
+                click.echo(
+                    "  {name}: {rows} row(s) in {duration:.1f}s ({rate:.1f} rows/s)".format(
+                        name=name,
+                        rows=stats.rows,
+                        duration=stats.duration,
+                        rate=stats.rows_per_second,
+                    )
+                )
+
     finally:
         # Shut down our pool
         for _ in pool:
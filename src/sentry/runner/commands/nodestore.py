@@ -0,0 +1,38 @@
+import click
+
+from sentry.runner.decorators import configuration
+
+
+@click.group()
+def nodestore():
+    "Manage the node storage backend."
+
+
+@nodestore.command("train-dictionary")
+@click.argument("outfile", type=click.File("wb"), required=True)
+@click.option(
+    "--size",
+    default=112640,
+    show_default=True,
+    help="The maximum size of the dictionary in bytes.",
+)
+@configuration
+def train_dictionary(outfile, size):
+    """
+    Train a zstd dictionary for version 2 nodes.
+
+    Reads the ids of the nodes to sample from stdin, one per line, and writes
+    the dictionary to OUTFILE. Add the path of the dictionary to the front of
+    SENTRY_NODESTORE_ZSTD_DICTIONARIES to start using it for new nodes.
+    """
+    from sentry import nodestore
+    from sentry.nodestore.encoding import train_dictionary
+
+    ids = [line.strip() for line in click.get_text_stream("stdin") if line.strip()]
+    if not ids:
+        raise click.ClickException("No node ids were provided.")
+
+    samples = [value for value in nodestore._get_bytes_multi(ids).values() if value]
+    click.echo(f"Training dictionary from {len(samples)} of {len(ids)} nodes.", err=True)
+
+    outfile.write(train_dictionary(samples, size=size))
@@ -0,0 +1,50 @@
+import click
+
+from sentry.runner.decorators import configuration
+
+
+@click.group()
+def relay():
+    "Manage the Relay project config cache."
+
+
+@relay.command("train-dictionary")
+@click.argument("outfile", type=click.File("wb"), required=True)
+@click.option(
+    "--size",
+    default=112640,
+    show_default=True,
+    help="The maximum size of the dictionary in bytes.",
+)
+@click.option(
+    "--samples",
+    default=10000,
+    show_default=True,
+    help="The maximum number of cached project configs to sample.",
+)
+@configuration
+def train_dictionary(outfile, size, samples):
+    """
+    Train a zstd dictionary for cached project configs.
+
+    Samples the project configs currently in the cache and writes the
+    dictionary to OUTFILE. To start using the dictionary, add its path to the
+    front of the zstd_dictionaries option of
+    SENTRY_RELAY_PROJECTCONFIG_CACHE_OPTIONS.
+
+    When rotating dictionaries, keep the previous dictionaries in the list
+    until the configs compressed with them have expired (after an hour).
+    """
+    import zstandard
+
+    from sentry.relay.projectconfig_cache import backend
+
+    if not hasattr(backend, "get_samples"):
+        raise click.ClickException("The project config cache backend does not support sampling.")
+
+    configs = backend.get_samples(samples)
+    if not configs:
+        raise click.ClickException("No project configs were found in the cache.")
+    click.echo(f"Training dictionary from {len(configs)} project configs.", err=True)
+
+    outfile.write(zstandard.train_dictionary(size, configs).as_bytes())
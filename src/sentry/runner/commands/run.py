@@ -511,6 +511,12 @@ def batching_kafka_options(group):
     default=None,
     help="Thread pool size (only utilitized for message types that support concurrent processing)",
 )
+@click.option(
+    "--pipelined",
+    default=False,
+    is_flag=True,
+    help="Overlap decoding, project lookups, processing store writes and task dispatch of messages within a batch, each stage using its own thread pool. The size of the I/O bound pools is controlled by --concurrency.",
+)
 @configuration
 def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
@@ -534,7 +540,12 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
         raise click.ClickException("Need to specify --all-consumer-types or --consumer-type")
 
     concurrency = options.pop("concurrency", None)
-    if concurrency is not None:
+    pipelined = options.pop("pipelined", False)
+    if pipelined:
+        executor = None
+        if concurrency is not None:
+            options["pipeline_concurrency"] = concurrency
+    elif concurrency is not None:
         executor = ThreadPoolExecutor(concurrency)
     else:
         executor = None
@@ -542,7 +553,9 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
     with metrics.global_tags(
         ingest_consumer_types=",".join(sorted(consumer_types)), _all_threads=True
     ):
-        get_ingest_consumer(consumer_types=consumer_types, executor=executor, **options).run()
+        get_ingest_consumer(
+            consumer_types=consumer_types, executor=executor, pipelined=pipelined, **options
+        ).run()
 
 
 @run.command("ingest-metrics-consumer-2")
@@ -557,7 +570,12 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
 )
 @click.option("--input-block-size", type=int, default=DEFAULT_BLOCK_SIZE)
 @click.option("--output-block-size", type=int, default=DEFAULT_BLOCK_SIZE)
-@click.option("--factory-name", default="default")
+@click.option(
+    "--factory-name",
+    type=click.Choice(["default", "shared-memory"]),
+    default="default",
+    help="The shared-memory factory indexes batches in --processes worker processes.",
+)
 @click.option("--ingest-profile", required=True)
 @click.option("commit_max_batch_size", "--commit-max-batch-size", type=int, default=25000)
 @click.option("commit_max_batch_time", "--commit-max-batch-time-ms", type=int, default=10000)
@@ -565,7 +583,6 @@ def metrics_streaming_consumer(**options):
     import sentry_sdk
 
     from sentry.sentry_metrics.configuration import UseCaseKey, get_ingest_config
-    from sentry.sentry_metrics.consumers.indexer.multiprocess import get_streaming_metrics_consumer
     from sentry.sentry_metrics.metrics_wrapper import MetricsWrapper
     from sentry.utils.metrics import backend, global_tags
 
@@ -575,6 +592,15 @@ def metrics_streaming_consumer(**options):
     metrics_wrapper = MetricsWrapper(backend, "sentry_metrics.indexer")
     configure_metrics(metrics_wrapper)
 
+    if options["factory_name"] == "shared-memory":
+        from sentry.sentry_metrics.consumers.indexer.shared_memory import (
+            get_streaming_metrics_consumer,
+        )
+    else:
+        from sentry.sentry_metrics.consumers.indexer.multiprocess import (
+            get_streaming_metrics_consumer,
+        )
+
     streamer = get_streaming_metrics_consumer(indexer_profile=ingest_config, **options)
 
     def handler(signum, frame):
@@ -6,7 +6,7 @@ import sys
 import click
 from django.conf import settings
 
-from sentry.utils import metrics, warnings
+from sentry.utils import json, metrics, warnings
 from sentry.utils.sdk import configure_sdk
 from sentry.utils.warnings import DeprecatedSettingWarning
 
@@ -311,6 +311,8 @@ def initialize_app(config, skip_service_validation=False):
 
     bootstrap_options(settings, config["options"])
 
+    json.set_default_codec(settings.SENTRY_JSON_CODEC)
+
     configure_structlog()
 
     # Commonly setups don't correctly configure themselves for production envs
@@ -523,6 +525,7 @@ def bind_cache_to_option_store():
     from sentry.options import default_store
 
     default_store.cache = default_cache
+    default_store.version_check_interval = settings.SENTRY_OPTIONS_VERSION_CHECK_INTERVAL
 
 
 def apply_legacy_settings(settings):
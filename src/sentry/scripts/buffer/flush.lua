@@ -0,0 +1,24 @@
+-- Reads and removes a set of buffer hashes in a single round trip.
+--
+-- KEYS: pairs of (buffer key, pending key) for every buffer key that is
+-- being flushed.
+--
+-- Returns a list containing the flattened contents of every buffer hash, in
+-- the same order as the keys that were provided. Hashes that have already
+-- been flushed by another worker are returned as empty lists.
+local results = {}
+
+for i = 1, #KEYS, 2 do
+    local key = KEYS[i]
+    local pending_key = KEYS[i + 1]
+
+    local values = redis.call('HGETALL', key)
+    if #values > 0 then
+        redis.call('DEL', key)
+    end
+    redis.call('ZREM', pending_key, key)
+
+    table.insert(results, values)
+end
+
+return results
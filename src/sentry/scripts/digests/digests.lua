@@ -294,19 +294,33 @@ local function digest_timeline(configuration, timeline_id, timeline_capacity)
         redis.call('EXPIRE', digest_key, configuration.ttl)
     end
 
-    local results = {}
+    local record_ids = {}
+    local scores = {}
     local records = redis.call('ZREVRANGE', digest_key, 0, -1, 'WITHSCORES')
     local i = 0
     for key, score in zrange_scored_iterator(records) do
         i = i + 1
-        results[i] = {
-            key,
-            redis.call('GET', configuration:get_timeline_record_key(timeline_id, key)),
-            score
-        }
+        record_ids[i] = key
+        scores[i] = score
     end
 
-    return results
+    -- The record values are fetched in chunks, since the number of arguments
+    -- that can be unpacked into a single call is limited. Missing values are
+    -- returned as ``false``, which keeps the columns aligned.
+    local values = {}
+    local length = 0
+    for _, chunk_iterator in chunked(1000, ipairs(record_ids)) do
+        local record_key_chunk = {}
+        local chunk_length = 0
+        for j, _, record_id in chunk_iterator do
+            record_key_chunk[j] = configuration:get_timeline_record_key(timeline_id, record_id)
+            chunk_length = j
+        end
+        table_extend(values, redis.call('MGET', unpack(record_key_chunk)), length)
+        length = length + chunk_length
+    end
+
+    return {record_ids, values, scores}
 end
 
 local function close_digest(configuration, timeline_id, delay_minimum, record_ids)
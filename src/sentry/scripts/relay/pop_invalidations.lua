@@ -0,0 +1,13 @@
+-- Atomically removes and returns the oldest queued project config
+-- invalidations.
+--
+-- KEYS: {queue}
+-- ARGV: {limit}
+--
+-- Returns {{scope, score, scope, score, ...}, remaining}
+
+local items = redis.call('ZRANGE', KEYS[1], 0, ARGV[1] - 1, 'WITHSCORES')
+if #items > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, ARGV[1] - 1)
+end
+return {items, redis.call('ZCARD', KEYS[1])}
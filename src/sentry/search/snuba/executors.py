@@ -9,6 +9,7 @@ from hashlib import md5
 from typing import Any, List, Mapping, Sequence, Set, Tuple, cast
 
 import sentry_sdk
+from django.core.cache import cache
 from django.utils import timezone
 from snuba_sdk import (
     Column,
@@ -108,6 +109,43 @@ class AbstractQueryExecutor(metaclass=ABCMeta):
     def postgres_only_fields(self) -> Set[str]:
         raise NotImplementedError
 
+    def get_cache_key(
+        self,
+        kind: str,
+        projects: Sequence[Project],
+        environments: Optional[Sequence[Environment]],
+        search_filters: Sequence[SearchFilter],
+        start: Optional[datetime],
+        end: datetime,
+        ttl: int,
+        *extra: Any,
+    ) -> str:
+        """
+        Returns a key for caching results of a search for ``ttl`` seconds.
+
+        The key does not depend on the order of the search filters, and the
+        time range is rounded to ``ttl`` seconds, so that the requests for the
+        following pages of a search share the key of its first request, even
+        though their time range (relative to now) has moved on.
+        """
+        key = [
+            type(self).__name__,
+            sorted(p.id for p in projects),
+            sorted(e.id for e in environments) if environments is not None else None,
+            sorted(repr(search_filter) for search_filter in search_filters),
+            int(start.timestamp()) // ttl if start is not None else None,
+            int(end.timestamp()) // ttl,
+            *extra,
+        ]
+        return "search:{}:{}".format(kind, md5(repr(key).encode("utf-8")).hexdigest())
+
+    def get_cached_hits(self, cache_key: Optional[str]) -> Optional[int]:
+        if cache_key is None:
+            return None
+        hits: Optional[int] = cache.get(cache_key)
+        metrics.incr("snuba.search.hits_cache", tags={"result": "miss" if hits is None else "hit"})
+        return hits
+
     @abstractmethod
     def query(
         self,
@@ -378,12 +416,30 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
                 paginator = DateTimePaginator(group_queryset, "-last_seen", **paginator_options)
                 metrics.incr("snuba.search.postgres_only")
                 # When its a simple django-only search, we count_hits like normal
+                hits_cache_ttl = options.get("snuba.search.hits-cache-ttl") if count_hits else 0
+                hits_cache_key = None
+                if hits_cache_ttl:
+                    hits_cache_key = self.get_cache_key(
+                        "hits",
+                        projects,
+                        environments,
+                        search_filters,
+                        date_from,
+                        end,
+                        hits_cache_ttl,
+                    )
+                hits = self.get_cached_hits(hits_cache_key)
 
                 # TODO: Add types to paginators and remove this
-                return cast(
+                result = cast(
                     CursorResult[Group],
-                    paginator.get_result(limit, cursor, count_hits=count_hits, max_hits=max_hits),
+                    paginator.get_result(
+                        limit, cursor, count_hits=count_hits, known_hits=hits, max_hits=max_hits
+                    ),
                 )
+                if hits_cache_key is not None and hits is None:
+                    cache.set(hits_cache_key, result.hits, hits_cache_ttl)
+                return result
 
         # TODO: Presumably we only want to search back to the project's max
         # retention date, which may be closer than 90 days in the past, but
@@ -407,6 +463,30 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             # is invalid.
             return self.empty_result
 
+        # The groups of the first page of a search are fetched along with the
+        # groups of the following pages, which are then served from the cache
+        # (including the hits of the first page.)
+        prefetch_pages = options.get("snuba.search.prefetch-pages")
+        prefetch_ttl = options.get("snuba.search.prefetch-cache-ttl")
+        prefetch_cache_key = None
+        if prefetch_pages and prefetch_ttl:
+            prefetch_cache_key = self.get_cache_key(
+                "prefetch",
+                projects,
+                environments,
+                search_filters,
+                start,
+                end,
+                prefetch_ttl,
+                sort_by,
+            )
+            if cursor is not None and not cursor.is_prev:
+                prefetched_results = self.get_prefetched_results(
+                    prefetch_cache_key, limit, cursor, count_hits, paginator_options, max_hits
+                )
+                if prefetched_results is not None:
+                    return prefetched_results
+
         # Here we check if all the django filters reduce the set of groups down
         # to something that we can send down to Snuba in a `group_id IN (...)`
         # clause.
@@ -441,26 +521,39 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         sort_field = self.sort_strategies[sort_by]
         chunk_growth = options.get("snuba.search.chunk-growth-rate")
         max_chunk_size = options.get("snuba.search.max-chunk-size")
-        chunk_limit = limit
+        # fetch the groups of the pages to prefetch as well
+        min_results = limit
+        if prefetch_cache_key is not None and cursor is None:
+            min_results = limit * (1 + prefetch_pages)
+        chunk_limit = min_results
         offset = 0
         num_chunks = 0
-        hits = self.calculate_hits(
-            group_ids,
-            too_many_candidates,
-            sort_field,
-            projects,
-            retention_window_start,
-            group_queryset,
-            environments,
-            sort_by,
-            limit,
-            cursor,
-            count_hits,
-            paginator_options,
-            search_filters,
-            start,
-            end,
-        )
+
+        hits_cache_ttl = options.get("snuba.search.hits-cache-ttl") if count_hits else 0
+        hits_cache_key = None
+        if hits_cache_ttl:
+            hits_cache_key = self.get_cache_key(
+                "hits", projects, environments, search_filters, start, end, hits_cache_ttl
+            )
+        hits = cached_hits = self.get_cached_hits(hits_cache_key)
+        if hits is None:
+            hits = self.calculate_hits(
+                group_ids,
+                too_many_candidates,
+                sort_field,
+                projects,
+                retention_window_start,
+                group_queryset,
+                environments,
+                sort_by,
+                limit,
+                cursor,
+                count_hits,
+                paginator_options,
+                search_filters,
+                start,
+                end,
+            )
         if count_hits and hits == 0:
             return self.empty_result
 
@@ -541,6 +634,7 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             # break the query loop for one of three reasons:
             # * we started with Postgres candidates and so only do one Snuba query max
             # * the paginator is returning enough results to satisfy the query (>= the limit)
+            #   and enough groups were found for the pages to prefetch
             # * there are no more groups in Snuba to post-filter
             # TODO do we actually have to rebuild this SequencePaginator every time
             # or can we just make it after we've broken out of the loop?
@@ -548,9 +642,79 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
                 [(score, id) for (id, score) in result_groups], reverse=True, **paginator_options
             ).get_result(limit, cursor, known_hits=hits, max_hits=max_hits)
 
-            if group_ids or len(paginator_results.results) >= limit or not more_results:
+            if (
+                group_ids
+                or (len(paginator_results.results) >= limit and len(result_groups) >= min_results)
+                or not more_results
+            ):
                 break
 
+        metrics.timing("snuba.search.num_chunks", num_chunks)
+
+        if hits_cache_key is not None and cached_hits is None and hits is not None:
+            cache.set(hits_cache_key, hits, hits_cache_ttl)
+
+        if (
+            prefetch_cache_key is not None
+            and cursor is None
+            and len(result_groups) > len(paginator_results.results)
+        ):
+            cache.set(
+                prefetch_cache_key,
+                {
+                    "groups": result_groups,
+                    # with candidates, all matching groups were fetched at once
+                    "more_results": more_results and not group_ids,
+                    "hits": hits if count_hits else None,
+                },
+                prefetch_ttl,
+            )
+
+        return self.get_groups(paginator_results, limit, cursor, more_results)
+
+    def get_prefetched_results(
+        self,
+        cache_key: str,
+        limit: int,
+        cursor: Cursor,
+        count_hits: bool,
+        paginator_options: Mapping[str, Any],
+        max_hits: Optional[int],
+    ) -> Optional[CursorResult[Group]]:
+        """
+        Returns the page at ``cursor`` from the groups prefetched along with
+        the first page of the search, or ``None`` if they do not cover it.
+        """
+        prefetched = cache.get(cache_key)
+        if prefetched is None or (count_hits and prefetched["hits"] is None):
+            metrics.incr("snuba.search.prefetch", tags={"result": "miss"})
+            return None
+
+        paginator_results = SequencePaginator(
+            [(score, id) for (id, score) in prefetched["groups"]],
+            reverse=True,
+            **paginator_options,
+        ).get_result(
+            limit,
+            cursor,
+            known_hits=prefetched["hits"] if count_hits else None,
+            max_hits=max_hits,
+        )
+        if len(paginator_results.results) < limit and prefetched["more_results"]:
+            # the page reaches past the prefetched groups
+            metrics.incr("snuba.search.prefetch", tags={"result": "partial"})
+            return None
+
+        metrics.incr("snuba.search.prefetch", tags={"result": "hit"})
+        return self.get_groups(paginator_results, limit, cursor, prefetched["more_results"])
+
+    def get_groups(
+        self,
+        paginator_results: CursorResult[Any],
+        limit: int,
+        cursor: Cursor | None,
+        more_results: bool,
+    ) -> CursorResult[Group]:
         # HACK: We're using the SequencePaginator to mask the complexities of going
         # back and forth between two databases. This causes a problem with pagination
         # because we're 'lying' to the SequencePaginator (it thinks it has the entire
@@ -570,12 +734,11 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             # more results.
             paginator_results.prev.has_results = True
 
-        metrics.timing("snuba.search.num_chunks", num_chunks)
-
         groups = Group.objects.in_bulk(paginator_results.results)
         paginator_results.results = [groups[k] for k in paginator_results.results if k in groups]
 
-        return paginator_results
+        # TODO: Add types to paginators and remove this
+        return cast(CursorResult[Group], paginator_results)
 
     def calculate_hits(
         self,
@@ -17,7 +17,7 @@ from django.conf import settings
 
 from sentry.sentry_metrics.configuration import MetricsIngestConfiguration
 from sentry.sentry_metrics.consumers.indexer.common import BatchMessages, MessageBatch, get_config
-from sentry.sentry_metrics.consumers.indexer.processing import process_messages
+from sentry.sentry_metrics.consumers.indexer.processing import process_messages, warm_up_indexer
 from sentry.utils import kafka_config
 from sentry.utils.batching_kafka_consumer import create_topics
 
@@ -258,6 +258,8 @@ def get_streaming_metrics_consumer(
     **options: Mapping[str, Union[str, int]],
 ) -> StreamProcessor:
     assert factory_name == "default"
+    warm_up_indexer(indexer_profile.use_case_id)
+
     processing_factory = BatchConsumerStrategyFactory(
         max_batch_size=max_batch_size,
         max_batch_time=max_batch_time,
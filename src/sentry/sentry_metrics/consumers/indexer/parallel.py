@@ -11,10 +11,10 @@ from arroyo.processing.strategies.streaming.transform import ParallelTransformSt
 from arroyo.types import Partition, Position, Topic
 from django.conf import settings
 
-from sentry.sentry_metrics.configuration import MetricsIngestConfiguration
+from sentry.sentry_metrics.configuration import MetricsIngestConfiguration, UseCaseKey
 from sentry.sentry_metrics.consumers.indexer.common import BatchMessages, get_config
 from sentry.sentry_metrics.consumers.indexer.multiprocess import SimpleProduceStep
-from sentry.sentry_metrics.consumers.indexer.processing import process_messages
+from sentry.sentry_metrics.consumers.indexer.processing import process_messages, warm_up_indexer
 from sentry.utils.batching_kafka_consumer import create_topics
 
 
@@ -25,11 +25,14 @@ def get_metrics():  # type: ignore
     return metrics
 
 
-def initializer() -> None:
+def initializer(use_case_id: UseCaseKey) -> None:
     from sentry.runner import configure
 
     configure()
 
+    # Every subprocess has its own local indexer cache.
+    warm_up_indexer(use_case_id)
+
 
 class MetricsConsumerStrategyFactory(ProcessingStrategyFactory):  # type: ignore
     def __init__(
@@ -74,7 +77,7 @@ class MetricsConsumerStrategyFactory(ProcessingStrategyFactory):  # type: ignore
             max_batch_time=self.__max_batch_time,
             input_block_size=self.__input_block_size,
             output_block_size=self.__output_block_size,
-            initializer=initializer,
+            initializer=partial(initializer, self.__config.use_case_id),
         )
 
         strategy = BatchMessages(parallel_strategy, self.__max_batch_time, self.__max_batch_size)
@@ -25,6 +25,20 @@ def get_indexer():  # type: ignore
     return indexer
 
 
+def warm_up_indexer(use_case_id: UseCaseKey) -> None:
+    """
+    Preload the indexer's local cache. Failures are logged and otherwise
+    ignored, as the consumer works without a warm cache.
+    """
+    try:
+        with get_metrics().timer("metrics_consumer.warm_up"):
+            loaded = get_indexer().warm_up(use_case_id=use_case_id)
+    except Exception:
+        logger.exception("Failed to warm up the indexer cache")
+    else:
+        logger.info("Loaded %d strings into the indexer cache", loaded)
+
+
 def process_messages(
     use_case_id: UseCaseKey,
     outer_message: Message[MessageBatch],
@@ -0,0 +1,410 @@
+"""
+A multiprocess indexer consumer that only sends the strings to index to its
+worker processes.
+
+The ``ParallelTransformStep`` used by the ``multiprocess`` factory copies
+every batch (including all message payloads) to a worker process and the
+re-serialized messages back, so most of the CPU time of the parent is spent
+pickling and copying payloads. Here the parent parses the batch and writes
+the unique strings of each organization into a shared memory block. The
+worker resolves them and writes back only the resolved ids (and their fetch
+metadata) into a second block, from which the parent builds the output
+messages.
+"""
+
+import functools
+import logging
+import time
+from collections import deque
+from functools import partial
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+from multiprocessing.shared_memory import SharedMemory
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import msgpack
+from arroyo.backends.kafka import KafkaConsumer, KafkaPayload
+from arroyo.processing import StreamProcessor
+from arroyo.processing.strategies import MessageRejected
+from arroyo.processing.strategies import ProcessingStrategy
+from arroyo.processing.strategies import ProcessingStrategy as ProcessingStep
+from arroyo.processing.strategies import ProcessingStrategyFactory
+from arroyo.types import Message, Partition, Position, Topic
+from django.conf import settings
+
+from sentry.sentry_metrics.configuration import MetricsIngestConfiguration, UseCaseKey
+from sentry.sentry_metrics.consumers.indexer.batch import IndexerBatch
+from sentry.sentry_metrics.consumers.indexer.common import BatchMessages, MessageBatch, get_config
+from sentry.sentry_metrics.consumers.indexer.multiprocess import SimpleProduceStep
+from sentry.sentry_metrics.consumers.indexer.parallel import initializer
+from sentry.sentry_metrics.consumers.indexer.processing import get_indexer
+from sentry.sentry_metrics.indexer.base import FetchType, FetchTypeExt, Metadata
+from sentry.utils.batching_kafka_consumer import create_topics
+
+logger = logging.getLogger(__name__)
+
+# The strings of a batch, grouped by organization: [(org_id, [string, ...]), ...]
+StringTable = Sequence[Tuple[int, Sequence[str]]]
+
+# The resolved ids of a ``StringTable``, in the same order as its strings:
+# [[(id, fetch type, is global) or None, ...], ...], where ``None`` means that
+# the indexer did not return a result for the string.
+ResolvedTable = Sequence[Sequence[Optional[Tuple[Optional[int], Optional[str], Optional[bool]]]]]
+
+
+@functools.lru_cache(maxsize=10)
+def get_metrics():  # type: ignore
+    from sentry.utils import metrics
+
+    return metrics
+
+
+def build_string_table(org_strings: Mapping[int, Set[str]]) -> StringTable:
+    return [(org_id, list(strings)) for org_id, strings in org_strings.items()]
+
+
+def _write(block: SharedMemory, data: bytes) -> bool:
+    if len(data) > block.size:
+        return False
+    block.buf[: len(data)] = data
+    return True
+
+
+# Shared memory blocks attached to by this (worker) process, by name. The
+# parent reuses its blocks for every batch, so they are only attached once.
+_attached_blocks: Dict[str, SharedMemory] = {}
+
+
+def _attach(name: str) -> SharedMemory:
+    try:
+        return _attached_blocks[name]
+    except KeyError:
+        block = _attached_blocks[name] = SharedMemory(name=name)
+        return block
+
+
+def resolve_strings(
+    use_case_id: UseCaseKey,
+    input_block: str,
+    input: Union[int, bytes],
+    output_block: str,
+) -> Union[int, bytes]:
+    """
+    Resolves the ids of a ``StringTable`` that was written to
+    ``input_block``.
+
+    ``input`` is either the length of the encoded table in the input block
+    or, if it did not fit into the block, the encoded table itself. Returns
+    the length of the encoded ``ResolvedTable`` in ``output_block`` or, if
+    it does not fit, the encoded table.
+    """
+    if isinstance(input, int):
+        table: StringTable = msgpack.unpackb(_attach(input_block).buf[:input])
+    else:
+        table = msgpack.unpackb(input)
+
+    metrics = get_metrics()
+    with metrics.timer("metrics_consumer.bulk_record"):
+        record_result = get_indexer().bulk_record(
+            use_case_id=use_case_id,
+            org_strings={org_id: set(strings) for org_id, strings in table},
+        )
+
+    mapping = record_result.get_mapped_results()
+    fetch_metadata = record_result.get_fetch_metadata()
+
+    resolved = []
+    for org_id, strings in table:
+        org_mapping = mapping.get(org_id, {})
+        org_metadata = fetch_metadata.get(org_id, {})
+        org_resolved: List[Optional[Tuple[Optional[int], Optional[str], Optional[bool]]]] = []
+        for string in strings:
+            if string not in org_mapping:
+                org_resolved.append(None)
+                continue
+
+            metadata = org_metadata.get(string)
+            if metadata is None:
+                org_resolved.append((org_mapping[string], None, None))
+            else:
+                org_resolved.append(
+                    (
+                        metadata.id,
+                        metadata.fetch_type.value,
+                        metadata.fetch_type_ext.is_global if metadata.fetch_type_ext else None,
+                    )
+                )
+        resolved.append(org_resolved)
+
+    data = msgpack.packb(resolved)
+    if _write(_attach(output_block), data):
+        return len(data)
+
+    metrics.incr("metrics_consumer.shared_memory.overflow", tags={"block": "output"})
+    return data
+
+
+def read_resolved_table(
+    table: StringTable, resolved: ResolvedTable
+) -> Tuple[Mapping[int, Mapping[str, Optional[int]]], Mapping[int, Mapping[str, Metadata]]]:
+    """
+    Turns a ``ResolvedTable`` back into the mapping and fetch metadata that
+    ``IndexerBatch.reconstruct_messages`` expects.
+    """
+    mapping: MutableMapping[int, MutableMapping[str, Optional[int]]] = {}
+    bulk_record_meta: MutableMapping[int, MutableMapping[str, Metadata]] = {}
+    for (org_id, strings), org_resolved in zip(table, resolved):
+        org_mapping: MutableMapping[str, Optional[int]] = {}
+        org_metadata: MutableMapping[str, Metadata] = {}
+        for string, entry in zip(strings, org_resolved):
+            if entry is None:
+                continue
+
+            id, fetch_type, is_global = entry
+            org_mapping[string] = id
+            if fetch_type is not None:
+                org_metadata[string] = Metadata(
+                    id=id,
+                    fetch_type=FetchType(fetch_type),
+                    fetch_type_ext=FetchTypeExt(is_global) if is_global is not None else None,
+                )
+
+        # Like ``KeyResults.get_mapped_results``, only include organizations
+        # that have results.
+        if org_mapping:
+            mapping[org_id] = org_mapping
+        bulk_record_meta[org_id] = org_metadata
+    return mapping, bulk_record_meta
+
+
+class BlockPair(NamedTuple):
+    input: SharedMemory
+    output: SharedMemory
+
+
+class PendingBatch(NamedTuple):
+    batch: IndexerBatch
+    table: StringTable
+    blocks: BlockPair
+    result: AsyncResult
+    submitted_at: float
+
+
+class SharedMemoryTransformStep(ProcessingStep[MessageBatch]):  # type: ignore
+    """
+    Indexes batches of messages in a pool of worker processes, passing only
+    the strings of each batch to the workers (see the module docstring.)
+
+    Every in-flight batch uses one pair of input and output blocks, up to
+    two batches per process are in flight at once. Batches are forwarded to
+    the next step in the order they were submitted.
+    """
+
+    def __init__(
+        self,
+        next_step: ProcessingStep[KafkaPayload],
+        config: MetricsIngestConfiguration,
+        processes: int,
+        input_block_size: int,
+        output_block_size: int,
+        initializer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.__next_step = next_step
+        self.__use_case_id = config.use_case_id
+        self.__pool = Pool(processes, initializer=initializer)
+        self.__blocks = [
+            BlockPair(
+                SharedMemory(create=True, size=input_block_size),
+                SharedMemory(create=True, size=output_block_size),
+            )
+            for _ in range(processes * 2)
+        ]
+        self.__free_blocks = list(self.__blocks)
+        self.__pending: Deque[PendingBatch] = deque()
+        self.__closed = False
+        self.__metrics = get_metrics()
+
+    def __forward(self, pending: PendingBatch, output: Union[int, bytes]) -> None:
+        if isinstance(output, int):
+            resolved = msgpack.unpackb(pending.blocks.output.buf[:output])
+        else:
+            resolved = msgpack.unpackb(output)
+        self.__free_blocks.append(pending.blocks)
+
+        mapping, bulk_record_meta = read_resolved_table(pending.table, resolved)
+        for message in pending.batch.reconstruct_messages(mapping, bulk_record_meta):
+            self.__next_step.submit(message)
+
+        self.__metrics.timing(
+            "metrics_consumer.shared_memory.batch_latency", time.time() - pending.submitted_at
+        )
+
+    def __forward_completed(self, timeout: Optional[float] = None) -> None:
+        deadline = time.time() + timeout if timeout is not None else None
+        while self.__pending:
+            pending = self.__pending[0]
+            if deadline is None:
+                if not pending.result.ready():
+                    return
+                output = pending.result.get()
+            else:
+                output = pending.result.get(timeout=max(deadline - time.time(), 0))
+            self.__pending.popleft()
+            self.__forward(pending, output)
+
+    def poll(self) -> None:
+        self.__forward_completed()
+        self.__next_step.poll()
+
+    def submit(self, message: Message[MessageBatch]) -> None:
+        assert not self.__closed
+
+        if not self.__free_blocks:
+            self.__forward_completed()
+            if not self.__free_blocks:
+                raise MessageRejected
+
+        batch = IndexerBatch(self.__use_case_id, message)
+        table = build_string_table(batch.extract_strings())
+
+        blocks = self.__free_blocks.pop()
+        data = msgpack.packb(table)
+        input: Union[int, bytes] = len(data)
+        if not _write(blocks.input, data):
+            self.__metrics.incr("metrics_consumer.shared_memory.overflow", tags={"block": "input"})
+            input = data
+
+        result = self.__pool.apply_async(
+            resolve_strings,
+            (self.__use_case_id, blocks.input.name, input, blocks.output.name),
+        )
+        self.__pending.append(PendingBatch(batch, table, blocks, result, time.time()))
+
+    def close(self) -> None:
+        self.__closed = True
+
+    def __release(self) -> None:
+        for block_pair in self.__blocks:
+            for block in block_pair:
+                block.close()
+                block.unlink()
+        self.__blocks = []
+        self.__free_blocks = []
+
+    def terminate(self) -> None:
+        self.__closed = True
+
+        logger.debug("Terminating %r...", self.__pool)
+        self.__pool.terminate()
+        self.__release()
+
+        logger.debug("Terminating %r...", self.__next_step)
+        self.__next_step.terminate()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        start = time.time()
+        self.__forward_completed(timeout)
+
+        self.__pool.close()
+        self.__pool.join()
+        self.__release()
+
+        self.__next_step.close()
+        self.__next_step.join(max(timeout - (time.time() - start), 0) if timeout else timeout)
+
+
+class SharedMemoryStrategyFactory(ProcessingStrategyFactory):  # type: ignore
+    def __init__(
+        self,
+        max_batch_size: int,
+        max_batch_time: float,
+        processes: int,
+        input_block_size: int,
+        output_block_size: int,
+        commit_max_batch_size: int,
+        commit_max_batch_time: float,
+        config: MetricsIngestConfiguration,
+    ):
+        self.__config = config
+        self.__max_batch_time = max_batch_time
+        self.__max_batch_size = max_batch_size
+
+        self.__processes = processes
+
+        self.__input_block_size = input_block_size
+        self.__output_block_size = output_block_size
+
+        self.__commit_max_batch_size = commit_max_batch_size
+        self.__commit_max_batch_time = commit_max_batch_time
+
+    def create_with_partitions(
+        self,
+        commit: Callable[[Mapping[Partition, Position]], None],
+        partitions: Mapping[Partition, int],
+    ) -> ProcessingStrategy[KafkaPayload]:
+        transform_step = SharedMemoryTransformStep(
+            next_step=SimpleProduceStep(
+                commit_function=commit,
+                commit_max_batch_size=self.__commit_max_batch_size,
+                # convert to seconds
+                commit_max_batch_time=self.__commit_max_batch_time / 1000,
+                output_topic=self.__config.output_topic,
+            ),
+            config=self.__config,
+            processes=self.__processes,
+            input_block_size=self.__input_block_size,
+            output_block_size=self.__output_block_size,
+            initializer=partial(initializer, self.__config.use_case_id),
+        )
+
+        return BatchMessages(transform_step, self.__max_batch_time, self.__max_batch_size)
+
+
+def get_streaming_metrics_consumer(
+    topic: str,
+    commit_max_batch_size: int,
+    commit_max_batch_time: float,
+    max_batch_size: int,
+    max_batch_time: float,
+    processes: int,
+    input_block_size: int,
+    output_block_size: int,
+    group_id: str,
+    auto_offset_reset: str,
+    factory_name: str,
+    indexer_profile: MetricsIngestConfiguration,
+    **options: Mapping[str, Union[str, int]],
+) -> StreamProcessor:
+    assert factory_name == "shared-memory"
+    processing_factory = SharedMemoryStrategyFactory(
+        max_batch_size=max_batch_size,
+        max_batch_time=max_batch_time,
+        processes=processes,
+        input_block_size=input_block_size,
+        output_block_size=output_block_size,
+        commit_max_batch_size=commit_max_batch_size,
+        commit_max_batch_time=commit_max_batch_time,
+        config=indexer_profile,
+    )
+
+    cluster_name: str = settings.KAFKA_TOPICS[indexer_profile.input_topic]["cluster"]
+    create_topics(cluster_name, [indexer_profile.input_topic])
+
+    return StreamProcessor(
+        KafkaConsumer(get_config(indexer_profile.input_topic, group_id, auto_offset_reset)),
+        Topic(indexer_profile.input_topic),
+        processing_factory,
+    )
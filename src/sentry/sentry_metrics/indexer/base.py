@@ -198,7 +198,7 @@ class StringIndexer(Service):
     Check `sentry.snuba.metrics` for convenience functions.
     """
 
-    __all__ = ("record", "resolve", "reverse_resolve", "bulk_record")
+    __all__ = ("record", "resolve", "reverse_resolve", "bulk_record", "warm_up")
 
     def bulk_record(
         self, use_case_id: UseCaseKey, org_strings: Mapping[int, Set[str]]
@@ -242,3 +242,10 @@ class StringIndexer(Service):
         Returns None if the entry cannot be found.
         """
         raise NotImplementedError()
+
+    def warm_up(self, use_case_id: UseCaseKey) -> int:
+        """Preload frequently used strings into process-local caches.
+
+        Returns the number of strings that were loaded.
+        """
+        return 0
@@ -1,27 +1,119 @@
 import logging
 import random
-from typing import Mapping, MutableMapping, Optional, Sequence
+from typing import Mapping, MutableMapping, Optional, Sequence, Tuple
 
 from django.conf import settings
 from django.core.cache import caches
 
+from sentry.utils import metrics
 from sentry.utils.hashlib import md5_text
+from sentry.utils.lru import CacheStats, SizedLRUCache
 
 logger = logging.getLogger(__name__)
 
+_INDEXER_CACHE_LOOKUP_METRIC = "sentry_metrics.indexer.cache.lookup"
+
+# Approximate number of bytes used by a local cache entry on top of the
+# length of its key (the cached integer, the key tuple and the bookkeeping
+# done by the LRU.)
+_LOCAL_CACHE_ENTRY_OVERHEAD = 64
+
+
+def _jitter(ttl: float) -> float:
+    # introduce jitter in the ttl so that when we have large amount of new
+    # keys written into the cache, they don't expire all at once
+    return ttl + random.uniform(0, 0.25) * ttl
+
 
 class StringIndexerCache:
-    def __init__(self, version: int, cache_name: str):
+    """
+    Caches the ids of indexed strings in the shared Django cache.
+
+    If ``local_cache_size`` (in bytes) is set, a process-local LRU is kept in
+    front of the shared cache. Indexed strings never change their id, so the
+    local tier is not invalidated when other processes write to the shared
+    cache and only needs a short ``local_cache_ttl`` (in seconds) to pick up
+    deleted rows.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        cache_name: str,
+        local_cache_size: int = 0,
+        local_cache_ttl: int = 600,
+    ):
         self.version = version
         self.cache = caches[cache_name]
+        self.local_cache: Optional[SizedLRUCache[Tuple[str, str], int]] = None
+        if local_cache_size > 0:
+            self.local_cache = SizedLRUCache(local_cache_size, ttl=local_cache_ttl)
 
     @property
     def randomized_ttl(self) -> int:
-        # introduce jitter in the cache_ttl so that when we have large
-        # amount of new keys written into the cache, they don't expire all at once
-        cache_ttl = settings.SENTRY_METRICS_INDEXER_CACHE_TTL
-        jitter = random.uniform(0, 0.25) * cache_ttl
-        return int(cache_ttl + jitter)
+        return int(_jitter(settings.SENTRY_METRICS_INDEXER_CACHE_TTL))
+
+    def _get_local(
+        self, keys: Sequence[str], cache_namespace: str
+    ) -> Tuple[MutableMapping[str, int], Sequence[str]]:
+        """
+        Returns the values found in the local tier and the keys that have to
+        be looked up in the shared cache.
+        """
+        if self.local_cache is None:
+            return {}, keys
+
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local_cache.get((cache_namespace, key))
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+
+        self._record_lookup("local", hits=len(found), misses=len(missing))
+        return found, missing
+
+    def _set_local(self, key_values: Mapping[str, int], cache_namespace: str) -> None:
+        if self.local_cache is None:
+            return
+
+        ttl = _jitter(self.local_cache.ttl)
+        for key, value in key_values.items():
+            self.local_cache.set(
+                (cache_namespace, key),
+                value,
+                ttl=ttl,
+                size=len(cache_namespace) + len(key) + _LOCAL_CACHE_ENTRY_OVERHEAD,
+            )
+
+    def _record_lookup(self, tier: str, hits: int, misses: int) -> None:
+        if hits:
+            metrics.incr(
+                _INDEXER_CACHE_LOOKUP_METRIC, tags={"tier": tier, "cache_hit": "true"}, amount=hits
+            )
+        if misses:
+            metrics.incr(
+                _INDEXER_CACHE_LOOKUP_METRIC,
+                tags={"tier": tier, "cache_hit": "false"},
+                amount=misses,
+            )
+
+    def get_local_stats(self) -> Optional[CacheStats]:
+        if self.local_cache is None:
+            return None
+        return self.local_cache.get_stats()
+
+    def warm(self, key_values: Mapping[str, int], cache_namespace: str) -> int:
+        """
+        Preload the local tier, returning the number of entries that were
+        loaded. This does not write to the shared cache.
+        """
+        if self.local_cache is None:
+            return 0
+        self._set_local(key_values, cache_namespace)
+        return len(key_values)
 
     def make_cache_key(self, key: str, cache_namespace: str) -> str:
         hashed = md5_text(key).hexdigest()
@@ -46,10 +138,7 @@ class StringIndexerCache:
         return formatted
 
     def get(self, key: str, cache_namespace: str) -> int:
-        result: int = self.cache.get(
-            self.make_cache_key(key, cache_namespace), version=self.version
-        )
-        return result
+        return self.get_many([key], cache_namespace)[key]  # type: ignore
 
     def set(self, key: str, value: int, cache_namespace: str) -> None:
         self.cache.set(
@@ -58,29 +147,43 @@ class StringIndexerCache:
             timeout=self.randomized_ttl,
             version=self.version,
         )
+        self._set_local({key: value}, cache_namespace)
 
     def get_many(
         self, keys: Sequence[str], cache_namespace: str
     ) -> MutableMapping[str, Optional[int]]:
-        cache_keys = {self.make_cache_key(key, cache_namespace): key for key in keys}
-        results: Mapping[str, Optional[int]] = self.cache.get_many(
-            cache_keys.keys(), version=self.version
-        )
-        return self._format_results(keys, results, cache_namespace)
+        local_results, missing = self._get_local(keys, cache_namespace)
+        if not missing:
+            return {key: local_results[key] for key in keys}
+
+        cache_keys = [self.make_cache_key(key, cache_namespace) for key in missing]
+        results: Mapping[str, Optional[int]] = self.cache.get_many(cache_keys, version=self.version)
+        shared_results = self._format_results(missing, results, cache_namespace)
+
+        shared_hits = {k: v for k, v in shared_results.items() if v is not None}
+        self._set_local(shared_hits, cache_namespace)
+        self._record_lookup("shared", hits=len(shared_hits), misses=len(missing) - len(shared_hits))
+
+        return {key: local_results.get(key, shared_results.get(key)) for key in keys}
 
     def set_many(self, key_values: Mapping[str, int], cache_namespace: str) -> None:
         cache_key_values = {
             self.make_cache_key(k, cache_namespace): v for k, v in key_values.items()
         }
         self.cache.set_many(cache_key_values, timeout=self.randomized_ttl, version=self.version)
+        self._set_local(key_values, cache_namespace)
 
     def delete(self, key: str, cache_namespace: str) -> None:
         cache_key = self.make_cache_key(key, cache_namespace)
         self.cache.delete(cache_key, version=self.version)
+        if self.local_cache is not None:
+            self.local_cache.delete((cache_namespace, key))
 
     def delete_many(self, keys: Sequence[str], cache_namespace: str) -> None:
         cache_keys = [self.make_cache_key(key, cache_namespace) for key in keys]
         self.cache.delete_many(cache_keys, version=self.version)
+        if self.local_cache is not None:
+            self.local_cache.delete_many((cache_namespace, key) for key in keys)
 
 
 # todo: dont hard code 1 as the version
@@ -1,7 +1,8 @@
 from functools import reduce
 from operator import or_
-from typing import Any, Mapping, Optional, Set
+from typing import Any, Dict, Mapping, MutableMapping, Optional, Set
 
+from django.conf import settings
 from django.db.models import Q
 
 from sentry.sentry_metrics.configuration import UseCaseKey, get_ingest_config
@@ -228,6 +229,40 @@ class PGStringIndexerV2(StringIndexer):
 
         return string
 
+    def warm_up(self, use_case_id: UseCaseKey) -> int:
+        """
+        Loads the most recently seen strings (up to
+        ``SENTRY_METRICS_INDEXER_WARM_UP_ORG_LIMIT`` per organization) into
+        the local tier of the indexer cache, so that a freshly started
+        consumer does not have to go to the shared cache for the strings
+        that appear in nearly every batch.
+        """
+        if indexer_cache.local_cache is None:
+            return 0
+
+        limit = settings.SENTRY_METRICS_INDEXER_WARM_UP_LIMIT
+        org_limit = settings.SENTRY_METRICS_INDEXER_WARM_UP_ORG_LIMIT
+
+        per_org: Dict[int, int] = {}
+        key_values: MutableMapping[str, int] = {}
+        with metrics.timer("sentry_metrics.indexer.warm_up"):
+            rows = (
+                self._table(use_case_id)
+                .objects.using_replica()
+                .order_by("-last_seen")
+                .values_list("organization_id", "string", "id")[:limit]
+            )
+            for org_id, string, id in rows:
+                if per_org.get(org_id, 0) >= org_limit:
+                    continue
+                per_org[org_id] = per_org.get(org_id, 0) + 1
+                key_values[f"{org_id}:{string}"] = id
+
+            loaded = indexer_cache.warm(key_values, use_case_id.value)
+
+        metrics.incr("sentry_metrics.indexer.warm_up.strings", amount=loaded)
+        return loaded
+
     def _table(self, use_case_id: UseCaseKey) -> IndexerTable:
         return TABLE_MAPPING[get_ingest_config(use_case_id).db_model]
 
@@ -285,3 +320,6 @@ class StaticStringsIndexerDecorator(StringIndexer):
         if id in REVERSE_SHARED_STRINGS:
             return REVERSE_SHARED_STRINGS[id]
         return self.indexer.reverse_resolve(use_case_id=use_case_id, id=id)
+
+    def warm_up(self, use_case_id: UseCaseKey) -> int:
+        return self.indexer.warm_up(use_case_id)
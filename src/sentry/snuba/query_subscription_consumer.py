@@ -1,8 +1,9 @@
 import logging
 import re
 import time
+from collections import defaultdict
 from random import random
-from typing import Any, Callable, Dict, Iterable, List, Optional, cast
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, cast
 
 import jsonschema
 import pytz
@@ -23,7 +24,10 @@ logger = logging.getLogger(__name__)
 
 TQuerySubscriptionCallable = Callable[[Dict[str, Any], QuerySubscription], None]
 
+TQuerySubscriptionBatchCallable = Callable[[List[Tuple[Dict[str, Any], QuerySubscription]]], None]
+
 subscriber_registry: Dict[str, TQuerySubscriptionCallable] = {}
+batch_subscriber_registry: Dict[str, TQuerySubscriptionBatchCallable] = {}
 
 
 def register_subscriber(
@@ -38,6 +42,24 @@ def register_subscriber(
     return inner
 
 
+def register_batch_subscriber(
+    subscriber_key: str,
+) -> Callable[[TQuerySubscriptionBatchCallable], TQuerySubscriptionBatchCallable]:
+    """
+    Registers a callback that receives a list of ``(contents, subscription)`` updates at
+    once, when batching is enabled via ``subscriptions-query.batch-size``. A regular
+    subscriber must be registered for the same key as well.
+    """
+
+    def inner(func: TQuerySubscriptionBatchCallable) -> TQuerySubscriptionBatchCallable:
+        if subscriber_key in batch_subscriber_registry:
+            raise Exception("Batch handler already registered for %s" % subscriber_key)
+        batch_subscriber_registry[subscriber_key] = func
+        return func
+
+    return inner
+
+
 class InvalidMessageError(Exception):
     pass
 
@@ -87,6 +109,9 @@ class QuerySubscriptionConsumer:
         self.initial_offset_reset = initial_offset_reset
         self.offsets: Dict[int, Optional[int]] = {}
         self.consumer: Consumer = None
+        # Updates waiting for a batch subscriber. These are always flushed before offsets
+        # are committed.
+        self.pending_updates: List[Tuple[Dict[str, Any], QuerySubscription]] = []
         self.cluster_options = kafka_config.get_kafka_consumer_cluster_options(
             self.cluster_name,
             {
@@ -169,6 +194,8 @@ class QuerySubscriptionConsumer:
         while not self.__shutdown_requested:
             message = self.consumer.poll(0.1)
             if message is None:
+                # Don't hold back a partial batch while the topic is idle
+                self.flush_updates()
                 continue
 
             error = message.error()
@@ -217,6 +244,8 @@ class QuerySubscriptionConsumer:
         self.__batch_deadline = None
 
     def commit_offsets(self, partitions: Optional[Iterable[int]] = None) -> None:
+        self.flush_updates()
+
         logger.info(
             "query-subscription-consumer.commit_offsets",
             extra={"offsets": str(self.offsets), "partitions": str(partitions)},
@@ -240,6 +269,43 @@ class QuerySubscriptionConsumer:
     def shutdown(self) -> None:
         self.__shutdown_requested = True
 
+    def flush_updates(self) -> None:
+        """
+        Passes all pending updates to the batch subscribers of their subscription types.
+        """
+        if not self.pending_updates:
+            return
+
+        updates_by_type: Dict[str, List[Tuple[Dict[str, Any], QuerySubscription]]] = defaultdict(
+            list
+        )
+        for contents, subscription in self.pending_updates:
+            updates_by_type[subscription.type].append((contents, subscription))
+        self.pending_updates = []
+
+        for subscription_type, updates in updates_by_type.items():
+            callback = batch_subscriber_registry[subscription_type]
+            with sentry_sdk.start_span(op="process_messages") as span, metrics.timer(
+                "snuba_query_subscriber.batch_callback.duration", instance=subscription_type
+            ):
+                span.set_data("batch_size", len(updates))
+                metrics.timing(
+                    "snuba_query_subscriber.batch_size",
+                    len(updates),
+                    tags={"type": subscription_type},
+                )
+                try:
+                    callback(updates)
+                except Exception:
+                    # Same failsafe as for single messages, a batch must not block the consumer.
+                    logger.exception(
+                        "Unexpected error while handling batch of updates in QuerySubscriptionConsumer. Skipping batch.",
+                        extra={
+                            "subscription_type": subscription_type,
+                            "subscription_ids": [c["subscription_id"] for c, _ in updates],
+                        },
+                    )
+
     def handle_message(self, message: Message) -> None:
         """
         Parses the value from Kafka, and if valid passes the payload to the callback defined by the
@@ -333,6 +399,13 @@ class QuerySubscriptionConsumer:
                 )
                 return
 
+            batch_size = options.get("subscriptions-query.batch-size")
+            if batch_size > 1 and subscription.type in batch_subscriber_registry:
+                self.pending_updates.append((contents, subscription))
+                if len(self.pending_updates) >= batch_size:
+                    self.flush_updates()
+                return
+
             sentry_sdk.set_tag("project_id", subscription.project_id)
             sentry_sdk.set_tag("query_subscription_id", contents["subscription_id"])
 
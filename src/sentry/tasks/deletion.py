@@ -97,6 +97,7 @@ def run_deletion(deletion_id, first_pass=True):
         query={"id": deletion.object_id},
         transaction_id=deletion.guid,
         actor_id=deletion.actor_id,
+        engine=deletions.get_engine(transaction_id=deletion.guid, actor_id=deletion.actor_id),
     )
 
     if not task.should_proceed(instance):
@@ -151,7 +152,10 @@ def delete_groups(object_ids, transaction_id=None, eventstream_state=None, **kwa
     current_batch, rest = object_ids[:max_batch_size], object_ids[max_batch_size:]
 
     task = deletions.get(
-        model=Group, query={"id__in": current_batch}, transaction_id=transaction_id
+        model=Group,
+        query={"id__in": current_batch},
+        transaction_id=transaction_id,
+        engine=deletions.get_engine(transaction_id=transaction_id),
     )
     has_more = task.chunk()
     if has_more or rest:
@@ -29,3 +29,7 @@ def sync_options(cutoff=ONE_HOUR):
             default_manager.store.set_cache(opt, option.value)
         except UnknownOption as e:
             logger.exception(str(e))
+
+    # Repair the published version of the options, in case publishing it
+    # failed when the options were changed.
+    default_manager.store.publish_version()
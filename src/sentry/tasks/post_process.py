@@ -86,26 +86,29 @@ def _capture_stats(event, is_new):
             metrics.incr("events.platform_mismatch", tags=tags)
 
 
-def handle_owner_assignment(project, group, event):
+def handle_owner_assignment(project, group, event, local_cache=None):
     from sentry.models import GroupAssignee, ProjectOwnership
 
+    if local_cache is None:
+        local_cache = cache
+
     with metrics.timer("post_process.handle_owner_assignment"):
         with sentry_sdk.start_span(op="post_process.handle_owner_assignment.cache_set_owner"):
             owner_key = "owner_exists:1:%s" % group.id
-            owners_exists = cache.get(owner_key)
+            owners_exists = local_cache.get(owner_key)
             if owners_exists is None:
                 owners_exists = group.groupowner_set.exists()
                 # Cache for an hour if it's assigned. We don't need to move that fast.
-                cache.set(owner_key, owners_exists, 3600 if owners_exists else 60)
+                local_cache.set(owner_key, owners_exists, 3600 if owners_exists else 60)
 
         with sentry_sdk.start_span(op="post_process.handle_owner_assignment.cache_set_assignee"):
             # Is the issue already assigned to a team or user?
             assignee_key = "assignee_exists:1:%s" % group.id
-            assignees_exists = cache.get(assignee_key)
+            assignees_exists = local_cache.get(assignee_key)
             if assignees_exists is None:
                 assignees_exists = group.assignee_set.exists()
                 # Cache for an hour if it's assigned. We don't need to move that fast.
-                cache.set(assignee_key, assignees_exists, 3600 if assignees_exists else 60)
+                local_cache.set(assignee_key, assignees_exists, 3600 if assignees_exists else 60)
 
         if owners_exists and assignees_exists:
             return
@@ -232,6 +235,87 @@ def fetch_buffered_group_stats(group):
     group.times_seen_pending = result["times_seen"]
 
 
+class PrefetchedCache:
+    """
+    A view of the cache for a batch of events, see `post_process_group_batch`. The given
+    keys are fetched with a single `get_many`. Writes go to the cache as well as to the
+    prefetched values, so that later events of the batch see them.
+    """
+
+    def __init__(self, keys=()):
+        self.__keys = set(keys)
+        self.__values = cache.get_many(list(self.__keys)) if self.__keys else {}
+
+    def get(self, key):
+        if key in self.__keys:
+            return self.__values.get(key)
+        return cache.get(key)
+
+    def set(self, key, value, timeout):
+        cache.set(key, value, timeout)
+        if key in self.__keys:
+            self.__values[key] = value
+
+
+class PostProcessBatch:
+    """
+    State shared by the events of a batch, see `post_process_group_batch`. The groups,
+    rules and rule statuses of all events, as well as the cache keys read while post
+    processing them, are fetched up front with a few bulk queries.
+    """
+
+    def __init__(self, events):
+        from sentry.models import Group, GroupSnooze, GroupStatus, Rule
+        from sentry.rules.processor import RuleProcessor
+
+        group_ids = {event.group_id for event in events if event.group_id}
+        self.groups = Group.objects.in_bulk(group_ids) if group_ids else {}
+        # Rules are loaded for the projects of the events rather than their groups, which
+        # includes events whose group has been merged.
+        self.rules = Rule.get_for_projects(list({event.project_id for event in events}))
+        # Statuses are only needed for unresolved groups. Groups that are unignored while the
+        # batch is processed fetch theirs in `RuleProcessor.apply`.
+        self.rule_statuses = RuleProcessor.bulk_get_rule_statuses(
+            [
+                (group, self.rules[group.project_id])
+                for group in self.groups.values()
+                if group.status == GroupStatus.UNRESOLVED and self.rules[group.project_id]
+            ]
+        )
+
+        cache_keys = set()
+        for group_id in self.groups:
+            cache_keys.add("owner_exists:1:%s" % group_id)
+            cache_keys.add("assignee_exists:1:%s" % group_id)
+            cache_keys.add(GroupSnooze.get_cache_key(group_id))
+        for event in events:
+            cache_keys.add(f"w-o:{event.project.organization_id}-h-c")
+        self.cache = PrefetchedCache(cache_keys)
+
+    def get_group(self, group_id):
+        from sentry.models.group import get_group_with_redirect
+
+        group = self.groups.get(group_id)
+        if group is None:
+            # e.g. the group has been merged into another one
+            group, _ = get_group_with_redirect(group_id)
+        return group
+
+
+def _load_event(data, group_id):
+    from sentry.eventstore.models import Event
+    from sentry.models import EventDict
+
+    event = Event(
+        project_id=data["project"], event_id=data["event_id"], group_id=group_id, data=data
+    )
+
+    # Re-bind node data to avoid renormalization. We only want to
+    # renormalize when loading old data from the database.
+    event.data = EventDict(event.data, skip_renormalization=True)
+    return event
+
+
 @instrumented_task(
     name="sentry.tasks.post_process.post_process_group",
     time_limit=120,
@@ -243,9 +327,7 @@ def post_process_group(
     """
     Fires post processing hooks for a group.
     """
-    from sentry.eventstore.models import Event
     from sentry.eventstore.processing import event_processing_store
-    from sentry.reprocessing2 import is_reprocessed_event
     from sentry.utils import snuba
 
     with snuba.options_override({"consistent": True}):
@@ -259,19 +341,11 @@ def post_process_group(
                 extra={"cache_key": cache_key, "reason": "missing_cache"},
             )
             return
-        event = Event(
-            project_id=data["project"], event_id=data["event_id"], group_id=group_id, data=data
-        )
+        event = _load_event(data, group_id)
 
         set_current_event_project(event.project_id)
 
-        is_transaction_event = not bool(event.group_id)
-
-        from sentry.models import EventDict, Organization, Project
-
-        # Re-bind node data to avoid renormalization. We only want to
-        # renormalize when loading old data from the database.
-        event.data = EventDict(event.data, skip_renormalization=True)
+        from sentry.models import Organization, Project
 
         with metrics.timer("tasks.post_process.delete_event_cache"):
             event_processing_store.delete_by_key(cache_key)
@@ -283,183 +357,301 @@ def post_process_group(
             "organization", Organization.objects.get_from_cache(id=event.project.organization_id)
         )
 
-        # Simplified post processing for transaction events.
-        # This should eventually be completely removed and transactions
-        # will not go through any post processing.
-        if is_transaction_event:
-            transaction_processed.send_robust(
-                sender=post_process_group,
-                project=event.project,
-                event=event,
-            )
-
-            return
-
-        is_reprocessed = is_reprocessed_event(event.data)
-        sentry_sdk.set_tag("is_reprocessed", is_reprocessed)
+        _post_process_event(
+            event,
+            is_new,
+            is_regression,
+            is_new_group_environment,
+            primary_hash=kwargs.get("primary_hash"),
+        )
 
-        # NOTE: we must pass through the full Event object, and not an
-        # event_id since the Event object may not actually have been stored
-        # in the database due to sampling.
-        from sentry.models import Commit, GroupInboxReason
-        from sentry.models.group import get_group_with_redirect
-        from sentry.models.groupinbox import add_group_to_inbox
-        from sentry.rules.processor import RuleProcessor
-        from sentry.tasks.groupowner import process_suspect_commits
-        from sentry.tasks.servicehooks import process_service_hook
 
-        # Re-bind Group since we're reading the Event object
-        # from cache, which may contain a stale group and project
-        event.group, _ = get_group_with_redirect(event.group_id)
-        event.group_id = event.group.id
-        # We fetch buffered updates to group aggregates here and populate them on the Group. This
-        # helps us avoid problems with processing group ignores and alert rules that rely on these
-        # stats.
-        fetch_buffered_group_stats(event.group)
+@instrumented_task(
+    name="sentry.tasks.post_process.post_process_group_batch",
+    time_limit=300,
+    soft_time_limit=290,
+)
+def post_process_group_batch(events, **kwargs):
+    """
+    Fires post processing hooks for a batch of events, like `post_process_group` does for
+    each of them, in order. Lookups are shared by all events of the batch.
+    :param events: A list of the keyword arguments of `post_process_group` for each event
+    """
+    from sentry.eventstore.processing import event_processing_store
+    from sentry.models import Organization, Project
+    from sentry.utils import snuba
 
-        event.group.project = event.project
-        event.group.project.set_cached_field_value("organization", event.project.organization)
+    with snuba.options_override({"consistent": True}):
+        payloads = event_processing_store.get_many([event["cache_key"] for event in events])
+
+        batch = []
+        for task_kwargs in events:
+            # The payload of an event that is in the batch twice is only processed once, as
+            # if it had been deleted from the processing store by the first one.
+            data = payloads.pop(task_kwargs["cache_key"], None)
+            if not data:
+                logger.info(
+                    "post_process.skipped",
+                    extra={"cache_key": task_kwargs["cache_key"], "reason": "missing_cache"},
+                )
+                continue
+            batch.append((task_kwargs, _load_event(data, task_kwargs.get("group_id"))))
 
-        bind_organization_context(event.project.organization)
+        if not batch:
+            return
 
-        _capture_stats(event, is_new)
+        with metrics.timer("tasks.post_process.delete_event_cache"):
+            event_processing_store.delete_many_by_key(
+                [task_kwargs["cache_key"] for task_kwargs, _ in batch]
+            )
 
-        with sentry_sdk.start_span(op="tasks.post_process_group.add_group_to_inbox"):
+        # Re-bind Project and Org since we're reading the Event objects
+        # from cache which may contain stale parent models.
+        projects = {
+            project.id: project
+            for project in Project.objects.get_many_from_cache(
+                list({event.project_id for _, event in batch})
+            )
+        }
+        organizations = {
+            organization.id: organization
+            for organization in Organization.objects.get_many_from_cache(
+                list({project.organization_id for project in projects.values()})
+            )
+        }
+        for _, event in batch:
+            project = projects.get(event.project_id)
+            if project is None:
+                project = Project.objects.get_from_cache(id=event.project_id)
+            organization = organizations.get(project.organization_id)
+            if organization is None:
+                organization = Organization.objects.get_from_cache(id=project.organization_id)
+            event.project = project
+            event.project.set_cached_field_value("organization", organization)
+
+        metrics.timing("tasks.post_process.batch_size", len(batch))
+        state = PostProcessBatch([event for _, event in batch])
+
+        for task_kwargs, event in batch:
+            set_current_event_project(event.project_id)
             try:
-                if is_reprocessed and is_new:
-                    add_group_to_inbox(event.group, GroupInboxReason.REPROCESSED)
+                _post_process_event(
+                    event,
+                    task_kwargs["is_new"],
+                    task_kwargs["is_regression"],
+                    task_kwargs["is_new_group_environment"],
+                    primary_hash=task_kwargs.get("primary_hash"),
+                    batch=state,
+                )
             except Exception:
-                logger.exception("Failed to add group to inbox for reprocessed groups")
+                # An event must not prevent the rest of the batch from being processed
+                logger.exception(
+                    "post_process.batch.failed",
+                    extra={"cache_key": task_kwargs["cache_key"]},
+                )
 
-        if not is_reprocessed:
-            # we process snoozes before rules as it might create a regression
-            # but not if it's new because you can't immediately snooze a new group
-            has_reappeared = not is_new
-            try:
-                if has_reappeared:
-                    has_reappeared = process_snoozes(event.group)
-            except Exception:
-                logger.exception("Failed to process snoozes for group")
 
-            try:
-                if not has_reappeared:  # If true, we added the .UNIGNORED reason already
-                    if is_new:
-                        add_group_to_inbox(event.group, GroupInboxReason.NEW)
-                    elif is_regression:
-                        add_group_to_inbox(event.group, GroupInboxReason.REGRESSION)
-            except Exception:
-                logger.exception("Failed to add group to inbox for non-reprocessed groups")
+def _post_process_event(
+    event, is_new, is_regression, is_new_group_environment, primary_hash=None, batch=None
+):
+    """
+    Runs post processing for an event, with its project bound already.
+    :param batch: The `PostProcessBatch` the event belongs to, if any
+    """
+    from sentry.reprocessing2 import is_reprocessed_event
 
-            with sentry_sdk.start_span(op="tasks.post_process_group.handle_owner_assignment"):
-                try:
-                    handle_owner_assignment(event.project, event.group, event)
-                except Exception:
-                    logger.exception("Failed to handle owner assignments")
+    local_cache = batch.cache if batch is not None else cache
+    is_transaction_event = not bool(event.group_id)
+
+    # Simplified post processing for transaction events.
+    # This should eventually be completely removed and transactions
+    # will not go through any post processing.
+    if is_transaction_event:
+        transaction_processed.send_robust(
+            sender=post_process_group,
+            project=event.project,
+            event=event,
+        )
 
-            rp = RuleProcessor(
-                event, is_new, is_regression, is_new_group_environment, has_reappeared
-            )
-            has_alert = False
-            with sentry_sdk.start_span(op="tasks.post_process_group.rule_processor_callbacks"):
-                # TODO(dcramer): ideally this would fanout, but serializing giant
-                # objects back and forth isn't super efficient
-                for callback, futures in rp.apply():
-                    has_alert = True
-                    safe_execute(callback, event, futures, _with_transaction=False)
+        return
 
-            try:
-                lock = locks.get(
-                    f"w-o:{event.group_id}-d-l",
-                    duration=10,
-                    name="post_process_w_o",
-                )
-                with lock.acquire():
-                    has_commit_key = f"w-o:{event.project.organization_id}-h-c"
-                    org_has_commit = cache.get(has_commit_key)
-                    if org_has_commit is None:
-                        org_has_commit = Commit.objects.filter(
-                            organization_id=event.project.organization_id
-                        ).exists()
-                        cache.set(has_commit_key, org_has_commit, 3600)
-
-                    if org_has_commit:
-                        group_cache_key = f"w-o-i:g-{event.group_id}"
-                        if cache.get(group_cache_key):
-                            metrics.incr(
-                                "sentry.tasks.process_suspect_commits.debounce",
-                                tags={"detail": "w-o-i:g debounce"},
-                            )
-                        else:
-                            from sentry.utils.committers import get_frame_paths
-
-                            cache.set(group_cache_key, True, 604800)  # 1 week in seconds
-                            event_frames = get_frame_paths(event)
-                            sdk_name = get_sdk_name(event.data)
-                            process_suspect_commits.delay(
-                                event_id=event.event_id,
-                                event_platform=event.platform,
-                                event_frames=event_frames,
-                                group_id=event.group_id,
-                                project_id=event.project_id,
-                                sdk_name=sdk_name,
-                            )
-            except UnableToAcquireLock:
-                pass
-            except Exception:
-                logger.exception("Failed to process suspect commits")
+    is_reprocessed = is_reprocessed_event(event.data)
+    sentry_sdk.set_tag("is_reprocessed", is_reprocessed)
+
+    # NOTE: we must pass through the full Event object, and not an
+    # event_id since the Event object may not actually have been stored
+    # in the database due to sampling.
+    from sentry.models import Commit, GroupInboxReason
+    from sentry.models.group import get_group_with_redirect
+    from sentry.models.groupinbox import add_group_to_inbox
+    from sentry.rules.processor import RuleProcessor
+    from sentry.tasks.groupowner import process_suspect_commits
+    from sentry.tasks.servicehooks import process_service_hook
+
+    # Re-bind Group since we're reading the Event object
+    # from cache, which may contain a stale group and project
+    if batch is not None:
+        event.group = batch.get_group(event.group_id)
+    else:
+        event.group, _ = get_group_with_redirect(event.group_id)
+    event.group_id = event.group.id
+    # We fetch buffered updates to group aggregates here and populate them on the Group. This
+    # helps us avoid problems with processing group ignores and alert rules that rely on these
+    # stats.
+    fetch_buffered_group_stats(event.group)
 
-            if features.has("projects:servicehooks", project=event.project):
-                allowed_events = {"event.created"}
-                if has_alert:
-                    allowed_events.add("event.alert")
+    event.group.project = event.project
+    event.group.project.set_cached_field_value("organization", event.project.organization)
 
-                if allowed_events:
-                    for servicehook_id, events in _get_service_hooks(project_id=event.project_id):
-                        if any(e in allowed_events for e in events):
-                            process_service_hook.delay(servicehook_id=servicehook_id, event=event)
+    bind_organization_context(event.project.organization)
 
-            from sentry.tasks.sentry_apps import process_resource_change_bound
+    _capture_stats(event, is_new)
 
-            if event.get_event_type() == "error" and _should_send_error_created_hooks(
-                event.project
-            ):
-                process_resource_change_bound.delay(
-                    action="created", sender="Error", instance_id=event.event_id, instance=event
-                )
-            if is_new:
-                process_resource_change_bound.delay(
-                    action="created", sender="Group", instance_id=event.group_id
-                )
+    with sentry_sdk.start_span(op="tasks.post_process_group.add_group_to_inbox"):
+        try:
+            if is_reprocessed and is_new:
+                add_group_to_inbox(event.group, GroupInboxReason.REPROCESSED)
+        except Exception:
+            logger.exception("Failed to add group to inbox for reprocessed groups")
+
+    if not is_reprocessed:
+        # we process snoozes before rules as it might create a regression
+        # but not if it's new because you can't immediately snooze a new group
+        has_reappeared = not is_new
+        try:
+            if has_reappeared:
+                has_reappeared = process_snoozes(event.group, local_cache=local_cache)
+        except Exception:
+            logger.exception("Failed to process snoozes for group")
 
-            from sentry.plugins.base import plugins
+        try:
+            if not has_reappeared:  # If true, we added the .UNIGNORED reason already
+                if is_new:
+                    add_group_to_inbox(event.group, GroupInboxReason.NEW)
+                elif is_regression:
+                    add_group_to_inbox(event.group, GroupInboxReason.REGRESSION)
+        except Exception:
+            logger.exception("Failed to add group to inbox for non-reprocessed groups")
+
+        with sentry_sdk.start_span(op="tasks.post_process_group.handle_owner_assignment"):
+            try:
+                handle_owner_assignment(event.project, event.group, event, local_cache=local_cache)
+            except Exception:
+                logger.exception("Failed to handle owner assignments")
 
-            for plugin in plugins.for_project(event.project):
-                plugin_post_process_group(
-                    plugin_slug=plugin.slug, event=event, is_new=is_new, is_regresion=is_regression
-                )
+        if batch is not None:
+            rp = RuleProcessor(
+                event,
+                is_new,
+                is_regression,
+                is_new_group_environment,
+                has_reappeared,
+                rules=batch.rules.get(event.project_id),
+                rule_statuses=batch.rule_statuses.get(event.group_id),
+            )
+        else:
+            rp = RuleProcessor(
+                event, is_new, is_regression, is_new_group_environment, has_reappeared
+            )
+        has_alert = False
+        with sentry_sdk.start_span(op="tasks.post_process_group.rule_processor_callbacks"):
+            # TODO(dcramer): ideally this would fanout, but serializing giant
+            # objects back and forth isn't super efficient
+            for callback, futures in rp.apply():
+                has_alert = True
+                safe_execute(callback, event, futures, _with_transaction=False)
 
-            from sentry import similarity
+        try:
+            lock = locks.get(
+                f"w-o:{event.group_id}-d-l",
+                duration=10,
+                name="post_process_w_o",
+            )
+            with lock.acquire():
+                has_commit_key = f"w-o:{event.project.organization_id}-h-c"
+                org_has_commit = local_cache.get(has_commit_key)
+                if org_has_commit is None:
+                    org_has_commit = Commit.objects.filter(
+                        organization_id=event.project.organization_id
+                    ).exists()
+                    local_cache.set(has_commit_key, org_has_commit, 3600)
+
+                if org_has_commit:
+                    group_cache_key = f"w-o-i:g-{event.group_id}"
+                    if cache.get(group_cache_key):
+                        metrics.incr(
+                            "sentry.tasks.process_suspect_commits.debounce",
+                            tags={"detail": "w-o-i:g debounce"},
+                        )
+                    else:
+                        from sentry.utils.committers import get_frame_paths
+
+                        cache.set(group_cache_key, True, 604800)  # 1 week in seconds
+                        event_frames = get_frame_paths(event)
+                        sdk_name = get_sdk_name(event.data)
+                        process_suspect_commits.delay(
+                            event_id=event.event_id,
+                            event_platform=event.platform,
+                            event_frames=event_frames,
+                            group_id=event.group_id,
+                            project_id=event.project_id,
+                            sdk_name=sdk_name,
+                        )
+        except UnableToAcquireLock:
+            pass
+        except Exception:
+            logger.exception("Failed to process suspect commits")
+
+        if features.has("projects:servicehooks", project=event.project):
+            allowed_events = {"event.created"}
+            if has_alert:
+                allowed_events.add("event.alert")
+
+            if allowed_events:
+                for servicehook_id, events in _get_service_hooks(project_id=event.project_id):
+                    if any(e in allowed_events for e in events):
+                        process_service_hook.delay(servicehook_id=servicehook_id, event=event)
+
+        from sentry.tasks.sentry_apps import process_resource_change_bound
+
+        if event.get_event_type() == "error" and _should_send_error_created_hooks(event.project):
+            process_resource_change_bound.delay(
+                action="created", sender="Error", instance_id=event.event_id, instance=event
+            )
+        if is_new:
+            process_resource_change_bound.delay(
+                action="created", sender="Group", instance_id=event.group_id
+            )
 
-            with sentry_sdk.start_span(op="tasks.post_process_group.similarity"):
-                safe_execute(similarity.record, event.project, [event], _with_transaction=False)
+        from sentry.plugins.base import plugins
 
-        # Patch attachments that were ingested on the standalone path.
-        with sentry_sdk.start_span(op="tasks.post_process_group.update_existing_attachments"):
-            try:
-                update_existing_attachments(event)
-            except Exception:
-                logger.exception("Failed to update existing attachments")
-
-        if not is_reprocessed:
-            event_processed.send_robust(
-                sender=post_process_group,
-                project=event.project,
-                event=event,
-                primary_hash=kwargs.get("primary_hash"),
+        for plugin in plugins.for_project(event.project):
+            plugin_post_process_group(
+                plugin_slug=plugin.slug, event=event, is_new=is_new, is_regresion=is_regression
             )
 
+        from sentry import similarity
 
-def process_snoozes(group):
+        with sentry_sdk.start_span(op="tasks.post_process_group.similarity"):
+            safe_execute(similarity.record, event.project, [event], _with_transaction=False)
+
+    # Patch attachments that were ingested on the standalone path.
+    with sentry_sdk.start_span(op="tasks.post_process_group.update_existing_attachments"):
+        try:
+            update_existing_attachments(event)
+        except Exception:
+            logger.exception("Failed to update existing attachments")
+
+    if not is_reprocessed:
+        event_processed.send_robust(
+            sender=post_process_group,
+            project=event.project,
+            event=event,
+            primary_hash=primary_hash,
+        )
+
+
+def process_snoozes(group, local_cache=None):
     """
     Return True if the group is transitioning from "resolved" to "unresolved",
     otherwise return False.
@@ -473,15 +665,18 @@ def process_snoozes(group):
     )
     from sentry.models.grouphistory import GroupHistoryStatus, record_group_history
 
+    if local_cache is None:
+        local_cache = cache
+
     key = GroupSnooze.get_cache_key(group.id)
-    snooze = cache.get(key)
+    snooze = local_cache.get(key)
     if snooze is None:
         try:
             snooze = GroupSnooze.objects.get(group=group)
         except GroupSnooze.DoesNotExist:
             snooze = False
         # This cache is also set in post_save|delete.
-        cache.set(key, snooze, 3600)
+        local_cache.set(key, snooze, 3600)
     if not snooze:
         return False
 
@@ -503,6 +698,9 @@ def process_snoozes(group):
         )
 
         snooze.delete()
+        if local_cache is not cache:
+            # post_delete only updates the shared cache
+            local_cache.set(key, False, 3600)
         group.update(status=GroupStatus.UNRESOLVED)
         issue_unignored.send_robust(
             project=group.project,
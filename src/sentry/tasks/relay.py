@@ -2,9 +2,16 @@ import logging
 import time
 
 import sentry_sdk
+from django.conf import settings
+from django.db.models import Q
 
 from sentry.models.organization import Organization
-from sentry.relay import projectconfig_cache, projectconfig_debounce_cache
+from sentry.relay import (
+    projectconfig_cache,
+    projectconfig_debounce_cache,
+    projectconfig_invalidation_queue,
+)
+from sentry.relay.projectconfig_invalidation_queue.base import parse_scope
 from sentry.tasks.base import instrumented_task
 from sentry.utils import metrics
 from sentry.utils.sdk import set_current_event_project
@@ -173,6 +180,93 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
     return configs
 
 
+def compute_configs_batch(organization_ids=(), project_ids=(), public_keys=()):
+    """Computes the configs for many organizations, projects and public keys at once.
+
+    This is equivalent to calling :func:`compute_configs` for each of the arguments, but
+    every public key is only computed once even if it is contained in multiple scopes, and
+    the project keys, organizations, project options and organization options of all
+    projects are fetched in bulk.
+
+    :returns: A tuple of the dict mapping all affected public keys to their config and the
+       number of configs that calling :func:`compute_configs` for each scope would have
+       computed.
+    """
+    from sentry.models import OrganizationOption, Project, ProjectKey, ProjectOption
+
+    organization_ids = set(organization_ids)
+    project_ids = set(project_ids)
+    public_keys = set(public_keys)
+
+    projects = {}
+    if organization_ids or project_ids:
+        for project in Project.objects.filter(
+            Q(organization_id__in=organization_ids) | Q(id__in=project_ids)
+        ):
+            projects[project.id] = project
+
+    keys_by_project = {project_id: [] for project_id in projects}
+    keys = {}
+    for key in ProjectKey.objects.filter(
+        Q(project_id__in=projects.keys()) | Q(public_key__in=public_keys)
+    ):
+        keys[key.public_key] = key
+        if key.project_id in keys_by_project:
+            keys_by_project[key.project_id].append(key)
+
+    # As in `compute_configs`, organizations and projects only re-compute the configs
+    # that are currently cached.
+    cached_public_keys = projectconfig_cache.exists_many(
+        [key.public_key for project_keys in keys_by_project.values() for key in project_keys]
+    )
+
+    requested = 0
+    to_compute = set()
+    for project in projects.values():
+        scopes = (project.organization_id in organization_ids) + (project.id in project_ids)
+        for key in keys_by_project[project.id]:
+            if key.public_key in cached_public_keys:
+                requested += scopes
+                to_compute.add(key.public_key)
+
+    configs = {}
+    for public_key in public_keys:
+        requested += 1
+        if public_key in keys:
+            to_compute.add(public_key)
+        else:
+            # See `compute_configs` for why deleted keys are disabled.
+            configs[public_key] = {"disabled": True}
+
+    # Prefetch everything shared between the configs of the keys we compute, including
+    # the organization options that quotas are derived from.
+    compute_keys = [keys[public_key] for public_key in to_compute]
+    projects.update(
+        Project.objects.in_bulk(
+            {key.project_id for key in compute_keys if key.project_id not in projects}
+        )
+    )
+    organizations = Organization.objects.in_bulk(
+        {project.organization_id for project in projects.values()}
+    )
+    for project in projects.values():
+        if project.organization_id in organizations:
+            project.set_cached_field_value("organization", organizations[project.organization_id])
+    ProjectOption.objects.preload_all_values({key.project_id for key in compute_keys})
+    OrganizationOption.objects.preload_all_values(organizations.keys())
+
+    for key in compute_keys:
+        project = projects.get(key.project_id)
+        if project is None or project.organization_id not in organizations:
+            # The project or organization has been deleted since the key was fetched.
+            configs[key.public_key] = {"disabled": True}
+            continue
+        key.set_cached_field_value("project", project)
+        configs[key.public_key] = compute_projectkey_config(key)
+
+    return configs, requested
+
+
 def compute_projectkey_config(key):
     """Computes a single config for the given :class:`ProjectKey`.
 
@@ -238,6 +332,68 @@ def invalidate_project_config(
     projectconfig_cache.set_many(updated_configs)
 
 
+@instrumented_task(
+    name="sentry.tasks.relay.process_project_config_invalidations",
+    queue="relay_config_bulk",
+    soft_time_limit=25 * 60,  # 25mins
+    time_limit=25 * 60 + 5,
+)
+def process_project_config_invalidations(**kwargs):
+    """Task which re-computes the project configs of all queued invalidations.
+
+    Invalidations are added to the queue by :func:`schedule_invalidate_project_config` if
+    the ``projectconfig_invalidation_queue`` service is enabled.  All queued organizations,
+    projects and public keys are computed together with :func:`compute_configs_batch` and
+    written to the cache at once.
+    """
+    # Like `invalidate_project_config`, allow new invalidations to schedule another task
+    # while this one is running.
+    projectconfig_invalidation_queue.mark_drain_done()
+
+    scopes, remaining = projectconfig_invalidation_queue.pop_many(
+        settings.SENTRY_RELAY_PROJECTCONFIG_INVALIDATION_BATCH_SIZE
+    )
+    if remaining:
+        process_project_config_invalidations.apply_async()
+    if not scopes:
+        return
+
+    now = time.time()
+    metrics.timing(
+        "relay.projectconfig_cache.invalidation.queue_latency",
+        now - min(queued_at for _, queued_at in scopes),
+    )
+    metrics.timing("relay.projectconfig_cache.invalidation.batch_size", len(scopes))
+
+    organization_ids, project_ids, public_keys = [], [], []
+    for scope, _ in scopes:
+        kind, value = parse_scope(scope)
+        if kind == "o":
+            organization_ids.append(int(value))
+        elif kind == "p":
+            project_ids.append(int(value))
+        else:
+            public_keys.append(value)
+
+    with metrics.timer("relay.projectconfig_cache.invalidation.compute_batch"):
+        configs, requested = compute_configs_batch(organization_ids, project_ids, public_keys)
+
+    metrics.incr(
+        "relay.projectconfig_cache.invalidation.recompute",
+        amount=len(configs),
+        tags={"action": "recompute", "scope": "batch"},
+    )
+    # Configs that would have been computed more than once if every scope had been
+    # invalidated on its own.
+    metrics.incr(
+        "relay.projectconfig_cache.invalidation.coalesced",
+        amount=requested - len(configs),
+        tags={"stage": "batch"},
+    )
+
+    projectconfig_cache.set_many(configs)
+
+
 def schedule_invalidate_project_config(
     *,
     trigger,
@@ -259,6 +415,24 @@ def schedule_invalidate_project_config(
 
     validate_args(organization_id, project_id, public_key)
 
+    queued = projectconfig_invalidation_queue.enqueue(
+        organization_id=organization_id, project_id=project_id, public_key=public_key
+    )
+    if queued is not None:
+        if queued.coalesced:
+            metrics.incr(
+                "relay.projectconfig_cache.skipped",
+                tags={"reason": "coalesced", "update_reason": trigger, "task": "invalidation"},
+            )
+        else:
+            metrics.incr(
+                "relay.projectconfig_cache.scheduled",
+                tags={"update_reason": trigger, "task": "invalidation-queue"},
+            )
+        if queued.schedule_drain:
+            process_project_config_invalidations.apply_async(countdown=countdown)
+        return
+
     # The keys we need to check for to see if this is debounced, we want to check all
     # levels.
     check_debounce_keys = {
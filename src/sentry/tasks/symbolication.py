@@ -1,7 +1,10 @@
 import logging
 import random
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
 from time import sleep, time
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
 
 import sentry_sdk
 from django.conf import settings
@@ -83,6 +86,64 @@ def should_demote_symbolication(project_id: int) -> bool:
             return False
 
 
+class SymbolicationBatcher:
+    """
+    Collects the native events submitted for symbolication, and submits them
+    as ``symbolicate_event_batch`` tasks of up to ``batch_size`` events of the
+    same project.
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        self.batch_size = batch_size
+        self.__events: Dict[int, List[Mapping[str, Any]]] = defaultdict(list)
+        self.__lock = threading.Lock()
+
+    def add(self, project_id: int, **task_kwargs: Any) -> None:
+        with self.__lock:
+            events = self.__events[project_id]
+            events.append(task_kwargs)
+            if len(events) < self.batch_size:
+                return
+            del self.__events[project_id]
+        symbolicate_event_batch.delay(events=events)
+
+    def flush(self) -> None:
+        with self.__lock:
+            batches = list(self.__events.values())
+            self.__events.clear()
+        for events in batches:
+            symbolicate_event_batch.delay(events=events)
+
+
+_batcher: Optional[SymbolicationBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+@contextmanager
+def batch_symbolication() -> Iterator[None]:
+    """
+    Batch the symbolication of the native events submitted within the block
+    (from any thread), if enabled with the ``symbolicate-event.batch-size``
+    option. Collected events are submitted when the block exits at the latest.
+    """
+    global _batcher
+
+    batch_size = options.get("symbolicate-event.batch-size")
+    with _batcher_lock:
+        if batch_size <= 1 or _batcher is not None:
+            batcher = None
+        else:
+            batcher = _batcher = SymbolicationBatcher(batch_size)
+
+    try:
+        yield
+    finally:
+        if batcher is not None:
+            with _batcher_lock:
+                _batcher = None
+            batcher.flush()
+
+
 def submit_symbolicate(
     is_low_priority: bool,
     from_reprocessing: bool,
@@ -102,6 +163,23 @@ def submit_symbolicate(
     else:
         task = symbolicate_event_from_reprocessing if from_reprocessing else symbolicate_event
 
+    batcher = _batcher
+    if (
+        batcher is not None
+        and task is symbolicate_event
+        and data is not None
+        and queue_switches == 0
+        and _is_payload_event(data)
+    ):
+        batcher.add(
+            data["project"],
+            cache_key=cache_key,
+            start_time=start_time,
+            event_id=event_id,
+            has_attachments=has_attachments,
+        )
+        return
+
     task.delay(
         cache_key=cache_key,
         start_time=start_time,
@@ -112,6 +190,12 @@ def submit_symbolicate(
     )
 
 
+def _is_payload_event(data: Event) -> bool:
+    from sentry.lang.native.processing import get_symbolication_function, process_payload
+
+    return get_symbolication_function(data) is process_payload
+
+
 def _do_symbolicate_event(
     cache_key: str,
     start_time: Optional[int],
@@ -434,3 +518,134 @@ def symbolicate_event_from_reprocessing_low_priority(
         queue_switches=queue_switches,
         has_attachments=has_attachments,
     )
+
+
+@instrumented_task(  # type: ignore
+    name="sentry.tasks.symbolication.symbolicate_event_batch",
+    queue="events.symbolicate_event",
+    time_limit=settings.SYMBOLICATOR_PROCESS_EVENT_HARD_TIMEOUT + 30,
+    soft_time_limit=settings.SYMBOLICATOR_PROCESS_EVENT_HARD_TIMEOUT + 20,
+    acks_late=True,
+)
+def symbolicate_event_batch(events: Sequence[Mapping[str, Any]], **kwargs: Any) -> None:
+    """
+    Symbolicates the native events of a project with a single symbolicator
+    request, and continues processing every event like ``symbolicate_event``.
+
+    :param list events: the ``symbolicate_event`` arguments of every event
+    """
+    from sentry.lang.native.batching import process_payloads
+
+    batch = []
+    for event in events:
+        data = processing.event_processing_store.get(event["cache_key"])
+        if data is None:
+            metrics.incr(
+                "events.failed",
+                tags={"reason": "cache", "stage": "symbolicate"},
+                skip_internal=False,
+            )
+            error_logger.error("symbolicate.failed.empty", extra={"cache_key": event["cache_key"]})
+            continue
+
+        data = CanonicalKeyDict(data)
+        if killswitch_matches_context(
+            "store.load-shed-symbolicate-event-projects",
+            {
+                "project_id": data["project"],
+                "event_id": data["event_id"],
+                "platform": data.get("platform") or "null",
+                "symbolication_function": "process_payload",
+            },
+        ):
+            _do_symbolicate_event(symbolicate_task=symbolicate_event, data=data, **event)
+            continue
+
+        batch.append((event, data))
+
+    if not batch:
+        return
+
+    # The whole batch is a single symbolicator request, so the counters that
+    # decide on moving projects to the low priority queue are submitted once
+    # per project of the batch.
+    project_ids = {data["project"] for _, data in batch}
+    failed = False
+    symbolication_start_time = time()
+
+    submission_ratio = options.get("symbolicate-event.low-priority.metrics.submission-rate")
+    submit_realtime_metrics = random.random() < submission_ratio
+    timestamp = int(symbolication_start_time)
+
+    if submit_realtime_metrics:
+        with sentry_sdk.start_span(op="tasks.store.symbolicate_event.low_priority.metrics.counter"):
+            for project_id in project_ids:
+                try:
+                    realtime_metrics.increment_project_event_counter(project_id, timestamp)
+                except Exception as e:
+                    sentry_sdk.capture_exception(e)
+
+    with metrics.timer("tasks.symbolication.symbolicate_event_batch.symbolication"):
+        while True:
+            try:
+                process_payloads([data for _, data in batch])
+                break
+            except RetrySymbolication as e:
+                if (
+                    time() - symbolication_start_time
+                ) > settings.SYMBOLICATOR_PROCESS_EVENT_HARD_TIMEOUT:
+                    metrics.incr(
+                        "tasks.symbolication.symbolicate_event_batch.fatal",
+                        tags={"reason": "timeout"},
+                    )
+                    error_logger.exception("symbolicate.failed.infinite_retry")
+                    failed = True
+                    break
+
+                metrics.incr("tasks.symbolication.symbolicate_event_batch.retry")
+                sleep(
+                    SYMBOLICATOR_MAX_RETRY_AFTER
+                    if e.retry_after is None
+                    else min(e.retry_after, SYMBOLICATOR_MAX_RETRY_AFTER)
+                )
+            except Exception:
+                metrics.incr(
+                    "tasks.symbolication.symbolicate_event_batch.fatal", tags={"reason": "error"}
+                )
+                error_logger.exception("tasks.symbolication.symbolicate_event_batch.symbolication")
+                failed = True
+                break
+
+    if submit_realtime_metrics:
+        with sentry_sdk.start_span(
+            op="tasks.store.symbolicate_event.low_priority.metrics.histogram"
+        ):
+            symbolication_duration = int(time() - symbolication_start_time)
+            for project_id in project_ids:
+                try:
+                    realtime_metrics.increment_project_duration_counter(
+                        project_id, timestamp, symbolication_duration
+                    )
+                except Exception as e:
+                    sentry_sdk.capture_exception(e)
+
+    for event, data in batch:
+        if failed:
+            data.setdefault("_metrics", {})["flag.processing.error"] = True
+            data.setdefault("_metrics", {})["flag.processing.fatal"] = True
+
+        # We cannot persist canonical types in the cache, so we need to
+        # downgrade this.
+        data = dict(data.items())
+        cache_key = processing.event_processing_store.store(data)
+
+        store.do_process_event(
+            cache_key=cache_key,
+            start_time=event["start_time"],
+            event_id=event["event_id"],
+            process_task=store.process_event,
+            data=data,
+            data_has_changed=True,
+            from_symbolicate=True,
+            has_attachments=event["has_attachments"],
+        )
@@ -1,4 +1,5 @@
-from collections import OrderedDict
+from array import array
+from collections import OrderedDict, defaultdict, namedtuple
 from collections.abc import Callable
 from datetime import timedelta
 from enum import Enum
@@ -95,11 +96,22 @@ class TSDBModel(Enum):
     sentry_app_component_interacted = 801
 
 
+# A range to total the counters (or distinct counters) of keys over, see
+# `BaseTSDB.get_totals_multi`.
+TotalsQuery = namedtuple(
+    "TotalsQuery",
+    ["model", "keys", "start", "end", "environment_id", "distinct", "jitter_value"],
+    defaults=[None, False, None],
+)
+
+
 class BaseTSDB(Service):
     __read_methods__ = frozenset(
         [
             "get_range",
+            "get_range_multi",
             "get_sums",
+            "get_totals_multi",
             "get_distinct_counts_series",
             "get_distinct_counts_totals",
             "get_distinct_counts_union",
@@ -360,6 +372,43 @@ class BaseTSDB(Service):
         """
         raise NotImplementedError
 
+    def get_range_multi(self, items, start, end, rollup=None):
+        """
+        Fetch the counters of many ``(model, key, environment_id)`` items over
+        the same range at once.
+
+        Returns a 2-tuple of the timestamps of the series and a mapping of
+        item to an ``array`` of counts, with one count per timestamp.
+
+        >>> series, counts = get_range_multi(
+        >>>     [(TSDBModel.group, 1, None), (TSDBModel.group, 2, 3)],
+        >>>     start=now - timedelta(days=1),
+        >>>     end=now)
+        """
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+
+        keys = defaultdict(list)
+        for model, key, environment_id in items:
+            keys[(model, environment_id)].append(key)
+
+        results = {}
+        for (model, environment_id), model_keys in keys.items():
+            ranges = self.get_range(
+                model,
+                model_keys,
+                start,
+                end,
+                rollup,
+                environment_ids=[environment_id] if environment_id is not None else None,
+            )
+            for key in model_keys:
+                points = dict(ranges.get(key, ()))
+                results[(model, key, environment_id)] = array(
+                    "q", [int(points.get(timestamp, 0)) for timestamp in series]
+                )
+
+        return series, results
+
     def get_sums(
         self,
         model,
@@ -384,6 +433,36 @@ class BaseTSDB(Service):
         sum_set = {key: sum(p for _, p in points) for (key, points) in range_set.items()}
         return sum_set
 
+    def get_totals_multi(self, queries, use_cache=False):
+        """
+        Fetch the results of many ``TotalsQuery`` at once: the sums of the
+        counters of the keys over the range, or the counts of their distinct
+        items if ``distinct`` is set.
+
+        Returns a list with a mapping of key => total for each query.
+
+        >>> get_totals_multi([
+        >>>     TotalsQuery(TSDBModel.group, [1, 2], now - timedelta(hours=1), now),
+        >>>     TotalsQuery(TSDBModel.users_affected_by_group, [1], now - timedelta(days=1), now,
+        >>>                 distinct=True),
+        >>> ])
+        """
+        results = []
+        for query in queries:
+            method = self.get_distinct_counts_totals if query.distinct else self.get_sums
+            results.append(
+                method(
+                    query.model,
+                    query.keys,
+                    query.start,
+                    query.end,
+                    environment_id=query.environment_id,
+                    use_cache=use_cache,
+                    jitter_value=query.jitter_value,
+                )
+            )
+        return results
+
     def _add_jitter_to_series(self, series, start, rollup, jitter_value):
         if jitter_value and series:
             jitter = jitter_value % rollup
@@ -1,3 +1,4 @@
+from array import array
 from collections import Counter, defaultdict
 
 from django.utils import timezone
@@ -97,6 +98,24 @@ class InMemoryTSDB(BaseTSDB):
             results_by_key[key] = sorted(points.items())
         return dict(results_by_key)
 
+    def get_range_multi(self, items, start, end, rollup=None):
+        items = list(items)
+        self.validate_arguments(
+            {model for model, _, _ in items},
+            {environment_id for _, _, environment_id in items},
+        )
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        epochs = [self.normalize_ts_to_rollup(timestamp, rollup) for timestamp in series]
+
+        results = {}
+        for item in items:
+            model, key, environment_id = item
+            data = self.data[model].get((key, environment_id), {})
+            results[item] = array("q", [int(data.get(epoch) or 0) for epoch in epochs])
+
+        return series, results
+
     def record(self, model, key, values, timestamp=None, environment_id=None):
         self.validate_arguments([model], [environment_id])
 
@@ -2,6 +2,7 @@ import itertools
 import logging
 import random
 import uuid
+from array import array
 from collections import defaultdict, namedtuple
 from functools import reduce
 from hashlib import md5
@@ -168,21 +169,22 @@ class RedisTSDB(BaseTSDB):
         """
         model_key = self.get_model_key(key)
 
-        if isinstance(model_key, int):
-            vnode = model_key % self.vnodes
-        else:
-            vnode = crc32(force_bytes(model_key)) % self.vnodes
-
         return (
-            "{prefix}{model}:{epoch}:{vnode}".format(
-                prefix=self.prefix,
-                model=model.value,
-                epoch=self.normalize_to_rollup(timestamp, rollup),
-                vnode=vnode,
+            self.make_counter_hash_key(
+                model, self.normalize_to_rollup(timestamp, rollup), self.get_vnode(model_key)
             ),
             self.add_environment_parameter(model_key, environment_id),
         )
 
+    def make_counter_hash_key(self, model, epoch, vnode):
+        return f"{self.prefix}{model.value}:{epoch}:{vnode}"
+
+    def get_vnode(self, model_key):
+        if isinstance(model_key, int):
+            return model_key % self.vnodes
+        else:
+            return crc32(force_bytes(model_key)) % self.vnodes
+
     def get_model_key(self, key):
         # We specialize integers so that a pure int-map can be optimized by
         # Redis, whereas long strings (say tag values) will store in a more
@@ -286,30 +288,62 @@ class RedisTSDB(BaseTSDB):
             raise NotImplementedError
         environment_id = environment_ids[0] if environment_ids else None
 
-        self.validate_arguments([model], [environment_id])
+        series, results = self.get_range_multi(
+            [(model, key, environment_id) for key in keys], start, end, rollup
+        )
+        if not series:
+            return {}
+
+        timestamps = [float(timestamp) for timestamp in series]
+        return {key: list(zip(timestamps, results[(model, key, environment_id)])) for key in keys}
+
+    def get_range_multi(self, items, start, end, rollup=None):
+        """
+        Fetch the counters of many ``(model, key, environment_id)`` items.
+
+        Counters of different keys that share a hash (the same model, rollup
+        epoch and vnode) are fetched with a single ``HMGET``, and all commands
+        for a cluster host are sent in one pipeline.
+        """
+        items = list(items)
+        environment_ids = {environment_id for _, _, environment_id in items}
+        self.validate_arguments({model for model, _, _ in items}, environment_ids)
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
-        series = [to_datetime(item) for item in series]
+        epochs = [self.normalize_ts_to_rollup(timestamp, rollup) for timestamp in series]
 
-        results = []
-        cluster, _ = self.get_cluster(environment_id)
-        with cluster.map() as client:
-            for key in keys:
-                for timestamp in series:
-                    hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append(
-                        (to_timestamp(timestamp), key, client.hget(hash_key, hash_field))
+        results = {}
+        for (cluster, _), cluster_environment_ids in self.get_cluster_groups(environment_ids):
+            cluster_environment_ids = set(cluster_environment_ids)
+
+            # hash_key -> [(hash_field, counts, index), ...]
+            fields = defaultdict(list)
+            for item in items:
+                model, key, environment_id = item
+                if environment_id not in cluster_environment_ids:
+                    continue
+
+                model_key = self.get_model_key(key)
+                vnode = self.get_vnode(model_key)
+                hash_field = self.add_environment_parameter(model_key, environment_id)
+                counts = results[item] = array("q", [0]) * len(series)
+                for index, epoch in enumerate(epochs):
+                    fields[self.make_counter_hash_key(model, epoch, vnode)].append(
+                        (hash_field, counts, index)
                     )
 
-        results_by_key = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+            with cluster.map() as client:
+                responses = [
+                    (entries, client.hmget(hash_key, [hash_field for hash_field, _, _ in entries]))
+                    for hash_key, entries in fields.items()
+                ]
+
+            for entries, response in responses:
+                for (_, counts, index), value in zip(entries, response.value):
+                    if value:
+                        counts[index] = int(value)
 
-        for key, points in results_by_key.items():
-            results_by_key[key] = sorted(points.items())
-        return dict(results_by_key)
+        return series, results
 
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
@@ -321,43 +355,55 @@ class RedisTSDB(BaseTSDB):
         rollups = self.get_active_series(timestamp=timestamp)
 
         for (cluster, durable), environment_ids in self.get_cluster_groups(environment_ids):
+            # The totals to add to the destination, by rollup and environment,
+            # with one count per timestamp of the rollup series.
+            totals = {
+                (rollup, environment_id): array("q", [0]) * len(series)
+                for rollup, series in rollups.items()
+                for environment_id in environment_ids
+            }
+
+            # hash_key -> [(hash_field, counts, index), ...]
+            fields = defaultdict(list)
+            for rollup, series in rollups.items():
+                for index, timestamp in enumerate(series):
+                    for source in sources:
+                        for environment_id in environment_ids:
+                            source_hash_key, source_hash_field = self.make_counter_key(
+                                model, rollup, timestamp, source, environment_id
+                            )
+                            fields[source_hash_key].append(
+                                (source_hash_field, totals[(rollup, environment_id)], index)
+                            )
+
             manager = cluster.map()
             if not durable:
                 manager = SuppressionWrapper(manager)
 
             with manager as client:
-                data = {}
-                for rollup, series in rollups.items():
-                    data[rollup] = {}
-                    for timestamp in series:
-                        results = data[rollup][timestamp] = defaultdict(list)
-                        for source in sources:
-                            for environment_id in environment_ids:
-                                source_hash_key, source_hash_field = self.make_counter_key(
-                                    model, rollup, timestamp, source, environment_id
-                                )
-                                results[environment_id].append(
-                                    client.hget(source_hash_key, source_hash_field)
-                                )
-                                client.hdel(source_hash_key, source_hash_field)
+                responses = []
+                for hash_key, entries in fields.items():
+                    hash_fields = [hash_field for hash_field, _, _ in entries]
+                    responses.append((entries, client.hmget(hash_key, hash_fields)))
+                    client.hdel(hash_key, *hash_fields)
+
+            for entries, response in responses:
+                for (_, counts, index), value in zip(entries, response.value or ()):
+                    if value:
+                        counts[index] += int(value)
 
             with cluster.map() as client:
-                for rollup, series in data.items():
-                    for timestamp, results in series.items():
-                        for environment_id, promises in results.items():
-                            total = sum(int(p.value) for p in promises if p.value)
-                            if total:
-                                (
-                                    destination_hash_key,
-                                    destination_hash_field,
-                                ) = self.make_counter_key(
-                                    model, rollup, timestamp, destination, environment_id
-                                )
-                                client.hincrby(destination_hash_key, destination_hash_field, total)
-                                client.expireat(
-                                    destination_hash_key,
-                                    self.calculate_expiry(rollup, self.rollups[rollup], timestamp),
-                                )
+                for (rollup, environment_id), counts in totals.items():
+                    for timestamp, total in zip(rollups[rollup], counts):
+                        if total:
+                            (destination_hash_key, destination_hash_field,) = self.make_counter_key(
+                                model, rollup, timestamp, destination, environment_id
+                            )
+                            client.hincrby(destination_hash_key, destination_hash_field, total)
+                            client.expireat(
+                                destination_hash_key,
+                                self.calculate_expiry(rollup, self.rollups[rollup], timestamp),
+                            )
 
     def delete(self, models, keys, start=None, end=None, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
@@ -25,7 +25,9 @@ def dont_do_this(callargs):
 method_specifications = {
     # method: (type, function(callargs) -> set[model])
     "get_range": (READ, single_model_argument),
+    "get_range_multi": (READ, lambda callargs: {item[0] for item in callargs["items"]}),
     "get_sums": (READ, single_model_argument),
+    "get_totals_multi": (READ, lambda callargs: {query.model for query in callargs["queries"]}),
     "get_distinct_counts_series": (READ, single_model_argument),
     "get_distinct_counts_totals": (READ, single_model_argument),
     "get_distinct_counts_union": (READ, single_model_argument),
@@ -1,5 +1,5 @@
 import itertools
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from collections.abc import Mapping, Sequence, Set
 from copy import deepcopy
 
@@ -9,6 +9,9 @@ from sentry.tsdb.base import BaseTSDB, TSDBModel
 from sentry.utils import outcomes, snuba
 from sentry.utils.dates import to_datetime
 
+# A query prepared by `SnubaTSDB.get_data`
+SnubaTSDBQuery = namedtuple("SnubaTSDBQuery", ["params", "referrer", "keys", "series"])
+
 SnubaModelQuerySettings = namedtuple(
     # `dataset` - the dataset in Snuba that we want to query
     # `groupby` - the column in Snuba that we want to put in the group by statement
@@ -191,6 +194,45 @@ class SnubaTSDB(BaseTSDB):
         `group_on_time`: whether to add a GROUP BY clause on the 'time' field.
         `group_on_model`: whether to add a GROUP BY clause on the primary model.
         """
+        query = self.__prepare_query(
+            model,
+            keys,
+            start,
+            end,
+            rollup,
+            environment_ids,
+            aggregation,
+            group_on_model,
+            group_on_time,
+            conditions,
+            jitter_value,
+        )
+
+        if keys:
+            result = snuba.query(
+                **query.params,
+                referrer=query.referrer,
+                use_cache=use_cache,
+            )
+        else:
+            result = {}
+
+        return self.__build_result(query, result)
+
+    def __prepare_query(
+        self,
+        model,
+        keys,
+        start,
+        end,
+        rollup,
+        environment_ids,
+        aggregation,
+        group_on_model,
+        group_on_time,
+        conditions,
+        jitter_value,
+    ):
         # XXX: to counteract the hack in project_key_stats.py
         if model in [
             TSDBModel.key_total_received,
@@ -257,30 +299,33 @@ class SnubaTSDB(BaseTSDB):
         if group_on_model and model_group is not None:
             orderby.append(model_group)
 
-        if keys:
-            result = snuba.query(
-                dataset=model_dataset,
-                start=start,
-                end=end,
-                groupby=groupby,
-                conditions=conditions,
-                filter_keys=keys_map,
-                aggregations=aggregations,
-                rollup=rollup,
-                limit=limit,
-                orderby=orderby,
-                referrer=f"tsdb-modelid:{model.value}",
-                is_grouprelease=(model == TSDBModel.frequent_releases_by_group),
-                use_cache=use_cache,
-            )
-        else:
-            result = {}
+        return SnubaTSDBQuery(
+            params={
+                "dataset": model_dataset,
+                "start": start,
+                "end": end,
+                "groupby": groupby,
+                "conditions": conditions,
+                "filter_keys": keys_map,
+                "aggregations": aggregations,
+                "rollup": rollup,
+                "limit": limit,
+                "orderby": orderby,
+                "is_grouprelease": (model == TSDBModel.frequent_releases_by_group),
+            },
+            referrer=f"tsdb-modelid:{model.value}",
+            keys=keys,
+            series=series if group_on_time else None,
+        )
 
-        if group_on_time:
-            keys_map["time"] = series
+    def __build_result(self, query, result):
+        groupby = query.params["groupby"]
+        keys_map = dict(query.params["filter_keys"])
+        if query.series is not None:
+            keys_map["time"] = query.series
 
         self.zerofill(result, groupby, keys_map)
-        self.trim(result, groupby, keys)
+        self.trim(result, groupby, query.keys)
 
         return result
 
@@ -360,6 +405,56 @@ class SnubaTSDB(BaseTSDB):
         #    {group: [(timestamp, count), ...]}
         return {k: sorted(result[k].items()) for k in result}
 
+    def get_totals_multi(self, queries, use_cache=False):
+        # Queries of the same model share a referrer, and are sent to snuba at once
+        prepared = defaultdict(list)
+        for idx, totals_query in enumerate(queries):
+            model_query_settings = self.model_query_settings.get(totals_query.model)
+            assert (
+                model_query_settings is not None
+            ), f"Unsupported TSDBModel: {totals_query.model.name}"
+
+            if totals_query.distinct:
+                aggregation = "uniq"
+            elif model_query_settings.dataset == snuba.Dataset.Outcomes:
+                aggregation = "sum"
+            else:
+                aggregation = "count()"
+
+            query = self.__prepare_query(
+                totals_query.model,
+                totals_query.keys,
+                totals_query.start,
+                totals_query.end,
+                None,
+                [totals_query.environment_id] if totals_query.environment_id is not None else None,
+                aggregation,
+                True,
+                False,
+                None,
+                totals_query.jitter_value,
+            )
+            prepared[query.referrer].append((idx, query))
+
+        results = [{} for _ in queries]
+        for referrer, referrer_queries in prepared.items():
+            to_query = [(idx, query) for idx, query in referrer_queries if query.keys]
+            snuba_results = (
+                snuba.bulk_query(
+                    [snuba.SnubaQueryParams(**query.params) for _, query in to_query],
+                    referrer=referrer,
+                    use_cache=use_cache,
+                )
+                if to_query
+                else []
+            )
+            for (idx, _), result in zip(to_query, snuba_results):
+                results[idx] = result
+            for idx, query in referrer_queries:
+                results[idx] = self.__build_result(query, results[idx])
+
+        return results
+
     def get_distinct_counts_series(
         self, model, keys, start, end=None, rollup=None, environment_id=None
     ):
@@ -1,6 +1,7 @@
 import zlib
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from functools import lru_cache
+from typing import Generic, Mapping, Optional, Sequence, Tuple, TypeVar
 
 import zstandard
 
@@ -92,3 +93,64 @@ class ZstdCodec(Codec[bytes, bytes]):
 
     def decode(self, value: bytes) -> bytes:
         return zstandard.ZstdDecompressor().decompress(value)
+
+
+class UnknownZstdDictionary(Exception):
+    pass
+
+
+class ZstdDictionaryCodec(Codec[bytes, bytes]):
+    """
+    Compresses values with the zstd dictionary ``dictionary_id`` of
+    ``dictionaries`` (or without a dictionary if it is ``0``.)
+
+    The id of the dictionary is stored in the header of every zstd frame, so
+    values compressed with any of ``dictionaries`` or without a dictionary can
+    be decoded.
+    """
+
+    def __init__(
+        self,
+        dictionaries: Mapping[int, zstandard.ZstdCompressionDict],
+        dictionary_id: int = 0,
+        level: int = 3,
+    ) -> None:
+        self.dictionaries = dictionaries
+        self.dictionary_id = dictionary_id
+        self.level = level
+
+    def encode(self, value: bytes) -> bytes:
+        return zstandard.ZstdCompressor(
+            level=self.level, dict_data=self.dictionaries.get(self.dictionary_id)
+        ).compress(value)
+
+    def decode(self, value: bytes) -> bytes:
+        dictionary_id = zstandard.get_frame_parameters(value).dict_id
+        dictionary: Optional[zstandard.ZstdCompressionDict] = None
+        if dictionary_id:
+            try:
+                dictionary = self.dictionaries[dictionary_id]
+            except KeyError:
+                raise UnknownZstdDictionary(dictionary_id)
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(value)
+
+
+@lru_cache(maxsize=None)
+def load_zstd_dictionaries(
+    paths: Sequence[str],
+) -> Tuple[Mapping[int, zstandard.ZstdCompressionDict], int]:
+    """
+    Load the zstd dictionaries stored at ``paths`` (which must be hashable),
+    returning a mapping of dictionary id to dictionary and the id of the
+    first dictionary (or ``0`` if no paths are given), which is the one that
+    should be used to compress new values.
+    """
+    dictionaries = {}
+    default_id = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            dictionary = zstandard.ZstdCompressionDict(f.read())
+        dictionaries[dictionary.dict_id()] = dictionary
+        if not default_id:
+            default_id = dictionary.dict_id()
+    return dictionaries, default_id
@@ -8,7 +8,7 @@ import datetime
 import decimal
 import uuid
 from enum import Enum
-from typing import Any
+from typing import Any, Mapping, Optional
 
 import rapidjson
 import sentry_sdk
@@ -90,28 +90,142 @@ _default_escaped_encoder = JSONEncoderForHTML(
 JSONData = Any  # https://github.com/python/typing/issues/182
 
 
-def dump(value: JSONData, fp, **kwargs):
-    for chunk in _default_encoder.iterencode(value):
-        fp.write(chunk)
+class JSONCodec:
+    """
+    Encodes values to and decodes values from JSON.
 
+    Every codec must behave like the reference ``simplejson`` codec: encoded
+    values decode to the same data (``better_default_encoder`` types
+    included), and values are rejected with the same exceptions. The encoded
+    JSON does not have to be identical byte for byte though (e.g. the case
+    of hex digits in escape sequences may differ.)
+    """
 
-def dumps(value: JSONData, escape: bool = False, **kwargs) -> str:
+    name: str
+
+    def dumps(self, value: JSONData) -> str:
+        raise NotImplementedError
+
+    def loads(self, value: str) -> JSONData:
+        raise NotImplementedError
+
+
+class SimpleJSONCodec(JSONCodec):
+    name = "simplejson"
+
+    def dumps(self, value: JSONData) -> str:
+        return _default_encoder.encode(value)
+
+    def loads(self, value: str) -> JSONData:
+        return _default_decoder.decode(value)
+
+
+class _Unsupported(Exception):
+    pass
+
+
+class _RapidJSONEncoder(rapidjson.Encoder):
+    def default(self, o):
+        if isinstance(o, tuple):
+            # simplejson encodes named tuples as objects
+            if hasattr(o, "_asdict"):
+                return o._asdict()
+            return list(o)
+        elif isinstance(o, dict):
+            # Dictionaries with keys other than strings, which simplejson
+            # converts to strings in its own way.
+            raise _Unsupported()
+        return better_default_encoder(o)
+
+
+class RapidJSONCodec(SimpleJSONCodec):
+    """
+    A codec that encodes with rapidjson, which is more than twice as fast as
+    simplejson for event payloads. Values rapidjson cannot encode like
+    simplejson, such as NaN, integers that do not fit into 64 bits or
+    non-string keys, are encoded with simplejson instead.
+
+    Decoding still uses simplejson: rapidjson only decodes faster when it
+    parses floats imprecisely and integers into 64 bits.
+    """
+
+    name = "rapidjson"
+
+    def __init__(self) -> None:
+        self._encoder = _RapidJSONEncoder(
+            number_mode=rapidjson.NM_NATIVE | rapidjson.NM_DECIMAL,
+            iterable_mode=rapidjson.IM_ONLY_LISTS,
+            mapping_mode=rapidjson.MM_ONLY_DICTS,
+        )
+
+    def dumps(self, value: JSONData) -> str:
+        try:
+            return self._encoder(value)
+        except Exception:
+            return _default_encoder.encode(value)
+
+
+_codecs: Mapping[str, JSONCodec] = {
+    codec.name: codec for codec in (SimpleJSONCodec(), RapidJSONCodec())
+}
+_default_codec = _codecs["simplejson"]
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Return the codec with the given name, or the default codec (configured
+    with ``SENTRY_JSON_CODEC``.)
+    """
+    if name is None:
+        return _default_codec
+    try:
+        return _codecs[name]
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec: {name}")
+
+
+def set_default_codec(name: str) -> None:
+    global _default_codec
+    _default_codec = get_codec(name)
+
+
+def dump(value: JSONData, fp, codec: Optional[str] = None, **kwargs):
+    fp.write(get_codec(codec).dumps(value))
+
+
+def dumps(value: JSONData, escape: bool = False, codec: Optional[str] = None, **kwargs) -> str:
     # Legacy use. Do not use. Use dumps_htmlsafe
     if escape:
         return _default_escaped_encoder.encode(value)
-    return _default_encoder.encode(value)
+    return get_codec(codec).dumps(value)
+
+
+def load(fp, codec: Optional[str] = None, **kwargs) -> JSONData:
+    return loads(fp.read(), codec=codec)
+
 
+def loads(
+    value: str,
+    use_rapid_json: bool = False,
+    codec: Optional[str] = None,
+    skip_trace: bool = False,
+    **kwargs,
+) -> JSONData:
+    """
+    Decode a JSON document with the given codec (or the default one.)
 
-def load(fp, **kwargs) -> JSONData:
-    return loads(fp.read())
+    ``use_rapid_json`` decodes with rapidjson only, without falling back to
+    simplejson, and raises ``rapidjson.JSONDecodeError`` for invalid JSON.
 
+    Pass ``skip_trace`` on hot paths that decode many small documents, where
+    the tracing span costs more than decoding.
+    """
+    decode = rapidjson.loads if use_rapid_json is True else get_codec(codec).loads
+    if skip_trace:
+        return decode(value)
 
-def loads(value: str, use_rapid_json: bool = False, **kwargs) -> JSONData:
     with sentry_sdk.start_span(op="sentry.utils.json.loads"):
-        if use_rapid_json is True:
-            return rapidjson.loads(value)
-        else:
-            return _default_decoder.decode(value)
+        return decode(value)
 
 
 def dumps_htmlsafe(value):
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterable, NamedTuple, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    entries: int
+
+
+class SizedLRUCache(Generic[K, V]):
+    """
+    A thread-safe, process-local LRU cache that is bounded by the total size
+    of its values (as determined by ``sizeof``) rather than by the number of
+    entries it contains.
+
+    Entries are expired after ``ttl`` seconds. Values larger than the maximum
+    size of the cache are never stored.
+
+    ``on_evict`` is called (outside of the cache lock) with the key of every
+    entry that is removed to make room for new entries, which can be used to
+    record metrics.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        sizeof: Callable[[V], int] = len,  # type: ignore
+        on_evict: Optional[Callable[[K], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        assert max_size > 0
+        assert ttl > 0
+        self.max_size = max_size
+        self.ttl = ttl
+        self.__sizeof = sizeof
+        self.__on_evict = on_evict
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        # key -> (expires_at, size, value)
+        self.__entries: "OrderedDict[K, Tuple[float, int, V]]" = OrderedDict()
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__expirations = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: K) -> bool:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            return entry is not None and entry[0] > self.__clock()
+
+    def get(self, key: K) -> Optional[V]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__misses += 1
+                return None
+
+            expires_at, size, value = entry
+            if expires_at <= self.__clock():
+                self.__remove(key)
+                self.__expirations += 1
+                self.__misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return value
+
+    def set(
+        self, key: K, value: V, ttl: Optional[float] = None, size: Optional[int] = None
+    ) -> bool:
+        """
+        Store a value, returning whether or not it was stored.
+
+        ``size`` overrides the size computed by ``sizeof``, for callers that
+        also want to account for the size of the key.
+        """
+        if size is None:
+            size = self.__sizeof(value)
+        if size > self.max_size:
+            self.delete(key)
+            return False
+
+        expires_at = self.__clock() + (ttl if ttl is not None else self.ttl)
+        evicted = []
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+
+            self.__entries[key] = (expires_at, size, value)
+            self.__size += size
+
+            while self.__size > self.max_size:
+                evicted_key, (_, evicted_size, _) = self.__entries.popitem(last=False)
+                self.__size -= evicted_size
+                self.__evictions += 1
+                evicted.append(evicted_key)
+
+        if self.__on_evict is not None:
+            for evicted_key in evicted:
+                self.__on_evict(evicted_key)
+
+        return True
+
+    def delete(self, key: K) -> None:
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+
+    def delete_many(self, keys: Iterable[K]) -> None:
+        with self.__lock:
+            for key in keys:
+                if key in self.__entries:
+                    self.__remove(key)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def __remove(self, key: K) -> None:
+        _, size, _ = self.__entries.pop(key)
+        self.__size -= size
+
+    def get_stats(self) -> CacheStats:
+        with self.__lock:
+            return CacheStats(
+                hits=self.__hits,
+                misses=self.__misses,
+                evictions=self.__evictions,
+                expirations=self.__expirations,
+                size=self.__size,
+                entries=len(self.__entries),
+            )
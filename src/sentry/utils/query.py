@@ -1,7 +1,10 @@
+import queue
 import re
+import threading
 
 import progressbar
 from django.db import connections, router
+from django.db.models import Max, Min
 
 from sentry import eventstore
 
@@ -165,6 +168,168 @@ class RangeQuerySetWrapper:
             has_results = num > start
 
 
+class ParallelRangeQuerySetWrapper:
+    """
+    Iterates through a queryset like ``RangeQuerySetWrapper``, but splits the
+    (integer) primary key space into ``partitions`` disjoint ranges that are fetched
+    concurrently by ``workers`` threads, each with its own database
+    connection. Threads rather than processes are used, since most of the
+    time is spent waiting for the database.
+
+    The boundaries of the ranges are chosen evenly between the smallest and
+    the largest primary key. There are more ranges than workers by default,
+    so that a worker which finishes a sparse range picks up the next one.
+
+    Results are yielded in no particular order, as soon as a batch of any
+    range has been fetched. At most ``queue_size`` batches are buffered, which
+    blocks the workers while the caller is busy with previous results.
+
+    With ``values``, rows are fetched as tuples of the given fields (or
+    single values with ``flat``), like ``values_list``, which skips building
+    model instances.
+    """
+
+    def __init__(
+        self,
+        queryset,
+        step=1000,
+        limit=None,
+        workers=4,
+        partitions=None,
+        values=None,
+        flat=False,
+        queue_size=None,
+        callbacks=(),
+    ):
+        if queryset.query.low_mark == 0 and not (
+            queryset.query.order_by or queryset.query.extra_order_by
+        ):
+            if limit is None:
+                limit = queryset.query.high_mark
+            queryset.query.clear_limits()
+        else:
+            raise InvalidQuerySetError
+
+        if flat and len(values or ()) != 1:
+            raise TypeError("'flat' is only valid with a single field in 'values'")
+
+        self.queryset = queryset
+        self.step = abs(step)
+        self.limit = limit
+        self.workers = workers
+        self.partitions = partitions or workers * 4
+        self.values = values
+        self.flat = flat
+        self.queue_size = queue_size or workers * 2
+        self.callbacks = callbacks
+
+    def get_ranges(self):
+        """
+        Returns the ``(start, end)`` primary key ranges (including the start
+        and excluding the end) the queryset is split into.
+        """
+        bounds = self.queryset.aggregate(min=Min("pk"), max=Max("pk"))
+        if bounds["min"] is None:
+            return []
+
+        start, end = bounds["min"], bounds["max"] + 1
+        count = min(self.partitions, end - start)
+        return [
+            (start + (end - start) * i // count, start + (end - start) * (i + 1) // count)
+            for i in range(count)
+        ]
+
+    def _iter_range(self, start, end):
+        queryset = self.queryset.filter(pk__gte=start, pk__lt=end).order_by("pk")
+        if self.values is not None:
+            queryset = queryset.values_list("pk", *self.values)
+
+        cur_value = None
+        while True:
+            results = queryset if cur_value is None else queryset.filter(pk__gt=cur_value)
+            results = list(results[0 : self.step])
+            if not results:
+                break
+
+            if self.values is None:
+                cur_value = results[-1].pk
+            else:
+                cur_value = results[-1][0]
+                if self.flat:
+                    results = [row[1] for row in results]
+                else:
+                    results = [row[1:] for row in results]
+
+            for cb in self.callbacks:
+                cb(results)
+
+            yield results
+
+            if len(results) < self.step:
+                break
+
+    def _fetch_ranges(self, ranges, results, stop):
+        def put(item):
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        try:
+            while not stop.is_set():
+                try:
+                    start, end = ranges.get_nowait()
+                except queue.Empty:
+                    break
+                for batch in self._iter_range(start, end):
+                    if not put(batch):
+                        return
+        except Exception as e:
+            put(e)
+        finally:
+            # Every thread opens connections of its own
+            connections.close_all()
+            put(None)
+
+    def __iter__(self):
+        ranges = queue.Queue()
+        for start_end in self.get_ranges():
+            ranges.put(start_end)
+
+        results = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=self._fetch_ranges, args=(ranges, results, stop), daemon=True)
+            for _ in range(min(self.workers, ranges.qsize()))
+        ]
+        for thread in threads:
+            thread.start()
+
+        pending = len(threads)
+        num = 0
+        try:
+            while pending:
+                batch = results.get()
+                if batch is None:
+                    pending -= 1
+                    continue
+                if isinstance(batch, Exception):
+                    raise batch
+
+                for result in batch:
+                    if self.limit and num >= self.limit:
+                        return
+                    num += 1
+                    yield result
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+
 class RangeQuerySetWrapperWithProgressBar(RangeQuerySetWrapper):
     def __iter__(self):
         total_count = self.queryset.count()
@@ -252,3 +417,69 @@ def bulk_delete_objects(
         )
 
     return has_more
+
+
+def bulk_delete_objects_keyset(
+    model,
+    limit=10000,
+    after_id=0,
+    num_shards=None,
+    shard_id=None,
+    partition_key=None,
+    **filters,
+):
+    """
+    Delete up to ``limit`` rows matching ``filters`` (a mapping of column
+    names to values) that have an id greater than ``after_id``, in id order.
+
+    Returns a 2-tuple of the number of deleted rows and the largest deleted id
+    (or ``None``), which is the ``after_id`` of the next batch. Unlike
+    ``bulk_delete_objects``, every batch only has to scan the index from the
+    previous batch onwards rather than over the dead rows of previous batches.
+    """
+    connection = connections[router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+
+    params = []
+    partition_query = []
+
+    if partition_key:
+        for column, value in partition_key.items():
+            partition_query.append(f"{quote_name(column)} = %s")
+            params.append(value)
+
+    query = []
+    for column, value in filters.items():
+        query.append(f"{quote_name(column)} = %s")
+        params.append(value)
+    query.append("id > %s")
+    params.append(after_id)
+
+    if num_shards:
+        assert num_shards > 1
+        assert shard_id < num_shards
+        query.append(f"id %% {num_shards:d} = {shard_id:d}")
+
+    query = """
+        with deleted as (
+            delete from %(table)s
+            where %(partition_query)s id = any(array(
+                select id
+                from %(table)s
+                where (%(query)s)
+                order by id
+                limit %(limit)d
+            ))
+            returning id
+        )
+        select count(*), max(id) from deleted
+    """ % dict(
+        partition_query=(" AND ".join(partition_query)) + (" AND " if partition_query else ""),
+        query=" AND ".join(query),
+        table=model._meta.db_table,
+        limit=limit,
+    )
+
+    cursor = connection.cursor()
+    cursor.execute(query, params)
+    return cursor.fetchone()
@@ -985,6 +985,42 @@ def query(
             return nest_groups(body["data"], groupby, aggregate_names + selected_names)
 
 
+def bulk_query(snuba_param_list, referrer=None, use_cache=False):
+    """
+    Sends many queries to snuba at once, and returns the result of each one in
+    the same shape as ``query``. Queries outside of the retention period or
+    the activity of their issue have an empty result, the other queries are
+    not affected.
+    """
+    results = [OrderedDict() for _ in snuba_param_list]
+    to_query = []
+    for idx, snuba_params in enumerate(snuba_param_list):
+        try:
+            to_query.append((idx, snuba_params, _prepare_query_params(snuba_params)))
+        except (QueryOutsideRetentionError, QueryOutsideGroupActivityError):
+            continue
+
+    if not to_query:
+        return results
+
+    bodies = _apply_cache_and_build_results(
+        [prepared for _, _, prepared in to_query], referrer=referrer, use_cache=use_cache
+    )
+
+    # Validate and scrub the responses, like ``query`` does
+    with timer("process_result"):
+        for (idx, snuba_params, _), body in zip(to_query, bodies):
+            aggregate_names = [a[2] for a in snuba_params.aggregations]
+            expected_cols = set(snuba_params.groupby + aggregate_names)
+            got_cols = {c["name"] for c in body["meta"]}
+
+            assert expected_cols == got_cols, f"expected {expected_cols}, got {got_cols}"
+
+            results[idx] = nest_groups(body["data"], snuba_params.groupby, aggregate_names)
+
+    return results
+
+
 def nest_groups(data, groups, aggregate_cols):
     """
     Build a nested mapping from query response rows. Each group column
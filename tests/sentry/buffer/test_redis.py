@@ -211,6 +211,71 @@ class RedisBufferTest(TestCase):
         self.buf.process("foo")
         process.assert_called_once_with(mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, True)
 
+    def test_incr_saves_msgpack_to_redis(self):
+        buf = RedisBuffer(value_encoding="msgpack")
+        now = datetime(2017, 5, 3, 6, 6, 6, 123456, tzinfo=timezone.utc)
+        client = buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1, "datetime": now}
+        key = buf._make_key(model, filters=filters)
+        buf.incr(model, {"times_seen": 1}, filters, extra={"foo": "bar", "datetime": now})
+        result = {force_text(k): v for k, v in client.hgetall(key).items()}
+
+        assert buf.codec.decode(result.pop("f")) == {"pk": 1, "datetime": now}
+        assert buf.codec.decode(result.pop("e+datetime")) == now
+        assert buf.codec.decode(result.pop("e+foo")) == "bar"
+        assert result == {"i+times_seen": b"1", "m": b"unittest.mock.Mock"}
+
+    def test_codec_roundtrip(self):
+        naive = datetime(2017, 5, 3, 6, 6, 6, 1)
+        aware = datetime(2017, 5, 3, 6, 6, 6, 1, tzinfo=timezone.utc)
+        value = {"pk": 1, "key": "\u201d", "naive": naive, "aware": aware, "f": 1.5}
+        assert self.buf.codec.decode(self.buf.codec.encode(value)) == value
+
+        project = self.buf.codec.decode(self.buf.codec.encode(self.project))
+        assert isinstance(project, Project)
+        assert project.pk == self.project.pk
+
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_batched_flush(self, process):
+        buf = RedisBuffer(batched_flush=True, value_encoding="msgpack")
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+        buf.incr(Group, {"times_seen": 1}, {"pk": 1}, {"last_seen": now})
+        buf.incr(Group, {"times_seen": 2}, {"pk": 1}, {"last_seen": now})
+        buf.incr(Group, {"times_seen": 1}, {"pk": 2}, signal_only=True)
+
+        # A legacy pickled entry, written before the encoding was switched.
+        client = buf.cluster.get_routing_client()
+        client.hmset(
+            "foo",
+            {
+                "e+foo": pickle.dumps("bar"),
+                "f": pickle.dumps({"pk": 3}),
+                "i+times_seen": "2",
+                "m": "sentry.models.Group",
+            },
+        )
+        client.zadd("b:p", {"foo": 1})
+
+        keys = [force_text(key) for key in client.zrange("b:p", 0, -1)]
+        assert len(keys) == 3
+        buf.process(batch_keys=keys + ["missing"])
+
+        assert sorted(process.call_args_list, key=lambda call: call[0][2]["pk"]) == [
+            mock.call(Group, {"times_seen": 3}, {"pk": 1}, {"last_seen": now}, None),
+            mock.call(Group, {"times_seen": 1}, {"pk": 2}, {}, True),
+            mock.call(Group, {"times_seen": 2}, {"pk": 3}, {"foo": "bar"}, None),
+        ]
+        assert client.zrange("b:p", 0, -1) == []
+        for key in keys:
+            assert not client.exists(key)
+
+        # Flushing the same keys again is a no-op.
+        process.reset_mock()
+        buf.process(batch_keys=keys)
+        assert process.call_count == 0
+
 
 #    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
 #    def test_incr_uses_signal_only(self):
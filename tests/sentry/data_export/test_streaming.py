@@ -0,0 +1,47 @@
+import gzip
+import time
+
+from sentry.data_export.streaming import ExportFileWriter, iter_pages
+from sentry.models import File
+from sentry.testutils import TestCase
+
+
+def get_page(limit, offset, total=23):
+    # finish pages out of order to make sure they're still yielded in order
+    time.sleep(0.001 * (offset % 3))
+    return [{"id": i} for i in range(offset, min(offset + limit, total))]
+
+
+class IterPagesTest(TestCase):
+    def test_sequential(self):
+        pages = list(iter_pages(get_page, export_limit=100, batch_size=5))
+        assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+        assert [row["id"] for page in pages for row in page] == list(range(23))
+
+    def test_concurrent(self):
+        pages = list(iter_pages(get_page, export_limit=100, batch_size=5, concurrency=3))
+        assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+        assert [row["id"] for page in pages for row in page] == list(range(23))
+
+    def test_export_limit(self):
+        pages = list(iter_pages(get_page, export_limit=12, batch_size=5, concurrency=3))
+        assert [len(page) for page in pages] == [5, 5, 2]
+
+
+class ExportFileWriterTest(TestCase):
+    def test_write(self):
+        file = File.objects.create(name="export.csv", type="export.csv", headers={})
+        writer = ExportFileWriter(file, ["id", "value"], blob_size=64)
+        writer.writeheader()
+        for page in iter_pages(get_page, export_limit=100, batch_size=5):
+            writer.writerows([dict(row, value="x" * row["id"]) for row in page])
+        writer.close()
+
+        file = File.objects.get(id=file.id)
+        assert writer.rows == 23
+        assert file.size == writer.size
+        assert file.blobs.count() > 1
+        with file.getfile() as f:
+            lines = gzip.decompress(f.read()).decode("utf-8").strip().split("\r\n")
+        assert lines[0] == "id,value"
+        assert lines[1:] == [f"{i},{'x' * i}" for i in range(23)]
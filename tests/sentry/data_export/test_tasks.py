@@ -1,10 +1,11 @@
+import gzip
 from unittest.mock import patch
 
 from django.db import IntegrityError
 
 from sentry.data_export.base import ExportQueryType
 from sentry.data_export.models import ExportedData
-from sentry.data_export.tasks import assemble_download, merge_export_blobs
+from sentry.data_export.tasks import assemble_download, merge_export_blobs, stream_download
 from sentry.exceptions import InvalidSearchQuery
 from sentry.models import File
 from sentry.search.events.constants import TIMEOUT_ERROR_MESSAGE
@@ -654,6 +655,134 @@ class AssembleDownloadLargeTest(TestCase, SnubaTestCase):
         assert emailer.called
 
 
+class StreamDownloadTest(TestCase, SnubaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.org = self.create_organization()
+        self.project = self.create_project(organization=self.org)
+        self.event = self.store_event(
+            data={
+                "tags": {"foo": "bar"},
+                "fingerprint": ["group-1"],
+                "timestamp": iso_format(before_now(minutes=3)),
+            },
+            project_id=self.project.id,
+        )
+        for minutes in (2, 1):
+            self.store_event(
+                data={
+                    "tags": {"foo": "bar2"},
+                    "fingerprint": ["group-1"],
+                    "timestamp": iso_format(before_now(minutes=minutes)),
+                },
+                project_id=self.project.id,
+            )
+
+    def read_rows(self, data_export):
+        file = data_export._get_file()
+        assert file.headers == {"Content-Type": "text/csv", "Content-Encoding": "gzip"}
+        with file.getfile() as f:
+            return gzip.decompress(f.read()).strip().split(b"\r\n")
+
+    def test_task_persistent_name(self):
+        assert stream_download.name == "sentry.data_export.tasks.stream_download"
+
+    @patch("sentry.data_export.models.ExportedData.email_success")
+    def test_issue_by_tag(self, emailer):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=ExportQueryType.ISSUES_BY_TAG,
+            query_info={"project": [self.project.id], "group": self.event.group_id, "key": "foo"},
+        )
+        with self.tasks():
+            stream_download(de.id, batch_size=1, concurrency=1)
+        de = ExportedData.objects.get(id=de.id)
+        assert de.date_finished is not None
+        header, raw1, raw2 = self.read_rows(de)
+        assert header == b"value,times_seen,last_seen,first_seen"
+
+        raw1, raw2 = sorted([raw1, raw2])
+        assert raw1.startswith(b"bar,1,")
+        assert raw2.startswith(b"bar2,2,")
+
+        assert emailer.called
+
+    @patch("sentry.data_export.models.ExportedData.email_success")
+    def test_discover(self, emailer):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=ExportQueryType.DISCOVER,
+            query_info={"project": [self.project.id], "field": ["title"], "query": ""},
+        )
+        with self.tasks():
+            stream_download(de.id, batch_size=2, concurrency=1)
+        de = ExportedData.objects.get(id=de.id)
+        assert de.date_finished is not None
+        assert de._get_file().checksum is not None
+        header, *rows = self.read_rows(de)
+        assert header == b"title"
+        assert len(rows) == 3
+        assert all(row.startswith(b"<unlabeled event>") for row in rows)
+
+        assert emailer.called
+
+    @patch("sentry.data_export.models.ExportedData.email_success")
+    def test_discover_export_limit(self, emailer):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=ExportQueryType.DISCOVER,
+            query_info={"project": [self.project.id], "field": ["title"], "query": ""},
+        )
+        with self.tasks():
+            stream_download(de.id, export_limit=2, batch_size=1, concurrency=1)
+        de = ExportedData.objects.get(id=de.id)
+        header, *rows = self.read_rows(de)
+        assert len(rows) == 2
+
+    @patch("sentry.search.events.builder.raw_snql_query")
+    def test_retries_on_recoverable_snuba_errors(self, mock_query):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=ExportQueryType.DISCOVER,
+            query_info={"project": [self.project.id], "field": ["title"], "query": ""},
+        )
+        mock_query.side_effect = [
+            QueryMemoryLimitExceeded("test"),
+            {
+                "data": [{"count": 3}],
+                "meta": [{"name": "count", "type": "UInt64"}],
+            },
+        ]
+        with self.tasks():
+            stream_download(de.id, concurrency=1, countdown=0)
+        de = ExportedData.objects.get(id=de.id)
+        assert de.date_finished is not None
+        header, row = self.read_rows(de)
+        # the file of the failed attempt has been removed
+        assert File.objects.filter(type="export.csv").count() == 1
+
+    @patch("sentry.search.events.builder.raw_snql_query")
+    @patch("sentry.data_export.models.ExportedData.email_failure")
+    def test_discover_invalid_search_query(self, emailer, mock_query):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=ExportQueryType.DISCOVER,
+            query_info={"project": [self.project.id], "field": ["title"], "query": ""},
+        )
+        mock_query.side_effect = InvalidSearchQuery("test")
+        with self.tasks():
+            stream_download(de.id, concurrency=1)
+        error = emailer.call_args[1]["message"]
+        assert error == "Invalid query. Please fix the query and try again."
+        assert not File.objects.filter(type="export.csv").exists()
+
+
 class MergeExportBlobsTest(TestCase, SnubaTestCase):
     def test_task_persistent_name(self):
         assert merge_export_blobs.name == "sentry.data_export.tasks.merge_blobs"
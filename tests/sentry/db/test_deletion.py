@@ -1,8 +1,10 @@
 from datetime import timedelta
+from functools import partial
 
+from django.core.cache import cache
 from django.utils import timezone
 
-from sentry.db.deletion import BulkDeleteQuery
+from sentry.db.deletion import BulkDeleteQuery, PartitionedDeletion, RowBudget
 from sentry.models import Group, Project
 from sentry.testutils import TestCase, TransactionTestCase
 
@@ -34,6 +36,81 @@ class BulkDeleteQueryTest(TestCase):
         assert not Group.objects.filter(id=group1_2.id).exists()
         assert Group.objects.filter(id=group1_3.id).exists()
 
+    def test_delete_range(self):
+        now = timezone.now()
+        groups = [self.create_group(last_seen=now - timedelta(days=2)) for _ in range(3)]
+        recent = self.create_group(last_seen=now)
+        q = BulkDeleteQuery(model=Group, dtfield="last_seen", days=1)
+
+        lower, upper = q.get_id_range()
+        assert lower <= groups[0].id
+        assert upper == groups[-1].id
+        assert q.select_range(lower - 1, upper, chunk_size=2) == [g.id for g in groups[:2]]
+
+        assert q.delete_range(lower - 1, upper, chunk_size=2) == (2, groups[1].id)
+        assert q.delete_range(groups[1].id, upper) == (1, groups[2].id)
+        assert q.delete_range(groups[2].id, upper) == (0, None)
+        assert list(Group.objects.all()) == [recent]
+
+    def test_id_range(self):
+        now = timezone.now()
+        older = self.create_group(last_seen=now - timedelta(days=3))
+        self.create_group(last_seen=now)
+        q = BulkDeleteQuery(model=Group, dtfield="last_seen", days=1)
+
+        # Nothing expired within the last day before the cutoff.
+        lower, upper = q.get_id_range()
+        assert lower <= older.id
+        assert upper == older.id
+
+        # The upper bound covers every row that expired within that day, even
+        # if it is not the most recently expired one.
+        self.create_group(last_seen=now - timedelta(hours=30))
+        last = self.create_group(last_seen=now - timedelta(hours=36))
+        assert q.get_id_range() == (lower, last.id)
+
+    def test_partitioned_deletion(self):
+        now = timezone.now()
+        groups = [self.create_group(last_seen=now - timedelta(days=2)) for _ in range(5)]
+        recent = self.create_group(last_seen=now)
+        q = BulkDeleteQuery(model=Group, dtfield="last_seen", days=1)
+
+        # An interrupted run has left a checkpoint that already covers all
+        # but the last group.
+        cache.set("test-checkpoint", [[groups[-2].id, groups[-1].id]])
+
+        deletion = PartitionedDeletion(
+            q,
+            partial(q.delete_range, chunk_size=2),
+            partitions=3,
+            checkpoint_key="test-checkpoint",
+        )
+        assert deletion.run().rows == 1
+        assert cache.get("test-checkpoint") is None
+        assert Group.objects.filter(id=groups[0].id).exists()
+
+        deletion = PartitionedDeletion(q, partial(q.delete_range, chunk_size=2), partitions=3)
+        assert deletion.get_positions()[0][0] < groups[0].id
+        assert deletion.get_positions()[-1][1] == groups[-2].id
+        assert deletion.run().rows == 4
+        assert list(Group.objects.all()) == [recent]
+
+
+class RowBudgetTest(TestCase):
+    def test_consume(self):
+        now = [0.0]
+        sleeps = []
+        budget = RowBudget(100, clock=lambda: now[0], sleep=sleeps.append)
+
+        budget.consume(50)
+        budget.consume(50)
+        budget.consume(100)
+        assert sleeps == [0.5, 1.0]
+
+        now[0] = 10.0
+        budget.consume(100)
+        assert sleeps == [0.5, 1.0]
+
 
 class BulkDeleteQueryIteratorTestCase(TransactionTestCase):
     def test_iteration(self):
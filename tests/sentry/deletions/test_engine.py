@@ -0,0 +1,137 @@
+from django.core.cache import cache
+from django.test import override_settings
+
+from sentry import deletions
+from sentry.deletions.base import BulkModelDeletionTask, ModelDeletionTask, ModelRelation
+from sentry.deletions.engine import DeletionEngine, get_bulk_filters, plan_waves
+from sentry.models import (
+    EnvironmentProject,
+    Group,
+    GroupAssignee,
+    GroupMeta,
+    Project,
+    ProjectCodeOwners,
+    ProjectKey,
+    RepositoryProjectPathConfig,
+    ScheduledDeletion,
+)
+from sentry.tasks.deletion import run_deletion
+from sentry.testutils import TestCase, TransactionTestCase
+from sentry.utils.query import bulk_delete_objects_keyset
+
+
+class PlanWavesTest(TestCase):
+    def test_independent_relations(self):
+        relations = [
+            ModelRelation(ProjectKey, {"project_id": 1}),
+            ModelRelation(EnvironmentProject, {"project_id": 1}),
+        ]
+        assert plan_waves(relations) == [relations]
+
+    def test_dependent_relations(self):
+        codeowners = ModelRelation(ProjectCodeOwners, {"project_id": 1})
+        path_config = ModelRelation(RepositoryProjectPathConfig, {"project_id": 1})
+        meta = ModelRelation(GroupMeta, {"group__project": 1})
+        group = ModelRelation(Group, {"project_id": 1})
+        key = ModelRelation(ProjectKey, {"project_id": 1})
+
+        assert plan_waves([codeowners, path_config, meta, group, key]) == [
+            [codeowners, meta, key],
+            [path_config, group],
+        ]
+
+    def test_same_model(self):
+        first = ModelRelation(ProjectKey, {"project_id": 1})
+        second = ModelRelation(ProjectKey, {"project_id": 1}, BulkModelDeletionTask)
+        assert plan_waves([first, second]) == [[first], [second]]
+
+
+class GetBulkFiltersTest(TestCase):
+    def test_bulk_task(self):
+        task = deletions.get(
+            model=GroupAssignee, query={"project": self.project}, task=BulkModelDeletionTask
+        )
+        assert get_bulk_filters(task) == {"project_id": self.project.id}
+
+    def test_related_lookups(self):
+        task = deletions.get(
+            model=GroupMeta, query={"group__project": 1}, task=BulkModelDeletionTask
+        )
+        assert get_bulk_filters(task) is None
+
+    def test_model_with_relations(self):
+        task = deletions.get(model=Group, query={"project_id": 1}, task=ModelDeletionTask)
+        assert get_bulk_filters(task) is None
+
+
+class BulkDeleteObjectsKeysetTest(TestCase):
+    def test_batches(self):
+        groups = [self.create_group() for _ in range(5)]
+        meta = [GroupMeta.objects.create(group=group, key="foo", value="bar") for group in groups]
+        other = GroupMeta.objects.create(group=self.create_group(), key="bar", value="baz")
+
+        deleted, last_id = bulk_delete_objects_keyset(GroupMeta, limit=2, key="foo")
+        assert (deleted, last_id) == (2, meta[1].id)
+
+        deleted, last_id = bulk_delete_objects_keyset(
+            GroupMeta, limit=10, after_id=last_id, key="foo"
+        )
+        assert (deleted, last_id) == (3, meta[-1].id)
+
+        assert bulk_delete_objects_keyset(GroupMeta, after_id=last_id, key="foo") == (0, None)
+        assert list(GroupMeta.objects.all()) == [other]
+
+    def test_shards(self):
+        groups = [self.create_group() for _ in range(4)]
+        meta = [GroupMeta.objects.create(group=group, key="foo", value="bar") for group in groups]
+
+        deleted, _ = bulk_delete_objects_keyset(GroupMeta, num_shards=2, shard_id=0, key="foo")
+        assert deleted == len([m for m in meta if m.id % 2 == 0])
+        assert {m.id for m in GroupMeta.objects.all()} == {m.id for m in meta if m.id % 2 == 1}
+
+
+class DeletionEngineTest(TransactionTestCase):
+    def test_resume_from_checkpoint(self):
+        project = self.create_project()
+        keys = [self.create_project_key(project) for _ in range(3)]
+        count = ProjectKey.objects.filter(project_id=project.id).count()
+
+        engine = DeletionEngine(
+            deletions.default_manager, transaction_id="abc", concurrency=1, batch_size=1
+        )
+        relation = ModelRelation(ProjectKey, {"project_id": project.id}, BulkModelDeletionTask)
+
+        # A checkpoint past all keys must not prevent them from being deleted.
+        task = deletions.get(task=relation.task, **relation.params)
+        checkpoint_key = engine.get_checkpoint_key(task, get_bulk_filters(task))
+        cache.set(checkpoint_key, keys[-1].id)
+
+        engine.delete_relations([relation])
+
+        assert not ProjectKey.objects.filter(project_id=project.id).exists()
+        assert cache.get(checkpoint_key) is None
+        assert engine.get_stats()["ProjectKey"].rows == count
+
+    @override_settings(
+        SENTRY_DELETIONS_CONCURRENCY=4, SENTRY_DELETIONS_NUM_SHARDS=2, SENTRY_DELETIONS_BATCH_SIZE=2
+    )
+    def test_delete_project(self):
+        project = self.create_project(name="test")
+        groups = [self.create_group(project=project) for _ in range(5)]
+        for group in groups:
+            GroupAssignee.objects.create(group=group, project=project, user=self.user)
+            GroupMeta.objects.create(group=group, key="foo", value="bar")
+        other_group = self.create_group()
+        GroupMeta.objects.create(group=other_group, key="foo", value="bar")
+
+        deletion = ScheduledDeletion.schedule(project, days=0)
+        deletion.update(in_progress=True)
+
+        with self.tasks():
+            run_deletion(deletion.id)
+
+        assert not Project.objects.filter(id=project.id).exists()
+        assert not Group.objects.filter(project_id=project.id).exists()
+        assert not GroupAssignee.objects.filter(project_id=project.id).exists()
+        assert not GroupMeta.objects.filter(group__project=project).exists()
+        assert GroupMeta.objects.filter(group=other_group).exists()
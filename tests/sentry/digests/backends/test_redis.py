@@ -1,10 +1,13 @@
 import time
+from unittest import mock
 
 import pytest
 
+from sentry import nodestore
 from sentry.digests import Record
 from sentry.digests.backends.base import InvalidState
 from sentry.digests.backends.redis import RedisBackend
+from sentry.digests.notifications import event_to_record
 from sentry.testutils import TestCase
 
 
@@ -151,3 +154,24 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_notification_codec(self):
+        backend = RedisBackend(codec={"path": "sentry.digests.codecs.NotificationCodec"})
+
+        event = self.store_event(data={"message": "hello world"}, project_id=self.project.id)
+        rule = self.create_project_rule(project=self.project)
+        record_1 = event_to_record(event, [rule])
+        backend.add("timeline", record_1)
+        backend.add("timeline", Record("record:2", "value", time.time()))
+        backend._get_connection("timeline").delete("d:t:timeline:r:record:2")
+
+        with mock.patch.object(
+            nodestore, "get_multi", wraps=nodestore.get_multi
+        ) as get_multi, backend.digest("timeline", 0) as records:
+            assert [record.key for record in records] == [record_1.key]
+            value = records[0].value
+            assert value.rules == [rule.id]
+            assert value.event.event_id == event.event_id
+            assert value.event.group_id == event.group_id
+            assert value.event.data["logentry"] == event.data["logentry"]
+            assert get_multi.call_count == 1
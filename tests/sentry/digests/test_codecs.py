@@ -0,0 +1,36 @@
+from sentry.digests.codecs import CompressedPickleCodec, NotificationCodec
+from sentry.digests.notifications import event_to_record
+from sentry.testutils import TestCase
+
+
+class NotificationCodecTestCase(TestCase):
+    def test_encode_notification(self):
+        codec = NotificationCodec()
+        event = self.store_event(data={"message": "hello world"}, project_id=self.project.id)
+        rule = self.create_project_rule(project=self.project)
+        notification = event_to_record(event, [rule]).value
+
+        value = codec.encode(notification)
+        assert value == (
+            f'n1:[{self.project.id},"{event.event_id}",{event.group_id},[{rule.id}]]'.encode()
+        )
+
+        for decoded in [codec.decode(value), codec.decode_many([value])[0]]:
+            assert decoded.rules == [rule.id]
+            assert decoded.event.project_id == self.project.id
+            assert decoded.event.event_id == event.event_id
+            assert decoded.event.group == event.group
+            assert decoded.event.data["logentry"] == event.data["logentry"]
+
+    def test_fallback(self):
+        codec = NotificationCodec()
+        value = {"key": "value"}
+        assert codec.encode(value) == CompressedPickleCodec().encode(value)
+        assert codec.decode(codec.encode(value)) == value
+        assert codec.decode_many([codec.encode(value)]) == [value]
+
+        # Records written before switching codecs can still be read
+        event = self.store_event(data={"message": "hello world"}, project_id=self.project.id)
+        notification = event_to_record(event, []).value
+        decoded = codec.decode(CompressedPickleCodec().encode(notification))
+        assert decoded.event.event_id == event.event_id
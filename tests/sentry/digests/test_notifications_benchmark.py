@@ -0,0 +1,63 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from sentry.digests.codecs import CompressedPickleCodec, NotificationCodec
+from sentry.digests.notifications import build_digest, event_to_record
+from sentry.eventstore.models import Event
+from sentry.utils.samples import load_data
+
+CODECS = [CompressedPickleCodec, NotificationCodec]
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+@pytest.fixture
+def rules(factories, default_project):
+    return [factories.create_project_rule(project=default_project) for _ in range(2)]
+
+
+@pytest.fixture
+def records(factories, default_project, rules):
+    # A digest of a high-volume project, with many records of a few groups
+    groups = [factories.create_group(project=default_project) for _ in range(20)]
+    data = load_data("python")
+    now = timezone.now()
+    records = []
+    for i in range(10000):
+        event = Event(
+            default_project.id,
+            uuid.uuid4().hex,
+            group_id=groups[i % len(groups)].id,
+            data=dict(data, timestamp=(now - timedelta(seconds=i)).timestamp()),
+        )
+        records.append(event_to_record(event, rules[: i % len(rules) + 1]))
+    return records
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.django_db
+def test_benchmark_build_digest(default_project, records, benchmark):
+    digest, logs = benchmark(lambda: build_digest(default_project, records))
+    assert sum(len(records) for groups in digest.values() for records in groups.values()) == 15000
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.django_db
+@pytest.mark.parametrize("codec", CODECS)
+def test_benchmark_decode_records(records, codec, benchmark):
+    codec = codec()
+    values = [codec.encode(record.value) for record in records]
+    decoded = benchmark(lambda: codec.decode_many(values))
+    assert [value.event.event_id for value in decoded] == [
+        record.value.event.event_id for record in records
+    ]
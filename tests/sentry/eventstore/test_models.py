@@ -1,4 +1,5 @@
 import pickle
+from unittest import mock
 
 import pytest
 
@@ -7,6 +8,7 @@ from sentry.db.models.fields.node import NodeData, NodeIntegrityFailure
 from sentry.eventstore.models import Event
 from sentry.grouping.enhancer import Enhancements
 from sentry.models import Environment
+from sentry.nodestore import encoding
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
 from sentry.utils import snuba
@@ -348,6 +350,29 @@ class EventNodeStoreTest(TestCase):
         e2_body = nodestore.get(e2_node_id)
         assert e2_body is None
 
+    def test_lazy_node_data(self):
+        data = {"message": "hello", "breadcrumbs": {"values": [{"message": "crumb"}]}}
+        with self.settings(SENTRY_NODESTORE_FORMAT_VERSION=2):
+            NodeData("lazy-node", data=dict(data)).save()
+        nodestore.backend._delete_cache_item("lazy-node")
+
+        node = NodeData("lazy-node")
+        with mock.patch(
+            "sentry.nodestore.encoding.json_loads", wraps=encoding.json_loads
+        ) as json_loads:
+            assert node["message"] == "hello"
+            assert "breadcrumbs" in node
+            assert "_ref" not in node
+
+        # Only the index and the key that was read have been decoded.
+        assert json_loads.call_count == 2
+        assert json_loads.call_args == mock.call(b'"hello"')
+        assert node._node_data is None
+
+        # Modifying the node loads its data in full.
+        node["level"] = "error"
+        assert node.data == dict(data, level="error")
+
     def test_screams_bloody_murder_when_ref_fails(self):
         project1 = self.create_project()
         project2 = self.create_project()
@@ -4,12 +4,14 @@ import pytest
 
 from sentry import options
 from sentry.eventstream.kafka.postprocessworker import (
+    _BATCH_SIZE_OPTION,
     _CONCURRENCY_OPTION,
     ErrorsPostProcessForwarderWorker,
     PostProcessForwarderWorker,
     TransactionsPostProcessForwarderWorker,
 )
 from sentry.eventstream.kafka.protocol import InvalidVersion
+from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
 
 
@@ -160,6 +162,49 @@ def test_post_process_forwarder_concurrency(kafka_message_payload):
     forwarder.shutdown()
 
 
+@pytest.mark.django_db
+@patch("sentry.eventstream.kafka.postprocessworker.post_process_group_batch")
+@patch("sentry.eventstream.kafka.postprocessworker.dispatch_post_process_group_task")
+def test_post_process_forwarder_batch(
+    dispatch_post_process_group_task, post_process_group_batch, kafka_message_payload
+):
+    """
+    Tests that the events of a batch are post processed by tasks of at most the batch size.
+    """
+    forwarder = PostProcessForwarderWorker(concurrency=2)
+
+    messages = []
+    for i in range(3):
+        kafka_message_payload[2]["event_id"] = f"{i:032x}"
+        mock_message = Mock()
+        mock_message.headers = MagicMock(return_value=[])
+        mock_message.value = MagicMock(return_value=json.dumps(kafka_message_payload))
+        mock_message.partition = MagicMock("1")
+        messages.append(mock_message)
+
+    with override_options({_BATCH_SIZE_OPTION: 2, "post-process-forwarder:kafka-headers": False}):
+        futures = [forwarder.process_message(message) for message in messages]
+        forwarder.flush_batch(futures)
+
+    assert not dispatch_post_process_group_task.called
+    assert post_process_group_batch.delay.call_count == 2
+    batches = [call.kwargs["events"] for call in post_process_group_batch.delay.call_args_list]
+    assert [len(events) for events in batches] == [2, 1]
+    assert batches[0][0] == {
+        "is_new": False,
+        "is_regression": None,
+        "is_new_group_environment": False,
+        "primary_hash": "311ee66a5b8e697929804ceb1c456ffe",
+        "cache_key": "e:00000000000000000000000000000000:1",
+        "group_id": 43,
+    }
+    assert [event["cache_key"] for events in batches for event in events] == [
+        f"e:{i:032x}:1" for i in range(3)
+    ]
+
+    forwarder.shutdown()
+
+
 @pytest.mark.django_db
 @patch("sentry.eventstream.kafka.postprocessworker.dispatch_post_process_group_task")
 def test_errors_post_process_forwarder_missing_headers(
@@ -0,0 +1,82 @@
+import os
+import random
+from io import BytesIO
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from sentry.filestore.blobcache import BlobCache
+from sentry.models import File
+
+FILE_SIZE = 32 * 1024 * 1024
+BLOB_SIZE = 1024 * 1024
+READ_SIZE = 4096
+READS = 16
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+@pytest.fixture
+def file():
+    # Stored in the local filesystem storage configured for tests
+    data = os.urandom(FILE_SIZE)
+    file = File.objects.create(name="test.bin", type="default", size=len(data))
+    file.putfile(BytesIO(data), blob_size=BLOB_SIZE)
+    return file, data
+
+
+def read_ranges(fp, offsets):
+    results = []
+    for offset in offsets:
+        fp.seek(offset)
+        results.append(fp.read(READ_SIZE))
+    # e.g. the central directory of a zip archive
+    fp.seek(-READ_SIZE, os.SEEK_END)
+    results.append(fp.read())
+    return results
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.django_db
+@pytest.mark.parametrize("mode", ["prefetch", "range", "read_ahead", "cached"])
+def test_benchmark_range_reads(file, mode, benchmark):
+    file, data = file
+    rng = random.Random(0)
+    offsets = sorted(rng.randrange(FILE_SIZE - READ_SIZE) for _ in range(READS))
+    expected = read_ranges(BytesIO(data), offsets)
+
+    with TemporaryDirectory() as path:
+        cache = BlobCache(path, max_size=FILE_SIZE) if mode == "cached" else None
+
+        def read():
+            if mode == "prefetch":
+                fp = file._get_chunked_blob(prefetch=True)
+            else:
+                fp = file._get_chunked_blob(read_ahead=2 if mode != "range" else 0, cache=cache)
+            with fp:
+                return read_ranges(fp, offsets)
+
+        assert benchmark(read) == expected
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.django_db
+@pytest.mark.parametrize("read_ahead", [0, 2, 4])
+def test_benchmark_sequential_reads(file, read_ahead, benchmark):
+    file, data = file
+
+    def read():
+        result = bytearray()
+        with file._get_chunked_blob(read_ahead=read_ahead) as fp:
+            for chunk in iter(lambda: fp.read(65536), b""):
+                result.extend(chunk)
+        return bytes(result)
+
+    assert benchmark(read) == data
@@ -0,0 +1,45 @@
+import os
+
+from sentry.filestore.blobcache import BlobCache
+
+
+def test_get_set(tmpdir):
+    cache = BlobCache(str(tmpdir), max_size=100)
+    assert cache.get("a" * 40) is None
+
+    cache.set("a" * 40, b"foo")
+    assert cache.get("a" * 40) == b"foo"
+
+    # Other processes share the entries
+    assert BlobCache(str(tmpdir), max_size=100).get("a" * 40) == b"foo"
+
+
+def test_lru_eviction(tmpdir):
+    cache = BlobCache(str(tmpdir), max_size=100)
+    cache.set("a" * 40, b"a" * 40)
+    cache.set("b" * 40, b"b" * 40)
+    assert cache.get("a" * 40) == b"a" * 40
+
+    # "b" is the least recently used entry
+    cache.set("c" * 40, b"c" * 40)
+    assert cache.get("a" * 40) == b"a" * 40
+    assert cache.get("b" * 40) is None
+    assert cache.get("c" * 40) == b"c" * 40
+
+    # Values larger than the cache are not stored
+    cache.set("d" * 40, b"d" * 101)
+    assert cache.get("d" * 40) is None
+    assert cache.get("a" * 40) == b"a" * 40
+
+
+def test_load_existing_entries(tmpdir):
+    BlobCache(str(tmpdir), max_size=100).set("a" * 40, b"a" * 60)
+
+    cache = BlobCache(str(tmpdir), max_size=100)
+    cache.set("b" * 40, b"b" * 60)
+    assert cache.get("a" * 40) is None
+    assert cache.get("b" * 40) == b"b" * 60
+
+    cache.clear()
+    assert cache.get("b" * 40) is None
+    assert not os.listdir(os.path.join(str(tmpdir), "bb"))
@@ -1,7 +1,9 @@
 import pytest
 
 from sentry.grouping.api import get_default_grouping_config_dict
+from sentry.grouping.enhancer import ENHANCEMENT_BASES, Enhancements
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
+from sentry.utils.safe import get_path
 from tests.sentry.grouping import grouping_input as grouping_inputs
 
 CONFIGS = {key: get_default_grouping_config_dict(key) for key in sorted(CONFIGURATIONS.keys())}
@@ -37,3 +39,33 @@ def run_configuration(grouping_input, config):
     event.project = None
 
     event.get_hashes()
+
+
+def _get_stacktraces(grouping_input):
+    data = grouping_input.data
+    for exception in get_path(data, "exception", "values", filter=True) or ():
+        frames = get_path(exception, "stacktrace", "frames", filter=True)
+        if frames:
+            yield frames, data.get("platform"), exception
+    frames = get_path(data, "stacktrace", "frames", filter=True)
+    if frames:
+        yield frames, data.get("platform"), None
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("base", sorted(ENHANCEMENT_BASES))
+def test_benchmark_enhancements(base, benchmark):
+    enhancements = Enhancements([], bases=[base])
+    stacktraces = [
+        stacktrace
+        for grouping_input in grouping_inputs
+        for stacktrace in _get_stacktraces(grouping_input)
+    ]
+
+    def run():
+        for frames, platform, exception_data in stacktraces:
+            # Frames are modified in place, so every round works on copies.
+            frames = [dict(frame) for frame in frames]
+            enhancements.apply_modifications_to_frame(frames, platform, exception_data)
+
+    benchmark(run)
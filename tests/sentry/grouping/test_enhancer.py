@@ -1,7 +1,13 @@
 import pytest
 
 from sentry.grouping.component import GroupingComponent
-from sentry.grouping.enhancer import Enhancements, InvalidEnhancerConfig, create_match_frame
+from sentry.grouping.enhancer import (
+    ENHANCEMENT_BASES,
+    CompiledRules,
+    Enhancements,
+    InvalidEnhancerConfig,
+    create_match_frame,
+)
 
 
 def dump_obj(obj):
@@ -412,3 +418,84 @@ def test_sentinel_and_prefix(action, type):
     actions[0][1].update_frame_components_contributions([component], frames, 0)
     expected = action == "+"
     assert getattr(component, f"is_{type}_frame") is expected
+
+
+COMPILED_RULES_FRAMES = [
+    {"function": "main", "module": "app.main", "abs_path": "/src/app/main.py", "in_app": True},
+    {"function": "__libc_start_main", "package": "/usr/lib/libc.so.6", "platform": "native"},
+    {"function": "std::panicking::begin_panic", "module": "std::panicking", "platform": "native"},
+    {"function": "core::result::unwrap_failed", "module": "core::result", "platform": "native"},
+    {"function": "dispatch", "abs_path": "webpack:///./node_modules/react-dom/index.js"},
+    {"function": "foo", "filename": "C:\\Windows\\System32\\kernel32.dll"},
+    {"function": "objc_exception_throw", "package": "/usr/lib/libobjc.A.dylib"},
+]
+
+
+@pytest.mark.parametrize("base", sorted(ENHANCEMENT_BASES))
+@pytest.mark.parametrize("platform", ["native", "javascript", "python", "cocoa"])
+def test_compiled_rules_match_rules(base, platform):
+    rules = list(ENHANCEMENT_BASES[base].iter_rules())
+    rules += Enhancements.from_config_string(
+        """
+        [ function:main ] | function:__libc_start_main   -group
+        function:dispatch | [ !module:std::* ]           +app
+        function:foo                                     ^-app
+        error.type:ValueError function:main              +app
+        """
+    ).rules
+    match_frames = [create_match_frame(frame, platform) for frame in COMPILED_RULES_FRAMES]
+    exception_data = {"type": "ValueError"}
+
+    expected = [
+        (rule, idx, action)
+        for rule in rules
+        for idx, action in rule.get_matching_frame_actions(
+            match_frames, platform, exception_data, {}
+        )
+    ]
+    assert expected
+    assert (
+        list(
+            CompiledRules(rules).iter_matching_frame_actions(
+                match_frames, platform, exception_data, {}
+            )
+        )
+        == expected
+    )
+
+
+def test_compiled_rules_apply_modifications():
+    enhancement = Enhancements.from_config_string(
+        """
+        app:no category:other       +app
+        app:yes category:other      -app
+        category:foo                +app
+        app:yes                     category=bar
+        category:bar function:foo   -app
+        app:no                      category=baz
+        """
+    )
+    frames = [
+        {"function": "foo", "in_app": False, "data": {"category": "foo"}},
+        {"function": "bar", "in_app": False, "data": {"category": "foo"}},
+        {"function": "baz", "in_app": False},
+    ]
+
+    # The first rules match no frames, but evaluate the `app:` matchers before
+    # the other rules change `in_app`. Applying the rules one after another,
+    # like before they were compiled, must give the same result.
+    expected = [dict(frame, data=dict(frame.get("data") or {})) for frame in frames]
+    match_frames = [create_match_frame(frame, "native") for frame in expected]
+    for rule in enhancement.rules:
+        for idx, action in rule.get_matching_frame_actions(match_frames, "native", None, {}):
+            action.apply_modifications_to_frame(expected, match_frames, idx, rule=rule)
+
+    enhancement.apply_modifications_to_frame(frames, "native", None)
+    assert frames == expected
+    assert [frame["in_app"] for frame in frames] == [False, True, False]
+    assert [frame["data"]["category"] for frame in frames] == ["baz", "bar", "baz"]
+
+
+def test_loads_is_cached():
+    dumped = Enhancements.from_config_string("function:foo +app").dumps()
+    assert Enhancements.loads(dumped) is Enhancements.loads(dumped)
@@ -36,6 +36,7 @@ from sentry.incidents.subscription_processor import (
     get_alert_rule_stats,
     get_redis_client,
     partition,
+    process_updates,
     update_alert_rule_stats,
 )
 from sentry.models import Integration
@@ -264,6 +265,13 @@ class ProcessUpdateTest(ProcessUpdateBaseClass):
             processor.process_update(message)
         return processor
 
+    def send_updates(self, updates):
+        self.email_action_handler.reset_mock()
+        with self.feature(
+            ["organizations:incidents", "organizations:performance-view"]
+        ), self.capture_on_commit_callbacks(execute=True):
+            process_updates(updates)
+
     def assert_slack_calls(self, trigger_labels):
         expected_result = [f"{label}: some rule 2" for label in trigger_labels]
         actual = [
@@ -1601,6 +1609,103 @@ class ProcessUpdateTest(ProcessUpdateBaseClass):
             incident, [self.action], [(150.0, IncidentStatus.CLOSED)]
         )
 
+    def test_process_updates(self):
+        rule = self.rule
+        rule.update(threshold_period=2)
+        trigger = self.trigger
+        updates = [
+            (
+                self.build_subscription_update(
+                    self.sub, timedelta(minutes=-2), trigger.alert_threshold + 1
+                ),
+                self.sub,
+            ),
+            (
+                self.build_subscription_update(
+                    self.other_sub, timedelta(minutes=-2), trigger.alert_threshold + 1
+                ),
+                self.other_sub,
+            ),
+            (
+                self.build_subscription_update(
+                    self.sub, timedelta(minutes=-1), trigger.alert_threshold + 2
+                ),
+                self.sub,
+            ),
+        ]
+        self.send_updates(updates)
+
+        # Only the first subscription reached the threshold period
+        incident = self.assert_active_incident(rule, self.sub)
+        self.assert_no_active_incident(rule, self.other_sub)
+        self.assert_trigger_exists_with_status(incident, trigger, TriggerStatus.ACTIVE)
+        self.assert_actions_fired_for_incident(
+            incident, [self.action], [(trigger.alert_threshold + 2, IncidentStatus.CRITICAL)]
+        )
+
+        # The stats of both subscriptions are written once the batch is processed
+        last_update, alert_counts, resolve_counts = get_alert_rule_stats(rule, self.sub, [trigger])
+        assert last_update == updates[2][0]["timestamp"]
+        assert alert_counts == {trigger.id: 0}
+        assert resolve_counts == {trigger.id: 0}
+        last_update, alert_counts, resolve_counts = get_alert_rule_stats(
+            rule, self.other_sub, [trigger]
+        )
+        assert last_update == updates[1][0]["timestamp"]
+        assert alert_counts == {trigger.id: 1}
+        assert resolve_counts == {trigger.id: 0}
+
+        # The next batch continues from the stored stats and the active incident
+        self.send_updates(
+            [
+                (
+                    self.build_subscription_update(
+                        self.other_sub, timedelta(), trigger.alert_threshold + 1
+                    ),
+                    self.other_sub,
+                ),
+                (
+                    self.build_subscription_update(
+                        self.sub, timedelta(), rule.resolve_threshold - 1
+                    ),
+                    self.sub,
+                ),
+            ]
+        )
+        self.assert_active_incident(rule, self.other_sub)
+        self.assert_no_active_incident(rule, self.sub)
+        self.assert_trigger_exists_with_status(incident, trigger, TriggerStatus.RESOLVED)
+
+    def test_process_updates_removed_alert_rule(self):
+        updates = [(self.build_subscription_update(self.sub), self.sub)]
+        self.rule.delete()
+        self.send_updates(updates)
+        self.metrics.incr.assert_called_once_with(
+            "incidents.alert_rules.no_alert_rule_for_subscription"
+        )
+
+    def test_process_updates_comparison_alert(self):
+        rule = self.comparison_rule_above
+        comparison_date = timezone.now() - timedelta(seconds=rule.comparison_delta)
+        for i in range(4):
+            self.store_event(
+                data={"timestamp": iso_format(comparison_date - timedelta(minutes=30 + i))},
+                project_id=self.project.id,
+            )
+
+        # The comparison queries of all updates run concurrently
+        self.send_updates(
+            [
+                (self.build_subscription_update(self.sub, timedelta(minutes=-9), 2), self.sub),
+                (self.build_subscription_update(self.sub, timedelta(minutes=-8), 7), self.sub),
+            ]
+        )
+        incident = self.assert_active_incident(rule)
+        self.assert_trigger_exists_with_status(incident, self.trigger, TriggerStatus.ACTIVE)
+        self.assert_actions_fired_for_incident(
+            incident, [self.action], [(175.0, IncidentStatus.CRITICAL)]
+        )
+
 
 class MetricsCrashRateAlertProcessUpdateTest(ProcessUpdateBaseClass, BaseMetricsTestCase):
     entity_subscription_metrics = patcher("sentry.snuba.entity_subscription.metrics")
@@ -3,10 +3,13 @@ import time
 import uuid
 from unittest.mock import Mock
 
+import msgpack
 import pytest
 
+from sentry.attachments import attachment_cache
 from sentry.event_manager import EventManager
 from sentry.ingest.ingest_consumer import (
+    PipelinedIngestConsumerWorker,
     process_attachment_chunk,
     process_event,
     process_individual_attachment,
@@ -190,6 +193,81 @@ def test_with_attachments(default_project, task_runner, missing_chunks, monkeypa
         assert not persisted_attachments
 
 
+@pytest.mark.django_db(transaction=True)
+def test_pipelined_worker(default_project, preprocess_event):
+    payload = get_normalized_event({"message": "hello world"}, default_project)
+    other_payload = get_normalized_event({"message": "hello again"}, default_project)
+    attachment_id = "ca90fb45-6dd9-40a0-a18f-8693aa621abb"
+    project_id = default_project.id
+    start_time = time.time() - 3600
+
+    class FakeKafkaMessage:
+        def __init__(self, value):
+            self.__value = msgpack.packb(value)
+
+        def value(self):
+            return self.__value
+
+    messages = [
+        {
+            "type": "attachment_chunk",
+            "payload": chunk,
+            "event_id": payload["event_id"],
+            "project_id": project_id,
+            "id": attachment_id,
+            "chunk_index": i,
+        }
+        for i, chunk in enumerate([b"Hello ", b"World!"])
+    ]
+    messages.append(
+        {
+            "type": "event",
+            "payload": json.dumps(payload),
+            "start_time": start_time,
+            "event_id": payload["event_id"],
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+            "attachments": [
+                {
+                    "id": attachment_id,
+                    "name": "lol.txt",
+                    "content_type": "text/plain",
+                    "attachment_type": "custom.attachment",
+                    "chunks": 2,
+                }
+            ],
+        }
+    )
+    messages.append(
+        {
+            "type": "event",
+            "payload": json.dumps(other_payload),
+            "start_time": start_time,
+            "event_id": other_payload["event_id"],
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+        }
+    )
+
+    worker = PipelinedIngestConsumerWorker()
+    try:
+        worker.flush_batch(
+            [worker.process_message(FakeKafkaMessage(message)) for message in messages]
+        )
+        stats = worker.get_stats()
+    finally:
+        worker.shutdown()
+
+    assert sorted(kwargs["event_id"] for kwargs in preprocess_event) == sorted(
+        [payload["event_id"], other_payload["event_id"]]
+    )
+    assert stats["decode"].items == 4
+    assert stats["dispatch"].items == 2
+
+    (attachment,) = attachment_cache.get(f"e:{payload['event_id']}:{project_id}")
+    assert attachment.data == b"Hello World!"
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     "event_attachments", [True, False], ids=["with_feature", "without_feature"]
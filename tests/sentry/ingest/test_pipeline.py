@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from sentry.ingest.pipeline import Pipeline, PipelineBatch, Stage
+
+
+def test_pipeline_runs_all_stages():
+    results = []
+    pipeline = Pipeline(
+        "test",
+        [
+            Stage("double", lambda x: x * 2, concurrency=2),
+            Stage("increment", lambda x: x + 1, concurrency=2),
+        ],
+    )
+
+    batch = PipelineBatch()
+    for i in range(10):
+        pipeline.submit(batch, i, on_result=results.append)
+    batch.wait()
+
+    assert sorted(results) == [i * 2 + 1 for i in range(10)]
+    assert {name: stats.items for name, stats in pipeline.get_stats().items()} == {
+        "double": 10,
+        "increment": 10,
+    }
+    pipeline.shutdown()
+
+
+def test_pipeline_drops_none():
+    results = []
+    pipeline = Pipeline(
+        "test",
+        [
+            Stage("filter", lambda x: x if x % 2 else None),
+            Stage("identity", lambda x: x),
+        ],
+    )
+
+    batch = PipelineBatch()
+    for i in range(10):
+        pipeline.submit(batch, i, on_result=results.append)
+    batch.wait()
+
+    assert sorted(results) == [1, 3, 5, 7, 9]
+    assert pipeline.get_stats()["identity"].items == 5
+    pipeline.shutdown()
+
+
+def test_pipeline_raises_first_error():
+    def explode(x):
+        if x == 3:
+            raise ValueError(x)
+        return x
+
+    results = []
+    pipeline = Pipeline("test", [Stage("explode", explode)])
+
+    batch = PipelineBatch()
+    for i in range(5):
+        pipeline.submit(batch, i, on_result=results.append)
+
+    with pytest.raises(ValueError):
+        batch.wait()
+
+    assert sorted(results) == [0, 1, 2, 4]
+    pipeline.shutdown()
+
+
+def test_pipeline_backpressure():
+    release = threading.Event()
+    submitted = []
+
+    def block(x):
+        release.wait()
+        return x
+
+    pipeline = Pipeline("test", [Stage("block", block, concurrency=1, max_pending=2)])
+    batch = PipelineBatch()
+
+    def produce():
+        for i in range(4):
+            pipeline.submit(batch, i)
+            submitted.append(i)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    producer.join(0.1)
+
+    # Only ``max_pending`` items may be in flight while the stage is blocked.
+    assert submitted == [0, 1]
+
+    release.set()
+    producer.join()
+    batch.wait()
+    assert submitted == [0, 1, 2, 3]
+    pipeline.shutdown()
@@ -1,6 +1,9 @@
 from unittest import TestCase
+from unittest.mock import Mock
 
-from sentry.lang.javascript.cache import SourceCache
+from django.test import override_settings
+
+from sentry.lang.javascript.cache import SourceCache, get_cached_view
 
 
 class BasicCacheTest(TestCase):
@@ -37,3 +40,34 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == "foobar"
+
+
+class ViewCacheTest(TestCase):
+    def test_disabled(self):
+        parse = Mock(side_effect=lambda body: body.decode("utf-8"))
+        with override_settings(SENTRY_JS_VIEW_CACHE_SIZE=0):
+            assert get_cached_view("source", "foo.js", b"foo", parse) == "foo"
+            assert get_cached_view("source", "foo.js", b"foo", parse) == "foo"
+        assert parse.call_count == 2
+
+    def test_cached(self):
+        parse = Mock(side_effect=lambda body: body.decode("utf-8"))
+        release = Mock(id=1)
+        with override_settings(SENTRY_JS_VIEW_CACHE_SIZE=1024, SENTRY_JS_VIEW_CACHE_TTL=60):
+            assert get_cached_view("source", "foo.js", b"foo", parse, release=release) == "foo"
+            assert get_cached_view("source", "foo.js", b"foo", parse, release=release) == "foo"
+            assert parse.call_count == 1
+
+            # a changed body, another release or url are parsed again
+            assert get_cached_view("source", "foo.js", b"bar", parse, release=release) == "bar"
+            assert get_cached_view("source", "foo.js", b"foo", parse, release=Mock(id=2)) == "foo"
+            assert get_cached_view("source", "bar.js", b"foo", parse, release=release) == "foo"
+            assert parse.call_count == 4
+
+    def test_size_limit(self):
+        parse = Mock(side_effect=lambda body: body.decode("utf-8"))
+        with override_settings(SENTRY_JS_VIEW_CACHE_SIZE=4, SENTRY_JS_VIEW_CACHE_TTL=60):
+            get_cached_view("source", "foo.js", b"foo", parse)
+            get_cached_view("source", "bar.js", b"bar", parse)
+            get_cached_view("source", "foo.js", b"foo", parse)
+        assert parse.call_count == 3
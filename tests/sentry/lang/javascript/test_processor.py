@@ -1,13 +1,17 @@
 import errno
+import os
 import re
 import unittest
 import zipfile
+import zlib
 from copy import deepcopy
 from io import BytesIO
+from tempfile import TemporaryDirectory
 from unittest.mock import ANY, MagicMock, call, patch
 
 import pytest
 import responses
+from django.test import override_settings
 from requests.exceptions import RequestException
 from symbolic import SourceMapTokenMatch
 
@@ -16,9 +20,11 @@ from sentry.lang.javascript.errormapping import REACT_MAPPING_URL, rewrite_excep
 from sentry.lang.javascript.processor import (
     CACHE_CONTROL_MAX,
     CACHE_CONTROL_MIN,
+    DISK_CACHE_MIN_SIZE,
     JavaScriptStacktraceProcessor,
     UnparseableSourcemap,
     cache,
+    decompress_body,
     discover_sourcemap,
     fetch_file,
     fetch_release_archive_for_url,
@@ -1029,6 +1035,23 @@ class FetchSourcemapTest(TestCase):
             fetch_sourcemap("http://example.com")
 
 
+class DecompressBodyTest(unittest.TestCase):
+    def test_disk_cache(self):
+        body = os.urandom(DISK_CACHE_MIN_SIZE) * 2
+        z_body = zlib.compress(body, 0)
+        with TemporaryDirectory() as path, override_settings(SENTRY_JS_DISK_CACHE_PATH=path):
+            assert decompress_body(z_body) == body
+            with patch("sentry.lang.javascript.processor.zlib.decompress") as decompress:
+                assert decompress_body(z_body) == body
+            assert not decompress.called
+
+    def test_small_body(self):
+        z_body = zlib.compress(b"foo")
+        with TemporaryDirectory() as path, override_settings(SENTRY_JS_DISK_CACHE_PATH=path):
+            assert decompress_body(z_body) == b"foo"
+            assert os.listdir(path) == []
+
+
 class TrimLineTest(unittest.TestCase):
     long_line = "The public is more familiar with bad design than good design. It is, in effect, conditioned to prefer bad design, because that is what it lives with. The new becomes threatening, the old reassuring."
 
@@ -0,0 +1,198 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from sentry.lang.native.batching import PayloadBatch, process_payloads
+from sentry.lang.native.processing import process_payload
+from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
+from sentry.utils import json
+from sentry.utils.safe import get_path
+
+LIBS = [
+    ("502fc0a5-1ec1-3e47-9998-684fa139dca7", "Foo.app/Contents/Foo"),
+    ("6b5f1a7e-0b7b-3cf4-8f41-2a5b0f0ecd61", "/usr/lib/libBar.dylib"),
+]
+
+
+def make_event(event_id, project_id, load_addresses, offsets):
+    images = [
+        {
+            "type": "macho",
+            "debug_id": debug_id,
+            "code_file": code_file,
+            "image_addr": hex(load_address),
+            "image_size": 0x10000,
+        }
+        for (debug_id, code_file), load_address in zip(LIBS, load_addresses)
+    ]
+    frames = [{"instruction_addr": hex(load_addresses[lib] + offset)} for lib, offset in offsets]
+    return {
+        "event_id": event_id,
+        "project": project_id,
+        "platform": "cocoa",
+        "debug_meta": {"images": images},
+        "exception": {
+            "values": [{"type": "Fail", "stacktrace": {"frames": frames, "registers": {}}}]
+        },
+    }
+
+
+def get_functions(data):
+    frames = get_path(data, "exception", "values", 0, "stacktrace", "frames")
+    return [(frame["function"], frame["instruction_addr"]) for frame in frames]
+
+
+class StubSymbolicator(BaseHTTPRequestHandler):
+    """
+    Symbolicates frames with the name of their module and the relative
+    address of the (adjusted) instruction.
+    """
+
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8"))
+        self.requests.append(body)
+
+        stacktraces = []
+        for stacktrace in body["stacktraces"]:
+            frames = []
+            for i, frame in enumerate(stacktrace["frames"]):
+                addr = int(frame["instruction_addr"], 16)
+                if frame.get("addr_mode"):
+                    module = body["modules"][int(frame["addr_mode"][4:])]
+                else:
+                    module = None
+                    for m in body["modules"]:
+                        if 0 <= addr - int(m["image_addr"], 16) < m["image_size"]:
+                            module = m
+                            addr -= int(m["image_addr"], 16)
+
+                if module is None:
+                    function = "unknown"
+                else:
+                    addr -= 1 if i > 0 or not stacktrace["registers"] else 0
+                    function = "{}+{:#x}".format(module["code_file"], addr)
+                frames.append(
+                    {
+                        "original_index": i,
+                        "instruction_addr": frame["instruction_addr"],
+                        "function": function,
+                        "status": "symbolicated",
+                    }
+                )
+            stacktraces.append({"frames": frames})
+
+        response = json.dumps(
+            {
+                "status": "completed",
+                "modules": [dict(m, debug_status="found") for m in body["modules"]],
+                "stacktraces": stacktraces,
+            }
+        ).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def symbolicator_url():
+    server = HTTPServer(("127.0.0.1", 0), StubSymbolicator)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:%d" % server.server_port
+    finally:
+        server.shutdown()
+        server.server_close()
+        StubSymbolicator.requests.clear()
+
+
+class PayloadBatchTest(TestCase):
+    def test_deduplication(self):
+        batch = PayloadBatch()
+        # same frames at different load addresses
+        assert batch.add(make_event("a", 1, [0x100000, 0x200000], [(0, 0x10), (1, 0x20)]))
+        assert batch.add(make_event("b", 1, [0x300000, 0x400000], [(0, 0x10), (1, 0x20)]))
+        # a crashing frame is not the same as a caller frame
+        assert batch.add(make_event("c", 1, [0x100000, 0x200000], [(1, 0x20), (1, 0x20)]))
+
+        assert len(batch.modules) == 2
+        assert {module["image_addr"] for module in batch.modules} == {"0x0"}
+
+        stacktraces, frame_indexes = batch.get_request()
+        assert [len(stacktrace["frames"]) for stacktrace in stacktraces] == [1, 3]
+        assert frame_indexes == [[0], [None, 1, 2]]
+
+    def test_unknown_module(self):
+        batch = PayloadBatch()
+        assert not batch.add(make_event("a", 1, [0x100000, 0x200000], [(0, 0x10), (1, 0x10000)]))
+        assert batch.modules == []
+        assert batch.events == []
+
+
+class ProcessPayloadsTest(TestCase):
+    @pytest.fixture(autouse=True)
+    def _symbolicator(self, symbolicator_url):
+        with override_options({"symbolicator.options": {"url": symbolicator_url}}):
+            yield
+
+    def make_events(self, count):
+        offsets = [(0, 0x10), (1, 0x24), (0, 0x38), (0, 0x10)]
+        return [
+            make_event(
+                "%032x" % i,
+                self.project.id,
+                [0x100000 * (i + 1), 0x10000000 + 0x100000 * i],
+                offsets if i % 2 else offsets[1:],
+            )
+            for i in range(count)
+        ]
+
+    def test_same_result(self):
+        expected = self.make_events(10)
+        for data in expected:
+            process_payload(data)
+        single_requests = len(StubSymbolicator.requests)
+        single_frames = sum(
+            len(stacktrace["frames"])
+            for request in StubSymbolicator.requests
+            for stacktrace in request["stacktraces"]
+        )
+        StubSymbolicator.requests.clear()
+
+        events = self.make_events(10)
+        assert process_payloads(events) == events
+
+        batch_requests = len(StubSymbolicator.requests)
+        batch_frames = sum(
+            len(stacktrace["frames"])
+            for request in StubSymbolicator.requests
+            for stacktrace in request["stacktraces"]
+        )
+
+        # 10 requests with 35 frames -> 1 request with 5 frames (including
+        # one that only prevents caller frames from being treated as crashing)
+        assert (single_requests, single_frames) == (10, 35)
+        assert (batch_requests, batch_frames) == (1, 5)
+
+        for data, expected_data in zip(events, expected):
+            assert get_functions(data) == get_functions(expected_data)
+            assert get_path(data, "debug_meta", "images") == get_path(
+                expected_data, "debug_meta", "images"
+            )
+
+    def test_unbatched_event(self):
+        events = self.make_events(2)
+        events.append(make_event("c" * 32, self.project.id, [0x100000, 0x200000], [(0, 0x10000)]))
+        assert process_payloads(events) == events
+        assert len(StubSymbolicator.requests) == 2
+        assert get_functions(events[2]) == [("unknown", "0x110000")]
@@ -1,5 +1,6 @@
 import os
 from io import BytesIO
+from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
 import pytest
@@ -164,3 +165,57 @@ class FileTest(TestCase):
 
         f = file.getfile(prefetch=True)
         assert f.read() == random_data
+
+    def test_putfile_duplicate_chunks(self):
+        file = File.objects.create(name="baz.js", type="default", size=12)
+        results = file.putfile(ContentFile(b"foo bar foo "), 4)
+
+        assert [index.offset for index in results] == [0, 4, 8]
+        assert results[0].blob == results[2].blob
+        assert results[0].blob != results[1].blob
+        with file.getfile() as fp:
+            assert fp.read() == b"foo bar foo "
+
+    def test_read_range(self):
+        data = b"abcdefghijklmnopqrstuvwxyz"
+        file = File.objects.create(name="baz.js", type="default", size=26)
+        file.putfile(BytesIO(data), 5)
+
+        with self.options({"filestore.read-ahead": 2}):
+            fp = file.getfile()
+        with fp:
+            assert fp.file.read_range(3, 4) == data[3:7]
+            assert fp.file.read_range(4, 13) == data[4:17]
+            assert fp.file.read_range(20) == data[20:]
+            assert fp.file.read_range(26, 10) == b""
+            # The position of the file is not changed
+            assert fp.tell() == 0
+
+            fp.seek(9)
+            assert fp.read(2) == data[9:11]
+            assert fp.read(8) == data[11:19]
+            assert fp.read() == data[19:]
+            assert fp.tell() == 26
+
+    def test_read_range_prefetched(self):
+        file = File.objects.create(name="baz.js", type="default", size=26)
+        file.putfile(BytesIO(b"abcdefghijklmnopqrstuvwxyz"), 5)
+
+        with file.getfile(prefetch=True) as fp:
+            assert fp.file.read_range(4, 13) == b"efghijklmnopq"
+
+    def test_blob_cache(self):
+        data = b"abcdefghijklmnopqrstuvwxyz"
+        file = File.objects.create(name="baz.js", type="default", size=26)
+        file.putfile(BytesIO(data), 5)
+
+        with TemporaryDirectory() as path, self.options({"filestore.blob-cache-path": path}):
+            with file.getfile() as fp:
+                assert fp.read() == data
+
+            # Blobs are read from the cache once they have been fetched
+            with patch.object(
+                FileBlob, "getfile", side_effect=AssertionError
+            ), file.getfile() as fp:
+                fp.seek(3)
+                assert fp.read(10) == data[3:13]
@@ -1,3 +1,5 @@
+from django.core.cache import cache
+
 from sentry.models import OrganizationOption
 from sentry.testutils import TestCase
 
@@ -32,3 +34,14 @@ class OrganizationOptionManagerTest(TestCase):
         OrganizationOption.objects.create(organization=self.organization, key="foo", value="bar")
         result = OrganizationOption.objects.get_value_bulk([self.organization], "foo")
         assert result == {self.organization: "bar"}
+
+    def test_preload_all_values(self):
+        other = self.create_organization()
+        OrganizationOption.objects.create(organization=self.organization, key="foo", value="bar")
+        OrganizationOption.objects.clear_local_cache()
+        cache.clear()
+
+        OrganizationOption.objects.preload_all_values([self.organization.id, other.id])
+        with self.assertNumQueries(0):
+            assert OrganizationOption.objects.get_value(self.organization, "foo") == "bar"
+            assert OrganizationOption.objects.get_value(other, "foo") is None
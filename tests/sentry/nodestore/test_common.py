@@ -3,10 +3,12 @@ Testsuite of backend-independent nodestore tests. Add your backend to the
 `ns` fixture to have it tested.
 """
 from contextlib import nullcontext
+from unittest import mock
 
 import pytest
 
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.nodestore.encoding import LazyNodePayload
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
     get_temporary_bigtable_nodestorage,
@@ -91,3 +93,67 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+@pytest.fixture
+def local_cache(settings, monkeypatch):
+    monkeypatch.setattr("sentry.nodestore.base._local_caches", {})
+    settings.SENTRY_NODESTORE_LOCAL_CACHE_SIZE = 1024
+    settings.SENTRY_NODESTORE_LOCAL_CACHE_TTL = 60
+
+
+def test_local_cache(ns, local_cache):
+    node_id = "d2502ebbd7df41ceba8d3275595cac33"
+    ns.set_subkeys(node_id, {None: {"foo": "a"}, "other": {"foo": "b"}})
+    assert ns.local_cache is not None
+
+    with mock.patch.object(ns, "_get_bytes") as get_bytes, mock.patch.object(
+        ns, "_get_bytes_multi"
+    ) as get_bytes_multi:
+        assert ns.get(node_id) == {"foo": "a"}
+        assert ns.get(node_id, subkey="other") == {"foo": "b"}
+        assert ns.get_multi([node_id]) == {node_id: {"foo": "a"}}
+        assert get_bytes.call_count == 0
+        assert get_bytes_multi.call_count == 0
+
+    # Values returned from the local cache are not shared between callers.
+    ns.get(node_id)["foo"] = "mutated"
+    assert ns.get(node_id) == {"foo": "a"}
+
+    ns.delete(node_id)
+    assert ns.local_cache.get(node_id) is None
+    assert ns.get(node_id) is None
+    assert ns.get(node_id, subkey="other") is None
+
+
+def test_local_cache_is_bounded(ns, local_cache):
+    for i in range(100):
+        ns.set(f"node_{i}", {"foo": "x" * 100})
+
+    stats = ns.local_cache.get_stats()
+    assert stats.size <= 1024
+    assert stats.evictions > 0
+    assert ns.get("node_0") == {"foo": "x" * 100}
+
+
+def test_format_version_2(ns, settings):
+    ns.set_subkeys("node_v1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+
+    settings.SENTRY_NODESTORE_FORMAT_VERSION = 2
+    ns.set_subkeys("node_v2", {None: {"foo": "a", "bar": [1, 2]}, "other": {"foo": "b"}})
+
+    # Nodes written in either format are readable.
+    assert ns.get("node_v1") == {"foo": "a"}
+    assert ns.get("node_v1", subkey="other") == {"foo": "b"}
+    assert ns.get("node_v2") == {"foo": "a", "bar": [1, 2]}
+    assert ns.get("node_v2", subkey="other") == {"foo": "b"}
+    assert ns.get("node_v2", subkey="missing") is None
+    assert ns._get_bytes("node_v2").startswith(b"\x00\x02")
+
+    ns._delete_cache_item("node_v2")
+    payload = ns.get_lazy("node_v2")
+    assert isinstance(payload, LazyNodePayload)
+    assert payload["bar"] == [1, 2]
+    assert dict(payload) == {"foo": "a", "bar": [1, 2]}
+    assert ns.get_lazy("node_v1") == {"foo": "a"}
+    assert ns.get_lazy("missing") is None
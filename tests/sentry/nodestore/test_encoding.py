@@ -0,0 +1,67 @@
+from unittest import mock
+
+import pytest
+import zstandard
+
+from sentry.nodestore import encoding
+from sentry.utils.codecs import UnknownZstdDictionary
+
+DATA = {
+    None: {"message": "hello world", "exception": {"values": [{"type": "ValueError"}]}},
+    "unprocessed": {"message": "hello"},
+    "scalar": 42,
+}
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_roundtrip(compress):
+    value = encoding.encode(DATA, compress=compress)
+    assert encoding.is_versioned(value)
+    assert encoding.decode(value) == DATA[None]
+    assert encoding.decode(value, subkey="unprocessed") == DATA["unprocessed"]
+    assert encoding.decode(value, subkey="scalar") == 42
+    assert encoding.decode(value, subkey="missing") is None
+
+
+def test_lazy_decode():
+    payload = encoding.decode(encoding.encode(DATA), lazy=True)
+    assert isinstance(payload, encoding.LazyNodePayload)
+    assert sorted(payload) == ["exception", "message"]
+    assert "exception" in payload
+    assert "missing" not in payload
+
+    with mock.patch.object(encoding, "json_loads", wraps=encoding.json_loads) as json_loads:
+        assert payload["exception"] == {"values": [{"type": "ValueError"}]}
+        assert payload["exception"] is payload["exception"]
+    # Keys are decoded once, and only when they are accessed.
+    assert json_loads.call_count == 1
+
+    assert payload.materialize() == DATA[None]
+    assert encoding.decode(encoding.encode(DATA), subkey="scalar", lazy=True) == 42
+
+
+def test_is_versioned():
+    assert not encoding.is_versioned(b'{"foo":"bar"}')
+    assert not encoding.is_versioned(b"\x80\x04")
+
+
+def test_dictionary(settings, tmpdir):
+    samples = [
+        encoding.json_dumps({"message": f"hello world {i}", "platform": "python", "id": i}).encode(
+            "utf8"
+        )
+        for i in range(1000)
+    ]
+    path = tmpdir.join("nodestore.dict")
+    path.write_binary(encoding.train_dictionary(samples, size=4096))
+
+    settings.SENTRY_NODESTORE_ZSTD_DICTIONARIES = (str(path),)
+    value = encoding.encode(DATA)
+    assert encoding.decode(value) == DATA[None]
+    # The id of the dictionary is only stored in the zstd frame
+    dictionary_id = zstandard.get_frame_parameters(value[encoding.HEADER.size :]).dict_id
+    assert dictionary_id == encoding.get_dictionaries()[1] != 0
+
+    settings.SENTRY_NODESTORE_ZSTD_DICTIONARIES = ()
+    with pytest.raises(UnknownZstdDictionary):
+        encoding.decode(value)
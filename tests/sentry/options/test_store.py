@@ -4,10 +4,11 @@ from uuid import uuid1
 import pytest
 from django.conf import settings
 from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
 from exam import before, fixture
 
 from sentry.models import Option
-from sentry.options.store import OptionsStore
+from sentry.options.store import VERSION_CACHE_KEY, OptionsStore
 from sentry.testutils import TestCase
 
 
@@ -149,3 +150,63 @@ class OptionsStoreTest(TestCase):
         mocked_time.return_value = 26
         store.clean_local_cache()
         assert not store._local_cache
+
+    @patch("sentry.options.store.time")
+    def test_snapshot(self, mocked_time):
+        store, key = self.store, self.key
+        store.version_check_interval = 10
+        mocked_time.return_value = 0
+
+        other_key = self.make_key()
+        store.set(key, "bar")
+        store.set(other_key, "baz")
+        assert store.get_version() is not None
+
+        # All options are loaded at once, and missing options are known to
+        # be unset.
+        with self.assertNumQueries(1):
+            assert store.get(key) == "bar"
+            assert store.get(other_key) == "baz"
+            assert store.get(self.make_key()) is None
+
+        # Changes are only picked up once they have been published, no matter
+        # the TTL of the options.
+        Option.objects.filter(key=key.name).update(value="lol", last_updated=timezone.now())
+        mocked_time.return_value = 60
+        with self.assertNumQueries(0):
+            assert store.get(key) == "bar"
+
+        assert store.publish_version()
+        assert store.get(key) == "bar"
+        mocked_time.return_value = 75
+        assert store.get(key) == "lol"
+
+        # Changes made by the store itself are visible immediately.
+        store.delete(other_key)
+        assert store.get(other_key) is None
+
+    def test_snapshot_without_version(self):
+        store, key = self.store, self.key
+        store.version_check_interval = 10
+        store.set(key, "bar")
+        store.cache.delete(VERSION_CACHE_KEY)
+        store.flush_local_cache()
+
+        # Options are fetched one by one until a version is published.
+        assert store.get(key) == "bar"
+        assert store.get_snapshot() is None
+        assert key.cache_key in store._local_cache
+
+    def test_publish_version(self):
+        store, key = self.store, self.key
+        assert not store.publish_version()
+        assert store.get_version() is None
+
+        store.version_check_interval = 10
+        assert store.publish_version()
+        version = store.get_version()
+        assert store.publish_version()
+        assert store.get_version() == version
+
+        store.set(key, "bar")
+        assert store.get_version() != version
@@ -0,0 +1,89 @@
+import pytest
+from django.test import override_settings
+
+from sentry.ownership.grammar import Matcher, Owner, Rule, dump_schema, parse_rules
+from sentry.ownership.index import OwnershipIndex, get_ownership_index
+
+rules = parse_rules(
+    """
+*.js                             #frontend
+url:http://google.com/*          #backend
+path:src/sentry/*                david@sentry.io
+path:src/sentry/api/*.py         #api
+tags.foo:bar                     tagperson@sentry.io
+module:foo.bar                   #workflow
+module:*.views                   #views
+codeowners:/src/components/      githubuser@sentry.io
+codeowners:frontend/*.ts         githubmod@sentry.io
+codeowners:*.ts                  #typescript
+codeowners:src/**/index.js       #index
+codeowners:\\                    #backslash
+codeowners:docs/                 #docs
+path:*ᛢ/*                        #runes
+"""
+)
+
+
+def make_event(*frames, **data):
+    return {
+        "exception": {"values": [{"stacktrace": {"frames": list(frames)}}]},
+        **data,
+    }
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        make_event(),
+        make_event({"filename": "foo.js"}),
+        make_event({"filename": "app/foo.JS"}),
+        make_event({"abs_path": "/usr/src/sentry/api/endpoint.py"}),
+        make_event({"filename": "src/sentry/api/endpoint.py"}),
+        make_event({"filename": "src\\sentry\\api\\endpoint.py"}),
+        make_event({"filename": "SRC/sentry/models.py"}, {"module": "foo.bar"}),
+        make_event({"module": "app.views"}, {"module": "foo.bar.baz"}),
+        make_event({"filename": "src/components/button/index.js"}),
+        make_event({"filename": "/src/components/"}, {"filename": "frontend/app.ts"}),
+        make_event({"filename": "frontend/app/app.ts"}, {"filename": "other/frontend/app.ts"}),
+        make_event({"filename": "\\"}, {"filename": "docs"}, {"filename": "docs/index.md"}),
+        make_event({"filename": "src/index.js"}, {"filename": "lib/docs/foo"}),
+        make_event({"filename": "ᛢ/foo.py"}, {"filename": "src/ſentry/foo.py"}),
+        make_event("not a frame", {"abs_path": None}, {"filename": ""}),
+        make_event({"filename": "src/sentry/foo.py"}, request={"url": "http://google.com/foo"}),
+        make_event(tags=[["foo", "bar"]]),
+    ],
+)
+def test_matching_rules(data):
+    index = OwnershipIndex(rules)
+    assert len(index) == len(rules)
+    assert index.get_matching_rules(data) == [rule for rule in rules if rule.test(data)]
+
+
+def test_matching_rules_order():
+    rules = [
+        Rule(Matcher("codeowners", "*.py"), [Owner("team", "python")]),
+        Rule(Matcher("path", "src/*"), [Owner("team", "src")]),
+        Rule(Matcher("codeowners", "src/app.py"), [Owner("team", "app")]),
+        Rule(Matcher("tags.level", "error"), [Owner("team", "errors")]),
+        Rule(Matcher("path", "src/*"), [Owner("team", "other")]),
+    ]
+    data = make_event({"filename": "src/app.py"}, tags=[["level", "error"]])
+    assert OwnershipIndex(rules).get_matching_rules(data) == rules
+
+
+def test_get_ownership_index():
+    schema = dump_schema(rules)
+    with override_settings(SENTRY_OWNERSHIP_INDEX_CACHE_SIZE=1000):
+        index = get_ownership_index(1, schema)
+        assert index.rules == rules
+        assert get_ownership_index(1, dump_schema(rules)) is index
+        assert get_ownership_index(2, schema) is not index
+
+        other_schema = dump_schema(rules[1:])
+        other_index = get_ownership_index(1, other_schema)
+        assert other_index is not index
+        assert other_index.rules == rules[1:]
+
+    with override_settings(SENTRY_OWNERSHIP_INDEX_CACHE_SIZE=0):
+        assert get_ownership_index(1, schema) is not get_ownership_index(1, schema)
@@ -0,0 +1,64 @@
+import pytest
+
+from sentry.ownership.grammar import Matcher, Owner, Rule
+from sentry.ownership.index import OwnershipIndex
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+@pytest.fixture(scope="module")
+def codeowners_rules():
+    # A large CODEOWNERS file, as converted to ownership rules
+    rules = []
+    for i in range(5000):
+        rules.append(
+            Rule(
+                Matcher("codeowners", f"/src/pkg{i // 50}/module{i}/"),
+                [Owner("team", f"team-{i % 100}")],
+            )
+        )
+        if i % 25 == 0:
+            rules.append(
+                Rule(Matcher("codeowners", f"*.ext{i}"), [Owner("user", f"user{i}@example.com")])
+            )
+    rules.append(Rule(Matcher("path", "src/*"), [Owner("team", "fallback")]))
+    return rules
+
+
+@pytest.fixture(scope="module")
+def event():
+    frames = []
+    for i in range(50):
+        frames.append(
+            {
+                "filename": f"src/pkg{i}/module{i * 50}/views.py",
+                "abs_path": f"/srv/app/src/pkg{i}/module{i * 50}/views.py",
+            }
+        )
+    return {"platform": "python", "exception": {"values": [{"stacktrace": {"frames": frames}}]}}
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_rules(codeowners_rules, event, benchmark):
+    matching = benchmark(lambda: [rule for rule in codeowners_rules if rule.test(event)])
+    assert len(matching) == 51
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_index(codeowners_rules, event, benchmark):
+    index = OwnershipIndex(codeowners_rules)
+    matching = benchmark(lambda: index.get_matching_rules(event))
+    assert matching == [rule for rule in codeowners_rules if rule.test(event)]
+    assert len(matching) == 51
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_build_index(codeowners_rules, benchmark):
+    benchmark(lambda: OwnershipIndex(codeowners_rules))
@@ -1,8 +1,10 @@
 from unittest import mock
 
 import pytest
+import zstandard
 
 from sentry.relay.projectconfig_cache import redis
+from sentry.utils import json
 
 
 def test_delete_count(monkeypatch):
@@ -24,3 +26,56 @@ def test_read_write():
     my_key = "fake-dsn-1"
     cache.set_many({my_key: "my-value"})
     assert cache.get(my_key) == "my-value"
+
+
+def _train_dictionary(tmpdir, name):
+    samples = [
+        json.dumps(
+            {"projectId": i, "config": {"features": [f"{name}-{j}" for j in range(i)]}}
+        ).encode()
+        for i in range(200)
+    ]
+    path = tmpdir.join(name)
+    path.write_binary(zstandard.train_dictionary(1024, samples).as_bytes())
+    return str(path)
+
+
+def test_read_legacy_values():
+    cache = redis.RedisProjectConfigCache()
+    value = {"projectId": 1}
+
+    cache.cluster.set("relayconfig:raw", json.dumps(value))
+    cache.cluster.set("relayconfig:zstd", zstandard.compress(json.dumps(value).encode()))
+
+    assert cache.get("raw") == value
+    assert cache.get("zstd") == value
+
+
+def test_dictionary_rotation(tmpdir):
+    old_path = _train_dictionary(tmpdir, "old.dict")
+    new_path = _train_dictionary(tmpdir, "new.dict")
+    value = {"projectId": 1, "config": {"features": ["feature-1"]}}
+
+    old_cache = redis.RedisProjectConfigCache(zstd_dictionaries=[old_path])
+    old_cache.set_many({"old": value})
+    stored = old_cache.cluster.get("relayconfig:old")
+    assert zstandard.get_frame_parameters(stored).dict_id == old_cache.codec.dictionary_id
+
+    new_cache = redis.RedisProjectConfigCache(zstd_dictionaries=[new_path, old_path])
+    new_cache.set_many({"new": value})
+    assert new_cache.get("old") == value
+    assert new_cache.get("new") == value
+
+    # Configs compressed with dictionaries that have been removed are misses.
+    assert redis.RedisProjectConfigCache(zstd_dictionaries=[new_path]).get("old") is None
+    assert redis.RedisProjectConfigCache().get("new") is None
+
+
+def test_get_samples():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"a": {"projectId": 1}, "b": {"projectId": 2}})
+    cache.cluster.set("relayconfig:c", json.dumps({"projectId": 3}))
+
+    samples = cache.get_samples(10)
+    assert sorted(json.loads(sample)["projectId"] for sample in samples) == [1, 2, 3]
+    assert len(cache.get_samples(1)) == 1
@@ -0,0 +1,41 @@
+from sentry.relay.projectconfig_invalidation_queue.redis import RedisProjectConfigInvalidationQueue
+
+
+def test_enqueue_coalesces():
+    queue = RedisProjectConfigInvalidationQueue(key_prefix="test-invalidation")
+    queue.mark_drain_done()
+    queue.pop_many(1000)
+
+    first = queue.enqueue(organization_id=1, project_id=None, public_key=None)
+    assert not first.coalesced
+    assert first.schedule_drain
+
+    second = queue.enqueue(organization_id=1, project_id=None, public_key=None)
+    assert second.coalesced
+    assert not second.schedule_drain
+
+    third = queue.enqueue(organization_id=None, project_id=2, public_key=None)
+    assert not third.coalesced
+    assert not third.schedule_drain
+
+    queue.mark_drain_done()
+    assert queue.enqueue(organization_id=None, project_id=None, public_key="abc").schedule_drain
+
+
+def test_pop_many():
+    queue = RedisProjectConfigInvalidationQueue(key_prefix="test-invalidation")
+    queue.pop_many(1000)
+
+    queue.enqueue(organization_id=1, project_id=None, public_key=None)
+    queue.enqueue(organization_id=None, project_id=2, public_key=None)
+    queue.enqueue(organization_id=None, project_id=None, public_key="abc")
+
+    scopes, remaining = queue.pop_many(2)
+    assert [scope for scope, _ in scopes] == ["o:1", "p:2"]
+    assert remaining == 1
+
+    scopes, remaining = queue.pop_many(2)
+    assert [scope for scope, _ in scopes] == ["k:abc"]
+    assert remaining == 0
+
+    assert queue.pop_many(2) == ([], 0)
@@ -27,6 +27,7 @@ from sentry.rules.conditions import EventCondition
 from sentry.rules.filters.base import EventFilter
 from sentry.rules.processor import RuleProcessor
 from sentry.testutils import TestCase
+from sentry.tsdb.base import TSDBModel
 from sentry.types.integrations import ExternalProviders
 
 EMAIL_ACTION_DATA = {
@@ -218,6 +219,87 @@ class RuleProcessorTest(TestCase):
         # mock condition first.
         assert passes.call_count == 0
 
+    @patch(
+        "sentry.constants._SENTRY_RULES",
+        [
+            "sentry.mail.actions.NotifyEmailAction",
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "sentry.rules.conditions.event_frequency.EventUniqueUserFrequencyCondition",
+        ],
+    )
+    def test_frequency_conditions_queried_together(self):
+        def frequency_condition(name, interval, value=0):
+            return {
+                "id": f"sentry.rules.conditions.event_frequency.{name}",
+                "interval": interval,
+                "value": value,
+            }
+
+        self.rule.update(
+            data={
+                "conditions": [
+                    frequency_condition("EventFrequencyCondition", "1h"),
+                    frequency_condition("EventUniqueUserFrequencyCondition", "1h"),
+                ],
+                "action_match": "all",
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [
+                    frequency_condition("EventFrequencyCondition", "1h", value=10),
+                    frequency_condition("EventFrequencyCondition", "1d"),
+                ],
+                "action_match": "all",
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        # Rules which fired recently are not evaluated, so their windows aren't queried
+        muted_rule = Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [frequency_condition("EventFrequencyCondition", "1w")],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        GroupRuleStatus.objects.create(
+            rule=muted_rule,
+            group=self.event.group,
+            project=self.project,
+            last_active=timezone.now(),
+        )
+
+        with patch("sentry.rules.processor.rules", init_registry()), self.options(
+            {"rules.event-frequency.memoize-ttl": 0}
+        ), patch(
+            "sentry.tsdb.get_totals_multi",
+            side_effect=lambda queries, use_cache=False: [
+                {self.event.group_id: 1} for _ in queries
+            ],
+        ) as get_totals_multi:
+            rp = RuleProcessor(
+                self.event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            results = list(rp.apply())
+
+        assert len(results) == 1
+        callback, futures = results[0]
+        assert [future.rule for future in futures] == [self.rule]
+
+        assert get_totals_multi.call_count == 1
+        queries = get_totals_multi.call_args[0][0]
+        assert sorted((query.model.value, query.end - query.start) for query in queries) == [
+            (TSDBModel.group.value, timedelta(hours=1)),
+            (TSDBModel.group.value, timedelta(days=1)),
+            (TSDBModel.users_affected_by_group.value, timedelta(hours=1)),
+        ]
+
 
 class MockFilterTrue(EventFilter):
     id = "tests.sentry.rules.test_processor.MockFilterTrue"
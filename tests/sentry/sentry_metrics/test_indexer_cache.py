@@ -1,7 +1,7 @@
 import pytest
 
 from sentry.sentry_metrics.configuration import UseCaseKey
-from sentry.sentry_metrics.indexer.cache import indexer_cache
+from sentry.sentry_metrics.indexer.cache import StringIndexerCache, indexer_cache
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
 
@@ -64,3 +64,62 @@ def test_separate_namespacing() -> None:
     indexer_cache.set("a", 2, UseCaseKey.PERFORMANCE.value)
     assert indexer_cache.get("a", UseCaseKey.RELEASE_HEALTH.value) == 1
     assert indexer_cache.get("a", UseCaseKey.PERFORMANCE.value) == 2
+
+
+@pytest.fixture
+def local_indexer_cache() -> StringIndexerCache:
+    cache.clear()
+    return StringIndexerCache(version=1, cache_name="default", local_cache_size=1024)
+
+
+def test_local_cache(local_indexer_cache: StringIndexerCache, use_case_id: str) -> None:
+    local_indexer_cache.set_many({"hello": 2, "bye": 3}, use_case_id)
+
+    # Values are served from the local tier even if the shared cache lost them.
+    cache.clear()
+    assert local_indexer_cache.get_many(["hello", "bye", "new"], use_case_id) == {
+        "hello": 2,
+        "bye": 3,
+        "new": None,
+    }
+
+    stats = local_indexer_cache.get_local_stats()
+    assert (stats.hits, stats.misses) == (2, 1)
+
+    local_indexer_cache.delete_many(["hello"], use_case_id)
+    assert local_indexer_cache.get("hello", use_case_id) is None
+    local_indexer_cache.delete("bye", use_case_id)
+    assert local_indexer_cache.get("bye", use_case_id) is None
+
+
+def test_local_cache_filled_from_shared(
+    local_indexer_cache: StringIndexerCache, use_case_id: str
+) -> None:
+    indexer_cache.set("shared", 5, use_case_id)
+    assert (use_case_id, "shared") not in local_indexer_cache.local_cache
+
+    assert local_indexer_cache.get("shared", use_case_id) == 5
+    assert (use_case_id, "shared") in local_indexer_cache.local_cache
+
+
+def test_local_cache_is_bounded(use_case_id: str) -> None:
+    local_indexer_cache = StringIndexerCache(version=1, cache_name="default", local_cache_size=200)
+    local_indexer_cache.warm({f"1:{i:020}": i for i in range(10)}, use_case_id)
+
+    stats = local_indexer_cache.get_local_stats()
+    assert stats.size <= 200
+    assert stats.entries < 10
+    assert stats.evictions == 10 - stats.entries
+
+
+def test_local_cache_separate_namespacing(local_indexer_cache: StringIndexerCache) -> None:
+    local_indexer_cache.set("a", 1, UseCaseKey.RELEASE_HEALTH.value)
+    local_indexer_cache.set("a", 2, UseCaseKey.PERFORMANCE.value)
+    assert local_indexer_cache.get("a", UseCaseKey.RELEASE_HEALTH.value) == 1
+    assert local_indexer_cache.get("a", UseCaseKey.PERFORMANCE.value) == 2
+
+
+def test_local_cache_disabled(use_case_id: str) -> None:
+    assert indexer_cache.local_cache is None
+    assert indexer_cache.get_local_stats() is None
+    assert indexer_cache.warm({"a": 1}, use_case_id) == 0
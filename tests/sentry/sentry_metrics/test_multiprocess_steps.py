@@ -19,6 +19,13 @@ from sentry.sentry_metrics.consumers.indexer.common import (
 )
 from sentry.sentry_metrics.consumers.indexer.multiprocess import TransformStep
 from sentry.sentry_metrics.consumers.indexer.processing import process_messages
+from sentry.sentry_metrics.consumers.indexer.shared_memory import (
+    SharedMemoryTransformStep,
+    build_string_table,
+    read_resolved_table,
+    resolve_strings,
+)
+from sentry.sentry_metrics.indexer.base import FetchType, Metadata
 from sentry.sentry_metrics.indexer.mock import MockIndexer
 from sentry.snuba.metrics.naming_layer.mri import SessionMRI
 from sentry.utils import json
@@ -334,6 +341,104 @@ def test_transform_step() -> None:
         )
 
 
+def test_shared_memory_transform_step() -> None:
+    config = get_ingest_config(UseCaseKey.RELEASE_HEALTH)
+
+    message_payloads = [counter_payload, distribution_payload, set_payload]
+
+    produce_step = Mock()
+    transform_step = SharedMemoryTransformStep(
+        next_step=produce_step,
+        config=config,
+        processes=1,
+        input_block_size=4096,
+        output_block_size=4096,
+    )
+
+    message_batch = [
+        Message(
+            Partition(Topic("topic"), 0),
+            i + 1,
+            KafkaPayload(None, json.dumps(payload).encode("utf-8"), []),
+            datetime.now(),
+        )
+        for i, payload in enumerate(message_payloads)
+    ]
+    last = message_batch[-1]
+    transform_step.submit(Message(last.partition, last.offset, message_batch, last.timestamp))
+    transform_step.join(10)
+
+    produce_step_calls = produce_step.submit.call_args_list
+    assert len(produce_step_calls) == len(message_batch)
+    for i, m in enumerate(message_batch):
+        compare_messages_ignoring_mapping_metadata(
+            produce_step_calls[i].args[0],
+            Message(
+                m.partition,
+                m.offset,
+                KafkaPayload(
+                    None,
+                    json.dumps(__translated_payload(message_payloads[i])).encode("utf-8"),
+                    [("metric_type", message_payloads[i]["type"])],
+                ),
+                m.timestamp,
+            ),
+        )
+
+
+@pytest.mark.parametrize("block_size", [4096, 1])
+def test_shared_memory_resolve_strings(block_size: int) -> None:
+    from multiprocessing.shared_memory import SharedMemory
+
+    import msgpack
+
+    table = build_string_table({1: {"a", "b"}, 2: {"a"}})
+    data = msgpack.packb(table)
+
+    input_block = SharedMemory(create=True, size=block_size)
+    output_block = SharedMemory(create=True, size=block_size)
+    try:
+        input = data
+        if len(data) <= block_size:
+            input_block.buf[: len(data)] = data
+            input = len(data)
+
+        output = resolve_strings(
+            UseCaseKey.RELEASE_HEALTH, input_block.name, input, output_block.name
+        )
+        if isinstance(output, int):
+            resolved = msgpack.unpackb(output_block.buf[:output])
+        else:
+            # The results did not fit into the output block.
+            assert block_size == 1
+            resolved = msgpack.unpackb(output)
+    finally:
+        for block in (input_block, output_block):
+            block.close()
+            block.unlink()
+
+    from sentry.sentry_metrics import indexer
+
+    mapping, bulk_record_meta = read_resolved_table(table, resolved)
+    assert mapping == {
+        1: {"a": indexer.resolve(1, "a"), "b": indexer.resolve(1, "b")},
+        2: {"a": indexer.resolve(2, "a")},
+    }
+    assert mapping[1]["a"] is not None
+    assert bulk_record_meta == {1: {}, 2: {}}
+
+
+def test_shared_memory_read_resolved_table() -> None:
+    table = [(1, ["a", "b", "c"])]
+    resolved = [[(10, "c", None), (None, "r", True), None]]
+    mapping, bulk_record_meta = read_resolved_table(table, resolved)
+    assert mapping == {1: {"a": 10, "b": None}}
+    assert bulk_record_meta[1]["a"] == Metadata(id=10, fetch_type=FetchType.CACHE_HIT)
+    assert bulk_record_meta[1]["b"].fetch_type == FetchType.RATE_LIMITED
+    assert bulk_record_meta[1]["b"].fetch_type_ext.is_global
+    assert "c" not in bulk_record_meta[1]
+
+
 invalid_payloads = [
     (
         {
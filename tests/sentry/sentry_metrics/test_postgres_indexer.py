@@ -1,10 +1,13 @@
+from datetime import timedelta
 from typing import Mapping, Set
+from unittest import mock
 
 import pytest
+from django.utils import timezone
 
 from sentry.sentry_metrics.configuration import UseCaseKey
 from sentry.sentry_metrics.indexer.base import FetchType, FetchTypeExt, KeyCollection, Metadata
-from sentry.sentry_metrics.indexer.cache import indexer_cache
+from sentry.sentry_metrics.indexer.cache import StringIndexerCache, indexer_cache
 from sentry.sentry_metrics.indexer.models import MetricsKeyIndexer, StringIndexer
 from sentry.sentry_metrics.indexer.postgres import PGStringIndexer
 from sentry.sentry_metrics.indexer.postgres_v2 import (
@@ -270,6 +273,36 @@ class PostgresIndexerV2Test(TestCase):
         assert indexer_cache.get(string.id, self.cache_namespace) is None
         assert indexer_cache.get(key, self.cache_namespace) is None
 
+    def test_warm_up(self):
+        now = timezone.now()
+        for i, string in enumerate(["a", "b", "c"]):
+            StringIndexer.objects.create(
+                organization_id=1, string=string, last_seen=now - timedelta(minutes=i)
+            )
+        StringIndexer.objects.create(
+            organization_id=2, string="d", last_seen=now - timedelta(hours=1)
+        )
+
+        # Without a local tier there is nothing to warm up.
+        assert self.indexer.warm_up(self.use_case_id) == 0
+
+        local_indexer_cache = StringIndexerCache(
+            version=1, cache_name="default", local_cache_size=1024 * 1024
+        )
+        with mock.patch(
+            "sentry.sentry_metrics.indexer.postgres_v2.indexer_cache", local_indexer_cache
+        ), self.settings(
+            SENTRY_METRICS_INDEXER_WARM_UP_LIMIT=10, SENTRY_METRICS_INDEXER_WARM_UP_ORG_LIMIT=2
+        ):
+            assert self.indexer.warm_up(self.use_case_id) == 3
+
+        assert local_indexer_cache.get_local_stats().entries == 3
+        assert ("release-health", "1:a") in local_indexer_cache.local_cache
+        assert ("release-health", "1:b") in local_indexer_cache.local_cache
+        assert ("release-health", "2:d") in local_indexer_cache.local_cache
+        # Warming up only fills the local tier.
+        assert indexer_cache.get("1:a", self.cache_namespace) is None
+
     def test_rate_limited(self):
         """
         Assert that rate limits per-org and globally are applied at all.
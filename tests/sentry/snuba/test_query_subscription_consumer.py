@@ -15,11 +15,14 @@ from sentry.snuba.query_subscription_consumer import (
     InvalidMessageError,
     InvalidSchemaError,
     QuerySubscriptionConsumer,
+    batch_subscriber_registry,
+    register_batch_subscriber,
     register_subscriber,
     subscriber_registry,
 )
 from sentry.snuba.subscriptions import create_snuba_query, create_snuba_subscription
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
 
 
@@ -125,6 +128,67 @@ class HandleMessageTest(BaseQuerySubscriptionTest, TestCase):
         )
         mock_callback.assert_called_once_with(data["payload"], sub)
 
+    def test_subscription_batch_registered(self):
+        registration_key = "batch_registered_test"
+        mock_callback = mock.Mock()
+        mock_batch_callback = mock.Mock()
+        register_subscriber(registration_key)(mock_callback)
+        register_batch_subscriber(registration_key)(mock_batch_callback)
+        with self.tasks():
+            snuba_query = create_snuba_query(
+                SnubaQuery.Type.ERROR,
+                Dataset.Events,
+                "hello",
+                "count()",
+                timedelta(minutes=10),
+                timedelta(minutes=1),
+                None,
+            )
+            sub = create_snuba_subscription(self.project, registration_key, snuba_query)
+        sub.refresh_from_db()
+
+        wrappers = []
+        for value in (1, 2, 3):
+            data = deepcopy(self.valid_wrapper)
+            data["payload"]["subscription_id"] = sub.subscription_id
+            data["payload"]["result"] = {"data": [{"hello": value}]}
+            wrappers.append(data)
+
+        with override_options({"subscriptions-query.batch-size": 2}):
+            for data in wrappers:
+                self.consumer.handle_message(self.build_mock_message(data))
+            # The third update is held back until the pending updates are flushed
+            assert mock_batch_callback.call_count == 1
+            self.consumer.flush_updates()
+
+        assert not mock_callback.called
+        expected = []
+        for data in wrappers:
+            payload = deepcopy(data["payload"])
+            payload["values"] = payload["result"]
+            payload["timestamp"] = parse_date(payload["timestamp"]).replace(tzinfo=pytz.utc)
+            expected.append((payload, sub))
+        assert mock_batch_callback.call_args_list == [
+            mock.call(expected[:2]),
+            mock.call(expected[2:]),
+        ]
+
+    def test_subscription_batch_disabled(self):
+        registration_key = "batch_disabled_test"
+        mock_callback = mock.Mock()
+        mock_batch_callback = mock.Mock()
+        register_subscriber(registration_key)(mock_callback)
+        register_batch_subscriber(registration_key)(mock_batch_callback)
+        sub = QuerySubscription.objects.create(
+            project=self.project, type=registration_key, subscription_id="an_id"
+        )
+        data = self.valid_wrapper
+        data["payload"]["subscription_id"] = sub.subscription_id
+        self.consumer.handle_message(self.build_mock_message(data))
+        self.consumer.flush_updates()
+        assert mock_callback.call_count == 1
+        assert not mock_batch_callback.called
+
 
 class ParseMessageValueTest(BaseQuerySubscriptionTest, unittest.TestCase):
     def run_test(self, message):
@@ -200,3 +264,25 @@ class RegisterSubscriberTest(unittest.TestCase):
         with pytest.raises(Exception) as excinfo:
             register_subscriber("hello")(other_callback)
         assert str(excinfo.value) == "Handler already registered for hello"
+
+
+class RegisterBatchSubscriberTest(unittest.TestCase):
+    def setUp(self):
+        self.orig_registry = deepcopy(batch_subscriber_registry)
+
+    def tearDown(self):
+        batch_subscriber_registry.clear()
+        batch_subscriber_registry.update(self.orig_registry)
+
+    def test_register(self):
+        callback = object()
+        register_batch_subscriber("hello")(callback)
+        assert batch_subscriber_registry["hello"] == callback
+
+    def test_already_registered(self):
+        callback = object()
+        other_callback = object()
+        register_batch_subscriber("hello")(callback)
+        with pytest.raises(Exception) as excinfo:
+            register_batch_subscriber("hello")(other_callback)
+        assert str(excinfo.value) == "Batch handler already registered for hello"
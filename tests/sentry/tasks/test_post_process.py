@@ -24,7 +24,7 @@ from sentry.models import (
 from sentry.ownership.grammar import Matcher, Owner, Rule, dump_schema
 from sentry.rules import init_registry
 from sentry.tasks.merge import merge_groups
-from sentry.tasks.post_process import post_process_group
+from sentry.tasks.post_process import post_process_group, post_process_group_batch
 from sentry.testutils import TestCase
 from sentry.testutils.helpers import with_feature
 from sentry.testutils.helpers.datetime import before_now, iso_format
@@ -647,6 +647,125 @@ class PostProcessGroupTest(TestCase):
             )
 
 
+class PostProcessGroupBatchTest(TestCase):
+    def get_task_kwargs(self, event, **kwargs):
+        return {
+            "is_new": False,
+            "is_regression": False,
+            "is_new_group_environment": False,
+            "cache_key": write_event_to_cache(event),
+            "group_id": event.group_id,
+            **kwargs,
+        }
+
+    def test_batch(self):
+        from sentry.models import GroupRuleStatus
+        from sentry.models import Rule as AlertRule
+
+        MOCK_RULES = ("sentry.rules.conditions.every_event.EveryEventCondition",)
+
+        with patch("sentry.constants._SENTRY_RULES", MOCK_RULES), patch(
+            "sentry.rules.processor.rules", init_registry()
+        ) as rules:
+            MockAction = mock.Mock()
+            MockAction.rule_type = "action/event"
+            MockAction.id = "tests.sentry.tasks.post_process.tests.MockAction"
+            MockAction.return_value.after.return_value = []
+            rules.add(MockAction)
+
+            conditions = [{"id": "sentry.rules.conditions.every_event.EveryEventCondition"}]
+            actions = [{"id": "tests.sentry.tasks.post_process.tests.MockAction"}]
+            AlertRule.objects.filter(project=self.project).delete()
+            rule = AlertRule.objects.create(
+                project=self.project, data={"conditions": conditions, "actions": actions}
+            )
+
+            event = self.store_event(
+                data={"message": "testing", "fingerprint": ["group-1"]}, project_id=self.project.id
+            )
+            event_2 = self.store_event(
+                data={"message": "testing", "fingerprint": ["group-1"]}, project_id=self.project.id
+            )
+            event_3 = self.store_event(
+                data={"message": "testing", "fingerprint": ["group-2"]}, project_id=self.project.id
+            )
+            assert event.group_id == event_2.group_id != event_3.group_id
+
+            events = [
+                self.get_task_kwargs(event, is_new=True, is_new_group_environment=True),
+                self.get_task_kwargs(event_2),
+                self.get_task_kwargs(event_3, is_new=True, is_new_group_environment=True),
+            ]
+            # Already processed and duplicate events are skipped
+            event_processing_store.delete_by_key(events[1]["cache_key"])
+            events.append(dict(events[2]))
+
+            post_process_group_batch(events=events)
+
+            assert MockAction.return_value.after.call_count == 2
+            for task_kwargs in events:
+                assert event_processing_store.get(task_kwargs["cache_key"]) is None
+            assert set(
+                GroupRuleStatus.objects.filter(rule=rule).values_list("group_id", flat=True)
+            ) == {event.group_id, event_3.group_id}
+            assert (
+                GroupInbox.objects.filter(
+                    group_id__in=[event.group_id, event_3.group_id],
+                    reason=GroupInboxReason.NEW.value,
+                ).count()
+                == 2
+            )
+
+    @patch("sentry.rules.processor.RuleProcessor")
+    def test_batch_merged_group(self, mock_processor):
+        from sentry.models import Rule as AlertRule
+
+        event = self.store_event(data={"message": "testing"}, project_id=self.project.id)
+        task_kwargs = self.get_task_kwargs(event, is_new=True, is_new_group_environment=True)
+        assert AlertRule.objects.filter(project=self.project).exists()
+
+        group1 = event.group
+        group2 = self.create_group(project=self.project)
+        with self.tasks():
+            merge_groups([group1.id], group2.id)
+
+        mock_processor.return_value.apply.return_value = []
+        post_process_group_batch(events=[task_kwargs])
+
+        # The rules of the project are applied to the merged group.
+        rules = AlertRule.get_for_project(self.project.id)
+        assert rules
+        mock_processor.assert_called_once_with(
+            EventMatcher(event, group=group2),
+            True,
+            False,
+            True,
+            False,
+            rules=rules,
+            rule_statuses=None,
+        )
+
+    @patch("sentry.signals.issue_unignored.send_robust")
+    def test_batch_invalidates_snooze(self, send_robust):
+        event = self.store_event(data={"message": "testing"}, project_id=self.project.id)
+        event_2 = self.store_event(data={"message": "testing"}, project_id=self.project.id)
+        group = event.group
+        group.update(status=GroupStatus.IGNORED)
+        GroupSnooze.objects.create(group=group, until=timezone.now() - timedelta(hours=1))
+
+        post_process_group_batch(
+            events=[self.get_task_kwargs(event), self.get_task_kwargs(event_2)]
+        )
+
+        assert send_robust.call_count == 1
+        assert Group.objects.get(id=group.id).status == GroupStatus.UNRESOLVED
+        assert not GroupSnooze.objects.filter(group=group).exists()
+        assert (
+            GroupInbox.objects.filter(group=group, reason=GroupInboxReason.UNIGNORED.value).count()
+            == 1
+        )
+
+
 class PostProcessGroupAssignmentTest(TestCase):
     def make_ownership(self, extra_rules=None):
         self.user_2 = self.create_user()
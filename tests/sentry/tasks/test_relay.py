@@ -7,9 +7,12 @@ from django.db import transaction
 from sentry.models import Project, ProjectKey, ProjectKeyStatus, ProjectOption
 from sentry.relay.projectconfig_cache.redis import RedisProjectConfigCache
 from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDebounceCache
+from sentry.relay.projectconfig_invalidation_queue.redis import RedisProjectConfigInvalidationQueue
 from sentry.tasks.relay import (
     build_project_config,
+    compute_configs_batch,
     invalidate_project_config,
+    process_project_config_invalidations,
     schedule_build_project_config,
     schedule_invalidate_project_config,
 )
@@ -79,6 +82,7 @@ def redis_cache(monkeypatch):
     monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", cache.set_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.delete_many", cache.delete_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.get", cache.get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.exists_many", cache.exists_many)
 
     return cache
 
@@ -448,3 +452,90 @@ def test_invalidate_hierarchy(
     assert len(calls) == 1
     cache = redis_cache.get(default_projectkey)
     assert cache["disabled"] is False
+
+
+@pytest.fixture
+def invalidation_queue(monkeypatch):
+    queue = RedisProjectConfigInvalidationQueue(key_prefix="test-invalidation")
+    queue.mark_drain_done()
+    queue.pop_many(1000)
+    for name in ("enqueue", "pop_many", "mark_drain_done"):
+        monkeypatch.setattr(
+            f"sentry.relay.projectconfig_invalidation_queue.{name}", getattr(queue, name)
+        )
+    return queue
+
+
+@pytest.mark.django_db
+def test_invalidation_queue_coalesces(
+    monkeypatch, default_project, default_projectkey, invalidation_queue, redis_cache
+):
+    redis_cache.set_many({default_projectkey.public_key: {"dummy-key": "val"}})
+
+    scheduled = []
+    monkeypatch.setattr(
+        "sentry.tasks.relay.process_project_config_invalidations.apply_async",
+        lambda **kwargs: scheduled.append(kwargs),
+    )
+    monkeypatch.setattr(
+        "sentry.tasks.relay.invalidate_project_config.apply_async",
+        lambda **kwargs: pytest.fail("invalidations should be queued"),
+    )
+
+    for _ in range(3):
+        schedule_invalidate_project_config(
+            organization_id=default_project.organization_id, trigger="test"
+        )
+        schedule_invalidate_project_config(project_id=default_project.id, trigger="test")
+        schedule_invalidate_project_config(public_key=default_projectkey.public_key, trigger="test")
+
+    # Only the first invalidation schedules a task.
+    assert scheduled == [{"countdown": 5}]
+
+    with patch("sentry.tasks.relay.compute_projectkey_config") as compute:
+        compute.return_value = {"disabled": False}
+        process_project_config_invalidations()
+
+    # The key is part of all three queued scopes, but only computed once.
+    assert compute.call_count == 1
+    assert redis_cache.get(default_projectkey.public_key) == {"disabled": False}
+    assert invalidation_queue.pop_many(1000) == ([], 0)
+
+
+@pytest.mark.django_db
+def test_compute_configs_batch(default_project, default_projectkey, redis_cache):
+    other_project = Project.objects.create(organization=default_project.organization)
+    other_key = ProjectKey.objects.get_or_create(project=other_project)[0]
+    redis_cache.set_many({default_projectkey.public_key: {"dummy-key": "val"}})
+
+    configs, requested = compute_configs_batch(
+        organization_ids=[default_project.organization_id],
+        project_ids=[default_project.id],
+        public_keys=["deleted-key"],
+    )
+
+    # Configs that are not cached are not computed for organizations and projects.
+    assert other_key.public_key not in configs
+    assert configs["deleted-key"] == {"disabled": True}
+    config = configs[default_projectkey.public_key]
+    assert config["disabled"] is False
+    assert config["projectId"] == default_project.id
+    assert requested == 3
+
+
+@pytest.mark.django_db
+def test_compute_configs_batch_deleted_project(default_project, default_projectkey):
+    other_project = Project.objects.create(organization=default_project.organization)
+    other_key = ProjectKey.objects.get_or_create(project=other_project)[0]
+    # The project is deleted after its key has been fetched, which must not fail the
+    # configs of other keys in the batch.
+    with patch.object(
+        Project.objects, "in_bulk", return_value={default_project.id: default_project}
+    ):
+        configs, requested = compute_configs_batch(
+            public_keys=[default_projectkey.public_key, other_key.public_key],
+        )
+
+    assert configs[other_key.public_key] == {"disabled": True}
+    assert configs[default_projectkey.public_key]["projectId"] == default_project.id
+    assert requested == 2
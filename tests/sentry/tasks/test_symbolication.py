@@ -5,9 +5,11 @@ import pytest
 from sentry.plugins.base.v2 import Plugin2
 from sentry.tasks.store import preprocess_event
 from sentry.tasks.symbolication import (
+    batch_symbolication,
     should_demote_symbolication,
     submit_symbolicate,
     symbolicate_event,
+    symbolicate_event_batch,
 )
 from sentry.testutils.helpers.options import override_options
 from sentry.testutils.helpers.task_runner import TaskRunner
@@ -64,6 +66,12 @@ def mock_symbolicate_event_low_priority():
         yield m
 
 
+@pytest.fixture
+def mock_symbolicate_event_batch():
+    with mock.patch("sentry.tasks.symbolication.symbolicate_event_batch") as m:
+        yield m
+
+
 @pytest.fixture
 def mock_get_symbolication_function():
     with mock.patch("sentry.lang.native.processing.get_symbolication_function") as m:
@@ -183,6 +191,111 @@ def test_symbolicate_event_call_process_inline(
     )
 
 
+@pytest.mark.django_db
+def test_batch_symbolication(
+    default_project,
+    mock_process_event,
+    mock_save_event,
+    mock_symbolicate_event,
+    mock_symbolicate_event_batch,
+    register_plugin,
+):
+    register_plugin(globals(), BasicPreprocessorPlugin)
+
+    with override_options({"symbolicate-event.batch-size": 2}), batch_symbolication():
+        for i in range(3):
+            data = {
+                "project": default_project.id,
+                "platform": "native",
+                "logentry": {"formatted": "test"},
+                "event_id": "%032x" % i,
+            }
+            preprocess_event(cache_key=f"e:{i}", data=data, start_time=1)
+
+        # full batches are submitted right away
+        assert mock_symbolicate_event_batch.delay.call_count == 1
+
+    assert mock_symbolicate_event_batch.delay.call_args_list == [
+        mock.call(
+            events=[
+                {
+                    "cache_key": f"e:{i}",
+                    "start_time": 1,
+                    "event_id": "%032x" % i,
+                    "has_attachments": False,
+                }
+                for i in range(2)
+            ]
+        ),
+        mock.call(
+            events=[
+                {
+                    "cache_key": "e:2",
+                    "start_time": 1,
+                    "event_id": "%032x" % 2,
+                    "has_attachments": False,
+                }
+            ]
+        ),
+    ]
+    assert mock_symbolicate_event.delay.call_count == 0
+    assert mock_process_event.delay.call_count == 0
+
+
+@pytest.mark.django_db
+def test_symbolicate_event_batch(default_project, mock_event_processing_store, mock_process_event):
+    events = [
+        {"project": default_project.id, "platform": "native", "event_id": "%032x" % i}
+        for i in range(2)
+    ]
+    mock_event_processing_store.get.side_effect = events
+    mock_event_processing_store.store.side_effect = ["e:0", "e:1"]
+
+    with mock.patch(
+        "sentry.lang.native.batching.process_payloads"
+    ) as mock_process_payloads, mock.patch(
+        "sentry.tasks.store.do_process_event"
+    ) as mock_do_process_event, mock.patch(
+        "sentry.tasks.symbolication.realtime_metrics"
+    ) as mock_realtime_metrics, override_options(
+        {"symbolicate-event.low-priority.metrics.submission-rate": 1.0}
+    ):
+        symbolicate_event_batch(
+            events=[
+                {
+                    "cache_key": f"e:{i}",
+                    "start_time": 1,
+                    "event_id": "%032x" % i,
+                    "has_attachments": False,
+                }
+                for i in range(2)
+            ]
+        )
+
+    ((_, (symbolicated,), _),) = mock_process_payloads.mock_calls
+    assert [data["event_id"] for data in symbolicated] == ["%032x" % i for i in range(2)]
+
+    # The counters for the low priority queue are submitted once for the batch.
+    assert mock_realtime_metrics.increment_project_event_counter.call_count == 1
+    assert mock_realtime_metrics.increment_project_duration_counter.call_count == 1
+    ((project_id, _, _), _) = mock_realtime_metrics.increment_project_duration_counter.call_args
+    assert project_id == default_project.id
+
+    assert mock_do_process_event.call_args_list == [
+        mock.call(
+            cache_key=f"e:{i}",
+            start_time=1,
+            event_id="%032x" % i,
+            process_task=mock_process_event,
+            data=events[i],
+            data_has_changed=True,
+            from_symbolicate=True,
+            has_attachments=False,
+        )
+        for i in range(2)
+    ]
+
+
 @pytest.fixture(params=["org", "project"])
 def options_model(request, default_organization, default_project):
     if request.param == "org":
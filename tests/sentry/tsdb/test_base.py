@@ -4,7 +4,7 @@ from unittest import TestCase, mock
 
 import pytz
 
-from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, BaseTSDB
+from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, BaseTSDB, TotalsQuery, TSDBModel
 from sentry.utils.dates import to_timestamp
 
 
@@ -129,3 +129,67 @@ class BaseTSDBTest(TestCase):
         assert self.tsdb.make_series(0, start) == [
             (to_timestamp(start + timedelta(hours=24) * i), 0) for i in range(8)
         ]
+
+    def test_get_range_multi(self):
+        start = datetime(2016, 8, 1, tzinfo=pytz.utc)
+        end = start + timedelta(hours=2)
+        timestamps = [to_timestamp(start + timedelta(hours=i)) for i in range(3)]
+
+        def get_range(model, keys, start, end, rollup=None, environment_ids=None):
+            count = 10 if environment_ids else 1
+            return {key: [(timestamp, key * count) for timestamp in timestamps] for key in keys}
+
+        with mock.patch.object(self.tsdb, "get_range", side_effect=get_range) as get_range_mock:
+            series, results = self.tsdb.get_range_multi(
+                [(TSDBModel.group, 1, None), (TSDBModel.group, 2, None), (TSDBModel.group, 2, 3)],
+                start,
+                end,
+                rollup=ONE_HOUR,
+            )
+
+        assert get_range_mock.call_count == 2
+        assert series == timestamps
+        assert {item: list(counts) for item, counts in results.items()} == {
+            (TSDBModel.group, 1, None): [1, 1, 1],
+            (TSDBModel.group, 2, None): [2, 2, 2],
+            (TSDBModel.group, 2, 3): [20, 20, 20],
+        }
+
+    def test_get_totals_multi(self):
+        end = datetime(2016, 8, 1, tzinfo=pytz.utc)
+        start = end - timedelta(hours=1)
+
+        with mock.patch.object(
+            self.tsdb, "get_sums", return_value={1: 10}
+        ) as get_sums, mock.patch.object(
+            self.tsdb, "get_distinct_counts_totals", return_value={1: 2}
+        ) as get_distinct_counts_totals:
+            results = self.tsdb.get_totals_multi(
+                [
+                    TotalsQuery(TSDBModel.group, [1], start, end, jitter_value=1),
+                    TotalsQuery(
+                        TSDBModel.users_affected_by_group, [1], start, end, 3, distinct=True
+                    ),
+                ],
+                use_cache=True,
+            )
+
+        assert results == [{1: 10}, {1: 2}]
+        get_sums.assert_called_once_with(
+            TSDBModel.group,
+            [1],
+            start,
+            end,
+            environment_id=None,
+            use_cache=True,
+            jitter_value=1,
+        )
+        get_distinct_counts_totals.assert_called_once_with(
+            TSDBModel.users_affected_by_group,
+            [1],
+            start,
+            end,
+            environment_id=3,
+            use_cache=True,
+            jitter_value=None,
+        )
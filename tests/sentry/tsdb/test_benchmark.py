@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from sentry.tsdb.base import ONE_DAY, ONE_HOUR, TSDBModel
+from sentry.tsdb.inmemory import InMemoryTSDB
+
+GROUPS = 300
+DAYS = 90
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+@pytest.fixture(scope="module")
+def tsdb():
+    tsdb = InMemoryTSDB(rollups=((ONE_HOUR, 24), (ONE_DAY, DAYS)))
+    now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+    for day in range(DAYS):
+        tsdb.incr_multi(
+            [(TSDBModel.group, group, {"count": group % 7}) for group in range(GROUPS)],
+            timestamp=now - timedelta(days=day),
+            environment_id=1,
+        )
+    return tsdb
+
+
+def get_range(tsdb, end):
+    results = {}
+    for environment_id in (None, 1):
+        for key, points in tsdb.get_range(
+            TSDBModel.group,
+            list(range(GROUPS)),
+            end - timedelta(days=DAYS),
+            end,
+            rollup=ONE_DAY,
+            environment_ids=[environment_id] if environment_id is not None else None,
+        ).items():
+            results[(TSDBModel.group, key, environment_id)] = [count for _, count in points]
+    return results
+
+
+def get_range_multi(tsdb, end):
+    _, results = tsdb.get_range_multi(
+        [
+            (TSDBModel.group, group, environment_id)
+            for environment_id in (None, 1)
+            for group in range(GROUPS)
+        ],
+        end - timedelta(days=DAYS),
+        end,
+        rollup=ONE_DAY,
+    )
+    return results
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("read", [get_range, get_range_multi], ids=lambda read: read.__name__)
+def test_benchmark_get_range(tsdb, read, benchmark):
+    end = datetime.utcnow().replace(tzinfo=pytz.UTC)
+    expected = {key: list(counts) for key, counts in get_range_multi(tsdb, end).items()}
+
+    results = benchmark(read, tsdb, end)
+
+    assert {key: list(counts) for key, counts in results.items()} == expected
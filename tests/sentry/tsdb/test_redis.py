@@ -188,6 +188,39 @@ class RedisTSDBTest(TestCase):
         results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
         assert results == {1: 0, 2: 0}
 
+    def test_get_range_multi(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+
+        # More keys than vnodes, so that several keys share a hash.
+        keys = list(range(100))
+        self.db.incr_multi([(TSDBModel.group, key) for key in keys], dts[0])
+        self.db.incr_multi(
+            [(TSDBModel.group, key) for key in keys], dts[2], count=2, environment_id=1
+        )
+        self.db.incr(TSDBModel.project, 1, dts[3], count=5)
+
+        items = [(TSDBModel.group, key, None) for key in keys] + [
+            (TSDBModel.group, 1, 1),
+            (TSDBModel.project, 1, None),
+        ]
+        series, results = self.db.get_range_multi(items, dts[0], dts[-1])
+
+        assert series == [int(to_timestamp(d)) - int(to_timestamp(d)) % 3600 for d in dts]
+        for key in keys:
+            assert list(results[(TSDBModel.group, key, None)]) == [1, 0, 2, 0]
+        assert list(results[(TSDBModel.group, 1, 1)]) == [0, 0, 2, 0]
+        assert list(results[(TSDBModel.project, 1, None)]) == [0, 0, 0, 5]
+
+        self.db.merge(TSDBModel.group, 0, keys[1:], now, environment_ids=[1])
+
+        series, results = self.db.get_range_multi(items, dts[0], dts[-1])
+        assert list(results[(TSDBModel.group, 0, None)]) == [100, 0, 200, 0]
+        assert list(results[(TSDBModel.group, 1, None)]) == [0, 0, 0, 0]
+        assert list(results[(TSDBModel.group, 1, 1)]) == [0, 0, 0, 0]
+
+        assert self.db.get_sums(TSDBModel.group, [0], dts[0], dts[-1], environment_id=1) == {0: 200}
+
     def test_count_distinct(self):
         now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
         dts = [now + timedelta(hours=i) for i in range(4)]
@@ -1,8 +1,12 @@
 import datetime
+import decimal
+import os
 import uuid
+from collections import OrderedDict, namedtuple
 from enum import Enum
 from unittest import TestCase
 
+import pytest
 from django.utils.translation import ugettext_lazy as _
 
 from sentry.utils import json
@@ -48,3 +52,74 @@ class JSONTest(TestCase):
 
     def test_translation(self):
         self.assertEqual(json.dumps(_("word")), '"word"')
+
+
+class RapidJSONCodecTest(JSONTest):
+    def setUp(self):
+        json.set_default_codec("rapidjson")
+        self.addCleanup(json.set_default_codec, "simplejson")
+
+
+SAMPLES_PATH = os.path.join(os.path.dirname(json.__file__), "..", "data", "samples")
+
+Point = namedtuple("Point", "x y")
+
+COMPATIBILITY_VALUES = [
+    decimal.Decimal("1.50"),
+    Point(1, [Point(2, 3)]),
+    (1, (2,)),
+    {1: "int", None: "none", 1.5: "float"},
+    {True: "bool"},
+    {"nested": {2: "int"}},
+    OrderedDict([("b", 1), ("a", 2)]),
+    float("nan"),
+    [float("-inf")],
+    1 << 70,
+    -(1 << 64),
+    "\ud800",
+    "\u00e9\u2028\x00",
+    b"bytes",
+    uuid.UUID(int=5),
+    datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+    datetime.date(2020, 1, 2),
+    {"set": {1}},
+    len,
+    1e16,
+    0.1,
+    -0.0,
+]
+
+
+class CodecCompatibilityTest(TestCase):
+    def assert_compatible(self, value):
+        reference = json.get_codec("simplejson")
+        codec = json.get_codec("rapidjson")
+        try:
+            expected = reference.loads(reference.dumps(value))
+        except Exception as e:
+            with pytest.raises(type(e)):
+                codec.dumps(value)
+        else:
+            # compare reprs, so that NaN and -0.0 are compared as well
+            assert repr(reference.loads(codec.dumps(value))) == repr(expected)
+
+    def test_values(self):
+        for value in COMPATIBILITY_VALUES:
+            self.assert_compatible(value)
+
+    def test_unserializable(self):
+        self.assert_compatible(object())
+        self.assert_compatible({"key": object()})
+
+        circular = []
+        circular.append(circular)
+        self.assert_compatible(circular)
+
+    def test_samples(self):
+        for name in sorted(os.listdir(SAMPLES_PATH)):
+            with open(os.path.join(SAMPLES_PATH, name)) as f:
+                self.assert_compatible(json.load(f))
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            json.get_codec("pickle")
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from sentry.relay.config import get_project_config
+from sentry.utils import json
+
+SAMPLES_PATH = os.path.join(os.path.dirname(json.__file__), "..", "data", "samples")
+
+CODECS = ["simplejson", "rapidjson"]
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+@pytest.fixture(scope="module")
+def events():
+    # Event payloads, as stored in nodestore and sent through Kafka
+    events = []
+    for name in sorted(os.listdir(SAMPLES_PATH)):
+        with open(os.path.join(SAMPLES_PATH, name)) as f:
+            events.append(json.load(f))
+    return events
+
+
+@pytest.fixture
+def project_configs(default_project):
+    # Project configs, as stored in the relay project config cache
+    return [get_project_config(default_project, full_config=True).to_dict()]
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("codec", CODECS)
+def test_benchmark_dumps_events(events, codec, benchmark):
+    codec = json.get_codec(codec)
+    benchmark(lambda: [codec.dumps(data) for data in events])
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("codec", CODECS)
+def test_benchmark_loads_events(events, codec, benchmark):
+    codec = json.get_codec(codec)
+    payloads = [json.dumps(data) for data in events]
+    assert benchmark(lambda: [codec.loads(payload) for payload in payloads]) == events
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.django_db
+@pytest.mark.parametrize("codec", CODECS)
+def test_benchmark_dumps_project_configs(project_configs, codec, benchmark):
+    codec = json.get_codec(codec)
+    benchmark(lambda: [codec.dumps(config) for config in project_configs])
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.django_db
+@pytest.mark.parametrize("skip_trace", [False, True])
+def test_benchmark_loads_project_configs(project_configs, skip_trace, benchmark):
+    payloads = [json.dumps(config) for config in project_configs]
+    benchmark(lambda: [json.loads(payload, skip_trace=skip_trace) for payload in payloads])
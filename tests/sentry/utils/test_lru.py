@@ -0,0 +1,80 @@
+from unittest import mock
+
+from sentry.utils.lru import SizedLRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+def test_get_set():
+    cache = SizedLRUCache(100, ttl=10)
+    assert cache.get("a") is None
+    assert cache.set("a", b"hello")
+    assert cache.get("a") == b"hello"
+    assert "a" in cache
+    cache.delete("a")
+    assert cache.get("a") is None
+
+    stats = cache.get_stats()
+    assert (stats.hits, stats.misses, stats.size, stats.entries) == (1, 2, 0, 0)
+
+
+def test_evicts_least_recently_used_by_size():
+    on_evict = mock.Mock()
+    cache = SizedLRUCache(10, ttl=10, on_evict=on_evict)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    # Touch "a" so that "b" is the least recently used entry.
+    assert cache.get("a") == b"aaaa"
+    cache.set("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert on_evict.call_args_list == [mock.call("b")]
+
+    stats = cache.get_stats()
+    assert (stats.evictions, stats.size, stats.entries) == (1, 8, 2)
+
+
+def test_replacing_entry_updates_size():
+    cache = SizedLRUCache(10, ttl=10)
+    cache.set("a", b"aaaaaaaa")
+    cache.set("a", b"a")
+    assert cache.get_stats().size == 1
+
+
+def test_explicit_size():
+    cache = SizedLRUCache(10, ttl=10)
+    cache.set("a", 1, size=6)
+    cache.set("b", 2, size=6)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get_stats().size == 6
+
+
+def test_does_not_store_oversized_values():
+    cache = SizedLRUCache(4, ttl=10)
+    cache.set("a", b"a")
+    assert not cache.set("a", b"aaaaa")
+    assert cache.get("a") is None
+    assert cache.get_stats().size == 0
+
+
+def test_expiry():
+    clock = Clock()
+    cache = SizedLRUCache(100, ttl=10, clock=clock)
+    cache.set("a", b"a")
+    cache.set("b", b"b", ttl=20)
+
+    clock.time = 15
+    assert cache.get("a") is None
+    assert cache.get("b") == b"b"
+
+    stats = cache.get_stats()
+    assert (stats.expirations, stats.size, stats.entries) == (1, 1, 1)
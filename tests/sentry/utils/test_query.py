@@ -1,6 +1,8 @@
+import pytest
+
 from sentry.models import User
-from sentry.testutils import TestCase
-from sentry.utils.query import RangeQuerySetWrapper
+from sentry.testutils import TestCase, TransactionTestCase
+from sentry.utils.query import ParallelRangeQuerySetWrapper, RangeQuerySetWrapper
 
 
 class RangeQuerySetWrapperTest(TestCase):
@@ -26,3 +28,47 @@ class RangeQuerySetWrapperTest(TestCase):
             user.delete()
 
         assert User.objects.all().count() == 0
+
+
+# Worker threads use connections of their own, which would not see the rows
+# created within the transaction of a regular test case.
+class ParallelRangeQuerySetWrapperTest(TransactionTestCase):
+    def test_basic(self):
+        users = [self.create_user() for _ in range(20)]
+        qs = User.objects.all()
+
+        result = list(ParallelRangeQuerySetWrapper(qs, step=2, workers=3, partitions=7))
+        assert sorted(user.id for user in result) == sorted(user.id for user in users)
+        assert len(list(ParallelRangeQuerySetWrapper(qs, step=2, limit=5))) == 5
+        assert len(list(ParallelRangeQuerySetWrapper(qs.filter(id=users[3].id)))) == 1
+        assert list(ParallelRangeQuerySetWrapper(qs.filter(id=-1))) == []
+
+    def test_values(self):
+        users = [self.create_user() for _ in range(10)]
+        qs = User.objects.all()
+
+        result = ParallelRangeQuerySetWrapper(qs, step=3, values=("id", "email"))
+        assert sorted(result) == sorted((user.id, user.email) for user in users)
+
+        result = ParallelRangeQuerySetWrapper(qs, step=3, values=("email",), flat=True)
+        assert sorted(result) == sorted(user.email for user in users)
+
+        with pytest.raises(TypeError):
+            ParallelRangeQuerySetWrapper(qs, values=("id", "email"), flat=True)
+
+    def test_close_early(self):
+        for _ in range(10):
+            self.create_user()
+
+        results = iter(ParallelRangeQuerySetWrapper(User.objects.all(), step=1, queue_size=1))
+        next(results)
+        results.close()
+
+    def test_error(self):
+        self.create_user()
+
+        def callback(results):
+            raise ZeroDivisionError
+
+        with pytest.raises(ZeroDivisionError):
+            list(ParallelRangeQuerySetWrapper(User.objects.all(), callbacks=[callback]))
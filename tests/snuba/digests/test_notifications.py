@@ -0,0 +1,41 @@
+from sentry import tsdb
+from sentry.digests.notifications import event_to_record, fetch_state
+from sentry.digests.utils import sort_records
+from sentry.testutils import SnubaTestCase, TestCase
+from sentry.testutils.helpers.datetime import before_now, iso_format
+
+
+class FetchStateTestCase(TestCase, SnubaTestCase):
+    def test_counts(self):
+        rule = self.create_project_rule(project=self.project)
+        events = [
+            self.store_event(
+                data={
+                    "fingerprint": [fingerprint],
+                    "timestamp": iso_format(before_now(minutes=minutes)),
+                    "user": {"id": user},
+                },
+                project_id=self.project.id,
+            )
+            for fingerprint, minutes, user in [
+                ("group-1", 3, "user-1"),
+                ("group-1", 2, "user-2"),
+                ("group-1", 2, "user-1"),
+                ("group-2", 1, "user-1"),
+            ]
+        ]
+        group_1, group_2 = events[0].group, events[-1].group
+        records = sort_records([event_to_record(event, [rule]) for event in events])
+
+        state = fetch_state(self.project, records)
+        assert state["groups"] == {group_1.id: group_1, group_2.id: group_2}
+        assert state["rules"] == {rule.id: rule}
+        assert state["event_counts"] == {group_1.id: 3, group_2.id: 1}
+        assert state["user_counts"] == {group_1.id: 2, group_2.id: 1}
+
+        start, end = records[-1].datetime, records[0].datetime
+        group_ids = [group_1.id, group_2.id]
+        assert state["event_counts"] == tsdb.get_sums(tsdb.models.group, group_ids, start, end)
+        assert state["user_counts"] == tsdb.get_distinct_counts_totals(
+            tsdb.models.users_affected_by_group, group_ids, start, end
+        )
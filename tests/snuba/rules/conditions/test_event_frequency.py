@@ -7,10 +7,12 @@ from uuid import uuid4
 from django.utils.timezone import now
 from freezegun import freeze_time
 
+from sentry import tsdb
 from sentry.models import Rule
 from sentry.rules.conditions.event_frequency import (
     EventFrequencyCondition,
     EventFrequencyPercentCondition,
+    EventFrequencyQueryPlanner,
     EventUniqueUserFrequencyCondition,
 )
 from sentry.testutils.cases import RuleTestCase, SnubaTestCase
@@ -166,6 +168,79 @@ class StandardIntervalMixin:
         rule = self.get_rule(data=data, rule=Rule(environment_id=None))
         self.assertDoesNotPass(rule, event)
 
+    def _store_planner_events(self):
+        # 4 events in the last hour, and 2 events in the hour a day before
+        event = self.store_event(
+            data={
+                "fingerprint": ["something_random"],
+                "timestamp": iso_format(before_now(minutes=1)),
+                "user": {"id": uuid4().hex},
+            },
+            project_id=self.project.id,
+        )
+        self.increment(event, 3, timestamp=now() - timedelta(minutes=1))
+        self.increment(event, 2, timestamp=now() - timedelta(days=1, minutes=20))
+        return event
+
+    def _plan_rules(self, event, datas):
+        planner = EventFrequencyQueryPlanner(event)
+        rules = [
+            self.get_rule(data=data, rule=Rule(environment_id=None), planner=planner)
+            for data in datas
+        ]
+        for rule in rules:
+            planner.add_condition(rule)
+        return rules
+
+    def test_planner(self):
+        event = self._store_planner_events()
+        passing, failing, comparison = self._plan_rules(
+            event,
+            [
+                {"interval": "1h", "value": 3},
+                {"interval": "1h", "value": 4},
+                {
+                    "interval": "1h",
+                    "value": 99,
+                    "comparisonType": "percent",
+                    "comparisonInterval": "1d",
+                },
+            ],
+        )
+
+        with self.options({"rules.event-frequency.memoize-ttl": 0}), patch(
+            "sentry.tsdb.get_totals_multi", side_effect=tsdb.get_totals_multi
+        ) as get_totals_multi:
+            self.assertPasses(passing, event)
+            self.assertDoesNotPass(failing, event)
+            self.assertPasses(comparison, event)
+
+        # The windows of all the rules are queried together, and only once
+        assert get_totals_multi.call_count == 1
+        assert len(get_totals_multi.call_args[0][0]) == 2
+
+    def test_planner_memoize(self):
+        event = self._store_planner_events()
+        datas = [{"interval": "1h", "value": 4}]
+
+        with self.options({"rules.event-frequency.memoize-ttl": 60}):
+            (rule,) = self._plan_rules(event, datas)
+            self.assertDoesNotPass(rule, event)
+
+            self.increment(event, 1, timestamp=now() - timedelta(minutes=1))
+            (rule,) = self._plan_rules(event, datas)
+            with patch("sentry.tsdb.get_totals_multi") as get_totals_multi:
+                self.assertDoesNotPass(rule, event)
+            assert get_totals_multi.call_count == 0
+
+        with self.options({"rules.event-frequency.memoize-ttl": 0}):
+            (rule,) = self._plan_rules(event, datas)
+            with patch(
+                "sentry.tsdb.get_totals_multi", side_effect=tsdb.get_totals_multi
+            ) as get_totals_multi:
+                rule.passes(event, self.get_state())
+            assert get_totals_multi.call_count == 1
+
 
 @freeze_time((now() - timedelta(days=2)).replace(hour=12, minute=40, second=0, microsecond=0))
 class EventFrequencyConditionTestCase(
@@ -6,6 +6,7 @@ from unittest import mock
 import pytest
 import pytz
 from django.utils import timezone
+from freezegun import freeze_time
 
 from sentry import options
 from sentry.api.issue_search import convert_query_values, issue_search_config, parse_search_query
@@ -27,7 +28,7 @@ from sentry.search.snuba.backend import (
     CdcEventsDatasetSnubaSearchBackend,
     EventsDatasetSnubaSearchBackend,
 )
-from sentry.search.snuba.executors import InvalidQueryForExecutor
+from sentry.search.snuba.executors import InvalidQueryForExecutor, PostgresSnubaQueryExecutor
 from sentry.testutils import SnubaTestCase, TestCase, xfail_if_not_postgres
 from sentry.testutils.helpers.datetime import before_now, iso_format
 from sentry.testutils.helpers.faux import Any
@@ -1389,6 +1390,45 @@ class EventsSnubaSearchTest(TestCase, SnubaTestCase):
             assert third_results.hits > 10
             assert third_results.results != second_results.results
 
+    def test_hits_cache(self):
+        with freeze_time(timezone.now()):
+            with self.options({"snuba.search.hits-cache-ttl": 60}):
+                for sort_by in ("date", "freq"):
+                    assert self.make_query(sort_by=sort_by, count_hits=True).hits == 2
+
+            self.group2.update(status=GroupStatus.PENDING_DELETION)
+
+            with self.options({"snuba.search.hits-cache-ttl": 60}):
+                for sort_by in ("date", "freq"):
+                    assert self.make_query(sort_by=sort_by, count_hits=True).hits == 2
+
+            for sort_by in ("date", "freq"):
+                assert self.make_query(sort_by=sort_by, count_hits=True).hits == 1
+
+    def test_prefetch_pages(self):
+        with freeze_time(timezone.now()), self.options({"snuba.search.prefetch-pages": 1}):
+            results = self.backend.query([self.project], limit=1, sort_by="freq", count_hits=True)
+            assert list(results) == [self.group1]
+            assert results.hits == 2
+
+            with mock.patch.object(PostgresSnubaQueryExecutor, "snuba_search") as snuba_search:
+                results = self.backend.query(
+                    [self.project], cursor=results.next, limit=1, sort_by="freq", count_hits=True
+                )
+                assert not snuba_search.called
+
+            assert list(results) == [self.group2]
+            assert results.hits == 2
+            assert results.prev.has_results
+            assert not results.next.has_results
+
+            # the previous page is not prefetched
+            results = self.backend.query(
+                [self.project], cursor=results.prev, limit=1, sort_by="freq", count_hits=True
+            )
+            assert list(results) == [self.group1]
+            assert results.next.has_results
+
     def test_regressed_in_release(self):
         # expect no groups within the results since there are no releases
         results = self.make_query(search_filter_query="regressed_in_release:fake")
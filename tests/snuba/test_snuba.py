@@ -110,6 +110,53 @@ class SnubaTest(TestCase, SnubaTestCase):
             )
 
 
+class BulkQueryTest(TestCase, SnubaTestCase):
+    def test_simple(self) -> None:
+        one_min_ago = iso_format(before_now(minutes=1))
+        event_1 = self.store_event(
+            data={"fingerprint": ["group-1"], "message": "hello", "timestamp": one_min_ago},
+            project_id=self.project.id,
+        )
+        event_2 = self.store_event(
+            data={"fingerprint": ["group-2"], "message": "hello", "timestamp": one_min_ago},
+            project_id=self.project.id,
+        )
+        self.store_event(
+            data={"fingerprint": ["group-2"], "message": "hello", "timestamp": one_min_ago},
+            project_id=self.project.id,
+        )
+
+        results = snuba.bulk_query(
+            [
+                snuba.SnubaQueryParams(
+                    start=timezone.now() - timedelta(days=1),
+                    end=timezone.now(),
+                    groupby=["group_id"],
+                    aggregations=[["count()", "", "aggregate"]],
+                    filter_keys={
+                        "project_id": [self.project.id],
+                        "group_id": [event_1.group.id, event_2.group.id],
+                    },
+                ),
+                # Before the group was first seen
+                snuba.SnubaQueryParams(
+                    start=timezone.now() - timedelta(days=2),
+                    end=timezone.now() - timedelta(days=1),
+                    groupby=["group_id"],
+                    aggregations=[["count()", "", "aggregate"]],
+                    filter_keys={"project_id": [self.project.id], "group_id": [event_1.group.id]},
+                ),
+                snuba.SnubaQueryParams(
+                    start=timezone.now() - timedelta(days=1),
+                    end=timezone.now(),
+                    aggregations=[["uniq", "group_id", "aggregate"]],
+                    filter_keys={"project_id": [self.project.id]},
+                ),
+            ],
+        )
+        assert results == [{event_1.group.id: 1, event_2.group.id: 2}, {}, 2]
+
+
 class BulkRawQueryTest(TestCase, SnubaTestCase):
     def test_simple(self) -> None:
         one_min_ago = iso_format(before_now(minutes=1))
@@ -6,8 +6,9 @@ import pytz
 from sentry.models import Environment, Group, GroupRelease, Release
 from sentry.testutils import SnubaTestCase, TestCase
 from sentry.testutils.helpers.datetime import iso_format
-from sentry.tsdb.base import TSDBModel
+from sentry.tsdb.base import TotalsQuery, TSDBModel
 from sentry.tsdb.snuba import SnubaTSDB
+from sentry.utils import snuba
 from sentry.utils.dates import to_datetime, to_timestamp
 
 
@@ -439,6 +440,52 @@ class SnubaTSDBTest(TestCase, SnubaTestCase):
         )
         assert has_shape(results, 1)
 
+    def test_totals_multi(self):
+        start = self.now
+        end = self.now + timedelta(hours=4)
+        queries = [
+            TotalsQuery(TSDBModel.group, [self.proj1group1.id, self.proj1group2.id], start, end),
+            TotalsQuery(TSDBModel.group, [self.proj1group1.id], start, end, self.env1.id),
+            TotalsQuery(TSDBModel.group, [self.proj1group1.id], start, start + timedelta(hours=1)),
+            TotalsQuery(
+                TSDBModel.users_affected_by_group, [self.proj1group1.id], start, end, distinct=True
+            ),
+            TotalsQuery(TSDBModel.group, [], start, end),
+            # Before the group was first seen
+            TotalsQuery(
+                TSDBModel.group,
+                [self.proj1group1.id],
+                start - timedelta(days=2),
+                start - timedelta(days=1),
+            ),
+        ]
+
+        with patch(
+            "sentry.utils.snuba._bulk_snuba_query", side_effect=snuba._bulk_snuba_query
+        ) as bulk_snuba_query:
+            results = self.db.get_totals_multi(queries)
+        # A single request per model, without the query outside of the group activity
+        assert bulk_snuba_query.call_count == 2
+        assert sum(len(call[0][0]) for call in bulk_snuba_query.call_args_list) == 4
+
+        assert results == [
+            self.db.get_sums(
+                TSDBModel.group, [self.proj1group1.id, self.proj1group2.id], start, end
+            ),
+            self.db.get_sums(
+                TSDBModel.group, [self.proj1group1.id], start, end, environment_id=self.env1.id
+            ),
+            self.db.get_sums(
+                TSDBModel.group, [self.proj1group1.id], start, start + timedelta(hours=1)
+            ),
+            self.db.get_distinct_counts_totals(
+                TSDBModel.users_affected_by_group, [self.proj1group1.id], start, end
+            ),
+            {},
+            {self.proj1group1.id: 0},
+        ]
+        assert results[0] == {self.proj1group1.id: 12, self.proj1group2.id: 12}
+
     def test_calculated_limit(self):
 
         with patch("sentry.tsdb.snuba.snuba") as snuba: